@@ -23,10 +23,18 @@
 #
 
 from distutils.core import setup
+from distutils.command.build_py import build_py
 from setuptools import find_packages
 import os
 import subprocess
 
+class build_py_registry(build_py):
+    """ Generate the registry of metrics and studies before building """
+    def run(self):
+        from vizgrimoire.metrics.registry import write_registry
+        write_registry()
+        build_py.run(self)
+
 # Fetch version from git tags,
 # it will crash if you are running this outside a git clone
 
@@ -38,4 +46,5 @@ setup(name = "GrimoireLib",
       author_email = "dizquierdo@bitergia.com",
       description = "Open Source projects data mining library",
       url = "https://github.com/VizGrimoire/GrimoireLib",
-      packages = find_packages())
+      packages = find_packages(),
+      cmdclass = {'build_py': build_py_registry})
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+## Benchmarks for the metrics and the report pipeline
+##
+## The run command times each group of benchmarks against the databases
+## of an automator config (the testing ones or the ones created with
+## generate_dbs.py) and appends the results, with the commit, to a JSON
+## history file. The compare command flags the benchmarks slower than a
+## threshold between two commits of the history.
+##
+##    python benchmarks.py run --groups micro,metrics,studies
+##    python benchmarks.py compare 05eeaac HEAD --threshold 10
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+description = """
+Benchmarks for GrimoireLib metrics and report pipeline.
+
+"""
+
+groups = ["micro", "metrics", "filters", "studies", "report"]
+
+
+class Benchmarks(object):
+    """ Time the parts of the report pipeline separately """
+
+    def __init__(self, args):
+        self.args = args
+        self.results = {} # benchmark name -> seconds (best of the repeats)
+
+    def measure(self, name, function, *params):
+        """ Best time of args.repeat executions of function """
+        times = []
+        for i in range(0, self.args.repeat):
+            start = time.time()
+            function(*params)
+            times.append(time.time() - start)
+        self.results[name] = min(times)
+        logging.info("%s: %.4fs" % (name, self.results[name]))
+
+    def init_report(self):
+        from vizgrimoire.GrimoireUtils import getPeriod, read_main_conf
+        from vizgrimoire.report import Report
+
+        Report.init(self.args.config_file, self.args.metrics_path)
+        automator = read_main_conf(self.args.config_file)
+        self.startdate = "'" + automator['r']['start_date'] + "'"
+        self.enddate = "'" + automator['r'].get('end_date', time.strftime('%Y-%m-%d')) + "'"
+        self.period = getPeriod(automator['r'].get('period', 'months'))
+        self.identities_db = automator['generic']['db_identities']
+        self.people_out = []
+        if 'people_out' in automator['r']:
+            self.people_out = automator['r']['people_out'].split(",")
+
+    def bench_micro(self):
+        """ Python post processing of the metrics data, no database needed """
+        from vizgrimoire.GrimoireUtils import completePeriodIds, createJSON, fill_and_order_items
+
+        startdate, enddate = "'2000-01-01'", "'2015-01-01'"
+        months = range(2000*12+1, 2015*12+1)
+        # Time series with gaps, as returned by GetSQLPeriod queries
+        ts = {"month": months[::3], "commits": range(0, len(months[::3]))}
+        self.measure("micro.completePeriodIds", lambda:
+                     completePeriodIds(dict((k, list(v)) for k, v in ts.items()),
+                                       "month", startdate, enddate))
+        items = ["item%i" % (i) for i in range(0, 2000)]
+        data = {"name": items[::2], "commits": range(0, 1000)}
+        self.measure("micro.fill_and_order_items", lambda:
+                     fill_and_order_items(items, dict((k, list(v)) for k, v in data.items()),
+                                          "name"))
+        destdir = tempfile.mkdtemp()
+        evol = {"month": months, "id": range(0, len(months)),
+                "commits": [i * 1.5 for i in range(0, len(months))]}
+        self.measure("micro.createJSON", lambda:
+                     [createJSON(evol, os.path.join(destdir, "evol%i.json" % (i)))
+                      for i in range(0, 100)])
+        shutil.rmtree(destdir)
+
+    def bench_metrics(self):
+        """ get_ts, get_agg and get_list of each metric of each data source """
+        from vizgrimoire.metrics.metrics_filter import MetricFilters
+        from vizgrimoire.report import Report
+
+        for ds in Report.get_data_sources():
+            Report.connect_ds(ds)
+            for metric in ds.get_metrics_set(ds):
+                mfilter = MetricFilters(self.period, self.startdate, self.enddate,
+                                        None, 10, self.people_out)
+                mfilter.global_filter = metric.filters.global_filter
+                mfilter.set_closed_condition(metric.filters.closed_condition)
+                filters_orig = metric.filters
+                metric.filters = mfilter
+                name = "metrics." + ds.get_name() + "." + metric.id
+                for method in ["get_ts", "get_agg", "get_list"]:
+                    try:
+                        self.measure(name + "." + method, getattr(metric, method))
+                    except Exception, e:
+                        # Not all the metrics support all the methods
+                        logging.info(name + "." + method + " not available: " + str(e))
+                metric.filters = filters_orig
+
+    def bench_filters(self):
+        """ DataSource.get_metrics_data for all the items of each filter """
+        from vizgrimoire.filter import Filter
+        from vizgrimoire.report import Report
+
+        for ds in Report.get_data_sources():
+            Report.connect_ds(ds)
+            for filter_ in Report.get_filters():
+                name = "filters." + ds.get_name() + "." + filter_.get_name()
+                filter_all = Filter(filter_.get_name(), None)
+                for evol in [True, False]:
+                    try:
+                        self.measure(name + (".evol" if evol else ".agg"),
+                                     ds.get_metrics_data, self.period, self.startdate,
+                                     self.enddate, self.identities_db, filter_all, evol)
+                    except Exception, e:
+                        logging.info(name + " not available: " + str(e))
+
+    def bench_studies(self):
+        """ result() of each study for each data source """
+        from vizgrimoire.metrics.metrics_filter import MetricFilters
+        from vizgrimoire.report import Report
+
+        config = Report.get_config()['generic']
+        for ds in Report.get_data_sources():
+            dbname = config[ds.get_db_name()]
+            dbcon = ds.get_query_builder()(config['db_user'], config['db_password'],
+                                          dbname, self.identities_db)
+            for study in Report.get_studies():
+                mfilter = MetricFilters(self.period, self.startdate, self.enddate, [])
+                name = "studies." + ds.get_name() + "." + study.id
+                try:
+                    obj = study(dbcon, mfilter)
+                    self.measure(name, obj.result, ds)
+                except Exception, e:
+                    logging.info(name + " not available: " + str(e))
+
+    def bench_report(self):
+        """ report_tool.py end to end, time of each phase from its profile """
+        destdir = tempfile.mkdtemp()
+        profile = os.path.join(destdir, "profile")
+        tool_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "vizGrimoireJS")
+        cmd = [sys.executable, "report_tool.py", "-c", os.path.abspath(self.args.config_file),
+               "-o", destdir, "-m", "../vizgrimoire/metrics", "--profile", profile]
+        start = time.time()
+        subprocess.check_call(cmd, cwd = tool_dir)
+        self.results["report.total"] = time.time() - start
+        with open(os.path.join(profile, "profile.json")) as f:
+            steps = json.load(f)["steps"]
+        for step in steps:
+            name = "report." + step["step"].split("-")[0]
+            self.results[name] = self.results.get(name, 0) + step["time"]
+        shutil.rmtree(destdir)
+
+    def run(self):
+        run_groups = self.args.groups.split(",")
+        if [g for g in run_groups if g in ["metrics", "filters", "studies"]]:
+            self.init_report()
+        for group in groups:
+            if group in run_groups: getattr(self, "bench_" + group)()
+        return self.results
+
+
+def get_commit():
+    return subprocess.check_output(["git", "rev-parse", "HEAD"]).strip()
+
+def read_history(path):
+    if not os.path.exists(path): return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(path, results, config_file):
+    history = read_history(path)
+    history.append({"commit": get_commit(),
+                    "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "config": config_file,
+                    "results": results})
+    with open(path, "w") as f:
+        json.dump(history, f, indent = 1, sort_keys = True)
+    logging.info("Results saved in " + path)
+
+def get_results(history, commit):
+    """ Results of the last run of a commit (or of a prefix of it) """
+    if commit == "HEAD": commit = get_commit()
+    runs = [run for run in history if run["commit"].startswith(commit)]
+    if len(runs) == 0:
+        raise Exception("No benchmark results for " + commit)
+    return runs[-1]["results"]
+
+def compare(old, new, threshold, min_time):
+    """ Benchmarks slower in new than in old more than threshold (%) """
+    slower = []
+    for name in sorted(set(old.keys()) & set(new.keys())):
+        # Too fast benchmarks are just noise
+        if old[name] < min_time and new[name] < min_time: continue
+        change = (new[name] - old[name]) * 100 / max(old[name], 1e-6)
+        if change > threshold: slower.append((name, old[name], new[name], change))
+    return slower
+
+def parse_args():
+    parser = argparse.ArgumentParser(description = description)
+    parser.add_argument("--history", default = "benchmarks.json",
+                        help = "JSON file with the benchmarks history (default: benchmarks.json)")
+    subparsers = parser.add_subparsers(dest = "command")
+    run = subparsers.add_parser("run", help = "Run the benchmarks and add them to the history")
+    run.add_argument("--config-file", default = "automator.conf", dest = "config_file",
+                     help = "Automator config file (default: automator.conf)")
+    run.add_argument("--metrics", dest = "metrics_path", default = "../vizgrimoire/metrics",
+                     help = "Path to the metrics modules (default: ../vizgrimoire/metrics)")
+    run.add_argument("--groups", default = ",".join(groups),
+                     help = "Benchmarks to run (default: " + ",".join(groups) + ")")
+    run.add_argument("--repeat", type = int, default = 3,
+                     help = "Executions of each benchmark, the best one is used (default: 3)")
+    cmp_ = subparsers.add_parser("compare", help = "Compare the results of two commits")
+    cmp_.add_argument("old", help = "Commit (or prefix) of the reference results")
+    cmp_.add_argument("new", help = "Commit (or prefix) to check, HEAD for the current one")
+    cmp_.add_argument("--threshold", type = float, default = 10,
+                      help = "Max slowdown allowed in percentage (default: 10)")
+    cmp_.add_argument("--min-time", type = float, default = 0.01, dest = "min_time",
+                      help = "Ignore benchmarks faster than this in seconds (default: 0.01)")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO,format='%(asctime)s %(message)s')
+    args = parse_args()
+
+    if args.command == "run":
+        results = Benchmarks(args).run()
+        save_results(args.history, results, args.config_file)
+    else:
+        history = read_history(args.history)
+        slower = compare(get_results(history, args.old), get_results(history, args.new),
+                         args.threshold, args.min_time)
+        for (name, old, new, change) in slower:
+            print "SLOWER %s: %.4fs -> %.4fs (+%.1f%%)" % (name, old, new, change)
+        if len(slower) > 0: sys.exit(1)
+        print "No benchmarks slower than " + str(args.threshold) + "%"
@@ -0,0 +1,763 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+## Synthetic MetricsGrimoire databases for scale testing
+##
+## Generates CVSAnalY, Bicho, MLStats, Gerrit (Bicho), IRC, Mediawiki and
+## SortingHat databases with the tables and columns used by GrimoireLib.
+## The data only depends on the parameters and the seed, so the same
+## databases are generated in each run. Rows are written to tab separated
+## files and loaded with LOAD DATA LOCAL INFILE, and an automator
+## main.conf for the databases is created so report_tool.py can be run
+## against them.
+##
+## Example (10x the default scale, loaded in the local MySQL):
+##
+##    python generate_dbs.py --scale 10 --user root --dir /tmp/gen
+
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import subprocess
+
+
+description = """
+Generate synthetic MetricsGrimoire databases for scale testing.
+
+Creates the CVSAnalY, Bicho, MLStats, Gerrit, IRC, Mediawiki and
+SortingHat databases, loads them with LOAD DATA LOCAL INFILE and
+creates an automator main.conf for them.
+"""
+
+# Databases generated, as named in main.conf (db_<name>)
+databases = ["sortinghat", "cvsanaly", "bicho", "gerrit", "mlstats", "irc", "mediawiki"]
+
+# Weight of each data source in the number of events per day
+events_weight = {"cvsanaly": 1.0, "bicho": 0.3, "gerrit": 0.3, "mlstats": 0.5,
+                 "irc": 3.0, "mediawiki": 0.2}
+
+countries = [("es", "Spain", "ESP"), ("us", "United States", "USA"),
+             ("de", "Germany", "DEU"), ("fr", "France", "FRA"),
+             ("in", "India", "IND"), ("cn", "China", "CHN"),
+             ("br", "Brazil", "BRA"), ("jp", "Japan", "JPN")]
+
+people_uidentities = """
+    CREATE TABLE people_uidentities (
+      people_id varchar(255) NOT NULL,
+      uuid varchar(128) NOT NULL,
+      UNIQUE KEY people_unique (people_id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""
+
+# Schemas with the tables and columns used by the query builders
+schemas = {
+"sortinghat": ["""
+    CREATE TABLE uidentities (
+      uuid varchar(128) NOT NULL,
+      identifier varchar(256) DEFAULT NULL,
+      PRIMARY KEY (uuid)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE identities (
+      id varchar(128) NOT NULL,
+      name varchar(128) DEFAULT NULL,
+      email varchar(128) DEFAULT NULL,
+      username varchar(128) DEFAULT NULL,
+      source varchar(32) NOT NULL,
+      uuid varchar(128) DEFAULT NULL,
+      PRIMARY KEY (id),
+      KEY uuid (uuid)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE profiles (
+      uuid varchar(128) NOT NULL,
+      name varchar(128) DEFAULT NULL,
+      email varchar(128) DEFAULT NULL,
+      is_bot tinyint(1) DEFAULT NULL,
+      country_code varchar(2) DEFAULT NULL,
+      PRIMARY KEY (uuid)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE organizations (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      name varchar(255) NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE enrollments (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      start datetime NOT NULL,
+      end datetime NOT NULL,
+      uuid varchar(128) NOT NULL,
+      organization_id int(11) NOT NULL,
+      PRIMARY KEY (id),
+      KEY uuid (uuid),
+      KEY organization_id (organization_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE countries (
+      code varchar(2) NOT NULL,
+      name varchar(255) NOT NULL,
+      alpha3 varchar(3) NOT NULL,
+      PRIMARY KEY (code)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE domains_organizations (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      domain varchar(128) NOT NULL,
+      is_top_domain tinyint(1) DEFAULT NULL,
+      organization_id int(11) NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+"""],
+"cvsanaly": [people_uidentities, """
+    CREATE TABLE people (
+      id int(11) NOT NULL,
+      name varchar(255) DEFAULT NULL,
+      email varchar(255) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE repositories (
+      id int(11) NOT NULL,
+      uri varchar(255) DEFAULT NULL,
+      name varchar(255) DEFAULT NULL,
+      type varchar(30) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE scmlog (
+      id int(11) NOT NULL,
+      rev mediumtext,
+      committer_id int(11) DEFAULT NULL,
+      author_id int(11) DEFAULT NULL,
+      date datetime DEFAULT NULL,
+      author_date datetime DEFAULT NULL,
+      message longtext,
+      composed_rev tinyint(1) DEFAULT NULL,
+      repository_id int(11) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE files (
+      id int(11) NOT NULL,
+      file_name varchar(255) DEFAULT NULL,
+      repository_id int(11) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE file_types (
+      id int(11) NOT NULL,
+      file_id int(11) DEFAULT NULL,
+      type mediumtext,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE branches (
+      id int(11) NOT NULL,
+      name varchar(255) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE actions (
+      id int(11) NOT NULL DEFAULT '0',
+      type varchar(1) DEFAULT NULL,
+      file_id int(11) DEFAULT NULL,
+      commit_id int(11) DEFAULT NULL,
+      branch_id int(11) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE commits_lines (
+      id int(11) NOT NULL,
+      commit_id int(11) DEFAULT NULL,
+      added int(11) DEFAULT NULL,
+      removed int(11) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""],
+"bicho": [people_uidentities, """
+    CREATE TABLE people (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      name varchar(64) DEFAULT NULL,
+      email varchar(64) DEFAULT NULL,
+      user_id varchar(255) NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE trackers (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      url varchar(255) NOT NULL,
+      type int(11) NOT NULL,
+      retrieved_on datetime NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE issues (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      tracker_id int(11) NOT NULL,
+      issue varchar(255) NOT NULL,
+      type varchar(32) DEFAULT NULL,
+      summary varchar(255) NOT NULL,
+      description text NOT NULL,
+      status varchar(32) NOT NULL,
+      resolution varchar(32) DEFAULT NULL,
+      priority varchar(32) DEFAULT NULL,
+      submitted_by int(10) unsigned NOT NULL,
+      submitted_on datetime NOT NULL,
+      assigned_to int(10) unsigned NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE changes (
+      id int(10) unsigned NOT NULL AUTO_INCREMENT,
+      issue_id int(10) unsigned NOT NULL,
+      field varchar(64) NOT NULL,
+      old_value text NOT NULL,
+      new_value text NOT NULL,
+      changed_by int(10) unsigned NOT NULL,
+      changed_on datetime NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE comments (
+      id int(10) unsigned NOT NULL AUTO_INCREMENT,
+      issue_id int(10) unsigned NOT NULL,
+      comment_id int(10) unsigned DEFAULT NULL,
+      text text NOT NULL,
+      submitted_by int(10) unsigned NOT NULL,
+      submitted_on datetime NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""],
+"mlstats": [people_uidentities, """
+    CREATE TABLE mailing_lists (
+      mailing_list_url varchar(255) NOT NULL,
+      mailing_list_name varchar(255) DEFAULT NULL,
+      project_name varchar(255) DEFAULT NULL,
+      last_analysis datetime DEFAULT NULL,
+      PRIMARY KEY (mailing_list_url)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE people (
+      email_address varchar(255) NOT NULL,
+      name varchar(255) DEFAULT NULL,
+      username varchar(255) DEFAULT NULL,
+      domain_name varchar(255) DEFAULT NULL,
+      top_level_domain varchar(255) DEFAULT NULL,
+      PRIMARY KEY (email_address)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE messages (
+      message_ID varchar(255) NOT NULL,
+      mailing_list_url varchar(255) NOT NULL,
+      mailing_list varchar(255) DEFAULT NULL,
+      first_date datetime DEFAULT NULL,
+      first_date_tz int(11) DEFAULT NULL,
+      arrival_date datetime DEFAULT NULL,
+      arrival_date_tz int(11) DEFAULT NULL,
+      subject varchar(255) DEFAULT NULL,
+      message_body text,
+      is_response_of varchar(255) DEFAULT NULL,
+      mail_path text,
+      PRIMARY KEY (message_ID)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE messages_people (
+      type_of_recipient enum('From','To','Cc') NOT NULL DEFAULT 'From',
+      message_id varchar(255) NOT NULL,
+      email_address varchar(255) NOT NULL,
+      PRIMARY KEY (type_of_recipient,message_id,email_address)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8
+"""],
+"irc": [people_uidentities, """
+    CREATE TABLE channels (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      name varchar(255) NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE irclog (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      nick varchar(255) DEFAULT NULL,
+      date datetime NOT NULL,
+      message text,
+      type varchar(255) DEFAULT NULL,
+      channel_id int(11) DEFAULT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""],
+"mediawiki": [people_uidentities, """
+    CREATE TABLE people (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      name varchar(255) NOT NULL,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE wiki_pages (
+      page_id int(11) NOT NULL DEFAULT '0',
+      title varchar(255) NOT NULL,
+      PRIMARY KEY (page_id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+""", """
+    CREATE TABLE wiki_pages_revs (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      rev_id int(11) DEFAULT NULL,
+      page_id int(11) DEFAULT NULL,
+      user varchar(255) NOT NULL,
+      date datetime NOT NULL,
+      comment text,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""]
+}
+# Gerrit reviews are stored by Bicho
+schemas["gerrit"] = schemas["bicho"] + ["""
+    CREATE TABLE issues_ext_gerrit (
+      id int(11) NOT NULL AUTO_INCREMENT,
+      branch text,
+      url text,
+      change_id text,
+      related_artifacts text,
+      project text,
+      mod_date datetime DEFAULT NULL,
+      issue_id int(11) NOT NULL,
+      open text,
+      PRIMARY KEY (id)
+    ) ENGINE=MyISAM DEFAULT CHARSET=utf8
+"""]
+
+
+class TableFiles(object):
+    """ Tab separated files, one per table, in LOAD DATA format """
+
+    def __init__(self, dir_):
+        self.dir = dir_
+        self.files = {}
+        if not os.path.isdir(dir_): os.makedirs(dir_)
+
+    @staticmethod
+    def escape(value):
+        if value is None: return "\\N"
+        if isinstance(value, datetime.datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+        value = unicode(value).encode('utf-8')
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+    def get_path(self, table):
+        return os.path.join(self.dir, table + ".tsv")
+
+    def write(self, table, row):
+        if table not in self.files:
+            self.files[table] = open(self.get_path(table), "w")
+        self.files[table].write("\t".join(TableFiles.escape(v) for v in row) + "\n")
+
+    def get_tables(self):
+        return sorted(self.files.keys())
+
+    def close(self):
+        for f in self.files.values(): f.close()
+
+
+class Generator(object):
+    """ Deterministic data for all the databases from the parameters """
+
+    def __init__(self, args):
+        self.args = args
+        self.start = datetime.datetime.strptime(args.start, "%Y-%m-%d")
+        self.end = self.start + datetime.timedelta(days = args.days)
+        self.people = args.people * args.scale
+        self.repositories = args.repositories * args.scale
+        self.organizations = args.organizations * args.scale
+
+    def get_random(self, database):
+        """ Random generator for a database, independent of the others """
+        seed = hashlib.md5(str(self.args.seed) + "-" + database).hexdigest()
+        return random.Random(int(seed[0:8], 16))
+
+    @staticmethod
+    def get_skewed(rng, total, skew = 3):
+        """ Index in [0, total) with low values much more frequent
+
+        Used to pick people, organizations and repositories so a few of them
+        concentrate most of the activity, as in real communities.
+        """
+        return int(total * (rng.random() ** skew))
+
+    @staticmethod
+    def get_uuid(person):
+        return hashlib.sha1("person-%i" % (person)).hexdigest()
+
+    @staticmethod
+    def get_name(person):
+        return "Person %i" % (person)
+
+    def get_email(self, person):
+        return "person%i@org%i.example.com" % (person, self.get_organization(person))
+
+    def get_organization(self, person):
+        rng = random.Random(person)
+        return Generator.get_skewed(rng, self.organizations, 2) + 1
+
+    def is_bot(self, person):
+        # About 1% of the people are bots
+        return person % 97 == 13
+
+    def get_days(self):
+        day = self.start
+        while day < self.end:
+            yield day
+            day += datetime.timedelta(days = 1)
+
+    def get_events(self, rng, database):
+        """ Number of events in a day for a data source """
+        rate = self.args.events_per_day * self.args.scale * events_weight[database]
+        events = int(rate)
+        if rng.random() < rate - events: events += 1
+        # Some variability among days
+        return int(events * (0.5 + rng.random()))
+
+    @staticmethod
+    def get_date(rng, day):
+        return day + datetime.timedelta(seconds = rng.randint(0, 86399))
+
+    def write_identities(self, files, people_id):
+        """ people_uidentities for a data source, people_id(person) -> id """
+        for person in range(0, self.people):
+            files.write("people_uidentities", [people_id(person), Generator.get_uuid(person)])
+
+    def gen_sortinghat(self, files):
+        for org in range(1, self.organizations + 1):
+            files.write("organizations", [org, "Organization %i" % (org)])
+            files.write("domains_organizations", [org, "org%i.example.com" % (org), 0, org])
+        for country in countries:
+            files.write("countries", country)
+        enrollment = 0
+        for person in range(0, self.people):
+            uuid = Generator.get_uuid(person)
+            name = Generator.get_name(person)
+            email = self.get_email(person)
+            country = countries[person % len(countries)][0]
+            files.write("uidentities", [uuid, None])
+            files.write("profiles", [uuid, name, email, int(self.is_bot(person)), country])
+            for source in ["scm", "its", "scr", "mls", "irc", "mediawiki"]:
+                identity = hashlib.sha1(source + "-" + uuid).hexdigest()
+                files.write("identities", [identity, name, email, "person%i" % (person),
+                                           source, uuid])
+            enrollment += 1
+            files.write("enrollments", [enrollment, datetime.datetime(1900, 1, 1),
+                                        datetime.datetime(2100, 1, 1), uuid,
+                                        self.get_organization(person)])
+
+    def gen_cvsanaly(self, files):
+        rng = self.get_random("cvsanaly")
+        files_repo = 50 # files in each repository
+        self.write_identities(files, lambda person: person + 1)
+        for person in range(0, self.people):
+            files.write("people", [person + 1, Generator.get_name(person), self.get_email(person)])
+        files.write("branches", [1, "master"])
+        file_types = ["code", "code", "code", "documentation", "build", "i18n"]
+        for repo in range(1, self.repositories + 1):
+            files.write("repositories", [repo, "https://git.example.com/repo%i.git" % (repo),
+                                         "repo%i.git" % (repo), "git"])
+            for f in range(0, files_repo):
+                file_id = (repo - 1) * files_repo + f + 1
+                files.write("files", [file_id, "file%i.py" % (f), repo])
+                files.write("file_types", [file_id, file_id, file_types[f % len(file_types)]])
+        commit = 0
+        action = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "cvsanaly")):
+                commit += 1
+                author = Generator.get_skewed(rng, self.people)
+                committer = author
+                # Some commits are committed by the core people
+                if rng.random() < 0.2: committer = Generator.get_skewed(rng, self.people, 6)
+                repo = Generator.get_skewed(rng, self.repositories, 2) + 1
+                author_date = Generator.get_date(rng, day)
+                date = author_date + datetime.timedelta(minutes = rng.randint(0, 600))
+                rev = hashlib.sha1("commit-%i" % (commit)).hexdigest()
+                files.write("scmlog", [commit, rev, committer + 1, author + 1, date,
+                                       author_date, "Commit %i" % (commit), 0, repo])
+                for i in range(0, rng.randint(1, 4)):
+                    action += 1
+                    file_id = (repo - 1) * files_repo + rng.randint(0, files_repo - 1) + 1
+                    files.write("actions", [action, rng.choice("AMMMD"), file_id, commit, 1])
+                files.write("commits_lines", [commit, commit, rng.randint(0, 200),
+                                              rng.randint(0, 100)])
+
+    def gen_bicho(self, files):
+        rng = self.get_random("bicho")
+        trackers = max(1, self.repositories / 10)
+        self.write_identities(files, lambda person: person + 1)
+        for person in range(0, self.people):
+            files.write("people", [person + 1, Generator.get_name(person),
+                                   self.get_email(person), "person%i" % (person)])
+        for tracker in range(1, trackers + 1):
+            files.write("trackers", [tracker, "https://bugs.example.com/product%i" % (tracker),
+                                     1, self.end])
+        issue = 0
+        change = 0
+        comment = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "bicho")):
+                issue += 1
+                submitter = Generator.get_skewed(rng, self.people) + 1
+                assignee = Generator.get_skewed(rng, self.people, 6) + 1
+                submitted = Generator.get_date(rng, day)
+                status = "NEW"
+                date = submitted
+                for new_status in ["ASSIGNED", "RESOLVED"]:
+                    # Closed issues: most of them in a few days
+                    date += datetime.timedelta(hours = int(rng.expovariate(1.0 / 72)) + 1)
+                    if date >= self.end or rng.random() < 0.1: break
+                    change += 1
+                    files.write("changes", [change, issue, "status", status, new_status,
+                                            assignee, date])
+                    status = new_status
+                date = submitted
+                for reply in range(0, rng.randint(0, self.args.reply_depth)):
+                    date += datetime.timedelta(hours = int(rng.expovariate(1.0 / 24)) + 1)
+                    if date >= self.end: break
+                    comment += 1
+                    files.write("comments", [comment, issue, comment, "Comment %i" % (comment),
+                                             Generator.get_skewed(rng, self.people) + 1, date])
+                tracker = Generator.get_skewed(rng, trackers, 2) + 1
+                files.write("issues", [issue, tracker, str(issue), "normal",
+                                       "Issue %i" % (issue), "", status, None, None,
+                                       submitter, submitted, assignee])
+
+    def gen_gerrit(self, files):
+        rng = self.get_random("gerrit")
+        self.write_identities(files, lambda person: person + 1)
+        for person in range(0, self.people):
+            files.write("people", [person + 1, Generator.get_name(person),
+                                   self.get_email(person), "person%i" % (person)])
+        for repo in range(1, self.repositories + 1):
+            files.write("trackers", [repo, "gerrit.example.com_repo%i" % (repo), 1, self.end])
+        review = 0
+        change = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "gerrit")):
+                review += 1
+                owner = Generator.get_skewed(rng, self.people) + 1
+                repo = Generator.get_skewed(rng, self.repositories, 2) + 1
+                date = Generator.get_date(rng, day)
+                submitted = date
+                status = "NEW"
+                change += 1
+                files.write("changes", [change, review, "status", "", "NEW", owner, date])
+                iterations = rng.randint(1, self.args.review_iterations)
+                for patchset in range(1, iterations + 1):
+                    if date >= self.end: break
+                    change += 1
+                    files.write("changes", [change, review, "status", str(patchset),
+                                            "UPLOADED", owner, date])
+                    change += 1
+                    files.write("changes", [change, review, "Upload", str(patchset), "",
+                                            owner, date])
+                    date += datetime.timedelta(hours = int(rng.expovariate(1.0 / 12)) + 1)
+                    if date >= self.end: break
+                    reviewer = Generator.get_skewed(rng, self.people, 6) + 1
+                    vote = "-1"
+                    if patchset == iterations: vote = "2"
+                    change += 1
+                    files.write("changes", [change, review, "Code-Review", str(patchset), vote,
+                                            reviewer, date])
+                    date += datetime.timedelta(hours = int(rng.expovariate(1.0 / 24)) + 1)
+                if date < self.end:
+                    closing = rng.random()
+                    if closing < 0.8: status = "MERGED"
+                    elif closing < 0.9: status = "ABANDONED"
+                    if status != "NEW":
+                        change += 1
+                        files.write("changes", [change, review, "status", str(iterations),
+                                                status, owner, date])
+                files.write("issues", [review, repo, str(review), "review", "Review %i" % (review),
+                                       "", status, None, None, owner, submitted, 0])
+                files.write("issues_ext_gerrit", [review, "master",
+                                                  "https://gerrit.example.com/r/%i" % (review),
+                                                  hashlib.sha1("review-%i" % (review)).hexdigest(),
+                                                  None, "repo%i" % (repo), date, review,
+                                                  str(status == "NEW")])
+
+    def gen_mlstats(self, files):
+        rng = self.get_random("mlstats")
+        lists = max(1, self.repositories / 20)
+        self.write_identities(files, self.get_email)
+        for person in range(0, self.people):
+            email = self.get_email(person)
+            files.write("people", [email, Generator.get_name(person), "person%i" % (person),
+                                   email.split("@")[1], "com"])
+        for ml in range(1, lists + 1):
+            files.write("mailing_lists", ["http://lists.example.com/list%i" % (ml),
+                                          "list%i" % (ml), None, self.end])
+        message = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "mlstats")):
+                url = "http://lists.example.com/list%i" % (Generator.get_skewed(rng, lists, 2) + 1)
+                date = Generator.get_date(rng, day)
+                parent = None
+                # Thread: the first message and the replies, each one to the previous one
+                for depth in range(0, rng.randint(0, self.args.reply_depth) + 1):
+                    if date >= self.end: break
+                    message += 1
+                    message_id = "<%i@generated.example.com>" % (message)
+                    sender = self.get_email(Generator.get_skewed(rng, self.people))
+                    files.write("messages", [message_id, url, url, date, 0, date, 0,
+                                             "Subject %i" % (message), "", parent, None])
+                    files.write("messages_people", ["From", message_id, sender])
+                    parent = message_id
+                    date += datetime.timedelta(hours = int(rng.expovariate(1.0 / 12)) + 1)
+
+    def gen_irc(self, files):
+        rng = self.get_random("irc")
+        channels = max(1, self.repositories / 50)
+        self.write_identities(files, lambda person: "person%i" % (person))
+        for channel in range(1, channels + 1):
+            files.write("channels", [channel, "#channel%i" % (channel)])
+        line = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "irc")):
+                line += 1
+                nick = "person%i" % (Generator.get_skewed(rng, self.people))
+                channel = Generator.get_skewed(rng, channels, 2) + 1
+                files.write("irclog", [line, nick, Generator.get_date(rng, day),
+                                       "Message %i" % (line), "COMMENT", channel])
+
+    def gen_mediawiki(self, files):
+        rng = self.get_random("mediawiki")
+        pages = self.repositories * 10
+        self.write_identities(files, lambda person: "person%i" % (person))
+        for person in range(0, self.people):
+            files.write("people", [person + 1, "person%i" % (person)])
+        for page in range(1, pages + 1):
+            files.write("wiki_pages", [page, "Page %i" % (page)])
+        rev = 0
+        for day in self.get_days():
+            for event in range(0, self.get_events(rng, "mediawiki")):
+                rev += 1
+                user = "person%i" % (Generator.get_skewed(rng, self.people))
+                page = Generator.get_skewed(rng, pages, 2) + 1
+                files.write("wiki_pages_revs", [rev, rev, page, user,
+                                                Generator.get_date(rng, day), None])
+
+    def generate(self, database, dir_):
+        files = TableFiles(dir_)
+        getattr(self, "gen_" + database)(files)
+        files.close()
+        return files
+
+
+def get_db_name(args, database):
+    return args.prefix + "_" + database
+
+def get_load_sql(args, database, files):
+    """ SQL script to create the database and load the tables files """
+    db_name = get_db_name(args, database)
+    sql = "DROP DATABASE IF EXISTS %s;\n" % (db_name)
+    sql += "CREATE DATABASE %s CHARACTER SET utf8;\n" % (db_name)
+    sql += "USE %s;\n" % (db_name)
+    for schema in schemas[database]:
+        sql += schema.strip() + ";\n"
+    for table in files.get_tables():
+        sql += "LOAD DATA LOCAL INFILE '%s' INTO TABLE %s CHARACTER SET utf8;\n" % \
+            (os.path.abspath(files.get_path(table)), table)
+    return sql
+
+def get_mysql_args(args):
+    mysql_args = ["--local-infile=1"]
+    if args.user:
+        mysql_args.extend(["-u", args.user])
+    if args.passwd:
+        mysql_args.extend(["-p" + args.passwd])
+    if args.host:
+        mysql_args.extend(["-h", args.host])
+    if args.port:
+        mysql_args.extend(["-P", args.port, "--protocol=tcp"])
+    return mysql_args
+
+def write_main_conf(args, generator, path):
+    """ Automator main.conf for report_tool.py with the generated databases """
+    conf = "[generic]\n"
+    conf += "project = %s\n" % (args.prefix)
+    conf += "db_user = %s\n" % (args.user or "root")
+    conf += "db_password = %s\n" % (args.passwd or "")
+    conf += "db_identities = %s\n" % (get_db_name(args, "sortinghat"))
+    for database in databases:
+        conf += "db_%s = %s\n" % (database, get_db_name(args, database))
+    conf += "\n[r]\n"
+    conf += "start_date = %s\n" % (generator.start.strftime("%Y-%m-%d"))
+    conf += "end_date = %s\n" % (generator.end.strftime("%Y-%m-%d"))
+    conf += "reports = repositories,organizations,countries,people,domains\n"
+    conf += "period = months\n"
+    conf += "studies = contributors_new_gone,onion,top_issues,times_tickets\n"
+    conf += "\n[bicho]\nbackend = bg\n"
+    conf += "\n[gerrit]\nbackend = gerrit\n"
+    with open(path, "w") as f:
+        f.write(conf)
+
+def parse_args ():
+    parser = argparse.ArgumentParser(description = description)
+    parser.add_argument("--user", help = "MySQL user")
+    parser.add_argument("--passwd", help = "MySQL passwd")
+    parser.add_argument("--host", help = "MySQL host")
+    parser.add_argument("--port", help = "MySQL port number")
+    parser.add_argument("--dir", default = "generated",
+                        help = "Directory for the data files and main.conf")
+    parser.add_argument("--prefix", default = "cp_GrimoireLibScale",
+                        help = "Prefix of the databases names")
+    parser.add_argument("--databases", default = ",".join(databases),
+                        help = "Databases to generate (comma separated)")
+    parser.add_argument("--no-load", action = "store_true",
+                        help = "Only generate the data files and main.conf")
+    parser.add_argument("--scale", type = int, default = 1,
+                        help = "Multiplier for people, repositories, organizations and events")
+    parser.add_argument("--seed", type = int, default = 1, help = "Random seed")
+    parser.add_argument("--start", default = "2010-01-01", help = "First day of activity")
+    parser.add_argument("--days", type = int, default = 5 * 365, help = "Days of activity")
+    parser.add_argument("--people", type = int, default = 1000)
+    parser.add_argument("--repositories", type = int, default = 100)
+    parser.add_argument("--organizations", type = int, default = 50)
+    parser.add_argument("--events-per-day", type = float, default = 20,
+                        help = "Commits per day, other data sources are relative to it")
+    parser.add_argument("--reply-depth", type = int, default = 5,
+                        help = "Max replies in threads and comments in issues")
+    parser.add_argument("--review-iterations", type = int, default = 4,
+                        help = "Max patchsets in reviews")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    generator = Generator(args)
+    for database in args.databases.split(","):
+        print "Generating:", get_db_name(args, database)
+        files = generator.generate(database, os.path.join(args.dir, database))
+        if args.no_load: continue
+        print "Loading:", get_db_name(args, database)
+        mysql = subprocess.Popen(["mysql"] + get_mysql_args(args), stdin = subprocess.PIPE)
+        mysql.communicate(get_load_sql(args, database, files))
+        if mysql.returncode != 0:
+            raise Exception("Error loading " + get_db_name(args, database))
+    conf = os.path.join(args.dir, "main.conf")
+    write_main_conf(args, generator, conf)
+    print "Automator config:", conf
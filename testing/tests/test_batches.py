@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for metrics/batches.py"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vizgrimoire.GrimoireUtils import createJSON
+from vizgrimoire.data_source import DataSource
+from vizgrimoire.filter import Filter
+from vizgrimoire.metrics.batches import ColumnsWriter, get_batches
+from vizgrimoire.metrics.date_keys import DateKeys
+from vizgrimoire.metrics.query_builder import DSQuery, SCMQuery
+from vizgrimoire.report import Report
+
+
+class BatchesDS(DataSource):
+    """ Data source building the SCM GROUP BY queries without a database """
+    queries = []
+
+    @staticmethod
+    def get_name(): return "batches"
+
+    @staticmethod
+    def get_query_builder(): return SCMQuery
+
+    @staticmethod
+    def get_filter_items(filter_, startdate, enddate, identities_db):
+        return ["a", "b", "c"]
+
+    @staticmethod
+    def get_items_list_fields(): return ["name"]
+
+    @staticmethod
+    def _get_data(period, startdate, enddate, filter_, evol):
+        scm = SCMQuery(None, None, "db", "identities")
+        sql = scm.BuildQuery(period, startdate, enddate, "s.date",
+                             "count(distinct(s.id)) as commits", "scmlog s", "",
+                             evol, [filter_.get_name(), None])
+        BatchesDS.queries.append(sql)
+        items = DSQuery.items_batch[1]
+        if evol: return {"name": items, "commits": [[1]] * len(items), "year": [24120],
+                         "unixtime": ["1262304000"], "date": ["Jan 2010"], "id": [0]}
+        return {"name": items, "commits": [1] * len(items)}
+
+    @staticmethod
+    def get_agg_data(period, startdate, enddate, identities_db, filter_):
+        return BatchesDS._get_data(period, startdate, enddate, filter_, False)
+
+    @staticmethod
+    def get_evolutionary_data(period, startdate, enddate, identities_db, filter_):
+        return BatchesDS._get_data(period, startdate, enddate, filter_, True)
+
+
+class TestBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.destdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.destdir)
+
+    def test_get_batches(self):
+        self.assertEqual(get_batches(range(5), 2), [[0, 1], [2, 3], [4]])
+        self.assertEqual(get_batches([], 2), [])
+
+    def test_columns_writer(self):
+        fn = os.path.join(self.destdir, "people2-all.json")
+        writer = ColumnsWriter(fn, [0, 0])
+        writer.add({"name": ["a", "b"], "commits": [[1, 2], [3, 4]], "month": [1, 2]}, 2,
+                   ["month"])
+        # authors is not in the first batch and commits not in the last one
+        writer.add({"name": ["c"], "commits": [[5, 6]], "authors": [[1, 1]], "month": [1, 2]},
+                   1, ["month"])
+        writer.add({"name": ["d"], "authors": [[2, 0.5]], "month": [1, 2]}, 1, ["month"])
+        writer.close()
+        self.assertFalse(os.path.exists(writer.tmpdir))
+
+        data = {"name": ["a", "b", "c", "d"],
+                "commits": [[1, 2], [3, 4], [5, 6], [0, 0]],
+                "authors": [[0, 0], [0, 0], [1, 1], [2, 0.5]],
+                "month": [1, 2]}
+        fn_all = os.path.join(self.destdir, "all.json")
+        createJSON(data, fn_all)
+        with open(fn) as f: batches_json = f.read()
+        with open(fn_all) as f: all_json = f.read()
+        self.assertEqual(batches_json, all_json)
+        self.assertEqual(json.loads(batches_json), data)
+
+    def test_items_filter(self):
+        self.assertEqual(DSQuery.get_items_filter("up.identifier", ["a", "b'c"]),
+                         "up.identifier IN ('a', 'b\\'c')")
+        self.assertEqual(DSQuery.get_items_filter("r.uri AS name", ["a", None]),
+                         "(r.uri IN ('a') OR r.uri IS NULL)")
+        self.assertEqual(DSQuery.get_items_filter("DISTINCT(d.name) as name", ["a"]),
+                         "(d.name) IN ('a')")
+
+    def test_build_query_batch(self):
+        DSQuery.date_keys["db"] = DateKeys({})
+        scm = SCMQuery(None, None, "db", "identities")
+        DSQuery.items_batch = ("people2", ["a", "b"])
+        try:
+            sql = scm.BuildQuery("month", "'2010-01-01'", "'2011-01-01'", "s.date",
+                                 "count(distinct(s.id)) as commits", "scmlog s", "",
+                                 False, ["people2", None])
+            self.assertTrue("WHERE s.date>='2010-01-01' AND s.date<'2011-01-01' AND "
+                            "up.identifier IN ('a', 'b') GROUP BY up.identifier" in sql)
+            # Other filters are not restricted
+            DSQuery.items_batch = ("company", ["a", "b"])
+            sql = scm.BuildQuery("month", "'2010-01-01'", "'2011-01-01'", "s.date",
+                                 "count(distinct(s.id)) as commits", "scmlog s", "",
+                                 False, ["people2", None])
+            self.assertFalse(" IN (" in sql)
+        finally:
+            DSQuery.items_batch = None
+            DSQuery.date_keys.pop("db")
+
+    def test_filter_report_batches(self):
+        Report._automator = {'r': {}}
+        DSQuery.date_keys["db"] = DateKeys({})
+        BatchesDS.queries = []
+        try:
+            (items_list, evol) = BatchesDS._create_filter_report_all_batches(
+                Filter("people2"), "year", "'2010-01-01'", "'2011-01-01'",
+                self.destdir, "identities", 2)
+        finally:
+            DSQuery.date_keys.pop("db")
+            Report._automator = None
+        self.assertEqual(items_list, {"name": ["a", "b", "c"]})
+        self.assertEqual(DSQuery.items_batch, None)
+        # The queries of each batch are restricted to its items
+        self.assertEqual(len(BatchesDS.queries), 4)
+        self.assertTrue("up.identifier IN ('a', 'b')" in BatchesDS.queries[0])
+        self.assertTrue("up.identifier IN ('a', 'b')" in BatchesDS.queries[1])
+        self.assertTrue("up.identifier IN ('c')" in BatchesDS.queries[2])
+        fn = Filter("people2").get_static_filename_all(BatchesDS())
+        with open(os.path.join(self.destdir, fn)) as f:
+            self.assertEqual(json.load(f), {"commits": [1, 1, 1], "name": ["a", "b", "c"]})
+
+    def test_convert_all_to_single_names(self):
+        filter_ = Filter("people2")
+        data = {"name": [".hidden", "a/b", "c"], "commits": [1, 2, 3]}
+        BatchesDS.convert_all_to_single(data, filter_, self.destdir, False)
+        # The items list has the names used in the items files
+        with open(os.path.join(self.destdir, filter_.get_filename(BatchesDS))) as f:
+            self.assertEqual(json.load(f), {"name": ["_.hidden", "a_b", "c"]})
+        for item in ["_.hidden", "a_b", "c"]:
+            fn = Filter("people2", item).get_static_filename(BatchesDS())
+            self.assertTrue(os.path.exists(os.path.join(self.destdir, fn)))
+        fn = Filter("people2", ".hidden").get_static_filename(BatchesDS())
+        self.assertTrue(fn.startswith("_.hidden-"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/bundle.py"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vizgrimoire.metrics.bundle import BundleReader, BundleWriter
+
+
+class TestBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.destdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.destdir)
+
+    def test_get_shard(self):
+        self.assertEqual(BundleWriter.get_shard("Argentina-scm-cou-evolutionary.json"), "scm-cou")
+        self.assertEqual(BundleWriter.get_shard("a-b-its_1-com+prj-static.json"), "its_1-com_prj")
+        self.assertEqual(BundleWriter.get_shard("x-mls-dom-top-senders.json"), "mls-dom")
+        self.assertEqual(BundleWriter.get_shard("scm-com-all-static.json"), "scm-com")
+        self.assertEqual(BundleWriter.get_shard("scm-static.json"), "main")
+        self.assertEqual(BundleWriter.get_shard("scm-organizations.json"), "main")
+
+    def test_write_read(self):
+        bundle = BundleWriter(self.destdir)
+        docs = {"scm-static.json": '{"commits": 10}',
+                "Argentina-scm-cou-static.json": '{"commits": 2}',
+                "Spain-scm-cou-static.json": '{"commits": 3}'}
+        for name, data in docs.items():
+            self.assertTrue(bundle.add(os.path.join(self.destdir, name), data))
+        # Documents written again replace the old ones
+        bundle.add(os.path.join(self.destdir, "scm-static.json"), '{"commits": 11}')
+        docs["scm-static.json"] = '{"commits": 11}'
+        self.assertFalse(bundle.add(os.path.join(self.destdir, "..", "out.json"), '{}'))
+        bundle.close()
+
+        bundledir = os.path.join(self.destdir, "bundle")
+        with open(os.path.join(bundledir, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["shards"].keys()), ["main", "scm-cou"])
+        self.assertEqual(manifest["shards"]["scm-cou"]["documents"], 2)
+
+        reader = BundleReader(bundledir)
+        self.assertEqual(reader.get_names(), sorted(docs.keys()))
+        for name, data in docs.items():
+            self.assertEqual(reader.get(name), data)
+        self.assertEqual(reader.get("Peru-scm-cou-static.json"), None)
+
+        legacy = os.path.join(self.destdir, "legacy")
+        reader.extract(legacy)
+        with open(os.path.join(legacy, "Spain-scm-cou-static.json")) as f:
+            self.assertEqual(json.load(f), {"commits": 3})
+
+if __name__ == "__main__":
+    unittest.main()
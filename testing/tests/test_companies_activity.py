@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for analysis/companies_activity.py"""
+
+import unittest
+
+from vizgrimoire.analysis.companies_activity import OrganizationsFrame
+
+
+class TestOrganizationsFrame(unittest.TestCase):
+
+    def test_add_rows(self):
+        # Same format than the ROLLUP queries: NULL year is the total of
+        # the organization and NULL org_id the grand total
+        data = {"org_id": [1, 1, 2, 2, 3, 3, None],
+                "name": ["Acme", "Acme", "Acme", "Acme", "Bitergia", "Bitergia", "Acme"],
+                "year": [2014, None, 2014, None, 2013, None, None],
+                "commits": [5, 5, 2, 2, 7, 7, 14],
+                "commits_365": [None, 5, None, 1, None, 0, 6]}
+        frame = OrganizationsFrame()
+        frame.add_rows(data, {"commits": "commits", "commits_365": "commits_365"},
+                       2014, 2015)
+        # The organizations with the same name are not merged
+        ids = frame.get_ids("commits")
+        self.assertEqual(ids, [3, 1, 2])
+        self.assertEqual(frame.get_names(ids), ["Bitergia", "Acme", "Acme"])
+        self.assertEqual(frame.get_values(ids, "commits"), [7, 5, 2])
+        self.assertEqual(frame.get_values(ids, "commits_2014"), [0, 5, 2])
+        self.assertEqual(frame.get_values(ids, "commits_365"), [0, 5, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/coverage.py"""
+
+import unittest
+
+from vizgrimoire.metrics.coverage import get_sql_status, get_metric_status, \
+    format_coverage, STATUS_GROUP_BY, STATUS_CUSTOM, STATUS_NO_GROUP_BY
+from vizgrimoire.metrics.date_keys import DateKeys
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics import query_builder
+from vizgrimoire.metrics.irc_metrics import Sent
+from vizgrimoire.metrics.its_metrics import BMIIndex
+from vizgrimoire.metrics.pullpo_metrics import Submitted
+from vizgrimoire.metrics.qaforums_metrics import Questions, Answers
+from vizgrimoire.metrics.query_builder import DSQuery, IRCQuery, ITSQuery, \
+    PullpoQuery, QAForumsQuery
+
+
+class TestCoverage(unittest.TestCase):
+
+    def test_group_fields(self):
+        # All the declared filters must have a group field
+        builders = [getattr(query_builder, name) for name in dir(query_builder)
+                    if name.endswith("Query")]
+        for builder in builders:
+            if not isinstance(builder, type) or not issubclass(builder, DSQuery):
+                continue
+            for filter_name in builder.group_by_filters:
+                self.assertTrue(len(builder.get_group_field(filter_name)) > 0)
+                self.assertTrue(len(builder.get_group_field_alias(filter_name)) > 0)
+
+    def test_get_sql_status(self):
+        sql = "SELECT org.name AS name, COUNT(*) FROM t GROUP BY org.name"
+        self.assertEqual(get_sql_status(sql, "name"), STATUS_GROUP_BY)
+        self.assertEqual(get_sql_status("SELECT COUNT(*) FROM t", "name"),
+                         STATUS_NO_GROUP_BY)
+        self.assertEqual(get_sql_status(None, "name"), STATUS_NO_GROUP_BY)
+
+    def test_get_metric_status(self):
+        filters = MetricFilters("month", "'2010-01-01'", "'2015-01-01'")
+        # The affiliations tables and derived columns are not read without database
+        DSQuery.affiliations_refreshed["irc_db"] = True
+        DSQuery.date_keys["irc_db"] = DateKeys({})
+        metric = Sent(IRCQuery(None, None, "irc_db", "identities"), filters)
+        for filter_name in IRCQuery.group_by_filters:
+            self.assertEqual(get_metric_status(metric, filter_name), STATUS_GROUP_BY)
+        # The filters of the metric are not changed
+        self.assertTrue(metric.filters is filters)
+        metric = BMIIndex(ITSQuery(None, None, None, "identities"), filters)
+        self.assertEqual(get_metric_status(metric, "company"), STATUS_CUSTOM)
+
+    def test_people2_status(self):
+        filters = MetricFilters("month", "'2010-01-01'", "'2015-01-01'")
+        for db in ["pullpo_db", "qaforums_db"]:
+            DSQuery.affiliations_refreshed[db] = True
+            DSQuery.date_keys[db] = DateKeys({})
+        metric = Submitted(PullpoQuery(None, None, "pullpo_db", "identities"), filters)
+        self.assertEqual(get_metric_status(metric, "people2"), STATUS_GROUP_BY)
+        for metric_class in [Questions, Answers]:
+            metric = metric_class(QAForumsQuery(None, None, "qaforums_db", None), filters)
+            self.assertEqual(get_metric_status(metric, "people2"), STATUS_GROUP_BY)
+        # Each post table is joined with the people by its author field
+        db = QAForumsQuery(None, None, "qaforums_db", None)
+        where = db.GetSQLReportWhere(["people2", "'alice'"], "answers")
+        self.assertEqual(set(where), set(["a.user_identifier = p.identifier",
+                                     "p.username = 'alice'"]))
+
+    def test_format_coverage(self):
+        coverage = {"irc": {"company": {"sent": STATUS_GROUP_BY,
+                                        "senders": "error: no table"}},
+                    "releases": {}}
+        lines = format_coverage(coverage).split("\n")
+        self.assertEqual(lines[0], "irc")
+        self.assertEqual(lines[2].split(), ["senders", "E"])
+        self.assertEqual(lines[3].split(), ["sent", "x"])
+        self.assertEqual(lines[5], "  no filters supported")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/date_keys.py"""
+
+import MySQLdb
+import unittest
+
+from vizgrimoire.metrics.date_keys import DateKeys
+from vizgrimoire.metrics.query_builder import DSQuery, IRCQuery, SCMQuery
+
+
+class FakeConnection(object):
+    def __init__(self): self.commits = 0
+    def commit(self): self.commits += 1
+
+class FakeCursor(object):
+    def __init__(self): self.connection = FakeConnection()
+
+class KeysQuery(DSQuery):
+    """ Query builder with derived columns and without a database """
+
+    def __init__(self, database, error = None):
+        DSQuery.__init__(self, None, None, database)
+        self.error = error
+        self.queries = []
+        self._cursor = FakeCursor()
+
+    def _get_derived_tables_columns(self):
+        return {"irclog": ["date", "date_day_key", "date_week_key", "date_month_key"]}
+
+    def ExecuteViewQuery(self, sql):
+        if self.error is not None: raise self.error
+        self.queries.append(sql)
+
+
+class TestDateKeys(unittest.TestCase):
+
+    def setUp(self):
+        keys = ["date_day_key", "date_week_key", "date_month_key"]
+        self.date_keys = DateKeys({"irclog": ["date", "nick"] + keys,
+                                   "changes": ["changed_on"],
+                                   "people": ["email", "email_domain"]})
+
+    def test_get_key(self):
+        self.assertEqual(self.date_keys.get_key(" i.date ", "channels c , irclog i", "week"),
+                         "i.date_week_key")
+        self.assertEqual(self.date_keys.get_key("date", "irclog", "day"), "date_day_key")
+        self.assertEqual(self.date_keys.get_key("i.date", "irclog i", "year"), None)
+        self.assertEqual(self.date_keys.get_key("c.date", "irclog i, channels c", "month"), None)
+        self.assertEqual(self.date_keys.get_key("changed_on", "changes", "month"), None)
+
+    def test_missing(self):
+        self.assertEqual(self.date_keys.get_missing(),
+                         [("changes", "changed_on_day_key"), ("changes", "changed_on_month_key"),
+                          ("changes", "changed_on_week_key")])
+        self.assertEqual(DateKeys.get_create_query("changes", "changed_on_week_key"),
+                         "ALTER TABLE changes ADD COLUMN changed_on_week_key INT NULL, " +
+                         "ADD INDEX gl_changed_on_week_key (changed_on_week_key)")
+        queries = self.date_keys.get_refresh_queries()
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].startswith("UPDATE irclog SET date_day_key = DATE(date), "))
+        self.assertTrue(queries[0].endswith("WHERE date_day_key IS NULL AND date IS NOT NULL"))
+
+    def test_queries(self):
+        DSQuery.date_keys["irc_keys"] = self.date_keys
+        db = IRCQuery(None, None, "irc_keys")
+        q = db.BuildQuery("month", "'2010-01-01'", "'2015-01-01'", " i.date ",
+                          "COUNT(*) AS sent", "irclog i", "", True)
+        self.assertTrue("i.date_month_key AS month" in q)
+        self.assertTrue(q.endswith("GROUP BY i.date_month_key ORDER BY i.date_month_key"))
+
+        DSQuery.date_keys["scm_keys"] = self.date_keys
+        db = SCMQuery(None, None, "scm_keys")
+        domain = "DISTINCT(SUBSTR(people.email,LOCATE('@',people.email)+1)) as name"
+        self.assertEqual(self.date_keys.replace_domains(domain, "scmlog s, people"),
+                         "DISTINCT(people.email_domain) as name")
+        self.assertEqual(db._get_domain_filter("people.email", "people", "'gnome.org'"),
+                         "people.email_domain = 'gnome.org'")
+    def test_refresh_once_per_run(self):
+        db = KeysQuery("refresh_keys")
+        try:
+            self.assertEqual(db.get_date_keys().get_key("date", "irclog", "day"), "date_day_key")
+            db.get_date_keys()
+        finally:
+            DSQuery.date_keys.pop("refresh_keys")
+        # The new rows are filled the first time
+        self.assertEqual(len(db.queries), 1)
+        self.assertTrue(db.queries[0].startswith("UPDATE irclog SET "))
+        self.assertEqual(db.cursor.connection.commits, 1)
+
+    def test_refresh_error(self):
+        db = KeysQuery("error_keys", MySQLdb.Error("read only"))
+        try:
+            # Without fresh keys they are not used
+            self.assertEqual(db.get_date_keys().get_key("date", "irclog", "day"), None)
+        finally:
+            DSQuery.date_keys.pop("error_keys")
+
+if __name__ == "__main__":
+    unittest.main()
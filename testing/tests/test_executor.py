@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for metrics/executor.py"""
+
+import threading
+import time
+import unittest
+
+from vizgrimoire.metrics.executor import QueryExecutor
+from vizgrimoire.metrics.query_builder import DSQuery
+
+
+class RunTablesQuery(DSQuery):
+    """ Query builder recording the refreshes of the per run tables """
+
+    def __init__(self):
+        DSQuery.__init__(self, None, None, "db", "identities")
+        self.refreshed = []
+
+    def GetProjectsRepos(self):
+        self.refreshed.append("projects_repos")
+
+    def GetBotsTable(self, bots):
+        self.refreshed.append("people_bots")
+
+
+class TestQueryExecutor(unittest.TestCase):
+
+    def test_sequential(self):
+        executor = QueryExecutor()
+        tasks = [("a", lambda: 1), ("b", lambda: 2)]
+        self.assertEqual(executor.run(tasks), [(1, None), (2, None)])
+        # Without workers the errors are raised
+        self.assertRaises(ZeroDivisionError, executor.run, [("c", lambda: 1/0)])
+
+    def test_workers(self):
+        started = []
+        lock = threading.Lock()
+        def init():
+            with lock: started.append(threading.current_thread().name)
+        def task(value, delay):
+            time.sleep(delay)
+            return value
+        executor = QueryExecutor(3, init)
+        tasks = [(str(i), lambda i=i: task(i, 0.01 * (5 - i))) for i in range(5)]
+        tasks.append(("error", lambda: 1/0))
+        results = executor.run(tasks)
+        # The results in the order of the tasks, the errors isolated
+        self.assertEqual([result for (result, error) in results[:5]], range(5))
+        self.assertEqual(results[5][0], None)
+        self.assertTrue(isinstance(results[5][1], ZeroDivisionError))
+        self.assertEqual(len(started), 3)
+        self.assertFalse(threading.current_thread().name in started)
+
+    def test_worker_cursors(self):
+        # The workers do not use the shared connections
+        def worker_cursors():
+            return DSQuery.worker_local.cursors
+        executor = QueryExecutor(2, DSQuery.init_worker, DSQuery.close_worker)
+        results = executor.run([("a", worker_cursors), ("b", worker_cursors)])
+        self.assertEqual([result for (result, error) in results], [{}, {}])
+        self.assertEqual(getattr(DSQuery.worker_local, "cursors", None), None)
+
+    def test_refresh_run_tables(self):
+        dbcon = RunTablesQuery()
+        dbcon.refresh_run_tables(None, [])
+        self.assertEqual(dbcon.refreshed, [])
+        dbcon.refresh_run_tables(["company,,project", None], ["Jenkins"])
+        self.assertEqual(dbcon.refreshed, ["projects_repos", "people_bots"])
+
+
+if __name__ == '__main__':
+    unittest.main()
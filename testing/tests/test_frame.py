@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for metrics/frame.py"""
+
+import unittest
+
+from vizgrimoire.GrimoireUtils import fill_items, order_items, fill_and_order_items
+from vizgrimoire.metrics.frame import ReportFrame
+
+
+class TestReportFrame(unittest.TestCase):
+
+    def test_add(self):
+        frame = ReportFrame()
+        frame.add({"commits": 10, "authors": 2})
+        frame.add({"commits": 11})
+        frame.add(None)
+        self.assertEqual(frame.to_dict(), {"commits": 11, "authors": 2})
+        self.assertTrue("authors" in frame)
+
+    def test_add_items(self):
+        frame = ReportFrame(["b", "c", "a"])
+        frame.add_items({"name": ["a", "x", "b"], "commits": [1, 5, 2]}, "name")
+        frame.add_items({"name": "c", "authors": 3}, "name")
+        self.assertEqual(frame.to_dict(), {"name": ["b", "c", "a"],
+                                           "commits": [2, 0, 1],
+                                           "authors": [0, 3, 0]})
+
+    def test_add_items_evol(self):
+        frame = ReportFrame(["a", "b"])
+        data = {"name": ["b"], "commits": [[1, 2, 3]], "year": [24120, 24132, 24144]}
+        frame.add_items(data, "name", True, "year", "'2010-01-01'", "'2013-01-01'")
+        columns = frame.to_dict()
+        self.assertEqual(columns["year"], [24120, 24132, 24144])
+        self.assertEqual(columns["commits"], [[0, 0, 0], [1, 2, 3]])
+
+    def test_legacy(self):
+        items = ["b", "c", "a", "d"]
+        data = {"name": ["a", "b", "c"], "commits": [1, 2, 3], "authors": [4, 5, 6]}
+        legacy = order_items(items, fill_items(items, dict(data), "name"), "name")
+        self.assertEqual(fill_and_order_items(items, data, "name"), legacy)
+        # Without the id field the values are lists, as in order_items
+        self.assertEqual(fill_and_order_items(items, {"commits": 3}, "name"),
+                         {"commits": [3]})
+
+
+if __name__ == '__main__':
+    unittest.main()
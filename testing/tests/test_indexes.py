@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/indexes.py"""
+
+import unittest
+
+from vizgrimoire.metrics.indexes import IndexCatalog, ScanReport
+
+
+class TestIndexCatalog(unittest.TestCase):
+
+    def test_missing(self):
+        catalog = IndexCatalog([("scmlog", ["author_date"]), ("scmlog", ["author_id"]),
+                                ("actions", ["commit_id"]), ("commits_lines", ["commit_id"])])
+        # Same format than DSQuery.get_existing_indexes
+        existing = {"scmlog": [["id"], ["author_id", "author_date"]],
+                    "actions": [["id"]]}
+        self.assertEqual(catalog.get_missing(existing),
+                         [("scmlog", ["author_date"]), ("actions", ["commit_id"])])
+        self.assertEqual(IndexCatalog.get_name("actions", ["commit_id"]),
+                         "gl_actions_commit_id")
+
+
+class TestScanReport(unittest.TestCase):
+
+    def test_scans(self):
+        report = ScanReport(min_rows = 100)
+        plan = {"table": ["<derived2>", "s", "r", "a"],
+                "type": ["ALL", "ALL", "ALL", "ref"],
+                "rows": [5000, 2000, 10, 3]}
+        report.add("SELECT 1", plan)
+        report.add("SELECT 2", {"table": ["s"], "type": ["ALL"], "rows": [3000]})
+        self.assertEqual(report.get_scans(), [("s", 3000, "SELECT 2"),
+                                              ("s", 2000, "SELECT 1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
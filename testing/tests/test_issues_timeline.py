@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for the issues timeline tables of ITSQuery"""
+
+import hashlib
+import unittest
+
+from vizgrimoire.metrics.query_builder import ITSQuery
+
+CLOSED = "new_value='CLOSED'"
+
+
+class Connection(object):
+    def commit(self): pass
+
+class Cursor(object):
+    connection = Connection()
+
+class TimelineDB(ITSQuery):
+    """ ITSQuery recording the queries, with the given timeline state """
+
+    cursor = Cursor()
+
+    def __init__(self, state, last, closes = 1):
+        super(TimelineDB, self).__init__(None, None, "its_db")
+        self.state = state # (closed condition, issue, change and comment ids)
+        self.last = last # (issue, change and comment ids)
+        self.closes = closes
+        self.queries = []
+
+    def ExecuteQuery(self, sql):
+        self.queries.append(" ".join(sql.split()))
+        if sql.startswith("SELECT * FROM issues_timeline_state"):
+            if self.state is None: return {}
+            return {"closed_condition": self.state[0], "last_issue_id": self.state[1],
+                    "last_change_id": self.state[2], "last_comment_id": self.state[3]}
+        if "AS last_issue_id" in sql:
+            return {"last_issue_id": self.last[0], "last_change_id": self.last[1],
+                    "last_comment_id": self.last[2]}
+        if "AS closes" in sql:
+            return {"issues": 10, "closed": 1, "closes": self.closes}
+        return {}
+
+    def get_closes_queries(self):
+        return [q for q in self.queries if q.startswith("INSERT IGNORE INTO issues_timeline_closes")]
+
+
+class TestIssuesTimeline(unittest.TestCase):
+
+    def setUp(self):
+        ITSQuery.issues_timeline_refreshed = {}
+        self.condition_id = hashlib.md5(CLOSED).hexdigest()
+
+    def test_incremental(self):
+        db = TimelineDB((self.condition_id, 10, 20, 30), (10, 25, 30))
+        self.assertEqual(db.GetIssuesCloses(CLOSED), "issues_timeline_closes")
+        # Only the closes of the new changes are added
+        self.assertEqual(db.get_closes_queries(),
+                         ["INSERT IGNORE INTO issues_timeline_closes (issue_id, closed) "
+                          "SELECT DISTINCT issue_id, changed_on FROM changes "
+                          "WHERE new_value='CLOSED' AND id > 20"])
+        self.assertFalse("DELETE FROM issues_timeline_closes" in db.queries)
+        # Refreshed once per run
+        queries = len(db.queries)
+        db.GetIssuesTimeline(CLOSED)
+        self.assertEqual(len(db.queries), queries)
+
+    def test_full(self):
+        # Closes table empty with closed issues in the timeline
+        db = TimelineDB((self.condition_id, 10, 20, 30), (10, 25, 30), closes = 0)
+        db.GetIssuesTimeline(CLOSED)
+        self.assertTrue("DELETE FROM issues_timeline_closes" in db.queries)
+        self.assertEqual(db.get_closes_queries(),
+                         ["INSERT IGNORE INTO issues_timeline_closes (issue_id, closed) "
+                          "SELECT DISTINCT issue_id, changed_on FROM changes "
+                          "WHERE new_value='CLOSED'"])
+
+    def test_unchanged(self):
+        db = TimelineDB((self.condition_id, 10, 20, 30), (10, 20, 30))
+        db.GetIssuesTimeline(CLOSED)
+        self.assertEqual(db.get_closes_queries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
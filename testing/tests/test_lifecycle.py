@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/lifecycle.py"""
+
+import datetime
+import hashlib
+import unittest
+
+from vizgrimoire.data_source import DataSource
+from vizgrimoire.metrics.lifecycle import LifecycleIndex
+from vizgrimoire.metrics.query_builder import DSQuery, MLSQuery
+from vizgrimoire.MLS import MLS
+
+
+def day(date):
+    return datetime.datetime.strptime(date, "%Y-%m-%d").date()
+
+class TestLifecycleIndex(unittest.TestCase):
+
+    def setUp(self):
+        # Same format than DSQuery.GetLifecycleActivity
+        activity = {"uuid": ["a", "a", "b", "b", "c"],
+                    "day": [day("2014-01-10"), day("2014-06-02"), day("2014-01-20"),
+                            day("2014-02-03"), day("2014-06-20")],
+                    "all_commits": [3, 1, 1, 6, 2],
+                    "commits": [2, 1, 1, 6, 0]}
+        profiles = {"a": ["Alice", 0], "b": ["Bob", 0], "c": ["Bot", 1]}
+        self.index = LifecycleIndex(activity, profiles)
+
+    def test_first_last(self):
+        self.assertEqual(self.index.get_first("a"), day("2014-01-10"))
+        self.assertEqual(self.index.get_last("a"), day("2014-06-02"))
+        self.assertEqual(self.index.get_total("b", "commits"), 7)
+        self.assertEqual(self.index.get_total("b", "commits", "'2014-02-01'", "'2014-03-01'"), 6)
+        self.assertEqual(self.index.get_first_date("'2014-01-15'", "'2014-07-01'"),
+                         day("2014-01-20"))
+        self.assertEqual(self.index.get_last_date("'2014-01-01'", "'2014-07-01'"),
+                         day("2014-06-20"))
+        bots = self.index.get_bots([])
+        self.assertEqual(self.index.get_last_date("'2014-01-01'", "'2014-07-01'", bots),
+                         day("2014-06-02"))
+        self.assertEqual(self.index.get_first_date("'2015-01-01'", "'2015-07-01'"), None)
+
+    def test_bots(self):
+        self.assertEqual(self.index.get_bots(None), set())
+        self.assertEqual(self.index.get_bots([]), set(["c"]))
+        self.assertEqual(self.index.get_bots(["Bob"]), set(["b", "c"]))
+        self.assertEqual(LifecycleIndex({"uuid":[], "day":[]}).get_bots([]), None)
+
+        # As people_bots: people without profile are always bots, people
+        # without name only if there are bot names
+        activity = {"uuid": ["a", "n", "p"], "day": [day("2014-01-10")] * 3,
+                    "commits": [1, 1, 1]}
+        index = LifecycleIndex(activity, {"a": ["Alice", 0], "n": [None, 0]})
+        self.assertEqual(index.get_bots([]), set(["p"]))
+        self.assertEqual(index.get_bots([""]), set(["p"]))
+        self.assertEqual(index.get_bots(["Bob"]), set(["n", "p"]))
+
+    def test_new_gone(self):
+        self.assertEqual(self.index.get_new("'2014-01-01'", "'2014-02-01'"), set(["a", "b"]))
+        self.assertEqual(self.index.get_new("'2014-06-01'", "'2014-07-01'"), set(["c"]))
+        self.assertEqual(self.index.get_new("'2014-06-01'", "'2014-07-01'", set(["c"])), set())
+        # Active in [2014-01-01, 2014-04-01) but not in [2014-04-01, 2014-06-30)
+        self.assertEqual(self.index.get_gone("'2014-06-30'", 90), set(["b"]))
+
+        ts = self.index.get_new_ts("newauthors", "month", "'2014-01-01'", "'2015-01-01'")
+        self.assertEqual(ts, {"month": [2014*12+1, 2014*12+6], "newauthors": [2, 1]})
+
+    def test_ts(self):
+        ts = self.index.get_ts("commits", "month", "'2014-01-01'", "'2015-01-01'", "b")
+        self.assertEqual(ts, {"month": [2014*12+1, 2014*12+2], "commits": [1, 6]})
+        # Days without activity in the field are not included
+        ts = self.index.get_ts("commits", "month", "'2014-01-01'", "'2015-01-01'", "c")
+        self.assertEqual(ts, {"month": [], "commits": []})
+        ts = self.index.get_ts("commits", "week", "'2014-01-01'", "'2014-02-01'")
+        self.assertEqual(ts, {"week": [201402, 201404], "commits": [2, 1]})
+
+    def test_intake(self):
+        intake = self.index.get_intake("all_commits", 0, 1)
+        self.assertEqual(intake, {"month": [2014*12+1, 2014*12+6], "people": [1, 1]})
+        intake = self.index.get_intake("all_commits", 1, 5)
+        self.assertEqual(intake, {"month": [2014*12+1, 2014*12+6], "people": [1, 1]})
+        intake = self.index.get_intake("all_commits", 5, 10)
+        self.assertEqual(intake, {"month": [2014*12+2], "people": [1]})
+
+
+class Connection(object):
+    def commit(self): pass
+
+class Cursor(object):
+    connection = Connection()
+
+class LifecycleDB(MLSQuery):
+    """ MLSQuery recording the queries, with the given lifecycle state """
+
+    cursor = Cursor()
+
+    def __init__(self, state, source_rows, new_rows, identities = 7):
+        super(LifecycleDB, self).__init__(None, None, "mls_db")
+        self.state = state # (fields id, last date, source rows, identities)
+        self.source_rows = source_rows
+        self.new_rows = new_rows
+        self.identities = identities
+        self.queries = []
+
+    def ExecuteQuery(self, sql):
+        self.queries.append(" ".join(sql.split()))
+        if sql.startswith("SELECT * FROM people_lifecycle_state"):
+            if self.state is None: return {}
+            return {"fields": self.state[0], "last_date": self.state[1],
+                    "source_rows": self.state[2], "identities": self.state[3]}
+        if sql.startswith("CHECKSUM TABLE"):
+            return {"Table": "mls_db.people_uidentities", "Checksum": self.identities}
+        if "AS source_rows" in sql:
+            return {"source_rows": self.source_rows, "last_date": "2014-06-01 10:00:00"}
+        if "AS new_rows" in sql:
+            return {"new_rows": self.new_rows}
+        if sql.startswith("SELECT uuid, day"):
+            return {"uuid": [], "day": [], "sent": []}
+        return {}
+
+    def get_inserts(self):
+        return [q for q in self.queries if q.startswith("INSERT INTO people_lifecycle ")]
+
+
+class TestLifecycleTable(unittest.TestCase):
+
+    def setUp(self):
+        DSQuery.lifecycle_refreshed = {}
+        self.fields_id = hashlib.md5("sent").hexdigest()
+
+    def test_incremental(self):
+        db = LifecycleDB((self.fields_id, "2014-05-01 00:00:00", 100, 7), 110, 10)
+        self.assertEqual(db.GetLifecycleTable(), "people_lifecycle")
+        self.assertFalse("DROP TABLE IF EXISTS people_lifecycle" in db.queries)
+        inserts = db.get_inserts()
+        self.assertEqual(len(inserts), 1)
+        # Only the new messages, added to the activity of their days
+        self.assertTrue("AND m.first_date > '2014-05-01 00:00:00'" in inserts[0])
+        self.assertTrue(inserts[0].endswith("ON DUPLICATE KEY UPDATE sent = sent + VALUES(sent)"))
+        self.assertTrue("INSERT INTO people_lifecycle_state VALUES "
+                        "('%s', '2014-06-01 10:00:00', 110, 7)" % self.fields_id in db.queries)
+        # Refreshed once per run
+        queries = len(db.queries)
+        db.GetLifecycleTable()
+        self.assertEqual(len(db.queries), queries)
+
+    def test_rebuild(self):
+        # Messages added with older dates
+        db = LifecycleDB((self.fields_id, "2014-05-01 00:00:00", 100, 7), 110, 5)
+        db.GetLifecycleTable()
+        self.assertTrue("DROP TABLE IF EXISTS people_lifecycle" in db.queries)
+        self.assertFalse(" > '" in db.get_inserts()[0])
+        # Identities changed
+        DSQuery.lifecycle_refreshed = {}
+        db = LifecycleDB((self.fields_id, "2014-05-01 00:00:00", 100, 7), 110, 10, 8)
+        db.GetLifecycleTable()
+        self.assertTrue("DROP TABLE IF EXISTS people_lifecycle" in db.queries)
+        # No state yet
+        DSQuery.lifecycle_refreshed = {}
+        db = LifecycleDB(None, 110, 0)
+        db.GetLifecycleTable()
+        self.assertTrue("DROP TABLE IF EXISTS people_lifecycle" in db.queries)
+        self.assertEqual(len(db.get_inserts()), 1)
+
+    def test_unchanged(self):
+        db = LifecycleDB((self.fields_id, "2014-06-01 10:00:00", 110, 7), 110, 0)
+        db.GetLifecycleTable()
+        self.assertEqual(db.get_inserts(), [])
+
+    def test_run_tables(self):
+        # Built in the main thread before the global metrics are run by the workers
+        DataSource._lifecycle_indexes = {}
+        try:
+            db = LifecycleDB((self.fields_id, "2014-06-01 10:00:00", 110, 7), 110, 0)
+            MLS.refresh_run_tables(db, ["repository", None], None)
+            self.assertFalse("mls" in DataSource._lifecycle_indexes)
+            MLS.refresh_run_tables(db, None, None)
+            self.assertTrue("mls" in DataSource._lifecycle_indexes)
+        finally:
+            DataSource._lifecycle_indexes = {}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/onion.py"""
+
+import unittest
+
+from vizgrimoire.analysis.onion_model import CommunityStructure
+from vizgrimoire.analysis.onion_transitions import OnionTransitions
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.onion import OnionModel
+from vizgrimoire.metrics.query_builder import QAForumsQuery
+
+
+class OnionDS(object):
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+
+class OnionDB(object):
+    """ Onion activity of two windows, as GetOnionActivity """
+
+    def GetOnionActivity(self, windows, type_analysis = None):
+        return {"onion_window": [0, 0, 1, 1],
+                "person": ["a", "b", "a", "b"],
+                "contributions": [90, 10, 10, 90]}
+
+    def GetOnionPeople(self, people):
+        return dict((p, {"uuid": p, "name": p.upper()}) for p in people)
+
+
+class TestOnionModel(unittest.TestCase):
+
+    def setUp(self):
+        # Same format than DSQuery.GetOnionActivity for a filter all query
+        activity = {"onion_window": [0, 0, 0, 0, 1, 1, 1, 1, 1],
+                    "person": ["a", "b", "c", "d", "a", "b", "c", "d", "a"],
+                    "item": ["x", "x", "x", "x", "x", "x", "x", "x", "y"],
+                    "contributions": [70, 20, 6, 4, 10, 80, 4, 6, 3]}
+        self.onion = OnionModel(activity)
+
+    def test_cut(self):
+        self.assertEqual(OnionModel.cut([]), (0, 0))
+        self.assertEqual(OnionModel.cut([80, 15, 5]), (1, 2))
+        self.assertEqual(OnionModel.cut([79, 16, 5]), (2, 2))
+        self.assertEqual(OnionModel.cut([96, 4]), (1, 1))
+        self.assertEqual(OnionModel.cut([1]), (1, 1))
+
+    def test_layers(self):
+        self.assertEqual(self.onion.get_items(1), ["x", "y"])
+        layers = self.onion.get_layers(0, "x")
+        self.assertEqual(layers, {"core": set(["a", "b"]), "regular": set(["c"]),
+                                  "occasional": set(["d"])})
+        self.assertEqual(self.onion.get_counts(0, "x"),
+                         {"core": 2, "regular": 1, "occasional": 1})
+        self.assertEqual(self.onion.get_counts(1, "y"),
+                         {"core": 1, "regular": 0, "occasional": 0})
+        self.assertEqual(self.onion.get_counts(2, "x"),
+                         {"core": 0, "regular": 0, "occasional": 0})
+
+    def test_transitions(self):
+        transitions = self.onion.get_transitions(0, 1, "x")
+        self.assertEqual(transitions["core"], set(["b"]))
+        self.assertEqual(transitions["up_core"], set())
+        self.assertEqual(transitions["up_reg"], set(["d"]))
+        self.assertEqual(transitions["down_reg"], set(["a"]))
+        self.assertEqual(transitions["down_occ"], set(["c"]))
+
+
+class TestOnionTransitions(unittest.TestCase):
+
+    def test_agg(self):
+        filters = MetricFilters("month", "'2014-01-01'", "'2015-01-01'", None)
+        transitions = OnionTransitions(OnionDB(), filters)
+        for name, field in [("its", "changes"), ("mls", "sent"), ("scr", "submissions")]:
+            data = transitions.get_agg(OnionDS(name))
+            self.assertEqual(data["up_core"], {"uuid": ["b"], "name": ["B"], field: [90]})
+            self.assertEqual(data["down_reg"], {"uuid": ["a"], "name": ["A"], field: [10]})
+        # Data sources without onion model
+        self.assertEqual(transitions.get_agg(OnionDS("irc")), {})
+
+    def test_qaforums_filters(self):
+        # No onion model for qaforums filters: no data, no exception
+        db = QAForumsQuery(None, None, "qaforums_db")
+        for type_analysis in [["repository", None], ["repository", "'python'"]]:
+            filters = MetricFilters("month", "'2014-01-01'", "'2015-01-01'", type_analysis)
+            self.assertEqual(db.GetOnionActivity([], type_analysis), None)
+            transitions = OnionTransitions(db, filters)
+            self.assertEqual(transitions.get_agg(OnionDS("qaforums")), {})
+            community = CommunityStructure(db, filters)
+            self.assertEqual(community.get_agg(OnionDS("qaforums")), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
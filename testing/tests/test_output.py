@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/output.py"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vizgrimoire.metrics.output import OutputManager
+
+
+class TestOutputManager(unittest.TestCase):
+
+    def setUp(self):
+        self.destdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.destdir)
+
+    def read_manifest(self):
+        with open(os.path.join(self.destdir, OutputManager.manifest_file)) as f:
+            return json.load(f)
+
+    def test_write_if_changed(self):
+        scm = os.path.join(self.destdir, "scm-static.json")
+        its = os.path.join(self.destdir, "its-static.json")
+        output = OutputManager(self.destdir)
+        self.assertTrue(output.write(scm, '{"commits": 10}'))
+        self.assertTrue(output.write(its, u'{"closed": "\xf1"}'))
+        output.close()
+        manifest = self.read_manifest()
+        self.assertEqual(manifest["changed"], ["its-static.json", "scm-static.json"])
+        self.assertEqual(manifest["files"]["scm-static.json"]["size"], 15)
+
+        # Second run: only the changed file is written
+        output = OutputManager(self.destdir)
+        self.assertFalse(output.write(scm, '{"commits": 10}'))
+        self.assertTrue(output.write(its, u'{"closed": "n"}'))
+        output.close()
+        manifest = self.read_manifest()
+        self.assertEqual(manifest["changed"], ["its-static.json"])
+        self.assertEqual(sorted(manifest["files"].keys()), ["its-static.json", "scm-static.json"])
+        with open(its) as f:
+            self.assertEqual(json.load(f), {"closed": "n"})
+
+        # Files removed after the last run are written again
+        os.remove(scm)
+        output = OutputManager(self.destdir)
+        self.assertTrue(output.write(scm, '{"commits": 10}'))
+        output = OutputManager(self.destdir, force = True)
+        self.assertTrue(output.write(scm, '{"commits": 10}'))
+        self.assertEqual([f for f in os.listdir(self.destdir) if f.startswith(".tmp")], [])
+
+if __name__ == "__main__":
+    unittest.main()
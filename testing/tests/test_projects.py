@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/projects.py"""
+
+import unittest
+
+from vizgrimoire.metrics.projects import ProjectsHierarchy
+from vizgrimoire.metrics.query_builder import DSQuery, SCMQuery, MLSQuery
+
+
+class TestProjects(unittest.TestCase):
+
+    def setUp(self):
+        # openstack -> compute -> nova, with a cycle nova -> compute
+        projects = {"openstack": 1, "compute": 2, "nova": 3, "swift": 4}
+        children = [(1, 2), (2, 3), (3, 2), (1, 4)]
+        repositories = [(2, "scm", "compute.git"), (3, "scm", "nova.git"),
+                        (3, "its", "nova-tracker"), (4, "scm", "swift.git")]
+        self.hierarchy = ProjectsHierarchy(projects, children, repositories)
+
+    def test_closure(self):
+        closure = ProjectsHierarchy.get_closure([1, 2], [(1, 2), (2, 3), (3, 1)])
+        self.assertEqual(closure, {1: set([1, 2, 3]), 2: set([1, 2, 3])})
+        self.assertEqual(self.hierarchy.get_subprojects("openstack"), [1, 2, 3, 4])
+        self.assertEqual(self.hierarchy.get_subprojects("swift"), [4])
+        self.assertEqual(self.hierarchy.get_subprojects("unknown"), [])
+
+    def test_repositories(self):
+        self.assertEqual(self.hierarchy.get_repositories("openstack", "scm"),
+                         ["compute.git", "nova.git", "swift.git"])
+        self.assertEqual(self.hierarchy.get_repositories("compute", "its"), ["nova-tracker"])
+        self.assertEqual(self.hierarchy.get_repositories("swift", "its"), [])
+        pairs = self.hierarchy.get_projects_repositories("its")
+        self.assertEqual(pairs, [("compute", "nova-tracker"), ("nova", "nova-tracker"),
+                                 ("openstack", "nova-tracker")])
+
+    def test_projects_sql(self):
+        DSQuery.projects_repos_refreshed["scm_db"] = True
+        DSQuery.projects_repos_refreshed["mls_db"] = True
+        db = SCMQuery(None, None, "scm_db", "identities", "projects")
+        self.assertEqual(set(db.GetSQLProjectsFrom("'nova'")), set(["scmlog s", "projects_repos prj"]))
+        self.assertEqual(set(db.GetSQLProjectsWhere("'nova'")),
+                         set(["s.repository_id = prj.repository_id", "prj.name = 'nova'"]))
+        db = MLSQuery(None, None, "mls_db", "identities", "projects")
+        self.assertEqual(set(db.GetSQLProjectsWhere()),
+                         set(["m.mailing_list_url = prj.repository_id"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/query_profile.py"""
+
+import unittest
+
+from vizgrimoire.metrics.query_profile import QueryProfile
+
+
+class TestQueryProfile(unittest.TestCase):
+
+    def test_fingerprint(self):
+        sql = """SELECT COUNT(DISTINCT(s.id)) AS commits FROM scmlog s
+                 WHERE s.author_date >= '2014-01-01' AND s.repository_id IN (1, 2,3)"""
+        self.assertEqual(QueryProfile.get_fingerprint(sql),
+                         "select count(distinct(s.id)) as commits from scmlog s "+
+                         "where s.author_date >= ? and s.repository_id in (?+)")
+        self.assertEqual(QueryProfile.get_result_size({"id": [1, 2], "name": ["ab", None]}),
+                         (2, 18))
+        self.assertEqual(QueryProfile.get_result_size({"commits": 10}), (1, 8))
+
+    def test_add(self):
+        profile = QueryProfile(explain_time = 1)
+        profile.set_phase("evol")
+        profile.add("SELECT 1", 0.5, {"a": 1}, lambda sql: "plan")
+        profile.add("SELECT 1", 0.5, {"a": 1})
+        profile.set_phase("agg")
+        profile.add("SELECT 2", 2, {"a": [1, 2]}, lambda sql: "plan")
+        data = profile.get_profile()
+        self.assertEqual(data["total"]["queries"], 3)
+        self.assertEqual(data["total"]["fingerprints"], 1)
+        self.assertEqual(data["total"]["duplicates"], 1)
+        self.assertEqual(data["phases"]["evol"]["rows"], 2)
+        self.assertEqual(data["phases"]["agg"]["time"], 2)
+        slow = data["slow"][0]
+        self.assertEqual((slow["sql"], slow["max_time"], slow["explain"]), ("SELECT 2", 2, "plan"))
+        self.assertEqual(slow["phases"], {"evol": 2, "agg": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/registry.py"""
+
+import unittest
+
+from vizgrimoire.data_source import DataSource
+from vizgrimoire.metrics.registry import build_registry, get_registry
+
+
+class FakeMetrics(object):
+    def __init__(self, id):
+        self.id = id
+
+class FakeDS(DataSource):
+    _metrics_set = []
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_registry_updated(self):
+        # If it fails: python -m vizgrimoire.metrics.registry
+        self.assertEqual(build_registry(), get_registry())
+
+    def test_registry(self):
+        registry = get_registry()
+        self.assertTrue(("scm_metrics", "Commits", "SCM", "commits") in registry["metrics"])
+        # Metrics classes inheriting from other metrics module
+        self.assertTrue(("scr_jira_metrics", "Trackers", "ITS", "trackers") in registry["metrics"])
+        self.assertTrue(("ages", "Ages", "ages") in registry["studies"])
+        self.assertTrue(("leaders", "SCMLeaders", "main_actors_developing") in registry["studies"])
+        self.assertEqual([s for s in registry["studies"] if s[1] == "Analyses"], [])
+
+    def test_lazy_metrics(self):
+        created = []
+        def factory(id):
+            created.append(id)
+            return FakeMetrics(id)
+        for id in ["commits", "authors", "files"]:
+            FakeDS.add_metrics_lazy(id, lambda id = id: factory(id), FakeDS)
+        self.assertEqual(FakeDS.get_metrics("authors", FakeDS).id, "authors")
+        self.assertEqual(created, ["authors"])
+        self.assertEqual([m.id for m in FakeDS.get_metrics_set(FakeDS)],
+                         ["authors", "commits", "files"])
+        self.assertEqual(created, ["authors", "commits", "files"])
+        FakeDS.set_metrics_set(FakeDS, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/release_matrix.py"""
+
+import datetime
+import unittest
+
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.release_matrix import ReleaseMatrix
+from vizgrimoire.metrics.rollup import DailySeries, RollupNotSupported
+
+
+releases = [("2014-01-01", "2014-07-01"), ("2014-07-01", "2015-01-01")]
+
+class MatrixMetric(object):
+    """ Metric with the query per window of GetSQLWindows """
+    id = "commits"
+
+    def __init__(self, dbcon, filters):
+        self.filters = filters
+
+    def get_daily_series(self, windows):
+        start = datetime.date(2014, 7, 1)
+        if self.filters.type_analysis is None:
+            return DailySeries({"day": [start], "commits": [4]})
+        return DailySeries({"name": ["b", "a"], "day": [start, start],
+                            "commits": [2, 1]}, "name")
+
+class CellMetric(object):
+    """ Metric computed per release """
+    id = "time"
+    cells = []
+
+    def __init__(self, dbcon, filters):
+        self.filters = filters
+
+    def get_daily_series(self, windows):
+        raise RollupNotSupported("time")
+
+    def get_agg(self):
+        CellMetric.cells.append((self.filters.startdate, self.filters.type_analysis))
+        return {"time": len(CellMetric.cells)}
+
+
+class TestReleaseMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.filters = MetricFilters("month", None, None, None, 10, ["Jenkins"])
+
+    def test_global(self):
+        matrix = ReleaseMatrix(releases, self.filters)
+        self.assertEqual(matrix.get_metric(MatrixMetric, None), {"commits": [0, 4]})
+
+    def test_items(self):
+        matrix = ReleaseMatrix(releases, self.filters, "project", ["a", "b", "c"])
+        self.assertEqual(matrix.get_metric(MatrixMetric, None),
+                         {"commits": [[0, 1], [0, 2], [0, 0]]})
+        self.assertRaises(Exception, ReleaseMatrix, releases, self.filters, "project")
+
+    def test_cells(self):
+        CellMetric.cells = []
+        matrix = ReleaseMatrix(releases, self.filters, "project", ["a", "b"])
+        self.assertEqual(matrix.get_metric(CellMetric, None), {"time": [[1, 2], [3, 4]]})
+        self.assertEqual(CellMetric.cells[1], ("'2014-07-01'", ["project", "a"]))
+        matrix = ReleaseMatrix(releases, self.filters)
+        self.assertEqual(matrix.get_metric(CellMetric, None), {"time": [5, 6]})
+
+if __name__ == '__main__':
+    unittest.main()
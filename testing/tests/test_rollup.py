@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/rollup.py"""
+
+import datetime
+import unittest
+
+from vizgrimoire.GrimoireUtils import completePeriodIds
+from vizgrimoire.metrics.query_builder import DSQuery
+from vizgrimoire.metrics.rollup import DAILY_BASE, DailySeries, RollupNotSupported
+from vizgrimoire.metrics.rollup import get_base_fields, get_period_id, split_fields
+
+
+def day(date):
+    return datetime.datetime.strptime(date, "%Y-%m-%d").date()
+
+
+class TestRollup(unittest.TestCase):
+
+    def test_base_fields(self):
+        self.assertEqual(split_fields("count(distinct(s.id)) as commits, sum(a, b) as x"),
+                         ["count(distinct(s.id)) as commits", "sum(a, b) as x"])
+        fields = get_base_fields("COUNT(DISTINCT(pup.uuid)) AS authors, count(*) as n")
+        self.assertEqual(fields, [("distinct", "(pup.uuid)", "authors"),
+                                  ("sum", "count(*) as n", "n")])
+        self.assertRaises(RollupNotSupported, get_base_fields, "avg(t.x) as x")
+        # Ratios of counts
+        self.assertRaises(RollupNotSupported, get_base_fields,
+                          "count(s.id)/count(distinct(s.author_id)) as avg_commits")
+        self.assertRaises(RollupNotSupported, get_base_fields,
+                          "count(distinct(s.id))/count(distinct(pup.uuid)) as avg_commits_author")
+        self.assertRaises(RollupNotSupported, get_base_fields,
+                          "count(distinct(a)) as a, count(distinct(b)) as b")
+        self.assertRaises(RollupNotSupported, get_base_fields,
+                          "count(distinct ch.issue_id, ch.old_value) as sent")
+
+    def test_period_id(self):
+        # ISO weeks, as YEARWEEK(date, 3)
+        self.assertEqual(get_period_id(day("2015-01-01"), "week"), 201501)
+        self.assertEqual(get_period_id(day("2016-01-01"), "week"), 201553)
+        self.assertEqual(get_period_id(day("2014-05-10"), "month"), 2014 * 12 + 5)
+        self.assertEqual(get_period_id(day("2014-05-10"), "quarter"), 2014 * 4 + 1)
+        self.assertEqual(get_period_id(day("2014-05-10"), "year"), 2014 * 12)
+        self.assertEqual(get_period_id(day("1970-01-02"), "day"), 86400)
+
+    def test_roll_up(self):
+        base = {"day": [day("2014-01-01"), day("2014-01-01"), day("2014-01-02"),
+                        day("2014-02-01")],
+                "authors__ids": [1, 2, 1, 1],
+                "commits": [3, 1, 2, 5]}
+        series = DailySeries(base)
+        month = series.roll_up("month")
+        # The author 1 is counted once in January
+        self.assertEqual(month, {"month": [2014 * 12 + 1, 2014 * 12 + 2],
+                                 "authors": [2, 1], "commits": [6, 5]})
+        self.assertEqual(series.roll_up("year"), {"year": [2014 * 12],
+                                                  "authors": [2], "commits": [11]})
+        windows = series.roll_up_windows([("'2014-01-01'", "'2014-01-02'"),
+                                          ("2014-01-02", "2014-03-01"),
+                                          ("2015-01-01", "2016-01-01")])
+        self.assertEqual(windows, {"authors": [2, 1, 0], "commits": [4, 7, 0]})
+
+    def test_roll_up_items(self):
+        base = {"name": ["a", "a", "b"],
+                "day": [day("2014-01-01"), day("2014-04-01"), day("2014-01-05")],
+                "authors__ids": [1, 1, 2]}
+        series = DailySeries(base, "name")
+        self.assertEqual(series.roll_up("quarter"),
+                         {"name": ["a", "a", "b"], "quarter": [8056, 8057, 8056],
+                          "authors": [1, 1, 1]})
+        self.assertEqual(series.roll_up_windows([("2014-01-01", "2015-01-01")]),
+                         {"name": ["a", "b"], "authors": [[1], [1]]})
+        # Empty result of the query
+        series = DailySeries({"name": [], "day": [], "authors__ids": []}, "name")
+        self.assertEqual(series.roll_up("month"), {"name": [], "month": [], "authors": []})
+
+    def test_complete_quarters(self):
+        ts = completePeriodIds({"quarter": [2014 * 4 + 1], "commits": [5]},
+                               "quarter", "'2014-01-01'", "'2014-10-01'")
+        self.assertEqual(ts["quarter"], [2014 * 4, 2014 * 4 + 1, 2014 * 4 + 2])
+        self.assertEqual(ts["commits"], [0, 5, 0])
+        self.assertEqual(ts["id"], [0, 1, 2])
+
+    def test_daily_base_query(self):
+        sql = DSQuery.GetSQLPeriod(DAILY_BASE, "s.date",
+                                   "count(distinct(s.author_id)) as authors, count(*) as commits",
+                                   "scmlog s", "", "'2014-01-01'", "'2015-01-01'")
+        self.assertEqual(sql,
+            "SELECT DATE(s.date) AS day, (s.author_id) AS authors__ids, "
+            "count(*) as commits FROM scmlog s WHERE s.date>='2014-01-01' AND "
+            "s.date<'2015-01-01' GROUP BY DATE(s.date), (s.author_id) "
+            "ORDER BY DATE(s.date)")
+        sql = DSQuery.GetSQLPeriod(DAILY_BASE, "s.date", "count(*) as commits",
+                                   "scmlog s", "", "'2014-01-01'", "'2015-01-01'",
+                                   group_field = "r.name AS name", date_key = "s.date_day_key",
+                                   all_items = "repository")
+        self.assertEqual(sql,
+            "SELECT r.name AS name, s.date_day_key AS day, count(*) as commits "
+            "FROM scmlog s WHERE s.date>='2014-01-01' AND s.date<'2015-01-01' "
+            "GROUP BY name, s.date_day_key ORDER BY s.date_day_key")
+
+    def test_quarter_query(self):
+        # Same quarter ids as get_period_id
+        sql = DSQuery.GetSQLPeriod("quarter", "s.date", "count(*) as commits", "scmlog s", "",
+                                   "'2014-01-01'", "'2015-01-01'")
+        self.assertTrue(sql.startswith("SELECT YEAR(s.date)*4+QUARTER(s.date)-1 AS quarter, "))
+        self.assertTrue(sql.endswith("GROUP BY YEAR(s.date),QUARTER(s.date) "
+                                     "ORDER BY YEAR(s.date),QUARTER(s.date)"))
+
+    def test_windows_query(self):
+        windows = [("2014-01-01", "2014-07-01"), ("2014-07-01", "2015-01-01")]
+        sql = DSQuery.GetSQLWindows(windows, "s.date", "count(distinct(s.author_id)) as authors",
+                                    "scmlog s", "", "'2014-01-01'", "'2015-01-01'")
+        key = ("CASE WHEN s.date>='2014-01-01' AND s.date<'2014-07-01' THEN DATE('2014-01-01') "
+               "WHEN s.date>='2014-07-01' AND s.date<'2015-01-01' THEN DATE('2014-07-01') END")
+        self.assertEqual(sql,
+            "SELECT " + key + " AS day, count(distinct(s.author_id)) as authors "
+            "FROM scmlog s WHERE s.date>='2014-01-01' AND s.date<'2015-01-01' "
+            "GROUP BY " + key)
+        # One row per window with the exact values of the query
+        series = DailySeries({"day": [day("2014-01-01"), day("2014-07-01")], "authors": [5, 3]})
+        self.assertEqual(series.roll_up_windows(windows), {"authors": [5, 3]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+"""Unit tests for metrics/sketches.py"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+
+from vizgrimoire.metrics.executor import QueryExecutor
+from vizgrimoire.metrics.metrics import Metrics
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.query_builder import DSQuery
+from vizgrimoire.metrics.sketches import HyperLogLog, ExactSet, SketchStore, open_store
+
+
+class SketchesDS(object):
+    """ Data source with a sketch store """
+    store = None
+
+    @classmethod
+    def get_sketch_store(cls):
+        return cls.store
+
+
+class SketchesDB(object):
+    """ Database with the authors of each day, for the sketch queries """
+
+    BuildSketchQuery = staticmethod(DSQuery.BuildSketchQuery)
+
+    def __init__(self, authors):
+        self.authors = authors # list of (day, uuid)
+        self.queries = []
+
+    def ExecuteQuery(self, sql):
+        self.queries.append(sql)
+        (startdate, enddate) = re.findall("'([0-9-]+)'", sql)
+        rows = [row for row in self.authors if startdate <= row[0] < enddate]
+        return {"sketch_day": [row[0] for row in rows],
+                "sketch_uuid": [row[1] for row in rows]}
+
+
+class SlowSketchesDB(SketchesDB):
+    """ Database answering after a while, to run the workers at once """
+
+    def ExecuteQuery(self, sql):
+        time.sleep(0.05)
+        return SketchesDB.ExecuteQuery(self, sql)
+
+
+class Authors(Metrics):
+    id = "authors"
+    data_source = SketchesDS
+
+    def _get_sql(self, evolutionary):
+        return DSQuery.GetSQLPeriod(self.filters.period, "s.date",
+                                    "count(distinct(pup.uuid)) as authors",
+                                    "scmlog s", "", self.filters.startdate,
+                                    self.filters.enddate)
+
+
+class TestSketches(unittest.TestCase):
+
+    def test_hyperloglog(self):
+        sketch1 = HyperLogLog()
+        sketch2 = HyperLogLog()
+        for i in range(0, 20000): sketch1.add("uuid%i" % i)
+        for i in range(10000, 30000): sketch2.add("uuid%i" % i)
+        self.assertTrue(abs(sketch1.count() - 20000) < 20000 * 0.03)
+        sketch1.merge(sketch2)
+        self.assertTrue(abs(sketch1.count() - 30000) < 30000 * 0.03)
+
+        small = HyperLogLog()
+        for i in range(0, 50): small.add(u"persona%i" % i)
+        small.add(u"persona1")
+        self.assertEqual(small.count(), 50)
+
+    def test_store(self):
+        store = SketchStore(exact = ["authors"])
+        store.add("'2014-01-01'", None, "authors", "a")
+        store.add("'2014-01-02'", None, "authors", "a")
+        store.add("'2014-01-02'", None, "authors", "b")
+        store.add("'2014-01-02'", ("repository", "r1"), "authors", "a")
+        store.add("'2014-01-03'", ("repository", "r2"), "authors", "a")
+        store.add("'2014-01-03'", ("repository", "r2"), "authors", "c")
+        store.add("'2014-01-03'", None, "committers", "a")
+
+        self.assertTrue(isinstance(store.new_sketch("authors"), ExactSet))
+        self.assertTrue(isinstance(store.new_sketch("committers"), HyperLogLog))
+        self.assertEqual(store.count("authors", "'2014-01-01'", "'2014-01-03'"), 2)
+        self.assertEqual(store.count("authors", "'2014-01-01'", "'2014-01-02'"), 1)
+        self.assertEqual(store.count("committers", "'2014-01-01'", "'2014-01-03'"), 0)
+        # Union of items
+        items = [("repository", "r1"), ("repository", "r2")]
+        self.assertEqual(store.count("authors", "'2014-01-01'", "'2014-01-04'", items), 2)
+        counts = store.count_items("authors", "'2014-01-01'", "'2014-01-03'", "repository")
+        counts = dict(zip(counts["name"], counts["count"]))
+        self.assertEqual(counts, {"r1": 1, "r2": 0})
+
+    def test_loaded(self):
+        store = SketchStore()
+        metric = ("authors", "None", "None")
+        store.set_loaded(metric, "company", "'2014-01-01'", "'2015-01-01'")
+        store.add("'2014-02-01'", ("company", "c1"), metric, "a")
+        self.assertTrue(store.covers(metric, "company", "'2014-06-01'", "'2015-01-01'"))
+        self.assertFalse(store.covers(metric, "company", "'2013-12-01'", "'2015-01-01'"))
+        self.assertFalse(store.covers(metric, None, "'2014-06-01'", "'2015-01-01'"))
+
+        # Loading again removes the sketches of the filter
+        store.set_loaded(metric, "company", "'2014-06-01'", "'2015-01-01'")
+        self.assertEqual(store.get_items(metric, "company"), [])
+
+    def test_save_load(self):
+        store = SketchStore(precision = 12, exact = ["senders"])
+        metric = ("authors", "None", "None")
+        store.set_loaded(metric, "repository", "'2014-01-01'", "'2015-01-01'")
+        for i in range(0, 100):
+            store.add("'2014-03-01'", ("repository", "r1"), metric, "uuid%i" % i)
+            store.add("'2014-03-01'", None, "senders", "uuid%i" % i)
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "scm-sketches.json")
+            store.save(path)
+            loaded = SketchStore.load(path)
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertEqual(loaded.precision, 12)
+        self.assertTrue(loaded.covers(metric, "repository", "'2014-01-01'", "'2015-01-01'"))
+        self.assertEqual(loaded.count(metric, "'2014-01-01'", "'2015-01-01'", [("repository", "r1")]),
+                         store.count(metric, "'2014-01-01'", "'2015-01-01'", [("repository", "r1")]))
+        self.assertEqual(loaded.count("senders", "'2014-01-01'", "'2015-01-01'"), 100)
+
+    def test_open_store(self):
+        store = SketchStore(exact = ["authors"])
+        store.set_loaded("authors", None, "'2014-01-01'", "'2014-02-01'")
+        store.add("'2014-01-10'", None, "authors", "a")
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "scm-sketches.json")
+            self.assertEqual(open_store(path, 14, ["authors"]).loaded, {})
+            store.save(path)
+            loaded = open_store(path, 14, ["authors"])
+            self.assertTrue(loaded.covers("authors", None, "'2014-01-01'", "'2014-02-01'"))
+            self.assertEqual(loaded.count("authors", "'2014-01-01'", "'2014-02-01'"), 1)
+            # Saved with another config
+            self.assertEqual(open_store(path, 12, ["authors"]).loaded, {})
+            self.assertEqual(open_store(path, 14).loaded, {})
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_truncate(self):
+        store = SketchStore(exact = ["authors"])
+        store.set_loaded("authors", None, "'2014-01-01'", "'2014-02-01'")
+        store.add("'2014-01-10'", None, "authors", "a")
+        store.add("'2014-01-31'", None, "authors", "b")
+        store.add("'2014-01-31'", ("company", "c1"), "authors", "b")
+        store.truncate("authors", None, "'2014-01-31'")
+        self.assertEqual(store.get_loaded("authors", None),
+                         [SketchStore._get_day("2014-01-01"), SketchStore._get_day("2014-01-31")])
+        self.assertEqual(store.count("authors", "'2014-01-01'", "'2014-02-01'"), 1)
+        # Other filters are not changed
+        self.assertEqual(store.count("authors", "'2014-01-01'", "'2014-02-01'",
+                                     [("company", "c1")]), 1)
+        store.extend_loaded("authors", None, "'2014-03-01'")
+        self.assertTrue(store.covers("authors", None, "'2014-01-01'", "'2014-03-01'"))
+
+    def test_build_sketch_query(self):
+        sql = DSQuery.GetSQLPeriod("day", "s.date", "count(distinct(pup.uuid)) as authors",
+                                   "scmlog s", "", "'2014-01-01'", "'2015-01-01'")
+        self.assertEqual(DSQuery.BuildSketchQuery(sql, "authors"),
+            "SELECT DATE(s.date) AS sketch_day, pup.uuid AS sketch_uuid FROM scmlog s "
+            "WHERE s.date>='2014-01-01' AND s.date<'2015-01-01' "
+            "GROUP BY pup.uuid, YEAR(s.date),DAYOFYEAR(s.date)")
+        # With the day key column of the date (DateKeys)
+        sql = DSQuery.GetSQLPeriod("day", "s.date", "count(distinct(pup.uuid)) as authors",
+                                   "scmlog s", "", "'2014-01-01'", "'2015-01-01'",
+                                   date_key = "s.date_day_key")
+        self.assertEqual(DSQuery.BuildSketchQuery(sql, "authors"),
+            "SELECT s.date_day_key AS sketch_day, pup.uuid AS sketch_uuid FROM scmlog s "
+            "WHERE s.date>='2014-01-01' AND s.date<'2015-01-01' "
+            "GROUP BY pup.uuid, s.date_day_key")
+        # Not a distinct people count of the metric
+        self.assertEqual(DSQuery.BuildSketchQuery(sql, "committers"), None)
+        sql = DSQuery.GetSQLPeriod("day", "s.date", "count(distinct(s.id)) as authors",
+                                   "scmlog s", "", "'2014-01-01'", "'2015-01-01'")
+        self.assertEqual(DSQuery.BuildSketchQuery(sql, "authors"), None)
+        # Not an evolutionary query
+        self.assertEqual(DSQuery.BuildSketchQuery(
+            "SELECT count(distinct(pup.uuid)) as authors FROM scmlog s", "authors"), None)
+
+    def test_trends_saved_sketches(self):
+        authors = [("2014-01-10", "a"), ("2014-02-27", "b"), ("2014-02-28", "c"),
+                   ("2014-03-01", "d"), ("2014-03-03", "a")]
+        db = SketchesDB(authors[0:2])
+        filters = MetricFilters("month", "'2014-01-01'", "'2014-03-04'", None)
+        SketchesDS.store = SketchStore(exact = ["authors"], days = 60)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            data = Authors(db, filters).get_trends("'2014-02-28'", 30)
+            self.assertEqual(data["authors_30"], 1)
+            path = os.path.join(tmpdir, "scm-sketches.json")
+            SketchesDS.store.save(path)
+
+            # Next run, with more data: only the last saved day and the
+            # new days are read
+            db = SketchesDB(authors)
+            SketchesDS.store = open_store(path, 14, ["authors"])
+            SketchesDS.store.days = 60
+            data = Authors(db, filters).get_trends("'2014-03-04'", 30)
+        finally:
+            SketchesDS.store = None
+            shutil.rmtree(tmpdir)
+        self.assertEqual(len(db.queries), 1)
+        self.assertTrue("s.date>='2014-02-27' AND s.date<'2014-03-04'" in db.queries[0])
+        # b, c, d and a in the last 30 days, a in the previous ones
+        self.assertEqual(data["authors_30"], 4)
+        self.assertEqual(data["diff_netauthors_30"], 3)
+
+    def test_trends_workers(self):
+        # The workers share the store: the sketches are loaded only once
+        db = SlowSketchesDB([("2014-02-10", "a"), ("2014-02-20", "b")])
+        filters = MetricFilters("month", "'2014-01-01'", "'2014-03-01'", None)
+        SketchesDS.store = SketchStore(exact = ["authors"], days = 30)
+        try:
+            tasks = [(str(i), lambda: Authors(db, filters).get_trends("'2014-03-01'", 30))
+                     for i in range(4)]
+            results = QueryExecutor(4).run(tasks)
+        finally:
+            SketchesDS.store = None
+        self.assertEqual(len(db.queries), 1)
+        for (data, error) in results:
+            self.assertEqual(error, None)
+            self.assertEqual(data["authors_30"], 2)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
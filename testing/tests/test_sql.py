@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+
+
+"""Unit tests for metrics/sql.py"""
+
+import unittest
+from sets import Set
+
+from vizgrimoire.metrics.query_builder import DSQuery, SCMQuery
+from vizgrimoire.metrics.sql import Select, bind, join_parts, quote, unquote
+
+
+class TestSQL(unittest.TestCase):
+
+    def test_quote(self):
+        self.assertEqual(quote(None), "NULL")
+        self.assertEqual(quote(3), "3")
+        self.assertEqual(quote("2010-01-01"), "'2010-01-01'")
+        self.assertEqual(quote("O'Brien"), "'O\\'Brien'")
+        self.assertEqual(quote("a\\"), "'a\\\\'")
+        self.assertEqual(unquote("'2010-01-01'"), "2010-01-01")
+        self.assertEqual(unquote("NOW()"), None)
+
+    def test_bind(self):
+        self.assertEqual(bind("SELECT %(a)s, '%%x'", {"a": "b"}), "SELECT 'b', '%x'")
+        self.assertEqual(bind("LIKE '%%x'", None), "LIKE '%x'")
+
+    def test_join_parts(self):
+        parts = Set(["s.b = 1", "s.a = 2", "s.a = 2 "])
+        self.assertEqual(join_parts(parts, " and "), "s.a = 2 and s.b = 1")
+        # The parts are not consumed
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(join_parts(parts, " and "), join_parts(Set(list(parts)), " and "))
+
+    def test_select(self):
+        select = Select("count(*) AS n", "scmlog s")
+        select.add_date_range("s.date", "'2010-01-01'", "NOW()")
+        select.add_filter("s.message LIKE '%fix%'")
+        select.add_filter("s.author_id = %(author)s", author = "x'y")
+        select.group_by.append("s.repository_id")
+        self.assertEqual(select.get_template(),
+            "SELECT count(*) AS n FROM scmlog s WHERE s.date>=%(startdate)s AND "
+            "s.date<NOW() AND s.message LIKE '%%fix%%' AND s.author_id = %(author)s "
+            "GROUP BY s.repository_id")
+        self.assertEqual(select.get_sql(),
+            "SELECT count(*) AS n FROM scmlog s WHERE s.date>='2010-01-01' AND "
+            "s.date<NOW() AND s.message LIKE '%fix%' AND s.author_id = 'x\\'y' "
+            "GROUP BY s.repository_id")
+
+    def test_build_query(self):
+        scm = SCMQuery(None, None, "db", "identities")
+        fields = Set(["count(distinct(s.id)) as commits", "count(distinct(s.author_id)) as authors"])
+        tables = Set(["scmlog s", "actions a"])
+        filters = Set(["a.commit_id = s.id", "s.message LIKE '%fix%'"])
+        sql = DSQuery.GetSQLGlobal("s.date", scm._get_fields_query(fields),
+                                   scm._get_tables_query(tables),
+                                   scm._get_filters_query(filters),
+                                   "'2010-01-01'", "'2011-01-01'")
+        self.assertEqual(sql,
+            "SELECT count(distinct(s.author_id)) as authors , count(distinct(s.id)) as commits "
+            "FROM actions a , scmlog s WHERE s.date>='2010-01-01' AND s.date<'2011-01-01' "
+            "AND a.commit_id = s.id and s.message LIKE '%fix%'")
+        sql = DSQuery.GetSQLPeriod("month", "s.date", "count(s.id) as commits", "scmlog s",
+                                   " and s.id > 0", "'2010-01-01'", "'2011-01-01'", strict = True)
+        self.assertEqual(sql,
+            "SELECT YEAR(s.date)*12+MONTH(s.date) AS month, count(s.id) as commits "
+            "FROM scmlog s WHERE s.date>='2010-01-01' AND s.date<='2011-01-01' AND s.id > 0 "
+            "GROUP BY YEAR(s.date),MONTH(s.date) ORDER BY YEAR(s.date),MONTH(s.date)")
+
+
+if __name__ == '__main__':
+    unittest.main()
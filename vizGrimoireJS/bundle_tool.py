@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2015 Bitergia
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+#
+# This file is a part of GrimoireLib
+#
+
+""" Tool for getting the legacy JSON files from a report_tool --bundle """
+
+import logging
+from optparse import OptionParser
+
+def get_options():
+    parser = OptionParser(usage='Usage: %prog [options] [file ...]',
+                          description='Extract the JSON files (all if none is given) from a bundle',
+                          version='0.1')
+    parser.add_option("-b", "--bundle",
+                      action="store",
+                      dest="bundledir",
+                      help="Bundle dir (DESTDIR/bundle of report_tool --bundle)")
+    parser.add_option("-o", "--destination",
+                      action="store",
+                      dest="destdir",
+                      help="Destination dir for the JSON files")
+    parser.add_option("-l", "--list",
+                      action="store_true",
+                      dest="list",
+                      help="Only list the files in the bundle")
+
+    (opts, args) = parser.parse_args()
+
+    if not opts.bundledir:
+        parser.error("--bundle is needed.")
+    if not opts.list and not opts.destdir:
+        parser.error("--destination is needed.")
+
+    return opts, args
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO,format='%(asctime)s %(message)s')
+    from vizgrimoire.metrics.bundle import BundleReader
+
+    opts, names = get_options()
+    bundle = BundleReader(opts.bundledir)
+    if opts.list:
+        for name in bundle.get_names(): print name
+    else:
+        if len(names) == 0: names = None
+        total = bundle.extract(opts.destdir, names)
+        logging.info(str(total) + " files extracted in " + opts.destdir)
@@ -50,6 +50,10 @@ def get_options():
                       action="store_true",
                       dest="list",
                       help="Only list metrics, don't compute them. Default true.")
+    parser.add_option("--group-by-coverage",
+                      action="store",
+                      dest="coverage_file",
+                      help="Check the GROUP BY queries of the filters and save the coverage matrix in this JSON file")
 
     (opts, args) = parser.parse_args()
 
@@ -98,6 +102,14 @@ if __name__ == '__main__':
             logging.error("Data source not found " + opts.data_source)
             dss = []
 
+    if opts.coverage_file:
+        from vizgrimoire.GrimoireUtils import createJSON
+        from vizgrimoire.metrics.coverage import get_coverage, format_coverage
+        coverage = get_coverage(dss, check_db = True)
+        createJSON(coverage, opts.coverage_file)
+        print(format_coverage(coverage))
+        sys.exit(0)
+
     total_metrics = 0
     total_studies = 0
 
@@ -219,19 +219,19 @@ def scm_general(dbcon, filters):
 
     return dataset
 
-def scm_report(dbcon, filters):
+def scm_report(dbcon, filters, values):
     # Per release aggregated information
+    # values: commits and authors of the release (release matrix)
     project_name = "general"
 
-    commits = scm.Commits(dbcon, filters)
-    createJSON(commits.get_agg(), "./release/scm_commits_"+project_name+".json")
+    createJSON({"commits":values["commits"]}, "./release/scm_commits_"+project_name+".json")
 
     authors = scm.Authors(dbcon, filters)
-    createJSON(authors.get_agg(), "./release/scm_authors_"+project_name+".json")
+    createJSON({"authors":values["authors"]}, "./release/scm_authors_"+project_name+".json")
 
     dataset = {}
-    dataset["commits"] = commits.get_agg()["commits"]
-    dataset["authors"] = authors.get_agg()["authors"]
+    dataset["commits"] = values["commits"]
+    dataset["authors"] = values["authors"]
 
     # tops authors activity
     top_authors = authors.get_list()
@@ -253,8 +253,9 @@ def scm_report(dbcon, filters):
 
     return dataset
 
-def its_report(dbcon, filters):
+def its_report(dbcon, filters, values):
     # Per release its information
+    # values: opened tickets of the release (release matrix)
 
     from vizgrimoire.ITS import ITS
     ITS.set_backend("jira")
@@ -266,26 +267,25 @@ def its_report(dbcon, filters):
     else:
         ITS.closed_condition = "(new_value='Fix Committed')"
 
-    opened = its.Opened(dbcon, filters)
-    createJSON(opened.get_agg(), "./release/its_opened_"+project_name+".json")
+    createJSON({"opened":values["opened"]}, "./release/its_opened_"+project_name+".json")
     closed = its.Closed(dbcon, filters)
     createJSON(closed.get_agg(), "./release/its_closed_"+project_name+".json")
 
     dataset = {}
-    dataset["opened"] = opened.get_agg()["opened"]
+    dataset["opened"] = values["opened"]
     dataset["closed"] = closed.get_agg()["closed"]
 
     return dataset
 
 
-def scr_report(dbcon, filters):
+def scr_report(dbcon, filters, values):
     # Per release code review information
+    # values: submitted reviews of the release (release matrix)
     project_name = "general"
     project_name = project_name.replace(" ", "")
 
 
-    submitted = scr.Submitted(dbcon, filters)
-    createJSON(submitted.get_agg(), "./release/scr_submitted_"+project_name+".json")
+    createJSON({"submitted":values["submitted"]}, "./release/scr_submitted_"+project_name+".json")
 
     merged = scr.Merged(dbcon, filters)
     createJSON(merged.get_agg(), "./release/scr_merged.json_"+project_name+"")
@@ -327,7 +327,7 @@ def scr_report(dbcon, filters):
     waiting4submitter_median = float(data.data["median"]) / 86400.0
 
     dataset = {}
-    dataset["submitted"] = submitted.get_agg()["submitted"]
+    dataset["submitted"] = values["submitted"]
     dataset["merged"] = merged.get_agg()["merged"]
     dataset["abandoned"] = abandoned.get_agg()["abandoned"]
     dataset["bmiscr"] = round(bmi.get_agg()["bmiscr"], 2)
@@ -883,24 +883,46 @@ def general_info(opts, releases, people_out, affs_out):
     # TZ analysis
     timezone_analysis(opts)
 
-def releases_info(startdate, enddate, opts, people_out, affs_out):
+def releases_matrix(opts, releases, people_out, affs_out):
+    # Metrics for all the releases, with one query per metric.
+    # Metrics with the startdate in their conditions (merged, abandoned)
+    # are still computed per release.
+    from vizgrimoire.ITS import ITS
+    ITS.set_backend("jira")
+
+    scm_dbcon = SCMQuery(opts.dbuser, opts.dbpassword, opts.dbcvsanaly, opts.dbidentities)
+    its_dbcon = ITSQuery(opts.dbuser, opts.dbpassword, opts.dbbicho, opts.dbidentities)
+    scr_dbcon = SCRQuery(opts.dbuser, opts.dbpassword, opts.dbreview, opts.dbidentities)
+
+    filters = MetricFilters("month", None, None, None, opts.npeople, people_out, affs_out)
+    matrix = ReleaseMatrix(releases, filters)
+    data = {}
+    data.update(matrix.get_metric(scm.Commits, scm_dbcon))
+    data.update(matrix.get_metric(scm.Authors, scm_dbcon))
+    data.update(matrix.get_metric(its.Opened, its_dbcon))
+    data.update(matrix.get_metric(scr.Submitted, scr_dbcon))
+
+    return data
+
+def releases_info(startdate, enddate, opts, people_out, affs_out, values):
     # Releases information.
+    # values: metrics of the release (releases_matrix)
     data = {}
     filters = MetricFilters("month", startdate, enddate, None, opts.npeople,
                              people_out, affs_out)
     # SCM report
     scm_dbcon = SCMQuery(opts.dbuser, opts.dbpassword, opts.dbcvsanaly, opts.dbidentities)
-    dataset = scm_report(scm_dbcon, filters)
+    dataset = scm_report(scm_dbcon, filters, values)
     data["scm"] = dataset
 
     #ITS report
     its_dbcon = ITSQuery(opts.dbuser, opts.dbpassword, opts.dbbicho, opts.dbidentities)
-    dataset = its_report(its_dbcon, filters)
+    dataset = its_report(its_dbcon, filters, values)
     data["its"] = dataset
 
     #SCR Report
     scr_dbcon = SCRQuery(opts.dbuser, opts.dbpassword, opts.dbreview, opts.dbidentities)
-    dataset = scr_report(scr_dbcon, filters)
+    dataset = scr_report(scr_dbcon, filters, values)
     data["scr"] = dataset
 
     return data
@@ -1011,6 +1033,7 @@ if __name__ == '__main__':
     from vizgrimoire.metrics.metrics import Metrics
     from vizgrimoire.metrics.query_builder import DSQuery, SCMQuery, QAForumsQuery, MLSQuery, SCRQuery, ITSQuery, IRCQuery
     from vizgrimoire.metrics.metrics_filter import MetricFilters
+    from vizgrimoire.metrics.release_matrix import ReleaseMatrix
     import vizgrimoire.metrics.scm_metrics as scm
     import vizgrimoire.metrics.qaforums_metrics as qa
     import vizgrimoire.metrics.mls_metrics as mls
@@ -1031,6 +1054,10 @@ if __name__ == '__main__':
     people_out = ["OpenStack Jenkins","Launchpad Translations on behalf of nova-core","Jenkins","OpenStack Hudson","gerrit2@review.openstack.org","linuxdatacenter@gmail.com","Openstack Project Creator","Openstack Gerrit","openstackgerrit"]
     affs_out = ["-Bot","-Individual","-Unknown"]
 
+    # Metrics per release computed at once
+    print "Releases matrix"
+    matrix_data = releases_matrix(opts, releases, people_out, affs_out)
+
     releases_data = {}
     for release in releases:
         print "    Release: " + str(release[0]) + " - " + str(release[1])
@@ -1038,8 +1065,12 @@ if __name__ == '__main__':
 
         startdate = "'" + release[0] + "'"
         enddate = "'" + release[1] + "'"
+        release_pos = releases.index(release)
+        values = {}
+        for metric in matrix_data:
+            values[metric] = matrix_data[metric][release_pos]
         # Per release and project, an analysis is undertaken
-        releases_data[release] = releases_info(startdate, enddate, opts, people_out, affs_out)
+        releases_data[release] = releases_info(startdate, enddate, opts, people_out, affs_out, values)
 
     # Information is now stored in lists. Each list for each metric contains the values
     # of the releases analysis. Each entry in the list corresponds to the value of such 
@@ -33,6 +33,8 @@ from vizgrimoire.metrics.query_builder import DSQuery, SCMQuery, ITSQuery
 
 from vizgrimoire.metrics.metrics_filter import MetricFilters
 
+from vizgrimoire.metrics.release_matrix import ReleaseMatrix
+
 
 
 def read_options():
@@ -91,7 +93,7 @@ def read_options():
                       action="store",
                       dest="granularity",
                       default="months",
-                      help="year,months,weeks granularity")
+                      help="Comma separated granularities: days,weeks,months,quarters,year")
     parser.add_option("--npeople",
                       action="store",
                       dest="npeople",
@@ -135,6 +137,18 @@ def init_metrics():
         
     return available_metrics
 
+def build_periods(granularity):
+    # Periods of the time series for the granularity option
+    periods = {"days": "day", "weeks": "week", "months": "month",
+               "quarters": "quarter", "years": "year"}
+    return [periods.get(name, name) for name in granularity.split(",")]
+
+def get_database(opts, ds):
+    # Database of a data source from the command line options
+    databases = {"scm": opts.dbcvsanaly, "its": opts.dbbicho, "mls": opts.dbmlstats,
+                 "scr": opts.dbreview, "irc": opts.dbirc}
+    return databases[ds.get_name()]
+
 def build_releases(releases_dates):
     # Builds a list of tuples of dates that limit
     # each of the timeperiods to analyze
@@ -175,9 +189,17 @@ if __name__ == '__main__':
             metric_class = available_metrics[metric]
             ds = metric_class.data_source
             builder = ds.get_query_builder()
-            filters = MetricFilters("weeks", "'2010-01-01'", "'2014-01-01'", []) 
-            dbcon = builder("root", "", "dic_cvsanaly_openstack_2259", "dic_cvsanaly_openstack_2259")
+            startdate = "'" + releases[0][0] + "'"
+            enddate = "'" + releases[-1][1] + "'"
+            filters = MetricFilters("month", startdate, enddate, [], int(opts.npeople))
+            dbcon = builder(opts.dbuser, opts.dbpassword, get_database(opts, ds),
+                            opts.identities_db)
             metric_instance = metric_class(dbcon, filters)
             print metric_instance.get_agg()
+            # All the periods are rolled up from one daily query
+            print metric_instance.get_ts_periods(build_periods(opts.granularity))
+            # and the releases got with one query
+            matrix = ReleaseMatrix(releases, filters)
+            print matrix.get_metric(metric_class, dbcon)
 
 
@@ -36,6 +36,7 @@ def get_evol_report(startdate, enddate, identities_db):
 
 def create_evol_report(startdate, enddate, destdir, identities_db):
     for ds in get_enabled_data_sources():
+        set_step(ds.get_name())
         Report.connect_ds(ds)
         ds.create_evolutionary_report (period, startdate, enddate, destdir, identities_db)
 
@@ -49,6 +50,7 @@ def get_agg_report(startdate, enddate, identities_db):
 
 def create_agg_report(startdate, enddate, destdir, identities_db):
     for ds in get_enabled_data_sources():
+        set_step(ds.get_name())
         Report.connect_ds(ds)
         ds.create_agg_report (period, startdate, enddate, destdir, identities_db)
 
@@ -68,55 +70,77 @@ def get_top_report(startdate, enddate, npeople, identities_db, only_people=False
 
 def create_top_report(startdate, enddate, destdir, npeople, identities_db):
     for ds in get_enabled_data_sources():
+        set_step(ds.get_name())
         logging.info("Creating TOP for " + ds.get_name())
         Report.connect_ds(ds)
         ds.create_top_report (startdate, enddate, destdir, npeople, identities_db)
 
+def cube_on():
+    """ Filters metrics computed together in cube mode """
+    automator = Report.get_config()
+    return 'filters_cube' in automator['r'] and automator['r']['filters_cube'] == 'true'
+
+def init_sketches():
+    """ Distinct people sketches for the trends if sketches = true in [r]
+
+    sketches_precision: HyperLogLog precision (14 by default)
+    sketches_exact: metrics counted exactly (comma separated ids)
+    sketches_dir: the sketches saved there are loaded, so only the days
+    after them are read from the database
+    """
+    from vizgrimoire.metrics.sketches import SketchStore, open_store
+    automator = Report.get_config()
+    if 'sketches' not in automator['r'] or automator['r']['sketches'] != 'true':
+        return
+    precision = 14
+    if 'sketches_precision' in automator['r']:
+        precision = int(automator['r']['sketches_precision'])
+    exact = []
+    if 'sketches_exact' in automator['r']:
+        exact = automator['r']['sketches_exact'].split(",")
+    for ds in get_enabled_data_sources():
+        store = SketchStore(precision, exact)
+        if 'sketches_dir' in automator['r']:
+            path = os.path.join(automator['r']['sketches_dir'], ds.get_name()+"-sketches.json")
+            store = open_store(path, precision, exact)
+        ds.set_sketch_store(store)
+
+def save_sketches():
+    """ Save the sketches of each data source in sketches_dir, if configured """
+    automator = Report.get_config()
+    if 'sketches_dir' not in automator['r']: return
+    for ds in get_enabled_data_sources():
+        store = ds.get_sketch_store()
+        if store is None: continue
+        path = os.path.join(automator['r']['sketches_dir'], ds.get_name()+"-sketches.json")
+        logging.info("Saving sketches in " + path)
+        store.save(path)
+
 def create_reports_filters(period, startdate, enddate, destdir, npeople, identities_db):
     for ds in get_enabled_data_sources():
         Report.connect_ds(ds)
         logging.info("Creating filter reports for " + ds.get_name())
+        set_step(ds.get_name())
+        if cube_on() and ds.cube_supported():
+            # The filters processed in batches of items are not in the cube
+            cube_filters = [f for f in Report.get_filters()
+                            if f.get_name() in ds.get_group_by_filters() and
+                            ds.get_filter_batch_size(f) is None]
+            if len(cube_filters) > 0:
+                logging.info("Creating cube data for filters")
+                ds.prepare_filters_cube(cube_filters, period, startdate, enddate,
+                                        identities_db)
         for filter_ in Report.get_filters():
             logging.info("-> " + filter_.get_name())
-            # Tested in all this filters the group by
-            supported_all = {
-                         "scm":["people2","company","country","repository","domain","company+country","company+project"],
-                         "its":["people2","company","country","repository","domain","company+country","company+project"],
-                         "its_1":["people2"],
-                         "mls":["people2","company","country","repository","domain"],
-                         "scr":["people2","company","country","repository"],
-                         "mediawiki":["people2","company"],
-                         "irc":["people2"],
-                         "downloads":["people2"],
-                         "qaforums":["people2"],
-                         "releases":["people2"],
-                         "dockerhub":["people2"],
-                         "pullpo":["people2"],
-                         "eventizer":[]
-                         }
-            supported_on = {
-                         "scm":["people2","company","country","repository","domain","project","company+country","company+project"],
-                         "its":["people2","company","country","repository","domain","project","company+country","company+project"],
-                         "its_1":["people2"],
-                         "mls":["people2","company","country","repository","domain","project"],
-                         "scr":["people2","company","country","repository","project"],
-                         "mediawiki":["people2","company"],
-                         "irc":["people2"],
-                         "downloads":["people2"],
-                         "qaforums":["people2"],
-                         "releases":["people2"],
-                         "dockerhub":["people2"],
-                         "pullpo":["people2"],
-                         "eventizer":[]
-                         }
-
-            if filter_.get_name() in supported_on[ds.get_name()]:
-            # if filter_.get_name() in ["people2","company+country","repository","company"]:
-                logging.info("---> Using new filter API")
+            set_step(ds.get_name() + "-" + filter_.get_name())
+            if filter_.get_name() in ds.get_group_by_filters():
                 ds.create_filter_report_all(filter_, period, startdate, enddate,
                                             destdir, npeople, identities_db)
             else:
-                ds.create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db)
+                # No GROUP BY queries for the filter: item by item
+                ds.create_filter_report(filter_, period, startdate, enddate,
+                                        destdir, npeople, identities_db)
+        ds.clean_filters_cube()
 
 def create_report_people(startdate, enddate, destdir, npeople, identities_db, people_ids=None):
     for ds in get_enabled_data_sources():
@@ -247,6 +271,7 @@ def create_reports_studies(period, startdate, enddate, destdir):
         dbname = Report.get_config()['generic'][ds_dbname]
         dsquery = ds.get_query_builder()
         dbcon = dsquery(dbuser, dbpass, dbname, db_identities)
+        set_step(ds.get_name())
         # logging.info(ds.get_name() + " studies active " + str(studies))
         for study in studies:
             logging.info("Creating report for " + study.id + " for " + ds.get_name())
@@ -259,6 +284,100 @@ def create_reports_studies(period, startdate, enddate, destdir):
                 traceback.print_exc(file=sys.stdout)
                 continue
 
+def ensure_indexes():
+    """ Create the missing indexes of the data sources catalogs
+
+    The EXPLAIN of all the queries of the report is checked after it to
+    report the queries still doing full table scans.
+    """
+    from vizgrimoire.metrics.indexes import ScanReport
+    from vizgrimoire.metrics.query_builder import DSQuery
+
+    db_identities= Report.get_config()['generic']['db_identities']
+    dbuser = Report.get_config()['generic']['db_user']
+    dbpass = Report.get_config()['generic']['db_password']
+
+    for ds in get_enabled_data_sources():
+        dbname = Report.get_config()['generic'][ds.get_db_name()]
+        dsquery = ds.get_query_builder()
+        dbcon = dsquery(dbuser, dbpass, dbname, db_identities)
+        created = dbcon.ensure_indexes()
+        logging.info(str(len(created)) + " indexes created for " + ds.get_name())
+
+    DSQuery.scan_report = ScanReport()
+
+def ensure_date_keys():
+    """ Create the derived date keys and email domain columns and refresh them """
+    db_identities= Report.get_config()['generic']['db_identities']
+    dbuser = Report.get_config()['generic']['db_user']
+    dbpass = Report.get_config()['generic']['db_password']
+
+    for ds in get_enabled_data_sources():
+        dbname = Report.get_config()['generic'][ds.get_db_name()]
+        dsquery = ds.get_query_builder()
+        dbcon = dsquery(dbuser, dbpass, dbname, db_identities)
+        created = dbcon.ensure_date_keys()
+        logging.info(str(len(created)) + " derived columns created for " + ds.get_name())
+
+def init_query_profile(explain_time):
+    from vizgrimoire.metrics.query_builder import DSQuery
+    from vizgrimoire.metrics.query_profile import QueryProfile
+    DSQuery.query_profile = QueryProfile(explain_time)
+
+# Phase of the report and profiler of the python steps (--profile)
+current_phase = None
+phase_profiler = None
+
+def init_phase_profiler(destdir, memory):
+    from vizgrimoire.metrics.phase_profile import PhaseProfiler
+    global phase_profiler
+    phase_profiler = PhaseProfiler(destdir, memory)
+
+def set_phase(phase, step = None):
+    """ Phase (and data source, filter step) of the report for the profiles """
+    from vizgrimoire.metrics.query_builder import DSQuery
+    global current_phase
+    current_phase = phase
+    if DSQuery.query_profile is not None: DSQuery.query_profile.set_phase(phase)
+    if phase_profiler is not None: phase_profiler.start_step(phase, step)
+
+def set_step(step):
+    """ Step (data source, filter) inside the current phase """
+    set_phase(current_phase, step)
+
+def save_query_profile(path):
+    from vizgrimoire.metrics.query_builder import DSQuery
+    if DSQuery.query_profile is None: return
+    DSQuery.query_profile.log()
+    DSQuery.query_profile.save(path)
+
+def init_bundle(destdir):
+    import vizgrimoire.GrimoireUtils as GrimoireUtils
+    from vizgrimoire.metrics.bundle import BundleWriter
+    GrimoireUtils.json_bundle = BundleWriter(destdir)
+
+def save_bundle():
+    import vizgrimoire.GrimoireUtils as GrimoireUtils
+    if GrimoireUtils.json_bundle is None: return
+    GrimoireUtils.json_bundle.close()
+    GrimoireUtils.json_bundle = None
+
+def init_output(destdir, force):
+    import vizgrimoire.GrimoireUtils as GrimoireUtils
+    from vizgrimoire.metrics.output import OutputManager
+    GrimoireUtils.output_manager = OutputManager(destdir, force)
+
+def save_output():
+    """ Save the manifest of the JSON files written """
+    import vizgrimoire.GrimoireUtils as GrimoireUtils
+    if GrimoireUtils.output_manager is None: return
+    GrimoireUtils.output_manager.close()
+    GrimoireUtils.output_manager = None
+
+def report_full_scans():
+    from vizgrimoire.metrics.query_builder import DSQuery
+    if DSQuery.scan_report is not None: DSQuery.scan_report.log()
+
 def create_events(startdate, enddate, destdir):
     for ds in get_enabled_data_sources():
         if ds.get_name() != "scm": continue
@@ -305,29 +424,23 @@ def set_filter(filter_name, item = None):
         sys.exit(1)
 
 def set_metric(metric_name, ds_name):
-    metric_ok = False
     DS = set_data_source(ds_name)
 
-    metrics = DS.get_metrics_set(DS)
-    for metric in metrics:
-        if metric.id == metric_name:
-            metric_ok = True
-            DS.set_metrics_set(DS, [metric])
-            logging.info("[metric] " + metric.name + " configured")
-    if not metric_ok:
+    # Only the metric used is created
+    metric = DS.get_metrics(metric_name, DS)
+    if metric is not None:
+        DS.set_metrics_set(DS, [metric])
+        logging.info("[metric] " + metric.name + " configured")
+    else:
         logging.error(metric_name + " metric not available in " + DS.get_name())
         sys.exit(1)
 
 def set_study(study_id):
-    study_ok = False
-
-    studies = Report.get_studies()
-
-    for study in studies:
-        if study.id == study_id:
-            study_ok = True
-            Report.set_studies([study])
-    if not study_ok:
+    # Only the study used is imported
+    study = Report.get_study_by_id(study_id)
+    if study is not None:
+        Report.set_studies([study])
+    else:
         logging.error(study_id + " study not available ")
         sys.exit(1)
 
@@ -387,29 +500,63 @@ if __name__ == '__main__':
         set_metric(opts.metric, opts.data_source)
     if (opts.study):
         set_study(opts.study)
+    init_output(opts.destdir, opts.force_write)
     if (opts.events):
         create_events(startdate, enddate, opts.destdir)
+        save_output()
         logging.info("Events generated OK")
         sys.exit(0)
 
+    if opts.profile_queries:
+        init_query_profile(opts.explain_slow)
+    if opts.profile:
+        init_phase_profiler(opts.profile, opts.profile_memory)
+    if opts.bundle:
+        init_bundle(opts.destdir)
+
+    if opts.ensure_indexes:
+        set_phase("indexes")
+        ensure_indexes()
+    if opts.date_keys:
+        set_phase("date_keys")
+        ensure_date_keys()
+
+    init_sketches()
+
     if not opts.filter and not opts.study:
         logging.info("Creating global evolution metrics...")
+        set_phase("evol")
         evol = create_evol_report(startdate, enddate, opts.destdir, identities_db)
         logging.info("Creating global aggregated metrics...")
+        set_phase("agg")
         agg = create_agg_report(startdate, enddate, opts.destdir, identities_db)
         if not opts.metric:
+            set_phase("people")
             people_ids = create_people_identifiers(startdate, enddate, opts.destdir, opts.npeople, identities_db)
 
             logging.info("Creating global top metrics...")
+            set_phase("top")
             top = create_top_report(startdate, enddate, opts.destdir, opts.npeople, identities_db)
+            set_phase("people")
             if (automator['r']['reports'].find('people')>-1):
                 create_report_people(startdate, enddate, opts.destdir, opts.npeople, identities_db, people_ids)
             # create_reports_r(end_date, opts.destdir)
             create_top_people_report(startdate, enddate, opts.destdir, identities_db)
 
     if not opts.study and not opts.no_filters and not opts.metric:
+        set_phase("filters")
         create_reports_filters(period, startdate, enddate, opts.destdir, opts.npeople, identities_db)
     if not opts.filter and not opts.metric and not opts.item:
+        set_phase("studies")
         create_reports_studies(period, startdate, enddate, opts.destdir)
 
+    save_sketches()
+    save_bundle()
+    save_output()
+    report_full_scans()
+    if opts.profile_queries:
+        save_query_profile(opts.profile_queries)
+    if phase_profiler is not None:
+        phase_profiler.save()
+
     logging.info("Report data source analysis OK")
@@ -117,6 +117,39 @@ def read_options():
                       action="store_true",
                       dest="events",
                       help="Generate events.")
+    parser.add_option("--ensure-indexes",
+                      action="store_true",
+                      dest="ensure_indexes",
+                      help="Create the missing indexes and report queries doing full scans.")
+    parser.add_option("--date-keys",
+                      action="store_true",
+                      dest="date_keys",
+                      help="Create and refresh the derived date keys and email domain columns.")
+    parser.add_option("--profile-queries",
+                      action="store",
+                      dest="profile_queries",
+                      help="Save the queries profile in PROFILE_QUERIES.json and .csv")
+    parser.add_option("--profile",
+                      action="store",
+                      dest="profile",
+                      help="Save the cProfile stats (pstats) of each report step in PROFILE dir")
+    parser.add_option("--profile-memory",
+                      action="store_true",
+                      dest="profile_memory",
+                      help="Add top allocation sites per step to the profile (needs tracemalloc)")
+    parser.add_option("--bundle",
+                      action="store_true",
+                      dest="bundle",
+                      help="Write the JSON files in a sharded bundle in DESTDIR/bundle")
+    parser.add_option("--force-write",
+                      action="store_true",
+                      dest="force_write",
+                      help="Write all the JSON files, also the ones not changed from the last run")
+    parser.add_option("--explain-slow",
+                      action="store",
+                      dest="explain_slow",
+                      type="float",
+                      help="EXPLAIN the profiled queries slower than EXPLAIN_SLOW seconds")
 
     (opts, args) = parser.parse_args()
 
@@ -132,4 +165,8 @@ def read_options():
         parser.error("--metric need also --data-source.")
     if opts.item and opts.filter is None:
         parser.error("--item need also --filter.")
+    if opts.explain_slow is not None and opts.profile_queries is None:
+        parser.error("--explain-slow need also --profile-queries.")
+    if opts.profile_memory and opts.profile is None:
+        parser.error("--profile-memory need also --profile.")
     return opts
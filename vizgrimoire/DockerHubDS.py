@@ -87,11 +87,6 @@ class DockerHubDS(DataSource):
         filename = DockerHubDS().get_agg_filename()
         createJSON (data, os.path.join(destdir, filename))
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        filter_name = filter_.get_name()
-        logging.error(DockerHubDS.get_name()+ " " + filter_name +" does not support yet group by items sql queries")
-
     @staticmethod
     def get_top_metrics ():
         return ["pulls"]
@@ -127,14 +122,6 @@ class DockerHubDS(DataSource):
         logging.error("DockerHubDS " + filter_name + " not supported")
         return items
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = DockerHubDS.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
         pass
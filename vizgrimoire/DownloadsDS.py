@@ -123,11 +123,6 @@ class DownloadsDS(DataSource):
         filename = DownloadsDS().get_agg_filename()
         createJSON (data, os.path.join(destdir, filename))
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        filter_name = filter_.get_name()
-        logging.error(DownloadsDS.get_name()+ " " + filter_name +" does not support yet group by items sql queries")
-
     @staticmethod
     def get_top_metrics ():
         return ["packages", "pages", "countries"]
@@ -170,14 +165,6 @@ class DownloadsDS(DataSource):
         logging.error("DownloadsDS " + filter_name + " not supported")
         return items
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = DownloadsDS.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
         pass
@@ -194,6 +181,11 @@ class DownloadsDS(DataSource):
     def create_r_reports(vizr, enddate, destdir):
         pass
 
+    @staticmethod
+    def cube_supported():
+        """ Data is not computed with DataSource.get_metrics_data """
+        return False
+
     @staticmethod
     def get_query_builder ():
         from vizgrimoire.metrics.query_builder import DownloadsDSQuery
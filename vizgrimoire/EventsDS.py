@@ -145,56 +145,13 @@ class EventsDS(DataSource):
                 fn = os.path.join(destdir, filter_item.get_top_filename(EventsDS()))
                 createJSON(top_authors, fn)
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = EventsDS.get_filter_items(filter_, startdate, enddate, identities_db)
-        if (items == None): return
-
-        filter_name = filter_.get_name()
-        items = items['name']
-
-        if not isinstance(items, list):
-            items = [items]
-
-        file_items = []
-        for item in items:
-            if re.compile("^\..*").match(item) is not None: item = "_"+item
-            file_items.append(item)
-
-        fn = os.path.join(destdir, filter_.get_filename(EventsDS()))
-        createJSON(file_items, fn)
-
-        if filter_name in ("repository"):
-            items_list = {'name' : [], 'events_365' : [], 'rsvps_365' : []}
-        else:
-            items_list = items
-
-        for item in items:
-            logging.info(item)
-            filter_item = Filter(filter_.get_name(), item)
-
-            evol_data = EventsDS.get_evolutionary_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(EventsDS()))
-            createJSON(completePeriodIds(evol_data, period, startdate, enddate), fn)
-
-            agg = EventsDS.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(EventsDS()))
-            createJSON(agg, fn)
-
-            if filter_name in ("repository"):
-                items_list['name'].append(item.replace('/', '_'))
-                items_list['events_365'].append(agg['events_365'])
-                items_list['rsvps_365'].append(agg['rsvps_365'])
-
+    @classmethod
+    def create_filter_report_all(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
+        super(EventsDS, cls).create_filter_report_all(filter_, period, startdate, enddate,
+                                                      destdir, npeople, identities_db)
+        # top by filter, not supported by group all queries
         EventsDS.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
 
-        fn = os.path.join(destdir, filter_.get_filename(EventsDS()))
-        createJSON(items_list, fn)
-
-
     @staticmethod
     def get_top_metrics ():
         return ["rsvps","groups"]
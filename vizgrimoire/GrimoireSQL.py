@@ -23,7 +23,7 @@
 
 import MySQLdb
 import logging
-import re, sys
+import re, sys, time
 from vizgrimoire.metrics.query_builder import DSQuery
 
 
@@ -88,6 +88,15 @@ def SetDBChannel (user=None, password=None, database=None,
     cursor.execute("SET NAMES 'utf8'")
 
 def ExecuteQuery (sql):
+    profile = DSQuery.query_profile
+    if profile is None: return _ExecuteQuery(sql)
+    start = time.time()
+    result = _ExecuteQuery(sql)
+    profile.add(sql, time.time() - start, result,
+                lambda sql: DSQuery.get_explain(cursor, sql))
+    return result
+
+def _ExecuteQuery (sql):
     result = {}
     cursor.execute(sql)
     rows = cursor.rowcount
@@ -146,6 +146,40 @@ def completePeriodIdsMonths(ts_data, start, end):
 
     return new_ts_data
 
+def completePeriodIdsQuarters(ts_data, start, end):
+    data_vars = ts_data.keys()
+    new_ts_data =  createTimeSeries(ts_data)
+    checkListArray(ts_data)
+
+    # Quarter id: year*4 + (month-1)/3, as in the roll up of daily series
+    start_quarter = start.year*4 + (start.month-1)/3
+    end_quarter = end.year*4 + (end.month-1)/3
+    quarters = end_quarter - start_quarter
+
+    # All data is from the complete quarter
+    start = datetime(start.year, ((start.month-1)/3)*3+1, 1)
+
+    for i in range(0, quarters+1):
+        if (start_quarter+i in ts_data['quarter']) is False:
+            # Add new time point with all vars to zero
+            for key in (data_vars):
+                new_ts_data[key].append(0)
+            new_ts_data['quarter'].pop()
+            new_ts_data['quarter'].append(start_quarter+i)
+        else:
+            # Add already existing data for the time point
+            index = ts_data['quarter'].index(start_quarter+i)
+            for key in (data_vars):
+                new_ts_data[key].append(ts_data[key][index])
+
+        current =  start + relativedelta(months=3*i)
+        timestamp = calendar.timegm(current.timetuple())
+        new_ts_data['unixtime'].append(unicode(timestamp))
+        new_ts_data['id'].append(i)
+        new_ts_data['date'].append(datetime.strftime(current, "%b %Y"))
+
+    return new_ts_data
+
 def date2Week(date):
     # isocalendar: year weeknumber weekday
     week   = str(date.isocalendar()[0])
@@ -207,6 +241,8 @@ def completePeriodIds(ts_data, period, startdate, enddate):
         new_ts_data = completePeriodIdsWeeks(ts_data, start, end)
     elif period == "month":
         new_ts_data = completePeriodIdsMonths(ts_data, start, end)
+    elif period == "quarter":
+        new_ts_data = completePeriodIdsQuarters(ts_data, start, end)
     elif period == "year":
         new_ts_data = completePeriodIdsYears(ts_data, start, end)
 
@@ -341,6 +377,24 @@ def convertCombinedFiltersName(data):
             break
     return data
 
+# BundleWriter (metrics/bundle.py) in which createJSON adds the JSON
+# documents instead of writing them in files (report_tool --bundle)
+json_bundle = None
+# OutputManager (metrics/output.py) writing the files only if changed
+output_manager = None
+
+def write_json_file(json_data, filepath):
+    """ Write a JSON document in the bundle, with the output manager or as is """
+    if isinstance(json_data, unicode): json_data = json_data.encode('utf-8')
+    if json_bundle is not None and json_bundle.add(filepath, json_data):
+        return
+    if output_manager is not None:
+        output_manager.write(filepath, json_data)
+        return
+    jsonfile = open(filepath, 'w')
+    jsonfile.write(json_data)
+    jsonfile.close()
+
 # Until we use VizPy we will create JSON python files with _py
 def createJSON(data, filepath, check=False, skip_fields = []):
     check = False # for production mode
@@ -353,9 +407,7 @@ def createJSON(data, filepath, check=False, skip_fields = []):
     json_data = json.dumps(checked_data, sort_keys=True)
     json_data = json_data.replace('NaN','"NA"')
     if check == False: #forget about R JSON checking
-        jsonfile = open(filepath, 'w')
-        jsonfile.write(json_data)
-        jsonfile.close()
+        write_json_file(json_data, filepath)
         return
 
     # NA as value is not decoded with Python JSON
@@ -516,9 +568,10 @@ def read_main_conf(config_file):
 def get_subprojects(project, projects_db, dsquery = None):
     """ Return all subprojects ids for a project in a string join by comma """
 
+    if dsquery is not None: return dsquery.get_subprojects(project)
+
     from vizgrimoire.GrimoireSQL import ExecuteQuery
     query = ExecuteQuery
-    if dsquery is not None: query = dsquery.ExecuteQuery
 
     q = "SELECT project_id from %s.projects WHERE id='%s'" % (projects_db, project)
     project_id = query(q)['project_id']
@@ -708,8 +761,7 @@ def order_items(items, data, id_field, evol = False, period = None):
 def fill_and_order_items(items, data, id_field, evol = False,
                          period = None, startdate = None, enddate = None):
     # Only items will appear for a filter
-    if not evol: # evol is already filled (complete data) for a company, but not all organizations
-        data = fill_items(items, data, id_field)
-    if evol: data = fill_items(items, data, id_field,
-                               evol, period, startdate, enddate)
-    return order_items(items, data, id_field, evol, period)
+    from vizgrimoire.metrics.frame import ReportFrame
+    frame = ReportFrame(items)
+    frame.add_items(data, id_field, evol, period, startdate, enddate)
+    return frame.to_dict()
@@ -120,55 +120,13 @@ class IRC(DataSource):
             metric = DataSource.get_metrics("senders", IRC)
             items = metric.get_list()
             items['name'] = items.pop('senders')
+        elif (filter_name == "company"):
+            metric = DataSource.get_metrics("organizations", IRC)
+            items = metric.get_list()
         else:
             logging.error("IRC " + filter_name + " not supported")
         return items
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = IRC.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        fn = os.path.join(destdir, filter_.get_filename(IRC()))
-        createJSON(items, fn)
-
-        for item in items :
-            # item_name = "'"+ item+ "'"
-            logging.info (item)
-
-            filter_item = Filter(filter_.get_name(), item)
-
-            evol_data = IRC.get_evolutionary_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(IRC()))
-            createJSON(completePeriodIds(evol_data, period, startdate, enddate), fn)
-
-            agg = IRC.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(IRC()))
-            createJSON(agg, fn)
-
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        filter_name = filter_.get_name()
-        if filter_name == "people2" or filter_name == "company_off":
-            filter_all = Filter(filter_name, None)
-            agg_all = IRC.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(IRC()))
-            createJSON(agg_all, fn)
-
-            evol_all = IRC.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(IRC()))
-            createJSON(evol_all, fn)
-        else:
-            logging.error(IRC.get_name()+ " " + filter_name +" does not support yet group by items sql queries")
-
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
         top_data = IRC.get_top_data (startdate, enddate, identities_db, None, npeople)
@@ -81,6 +81,12 @@ class ITS(DataSource):
         # print cls
         return cls._get_backend().closed_condition
 
+    @classmethod
+    def refresh_run_tables(cls, dbcon, type_analysis, people_out):
+        """ Refresh the per run tables, with the issues timeline """
+        super(ITS, cls).refresh_run_tables(dbcon, type_analysis, people_out)
+        dbcon.GetIssuesTimeline(cls._get_closed_condition())
+
     @classmethod
     def get_evolutionary_data (cls, period, startdate, enddate, identities_db, filter_ = None):
         closed_condition = cls._get_closed_condition()
@@ -237,67 +243,6 @@ class ITS(DataSource):
             summary =  GetClosedSummaryCompanies(period, startdate, enddate, identities_db, closed_condition, limit)
         return summary
 
-    @classmethod
-    def create_filter_report(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = cls.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-            items = items['name']
-
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        fn = os.path.join(destdir, filter_.get_filename(cls()))
-        createJSON(items, fn)
-
-        if filter_name in ("domain", "company", "repository"):
-            items_list = {'name' : [], 'closed_365' : [], 'closers_365' : []}
-        else:
-            items_list = items
-
-        for item in items :
-            item_name = "'"+ item+ "'"
-            logging.info (item_name)
-            filter_item = Filter(filter_name, item)
-
-            evol_data = cls.get_evolutionary_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(cls()))
-            createJSON(evol_data, fn)
-
-            agg = cls.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(cls()))
-            createJSON(agg, fn)
-
-            if filter_name in ["domain", "company", "repository"]:
-                items_list['name'].append(item.replace('/', '_'))
-                items_list['closed_365'].append(agg['closed_365'])
-                items_list['closers_365'].append(agg['closers_365'])
-
-            if filter_name in ["company","domain","repository"]:
-                top = cls.get_top_data(startdate, enddate, identities_db, filter_item, npeople)
-                fn = os.path.join(destdir, filter_item.get_top_filename(cls()))
-                createJSON(top, fn)
-
-        fn = os.path.join(destdir, filter_.get_filename(cls()))
-        createJSON(items_list, fn)
-
-        if (filter_name == "company"):
-            ds = ITS
-            #summary = cls.get_filter_summary(
-            #    filter_, period, startdate, enddate,
-            #    identities_db, 10
-            #    )
-            #createJSON (summary,
-            #            destdir + "/" + filter_.get_summary_filename(cls))
-
-            # Perform ages study, if it is specified in Report
-            cls.ages_study_com (items, period, startdate, enddate, destdir)
-
-
     @staticmethod
     def _check_report_all_data(data, filter_, startdate, enddate, idb,
                                evol = False, period = None):
@@ -305,35 +250,14 @@ class ITS(DataSource):
 
     @classmethod
     def create_filter_report_all(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        check = False # activate to debug issues
-        filter_name = filter_.get_name()
+        data_all = super(ITS, cls).create_filter_report_all(filter_, period, startdate, enddate,
+                                                            destdir, npeople, identities_db)
+        if data_all is None: return
+        agg_all = data_all[0]
 
-        # Change filter to GrimoireLib notation
-        filter_name = filter_name.replace("+", MetricFilters.DELIMITER)
-
-        if filter_name in ["people2","company", "country","repository","domain","project",
-                           "company"+MetricFilters.DELIMITER+"country",
-                           "company"+MetricFilters.DELIMITER+"project"] :
-            filter_all = Filter(filter_name, None)
-            agg_all = cls.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(cls()))
-            createJSON(agg_all, fn)
-            ITS.convert_all_to_single(agg_all, filter_, destdir, False, period)
-
-            evol_all = cls.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(cls()))
-            createJSON(evol_all, fn)
-            ITS.convert_all_to_single(evol_all, filter_, destdir, True, period)
-
-            if check:
-                cls._check_report_all_data(evol_all, filter_, startdate, enddate,
-                                           identities_db, True, period)
-                cls._check_report_all_data(agg_all, filter_, startdate, enddate,
-                                           identities_db, False, period)
-        else:
-            logging.error(filter_name +" does not support yet group by items sql queries")
+        if (filter_.get_name() == "company"):
+            # Perform ages study, if it is specified in Report
+            cls.ages_study_com (agg_all['name'], period, startdate, enddate, destdir)
 
     @classmethod
     def get_top_people(cls, startdate, enddate, identities_db, npeople):
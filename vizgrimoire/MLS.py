@@ -208,69 +208,6 @@ class MLS(DataSource):
             summary =  GetSentSummaryCompanies(period, startdate, enddate, identities_db, limit, projects_db)
         return summary
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = MLS.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-            items = items['name']
-
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        items_files = [item.replace('/', '_').replace("<","__").replace(">","___")
-            for item in items]
-
-        fn = os.path.join(destdir, filter_.get_filename(MLS()))
-        createJSON(items_files, fn)
-
-        if filter_name in ("domain", "company", "repository"):
-            items_list = {'name' : [], 'sent_365' : [], 'senders_365' : []}
-        else:
-            items_list = items
-
-        for item in items :
-            item = item.replace("'", "\\'")
-            item_name = "'"+ item+ "'"
-            logging.info (item_name)
-            filter_item = Filter(filter_.get_name(), item)
-
-            evol_data = MLS.get_evolutionary_data(period, startdate, enddate, 
-                                                  identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(MLS()))
-            createJSON(evol_data, fn)
-
-            agg = MLS.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(MLS()))
-            createJSON(agg, fn)
-
-            if filter_name in ("domain", "company", "repository"):
-                items_list['name'].append(item.replace('/', '_').replace("<","__").replace(">","___"))
-                items_list['sent_365'].append(agg['sent_365'])
-                items_list['senders_365'].append(agg['senders_365'])
-
-            top_senders = MLS.get_top_data(startdate, enddate, identities_db, filter_item, npeople, False)
-            createJSON(top_senders, destdir+"/"+filter_item.get_top_filename(MLS()))
-
-        fn = os.path.join(destdir, filter_.get_filename(MLS()))
-        createJSON(items_list, fn)
-
-        if (filter_name == "company"):
-            ds = MLS
-            if False:
-                summary = MLS.get_filter_summary(
-                    filter_, period, startdate, enddate,
-                    identities_db, 10, self.db.projects_db
-                    )
-                createJSON (summary,
-                            destdir + "/" + filter_.get_summary_filename(MLS))
-            # Perform ages study, if it is specified in Report
-            MLS.ages_study_com (items, period, startdate, enddate, destdir)
-
     @staticmethod
     def _check_report_all_data(data, filter_, startdate, enddate, idb,
                                evol = False, period = None):
@@ -300,35 +237,19 @@ class MLS(DataSource):
             createJSON(top_senders, destdir+"/"+filter_item.get_top_filename(MLS()))
 
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        check = False # activate to debug issues
-        filter_name = filter_.get_name()
-
+    @classmethod
+    def create_filter_report_all(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
         # top by filter, not supported by group all queries
         MLS.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
 
-        if filter_name in ["people2","company","repository","country","domain","project"] :
-            filter_all = Filter(filter_name, None)
-            agg_all = MLS.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(MLS()))
-            createJSON(agg_all, fn)
-            MLS.convert_all_to_single(agg_all, filter_, destdir, False, period)
-
-            evol_all = MLS.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(MLS()))
-            createJSON(evol_all, fn)
-            MLS.convert_all_to_single(evol_all, filter_, destdir, True, period)
-
-            if check:
-                MLS._check_report_all_data(evol_all, filter_, startdate, enddate,
-                                           identities_db, True, period)
-                MLS._check_report_all_data(agg_all, filter_, startdate, enddate,
-                                           identities_db, False, period)
-        else:
-            logging.error(filter_name +" does not support yet group by items sql queries")
+        data_all = super(MLS, cls).create_filter_report_all(filter_, period, startdate, enddate,
+                                                            destdir, npeople, identities_db)
+        if data_all is None: return
+        agg_all = data_all[0]
+
+        if (filter_.get_name() == "company"):
+            # Perform ages study, if it is specified in Report
+            MLS.ages_study_com (agg_all['name'], period, startdate, enddate, destdir)
 
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
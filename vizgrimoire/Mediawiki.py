@@ -133,37 +133,15 @@ class Mediawiki(DataSource):
             metric = DataSource.get_metrics("authors", Mediawiki)
             items = metric.get_list()
             items['name'] = items.pop('authors')
+        elif (filter_name == "company"):
+            metric = DataSource.get_metrics("organizations", Mediawiki)
+            items = metric.get_list()
         else:
             logging.error("Mediawiki " + filter_name + " not supported")
             return items
 
         return items
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = Mediawiki.get_filter_items(filter_, startdate, enddate, identities_db)
-        if (items == None): return
-
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        filter_name = filter_.get_name()
-        if filter_name == "people2" or filter_name == "company":
-            filter_all = Filter(filter_name, None)
-            agg_all = Mediawiki.get_agg_data(period, startdate, enddate,
-                                             identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(Mediawiki()))
-            createJSON(agg_all, fn)
-
-            evol_all = Mediawiki.get_evolutionary_data(period, startdate, enddate,
-                                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(Mediawiki()))
-            createJSON(evol_all, fn)
-        else:
-            logging.error(Mediawiki.get_name()+ " " + filter_name +" does not support yet group by items sql queries")
-
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
 
@@ -189,81 +189,11 @@ class Pullpo(DataSource):
         items = metric.get_list()
         return items
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = Pullpo.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-            items = items['name']
-
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        # For repos aggregated data. Include metrics to sort in javascript.
-
-        items_list = {"name":[],"review_time_days_median":[],"submitted":[]}
-
-        for item in items :
-            item_file = item.replace("/","_")
-            items_list["name"].append(item_file)
-
-            logging.info (item)
-            filter_item = Filter(filter_name, item)
-
-            evol = Pullpo.get_evolutionary_data(period, startdate, enddate, 
-                                               identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(Pullpo()))
-            createJSON(evol, fn)
-
-            # Static
-            agg = Pullpo.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(Pullpo()))
-            createJSON(agg, fn)
-            if 'submitted' in agg:
-                items_list["submitted"].append(agg["submitted"])
-            else: items_list["submitted"].append("NA")
-            if 'review_time_days_median' in agg:
-                items_list["review_time_days_median"].append(agg['review_time_days_median'])
-            else: items_list["review_time_days_median"].append("NA")
-
-        fn = os.path.join(destdir, filter_.get_filename(Pullpo()))
-        createJSON(items_list, fn)
-
     @staticmethod
     def _check_report_all_data(data, filter_, startdate, enddate, idb,
                                evol = False, period = None):
         pass
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        check = False # activate to debug pull_requests
-        filter_name = filter_.get_name()
-
-        if filter_name == "people2" or filter_name == "company+country":
-            filter_all = Filter(filter_name, None)
-            agg_all = Pullpo.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(Pullpo()))
-            createJSON(agg_all, fn)
-
-            evol_all = Pullpo.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(Pullpo()))
-            createJSON(evol_all, fn)
-
-            if check:
-                Pullpo._check_report_all_data(evol_all, filter_, startdate, enddate,
-                                           identities_db, True, period)
-                Pullpo._check_report_all_data(agg_all, filter_, startdate, enddate,
-                                           identities_db, False, period)
-        else:
-            logging.error(filter_name +" does not support yet group by items sql queries")
-
-
     # Unify top format
     @staticmethod
     def _safeTopIds(top_data_period):
@@ -148,7 +148,7 @@ class QAForums(DataSource):
             metric = DataSource.get_metrics("tags", QAForums)
             # items = QAForums.tags_name(startdate, enddate)
             items = metric.get_list()
-        if (filter_name == "people2"):
+        elif (filter_name == "people2"):
             metric = DataSource.get_metrics("participants", QAForums)
             items = metric.get_list()
         else:
@@ -164,58 +164,6 @@ class QAForums(DataSource):
     def create_r_reports(vizr, enddate, destdir):
         return []
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items =  QAForums.get_filter_items(filter_, startdate, enddate, identities_db)
-            if items == None:
-                return
-            items = items['name']
-  
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, list):
-            items = [items]
-
-        file_items = []
-        for item in items:
-            if re.compile("^\..*").match(item) is not None: item = "_"+item
-            file_items.append(item)
-
-        fn = os.path.join(destdir, filter_.get_filename(QAForums()))
-        createJSON(file_items, fn)
-        for item in items:
-            logging.info(item)
-            filter_item = Filter(filter_.get_name(), item)
-
-            evol_data = QAForums.get_evolutionary_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(QAForums()))
-            createJSON(completePeriodIds(evol_data, period, startdate, enddate), fn)
-
-            agg = QAForums.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(QAForums()))
-            createJSON(agg, fn)
-
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        filter_name = filter_.get_name()
-        if filter_name == "people2" or filter_name == "company_off":
-            filter_all = Filter(filter_name, None)
-            agg_all = QAForums.get_agg_data(period, startdate, enddate,
-                                            identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(QAForums()))
-            createJSON(agg_all, fn)
-
-            evol_all = QAForums.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(QAForums()))
-            createJSON(evol_all, fn)
-        else:
-            logging.error(QAForums.get_name()+ " " + filter_name +" does not support yet group by items sql queries")
-
-
     @staticmethod
     def get_query_builder ():
         from vizgrimoire.metrics.query_builder import QAForumsQuery
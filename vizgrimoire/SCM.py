@@ -262,48 +262,6 @@ class SCM(DataSource):
                 fn = os.path.join(destdir, filter_item.get_top_filename(SCM()))
                 createJSON(top_authors, fn)
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = SCM.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-            items = items['name']
-
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        fn = os.path.join(destdir, filter_.get_filename(SCM()))
-        escaped_items = [i.replace('/','_') for i in items]
-        logging.info("D1")
-        createJSON(escaped_items, fn)
-
-        for item in items :
-            item_name = "'"+ item+ "'"
-            logging.info (item_name)
-            filter_item = Filter(filter_name, item)
-
-            evol_data = SCM.get_evolutionary_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(SCM()))
-            createJSON(evol_data, fn)
-
-            agg = SCM.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(SCM()))
-            createJSON(agg, fn)
-
-        SCM.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
-
-        if (filter_name == "company"):
-            ds = SCM
-            #summary =  SCM.get_filter_summary(filter_, period, startdate, enddate, identities_db, 10)
-            #createJSON (summary, destdir+"/"+ filter_.get_summary_filename(SCM))
-            # Perform ages study, if it is specified in Report
-            SCM.ages_study_com (items, period, startdate, enddate, destdir)
-
-
     @staticmethod
     def _check_report_all_data(data, filter_, startdate, enddate, idb,
                                evol = False, period = None):
@@ -341,51 +299,20 @@ class SCM(DataSource):
                                                    idb , filter_item)
                 assert ts['commits'] == data['commits'][pos]
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        # New API for getting all metrics with one query
-        check = False # activate to debug issues
-        filter_name = filter_.get_name()
-
-        # Change filter to GrimoireLib notation
-        filter_name = filter_name.replace("+", MetricFilters.DELIMITER)
-    
+    @classmethod
+    def create_filter_report_all(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
         # This report is created per item, not using GROUP BY yet
         SCM.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
 
-        # Filters metrics computed using GROUP BY queries
-        if filter_name in ["people2","company", "country","repository","domain","project",
-                           "company"+MetricFilters.DELIMITER+"country",
-                           "company"+MetricFilters.DELIMITER+"project"]:
-            filter_all = Filter(filter_name, None)
-            agg_all = SCM.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(SCM()))
-            createJSON(agg_all, fn)
-            SCM.convert_all_to_single(agg_all, filter_, destdir, False, period)
-
-            evol_all = SCM.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(SCM()))
-            createJSON(evol_all, fn)
-            SCM.convert_all_to_single(evol_all, filter_, destdir, True, period)
-
-            # Studies report for filters
-            if (filter_name == "company"):
-                ds = SCM
-                #summary =  SCM.get_filter_summary(filter_, period, startdate, enddate, identities_db, 10)
-                #createJSON (summary, destdir+"/"+ filter_.get_summary_filename(SCM))
-                # Perform ages study, if it is specified in Report
-                SCM.ages_study_com (agg_all['name'], period, startdate, enddate, destdir)
-
-            # check is only done fpr basic filters. Composed should work if basic does.
-            if check and not "," in filter_name:
-                SCM._check_report_all_data(evol_all, filter_, startdate, enddate,
-                                           identities_db, True, period)
-                SCM._check_report_all_data(agg_all, filter_, startdate, enddate,
-                                           identities_db, False, period)
-        else:
-            logging.error(filter_name +" does not support yet group by items sql queries")
+        data_all = super(SCM, cls).create_filter_report_all(filter_, period, startdate, enddate,
+                                                            destdir, npeople, identities_db)
+        if data_all is None: return
+        agg_all = data_all[0]
+
+        # Studies report for filters
+        if (filter_.get_name() == "company"):
+            # Perform ages study, if it is specified in Report
+            SCM.ages_study_com (agg_all['name'], period, startdate, enddate, destdir)
 
     @staticmethod
     def get_top_people(startdate, enddate, identities_db, npeople):
@@ -345,84 +345,17 @@ class SCR(DataSource):
                 fn = os.path.join(destdir, filter_item.get_top_filename(SCR()))
                 createJSON(top_mergers, fn)
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        from vizgrimoire.report import Report
-        items = Report.get_items()
-        if items is None:
-            items = SCR.get_filter_items(filter_, startdate, enddate, identities_db)
-            if (items == None): return
-            items = items['name']
-
-        filter_name = filter_.get_name()
-
-        if not isinstance(items, (list)):
-            items = [items]
-
-        # Include metrics to sort in javascript.
-        items_list = {"name":[],"review_time_days_median":[],"submitted":[]}
-
-        for item in items :
-            item_file = item.replace("/","_")
-            items_list["name"].append(item_file)
-
-            logging.info (item)
-            filter_item = Filter(filter_name, item)
-
-            evol = SCR.get_evolutionary_data(period, startdate, enddate,
-                                               identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(SCR()))
-            createJSON(evol, fn)
-
-            # Static
-            agg = SCR.get_agg_data(period, startdate, enddate, identities_db, filter_item)
-            fn = os.path.join(destdir, filter_item.get_static_filename(SCR()))
-            createJSON(agg, fn)
-
-            if 'submitted' in agg:
-                items_list["submitted"].append(agg["submitted"])
-            else: items_list["submitted"].append("NA")
-            if 'review_time_days_median' in agg:
-                items_list["review_time_days_median"].append(agg['review_time_days_median'])
-            else: items_list["review_time_days_median"].append("NA")
-
-        fn = os.path.join(destdir, filter_.get_filename(SCR()))
-        createJSON(items_list, fn)
-
-        SCR.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
-
     @staticmethod
     def _check_report_all_data(data, filter_, startdate, enddate, idb,
                                evol = False, period = None):
         pass
 
-    @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        check = False # activate to debug issues
-        filter_name = filter_.get_name()
-
-        if filter_name in ["people2","company","repository","country","domain","project"] :
-            filter_all = Filter(filter_name, None)
-            agg_all = SCR.get_agg_data(period, startdate, enddate,
-                                       identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_static_filename_all(SCR()))
-            createJSON(agg_all, fn)
-            SCR.convert_all_to_single(agg_all, filter_, destdir, False, period)
-
-            evol_all = SCR.get_evolutionary_data(period, startdate, enddate,
-                                                 identities_db, filter_all)
-            fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(SCR()))
-            createJSON(evol_all, fn)
-            SCR.convert_all_to_single(evol_all, filter_, destdir, True, period)
-
-
-            if check:
-                SCR._check_report_all_data(evol_all, filter_, startdate, enddate,
-                                           identities_db, True, period)
-                SCR._check_report_all_data(agg_all, filter_, startdate, enddate,
-                                           identities_db, False, period)
-        else:
-            logging.error(filter_name +" does not support yet group by items sql queries")
+    @classmethod
+    def create_filter_report_all(cls, filter_, period, startdate, enddate, destdir, npeople, identities_db):
+        super(SCR, cls).create_filter_report_all(filter_, period, startdate, enddate,
+                                                 destdir, npeople, identities_db)
+        # top by filter, not supported by group all queries
+        SCR.create_filter_report_top(filter_, period, startdate, enddate, destdir, npeople, identities_db)
 
 
     # Unify top format
@@ -473,6 +406,11 @@ class SCR(DataSource):
     def create_r_reports(vizr, enddate, destdir):
         pass
 
+    @staticmethod
+    def cube_supported():
+        """ Data is not computed with DataSource.get_metrics_data """
+        return False
+
     @staticmethod
     def get_query_builder():
         from vizgrimoire.metrics.query_builder import SCRQuery
@@ -50,13 +50,13 @@ from grimoirelib_alch.family.duration_persons import (
     ActiveCondition
     )
 from vizgrimoire.analysis.analyses import Analyses
+from vizgrimoire.GrimoireUtils import write_json_file
 from vizgrimoire.SCM import SCM
 from vizgrimoire.ITS import ITS
 from vizgrimoire.MLS import MLS
 
 from datetime import datetime, timedelta
 from jsonpickle import encode, set_encoder_options
-import codecs
 import logging
 import os.path
 
@@ -74,8 +74,7 @@ def produce_json (filename, data, compact = True):
                             ensure_ascii=False,
                             encoding="utf8")
     data_json = encode(data, unpicklable=False)
-    with codecs.open(filename, "w", "utf-8") as file:
-        file.write(data_json)
+    write_json_file(data_json, filename)
 
 def parse_analysis (type_analysis):
     """Parse a "type_analysis", returning a dictionary.
@@ -36,372 +36,194 @@ from vizgrimoire.MLS import MLS
 from vizgrimoire.report import Report
 import logging
 
+class OrganizationsFrame(object):
+    """ Metrics values indexed by organization id
+
+    Rows of grouped queries (org_id, name, year and one column per metric)
+    are added to the frame, which returns the organizations activity
+    format: a list of names and one list of values per metric and year.
+    Organizations with the same name are different rows.
+    """
+
+    def __init__(self):
+        self.index = {} # org_id -> metric -> value
+        self.names = {} # org_id -> name
+
+    def add_rows(self, data, metrics, start, end):
+        """ Add the rows of a grouped query with ROLLUP
+
+        metrics is a dict query column -> metric name. Rows with a NULL
+        year are the totals for all years. Years out of [start, end] and
+        the grand total row (NULL org_id) are ignored.
+        """
+        for i in range(0, len(data['org_id'])):
+            org_id = data['org_id'][i]
+            if org_id is None: continue
+            year = data['year'][i]
+            if year is not None and (year < start or year > end): continue
+            self.names[org_id] = data['name'][i]
+            values = self.index.setdefault(org_id, {})
+            for column, metric in metrics.iteritems():
+                value = data[column][i]
+                if value is None: continue
+                if year is None:
+                    # Last 365 days and active values only make sense for all years
+                    values[metric] = value
+                elif not (metric.endswith("_365") or metric.endswith("-active")):
+                    values[metric + "_" + str(year)] = value
+
+    def get_ids(self, sort_metric):
+        """ Ids of the organizations sorted by metric value, name and id """
+        return sorted(self.index.keys(),
+                      key = lambda org_id: (-self.index[org_id].get(sort_metric, 0),
+                                            self.names[org_id], org_id))
+
+    def get_names(self, ids):
+        return [self.names[org_id] for org_id in ids]
+
+    def get_values(self, ids, metric, default = 0):
+        return [self.index[org_id].get(metric, default) for org_id in ids]
+
+
 class CompaniesActivity(Analyses):
     id = "organizations_activity"
     name = "Companies Activity"
     desc = "Companies activity for different periods: commits, authors, actions ..."
 
-    def get_mls_from_organizations(self):
-        automator = Report.get_config()
-        identities_db = automator['generic']['db_identities']
+    # Metrics in each data source: query column -> metric name
+    scm_metrics = {"commits":"commits", "authors":"authors", "actions":"actions",
+                   "lines_added":"lines-added", "lines_removed":"lines-removed",
+                   "committers":"committers"}
+    its_metrics = {"opened":"opened", "closed":"closed"}
+    mls_metrics = {"sent":"sent"}
 
-        from_ = """
-            FROM messages m
-              JOIN messages_people mp ON m.message_ID = mp.message_id
-              JOIN people_uidentities pup ON mp.email_address = pup.people_id
-              JOIN %s.enrollments enr ON enr.uuid = pup.uuid
-              JOIN %s.organizations org ON org.id = enr.organization_id
-        """ % (identities_db, identities_db)
-        return from_
-
-
-    def get_its_from_organizations(self):
+    def _get_organizations_join(self, field):
         automator = Report.get_config()
         identities_db = automator['generic']['db_identities']
-
-        from_ = """
-            FROM issues i
-              JOIN people_uidentities pup ON i.submitted_by = pup.people_id
-              JOIN %s.enrollments enr ON enr.uuid = pup.uuid
-              JOIN %s.organizations org ON org.id = enr.organization_id
-        """ % (identities_db, identities_db)
-        return from_
-
-    def get_scm_from_organizations(self, committers = False):
-        automator = Report.get_config()
-        identities_db = automator['generic']['db_identities']
-        if (committers): field = "s.committer_id"
-        else:  field = "s.author_id"
-        from_ = """
-            FROM scmlog s
-              JOIN actions a ON a.commit_id = s.id
+        join = """
               JOIN people_uidentities pup ON %s = pup.people_id
               JOIN %s.enrollments enr ON enr.uuid = pup.uuid
               JOIN %s.organizations org ON org.id = enr.organization_id
         """ % (field, identities_db, identities_db)
-        return from_
-
-    def get_sql_commits(self, year = None):
-        where = ""
-        field = "commits"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where = " WHERE YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-        sql = """
-            select org.name, count(distinct(s.rev)) as %s
-            %s %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_authors(self, year = None):
-        where = ""
-        field = "authors"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where = " WHERE YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-        sql = """
-            select org.name, count(distinct(s.author_id)) as %s
-            %s %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_committers(self, year = None, active = False):
-        if year is not None and active:
-            logging.error("Active committers is not valid for past years.")
-            return None
-        # An active committers has done a commit in last 90 days
-        active_max_days = "90"
-        where = ""
-        field = "committers"
-        if active: field = "committers_active"
-        from_ =  self.get_scm_from_organizations(True)
-
-        if year is not None:
-            where = " WHERE YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-        if active:
-	    if where == "": where = " WHERE "
-  	    else: where += " AND "
-            where += " DATEDIFF(NOW(), s.author_date) < " + active_max_days
-        sql = """
-            select org.name, count(distinct(s.committer_id)) as %s
-            %s %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_actions(self, year = None):
-        where = ""
-        field = "actions"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where = " WHERE YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-        sql = """
-            select org.name, count(a.id) as %s
-            %s
-              JOIN actions a ON a.commit_id = s.id
-            %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_sloc(self, year = None):
-        """ Metric not used. Use lines_added and lines_removed """
-        where = ""
-        field = "sloc"
-        from_ =  self.get_scm_from_organizations()
-
-        # Remove commits from cvs2svn migration with removed lines issues
-        where = "WHERE  message NOT LIKE '%cvs2svn%'"
-        if year is not None:
-            where += " AND YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-
-        sql = """
-            select name, added-removed as %s FROM (
-              select org.name, SUM(removed) as removed, SUM(added) as added
-              %s JOIN commits_lines cl ON cl.commit_id = s.id
-              %s
-              group by org.id
-            ) t
-            order by %s desc, name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-
-    def get_lines_filters(self):
+        return join
+
+    @staticmethod
+    def _get_fields(metrics, date, enddate):
+        """ Fields for all the metrics and their last 365 days variants
+
+        metrics is a list of [column, value, aggregation] where aggregation
+        is a template for the value ("SUM(%s)"). NULL values are not
+        aggregated, so the last 365 days use the value only in that period.
+        """
+        last_year = "%s >= DATE_SUB(%s, INTERVAL 365 DAY) AND %s < %s" % \
+            (date, enddate, date, enddate)
+        fields = []
+        for column, value, aggregation in metrics:
+            if value is None:
+                fields.append("NULL AS " + column)
+                fields.append("NULL AS " + column + "_365")
+                continue
+            fields.append(aggregation % value + " AS " + column)
+            last_value = "IF(%s, %s, NULL)" % (last_year, value)
+            fields.append(aggregation % last_value + " AS " + column + "_365")
+        return fields
+
+    def get_sql_scm(self, enddate):
+        """ SCM metrics per organization and year (and all years with ROLLUP)
+
+        Commits, authors, actions and lines come from the organization of the
+        author and committers from the organization of the committer, in two
+        branches of the same query. Only commits with actions are counted.
+        Active committers have done a commit in the last 90 days.
+        """
         # Remove commits from cvs2svn migration with removed lines issues
-        where = "WHERE  message NOT LIKE '%cvs2svn%'"
-        return where
-
-    def get_sql_lines_added(self, year = None):
-        where = self.get_lines_filters()
-        field = "lines_added"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where += " AND YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-
-        sql = """
-            select name, added as %s FROM (
-              select org.name, SUM(added) as added
-              %s JOIN commits_lines cl ON cl.commit_id = s.id
-              %s
-              group by org.id
-            ) t
-            order by %s desc, name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_lines_removed(self, year = None):
-        where = self.get_lines_filters()
-        field = "lines_removed"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where += " AND YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-
-        sql = """
-            select name, removed as %s FROM (
-              select org.name, SUM(removed) as removed
-              %s JOIN commits_lines cl ON cl.commit_id = s.id
-              %s
-              group by org.id
-            ) t
-            order by %s desc, name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_lines_total(self, year = None):
-        where = self.get_lines_filters()
-        field = "lines_total"
-        from_ =  self.get_scm_from_organizations()
-
-        if year is not None:
-            where += " AND YEAR(s.author_date) = " + str(year)
-            field = field + "_" + str(year)
-
-        sql = """
-            select name, (added+removed) as %s FROM (
-              select org.name, SUM(removed) as removed, SUM(added) as added
-              %s JOIN commits_lines cl ON cl.commit_id = s.id
-              %s
-              group by org.id
-            ) t
-            order by %s desc, name
-        """ % (field, from_, where, field)
-
-        return (sql)
-
-    def get_sql_tickets(self, field = None, year = None):
-        where = "WHERE"
-        from_ =  self.get_its_from_organizations()
-        if field == "opened":
-            if year is None: where = ""
-        elif field == "closed":
-            where = "WHERE i.status='RESOLVED' "
-        elif field == "pending":
-            where = "WHERE i.status='NEW' "
-        else: return
-
-        if year is not None:
-            if where != "WHERE": where += " AND "
-            where += " YEAR(i.submitted_on) = " + str(year)
-            field = field + "_" + str(year)
-        sql = """
-            select org.name, count(distinct(i.id)) as %s
-            %s %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-        return (sql)
-
-    def get_sql_opened(self, year = None):
-        return self.get_sql_tickets("opened", year)
-
-    def get_sql_closed(self, year = None):
-        return self.get_sql_tickets("closed", year)
-
-    def get_sql_pending(self, year = None):
-        return self.get_sql_tickets("pending", year)
-
-    def get_sql_sent(self, year = None):
-        where = ""
-        field = "sent"
-        from_ =  self.get_mls_from_organizations()
-
-        if year is not None:
-            where = " WHERE YEAR(m.first_date) = " + str(year)
-            field = field + "_" + str(year)
-
-        sql = """
-            select org.name, count(distinct(m.message_ID)) as %s
-            %s %s
-            group by org.id
-            order by %s desc, org.name
-        """ % (field, from_, where, field)
-        return (sql)
+        lines = "IF(s.message NOT LIKE '%%cvs2svn%%', %s, NULL)"
+        # Actions are counted per commit so the lines are not multiplied by them
+        from_ = """
+            FROM scmlog s
+              JOIN (SELECT commit_id, COUNT(*) AS actions FROM actions
+                    GROUP BY commit_id) a ON a.commit_id = s.id
+        """
+        group_by = " GROUP BY org.id, YEAR(s.author_date) WITH ROLLUP"
+
+        authors = [["commits", "s.rev", "COUNT(DISTINCT(%s))"],
+                   ["authors", "s.author_id", "COUNT(DISTINCT(%s))"],
+                   ["actions", "a.actions", "SUM(%s)"],
+                   ["lines_added", lines % "cl.added", "SUM(%s)"],
+                   ["lines_removed", lines % "cl.removed", "SUM(%s)"],
+                   ["committers", None, None]]
+        fields = CompaniesActivity._get_fields(authors, "s.author_date", enddate)
+        fields.append("NULL AS committers_active")
+        sql_authors = "SELECT org.id AS org_id, org.name AS name, YEAR(s.author_date) AS year, " + \
+            ", ".join(fields) + from_ + \
+            self._get_organizations_join("s.author_id") + \
+            " LEFT JOIN commits_lines cl ON cl.commit_id = s.id " + group_by
+
+        committers = [[m[0], None, None] for m in authors[:-1]]
+        committers.append(["committers", "s.committer_id", "COUNT(DISTINCT(%s))"])
+        fields = CompaniesActivity._get_fields(committers, "s.author_date", enddate)
+        fields.append("COUNT(DISTINCT(IF(DATEDIFF(NOW(), s.author_date) < 90, " + \
+                      "s.committer_id, NULL))) AS committers_active")
+        sql_committers = "SELECT org.id AS org_id, org.name AS name, YEAR(s.author_date) AS year, " + \
+            ", ".join(fields) + from_ + \
+            self._get_organizations_join("s.committer_id") + group_by
+
+        return "(" + sql_authors + ") UNION ALL (" + sql_committers + ")"
+
+    def get_sql_its(self, enddate):
+        """ Tickets opened and closed per organization and year (ROLLUP) """
+        metrics = [["opened", "i.id", "COUNT(DISTINCT(%s))"],
+                   ["closed", "IF(i.status='RESOLVED', i.id, NULL)", "COUNT(DISTINCT(%s))"]]
+        fields = CompaniesActivity._get_fields(metrics, "i.submitted_on", enddate)
+        sql = "SELECT org.id AS org_id, org.name AS name, YEAR(i.submitted_on) AS year, " + \
+            ", ".join(fields) + " FROM issues i " + \
+            self._get_organizations_join("i.submitted_by") + \
+            " GROUP BY org.id, YEAR(i.submitted_on) WITH ROLLUP"
+        return sql
+
+    def get_sql_mls(self, enddate):
+        """ Messages sent per organization and year (ROLLUP) """
+        metrics = [["sent", "m.message_ID", "COUNT(DISTINCT(%s))"]]
+        fields = CompaniesActivity._get_fields(metrics, "m.first_date", enddate)
+        sql = "SELECT org.id AS org_id, org.name AS name, YEAR(m.first_date) AS year, " + \
+            ", ".join(fields) + """
+            FROM messages m
+              JOIN messages_people mp ON m.message_ID = mp.message_id
+            """ + self._get_organizations_join("mp.email_address") + \
+            " GROUP BY org.id, YEAR(m.first_date) WITH ROLLUP"
+        return sql
 
     def create_report(self, data_source, destdir):
         if data_source != SCM: return
         self.result(data_source, destdir)
 
-    def add_organizations_data (self, activity, data):
-        """ Add organizations data in an already existing complete organizations activity dictionary """
-        new_activity = []
-        field = None
-
-        # Check all data names are already in activity. If not add it with zero value.
-        for item in data['name']:
-            if item not in activity['name']:
-                activity['name'].append(item)
-                for metric in activity:
-                    if metric == "name": continue
-                    activity[metric].append(0)
-
-        # Find the name of the field to be uses to get values
-        for key in data.keys():
-            if key != "name":
-                field = key
-                break
-        for company in activity['name']:
-            if company in data['name']:
-                index = data['name'].index(company)
-                value = data[field][index]
-                new_activity.append(value)
-            else:
-                new_activity.append(0)
-
-        activity[field] = new_activity
-        return activity
-
     def check_array_values(self, data):
         for item in data:
             if not isinstance(data[item], list): data[item] = [data[item]]
 
-    def add_metric_years(self, metric, activity, start, end):
-        metrics = ['commits','authors','committers','actions','sloc',
-                   'lines-total','lines-added','lines-removed','opened','closed','sent']
-        if metric not in metrics:
-            logging.error(metric + " not supported in organizations activity.")
-            return
-        for i in range(start, end+1):
-            if metric == "commits":
-                data = self.db.ExecuteQuery(self.get_sql_commits(i))
-            elif metric == "authors":
-                data = self.db.ExecuteQuery(self.get_sql_authors(i))
-            elif metric == "committers":
-                data = self.db.ExecuteQuery(self.get_sql_committers(i))
-            elif metric == "actions":
-                data = self.db.ExecuteQuery(self.get_sql_actions(i))
-            elif metric == "sloc":
-                data = self.db.ExecuteQuery(self.get_sql_sloc(i))
-            elif metric == "lines-added":
-                data = self.db.ExecuteQuery(self.get_sql_lines_added(i))
-                data = self._convert_dict_field(data, "lines_added","lines-added")
-            elif metric == "lines-removed":
-                data = self.db.ExecuteQuery(self.get_sql_lines_removed(i))
-                data = self._convert_dict_field(data, "lines_removed","lines-removed")
-            elif metric == "lines-total":
-                data = self.db.ExecuteQuery(self.get_sql_lines_total(i))
-                data = self._convert_dict_field(data, "lines_total","lines-total")
-            elif metric == "opened":
-                data = self.db.ExecuteQuery(self.get_sql_opened(i))
-            elif metric == "closed":
-                data = self.db.ExecuteQuery(self.get_sql_closed(i))
-            elif metric == "sent":
-                data = self.db.ExecuteQuery(self.get_sql_sent(i))
-            self.check_array_values(data)
-            activity = self.add_organizations_data (activity, data)
-
-
-    def _convert_dict_field(self, dict, str_old, str_new):
-        """ Change field dict names replacing str_old with str_new in the field names"""
-        for key in dict.keys():
-            if str_old in key:
-                new_key = key.replace(str_old, str_new)
-                dict[new_key] = dict.pop(key)
-        return dict
-
-    def add_metric_lines_commit(self, activity, start, end):
-        # Global
-        activity['lines-per-commit'] = []
-        for i in range(0, len(activity['commits'])):
-            if activity['commits'][i] == 0:
-                activity['lines-per-commit'].append(None)
-            else:
-                activity['lines-per-commit'].append(\
-                (activity['lines-total'][i]) / activity['commits'][i])
-        # Per year
-        for i in range(start, end+1):
-            activity['lines-per-commit_'+str(i)] = []
-            for j in range(0, len(activity['commits_'+str(i)])):
-                if activity['commits_'+str(i)][j] == 0:
-                    activity['lines-per-commit_'+str(i)].append(None)
+    def add_frame_data(self, frame, data, metrics, start, end):
+        """ Add the rows of a data source query to the organizations frame """
+        self.check_array_values(data)
+        columns = dict(metrics)
+        for column, metric in metrics.iteritems():
+            columns[column + "_365"] = metric + "_365"
+        if "committers" in metrics:
+            columns["committers_active"] = "committers-active"
+        frame.add_rows(data, columns, start, end)
+
+    def add_metric_lines_commit(self, activity, suffixes):
+        """ Lines (added and removed) per commit for each period """
+        for suffix in suffixes:
+            activity['lines-total'+suffix] = \
+                [activity['lines-added'+suffix][i] + activity['lines-removed'+suffix][i]
+                 for i in range(0, len(activity['name']))]
+            activity['lines-per-commit'+suffix] = []
+            for i in range(0, len(activity['commits'+suffix])):
+                if activity['commits'+suffix][i] == 0:
+                    activity['lines-per-commit'+suffix].append(None)
                 else:
-                    activity['lines-per-commit_'+str(i)].append(\
-                    (activity['lines-total_'+str(i)][j]) / activity['commits_'+str(i)][j])
+                    activity['lines-per-commit'+suffix].append(\
+                    (activity['lines-total'+suffix][i]) / activity['commits'+suffix][i])
 
     def result(self, data_source = None, destdir = None):
         if data_source != SCM or destdir is None: return None
@@ -419,81 +241,52 @@ class CompaniesActivity(Analyses):
 
         start_year = int(start_date.split("-")[0])
         end_year = int(end_date.split("-")[0])
+        end_date = "'" + end_date + "'"
 
-        activity = {}
-        activity['name'] = []
-
-        # Commits
-        data = self.db.ExecuteQuery(self.get_sql_commits())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("commits", activity, start_year, end_year)
-        # Authors
-        data = self.db.ExecuteQuery(self.get_sql_authors())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("authors", activity, start_year, end_year)
-        # Committers
-        data = self.db.ExecuteQuery(self.get_sql_committers())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("committers", activity, start_year, end_year)
-        # Committers active: only valid for today
-        data = self.db.ExecuteQuery(self.get_sql_committers(None, True))
-        data = self._convert_dict_field(data, "committers_active","committers-active")
-        activity = self.add_organizations_data (activity, data)
-        # Committers inactive: only valid for today
-        activity['committers-inactive'] = \
-            [ activity['committers'][i] - activity['committers-active'][i] \
-             for i in range(0, len(activity['committers']))]
-        activity['committers-percent-active'] = []
-        for i in range(0, len(activity['committers'])):
-            if activity['committers'][i] == 0:
-                activity['committers-percent-active'].append(100)
-            else:
-                activity['committers-percent-active'].append(\
-                (activity['committers-active'][i]*100) / activity['committers'][i])
-        # Actions
-        data = self.db.ExecuteQuery(self.get_sql_actions())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("actions", activity, start_year, end_year)
-        # Source lines of code added
-        data = self.db.ExecuteQuery(self.get_sql_lines_added())
-        data = self._convert_dict_field(data, "lines_added", "lines-added")
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("lines-added", activity, start_year, end_year)
-        # Source lines of code removed
-        data = self.db.ExecuteQuery(self.get_sql_lines_removed())
-        data = self._convert_dict_field(data, "lines_removed","lines-removed")
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("lines-removed", activity, start_year, end_year)
-        # Source lines of code total (added+removed)
-        data = self.db.ExecuteQuery(self.get_sql_lines_total())
-        data = self._convert_dict_field(data, "lines_total","lines-total")
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("lines-total", activity, start_year, end_year)
-        # Lines per commit
-        self.add_metric_lines_commit(activity, start_year, end_year)
+        frame = OrganizationsFrame()
+
+        # Commits, authors, committers, actions and lines
+        data = self.db.ExecuteQuery(self.get_sql_scm(end_date))
+        self.add_frame_data(frame, data, self.scm_metrics, start_year, end_year)
 
         # We need to change the db to tickets
         dbname = automator["generic"]["db_bicho"]
         dsquery = ITS.get_query_builder()
         dbcon = dsquery(dbuser, dbpass, dbname, db_identities)
         self.db = dbcon
-        # Tickets opened
-        data = self.db.ExecuteQuery(self.get_sql_opened())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("opened", activity, start_year, end_year)
-        # Tickets closed
-        data = self.db.ExecuteQuery(self.get_sql_closed())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("closed", activity, start_year, end_year)
+        # Tickets opened and closed
+        data = self.db.ExecuteQuery(self.get_sql_its(end_date))
+        self.add_frame_data(frame, data, self.its_metrics, start_year, end_year)
 
         # Messages sent
         dbname = automator["generic"]["db_mlstats"]
         dsquery = MLS.get_query_builder()
         dbcon = dsquery(dbuser, dbpass, dbname, db_identities)
         self.db = dbcon
-        data = self.db.ExecuteQuery(self.get_sql_sent())
-        activity = self.add_organizations_data (activity, data)
-        self.add_metric_years("sent", activity, start_year, end_year)
+        data = self.db.ExecuteQuery(self.get_sql_mls(end_date))
+        self.add_frame_data(frame, data, self.mls_metrics, start_year, end_year)
+
+        suffixes = ["", "_365"] + ["_" + str(year) for year in range(start_year, end_year+1)]
+        ids = frame.get_ids("commits")
+        activity = {"name": frame.get_names(ids)}
+        metrics = self.scm_metrics.values() + self.its_metrics.values() + self.mls_metrics.values()
+        for metric in metrics:
+            for suffix in suffixes:
+                activity[metric+suffix] = frame.get_values(ids, metric+suffix)
+        activity['committers-active'] = frame.get_values(ids, 'committers-active')
+        # Committers inactive: only valid for today
+        activity['committers-inactive'] = \
+            [ activity['committers'][i] - activity['committers-active'][i] \
+             for i in range(0, len(activity['committers']))]
+        activity['committers-percent-active'] = []
+        for i in range(0, len(activity['committers'])):
+            if activity['committers'][i] == 0:
+                activity['committers-percent-active'].append(100)
+            else:
+                activity['committers-percent-active'].append(\
+                (activity['committers-active'][i]*100) / activity['committers'][i])
+        # Lines total and per commit
+        self.add_metric_lines_commit(activity, suffixes)
 
         createJSON(activity, destdir+"/organizations-activity.json")
         logging.info(destdir+"/organizations-activity.json created")
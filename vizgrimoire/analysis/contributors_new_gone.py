@@ -54,6 +54,20 @@ class ContributorsNewGone(Analyses):
         return study.result(data_source)
 
 
+    def _get_people_evol(self, index, uuid, field, period, startdate, enddate):
+        """ Evolution of the activity of a person, from the lifecycle index if any """
+        if index is not None:
+            return index.get_ts(field, period, startdate, enddate, uuid)
+        if field == "commits":
+            return self.db.GetEvolPeopleSCM(uuid, period, startdate, enddate)
+        return self.db.GetPeopleEvolSubmissionsSCR(uuid, period, startdate, enddate)
+
+    def _get_people_intake(self, index, field, min, max):
+        """ People intake per month, from the lifecycle index if any """
+        if index is not None:
+            return index.get_intake(field, min, max)
+        return self.db.GetPeopleIntake(min, max)
+
     def get_report_files(self, data_source = None):
         if data_source is None: return []
         ds = data_source.get_name()
@@ -279,12 +293,15 @@ class ContributorsNewGoneSCM(ContributorsNewGone):
         result_dict['people_gone'] = code_contrib
         createJSON(code_contrib, destdir+"/scm-code-contrib-gone.json")
 
+        # Activity of all people from the lifecycle index, not one query per person
+        index = data_source.get_lifecycle_index(self.db)
+
         data = self.GetNewAuthorsActivity()
 
         evol = {}
         evol['people'] = {}
         for uuid in data['uuid']:
-            pdata = self.db.GetEvolPeopleSCM(uuid, period, startdate, enddate)
+            pdata = self._get_people_evol(index, uuid, "commits", period, startdate, enddate)
             pdata = completePeriodIds(pdata, period, startdate, enddate)
             evol['people'][uuid] = {"commits":pdata['commits']}
             # Just to have the time series data
@@ -297,7 +314,7 @@ class ContributorsNewGoneSCM(ContributorsNewGone):
         evol = {}
         evol['people'] = {}
         for uuid in data['uuid']:
-            pdata = self.db.GetEvolPeopleSCM(uuid, period, startdate, enddate)
+            pdata = self._get_people_evol(index, uuid, "commits", period, startdate, enddate)
             pdata = completePeriodIds(pdata, period, startdate, enddate)
             evol['people'][uuid] = {"commits":pdata['commits']}
             # Just to have the time series data
@@ -311,13 +328,15 @@ class ContributorsNewGoneSCM(ContributorsNewGone):
         # createJSON(data, destdir+"/leaving-people-scr.json")
 
         evol = {}
-        data = completePeriodIds(self.db.GetPeopleIntake(0,1), period, startdate, enddate)
+        data = completePeriodIds(self._get_people_intake(index, "all_commits", 0, 1), period, startdate, enddate)
         evol[period] = data[period]
         evol['id'] = data['id']
         evol['date'] = data['date']
         evol['num_people_1'] = data['people']
-        evol['num_people_1_5'] = completePeriodIds(self.db.GetPeopleIntake(1,5),period, startdate, enddate)['people']
-        evol['num_people_5_10'] = completePeriodIds(self.db.GetPeopleIntake(5,10), period, startdate, enddate)['people']
+        evol['num_people_1_5'] = completePeriodIds(self._get_people_intake(index, "all_commits", 1, 5),
+                                                   period, startdate, enddate)['people']
+        evol['num_people_5_10'] = completePeriodIds(self._get_people_intake(index, "all_commits", 5, 10),
+                                                    period, startdate, enddate)['people']
         result_dict['people_intake_ts'] = evol
         createJSON(evol, destdir+"/scm-people-intake-evolutionary.json")
 
@@ -578,11 +597,14 @@ class ContributorsNewGoneSCR(ContributorsNewGone):
         createJSON(code_contrib, destdir+"/scr-code-contrib-gone.json")
 
 
+        # Activity of all people from the lifecycle index, not one query per person
+        index = data_source.get_lifecycle_index(self.db)
+
         data = self.GetNewSubmittersActivity()
         evol = {}
         evol['people'] = {}
         for uuid in data['uuid']:
-            pdata = self.db.GetPeopleEvolSubmissionsSCR(uuid, period, startdate, enddate)
+            pdata = self._get_people_evol(index, uuid, "submissions", period, startdate, enddate)
             pdata = completePeriodIds(pdata, period, startdate, enddate)
             evol['people'][uuid] = {"submissions":pdata['submissions']}
             # Just to have the time series data
@@ -595,7 +617,7 @@ class ContributorsNewGoneSCR(ContributorsNewGone):
         evol = {}
         evol['people'] = {}
         for uuid in data['uuid']:
-            pdata = self.db.GetPeopleEvolSubmissionsSCR(uuid, period, startdate, enddate)
+            pdata = self._get_people_evol(index, uuid, "submissions", period, startdate, enddate)
             pdata = completePeriodIds(pdata, period, startdate, enddate)
             evol['people'][uuid] = {"submissions":pdata['submissions']}
             # Just to have the time series data
@@ -608,11 +630,13 @@ class ContributorsNewGoneSCR(ContributorsNewGone):
         # createJSON(data, destdir+"/leaving-people-scr.json")
 
         evol = {}
-        data = completePeriodIds(self.db.GetPeopleIntake(0,1), period, startdate, enddate)
+        data = completePeriodIds(self._get_people_intake(index, "submissions", 0, 1), period, startdate, enddate)
         evol[period] = data[period]
         evol['id'] = data['id']
         evol['date'] = data['date']
         evol['num_people_1'] = data['people']
-        evol['num_people_1_5'] = completePeriodIds(self.db.GetPeopleIntake(1,5),period, startdate, enddate)['people']
-        evol['num_people_5_10'] = completePeriodIds(self.db.GetPeopleIntake(5,10), period, startdate, enddate)['people']
+        evol['num_people_1_5'] = completePeriodIds(self._get_people_intake(index, "submissions", 1, 5),
+                                                   period, startdate, enddate)['people']
+        evol['num_people_5_10'] = completePeriodIds(self._get_people_intake(index, "submissions", 5, 10),
+                                                    period, startdate, enddate)['people']
         createJSON(evol, destdir+"/scr-people-intake-evolutionary.json")
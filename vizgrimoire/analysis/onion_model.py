@@ -33,14 +33,10 @@
 
 from vizgrimoire.analysis.analyses import Analyses
 
-from vizgrimoire.metrics.query_builder import DSQuery
-
-from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.onion import OnionModel
 
 class CommunityStructure(Analyses):
     # TODO:
-    #  - Add date filters (start and end date)
-    #  - Add repository filters (s.repository_id= xxx)
     #  - Add type of file filter (so far 'code' is harcoded in the query)
     #  - Add evolutionary analysis of territoriality
 
@@ -48,90 +44,41 @@ class CommunityStructure(Analyses):
     name = "Onion Model"
     desc = "Community structure of developers: core, regular and occasional"
 
+    supported = ["scm", "its", "mls", "scr", "qaforums"]
+
     def get_agg (self, data_source = None):
         """ Returns aggregated data for a data source. """
         data = {}
-        if data_source is None or data_source.get_name() == "scm":
+        if data_source is None or data_source.get_name() in self.supported:
             data = self.result(data_source)
+        if data is None: data = {}
         return data
 
-    def result(self, data_source = None):
-        if data_source is not None and data_source.get_name() != "scm": return None
-
-        # Init of structure to be returned
-        community = {}
-        community['core'] = None
-        community['regular'] = None
-        community['occasional'] = None
-
-        q = "select count(distinct(s.id)) as total "+\
-             "from scmlog s, people p, actions a "+\
-             "where s.author_id = p.id and "+\
-             "      p.email <> '%gerrit@%' and "+\
-             "      p.email <> '%jenkins@%' and "+\
-             "      s.id = a.commit_id and "+\
-             "      s.author_date>="+self.filters.startdate+" and "+\
-             "      s.author_date<"+self.filters.enddate+";"
-
-        total = self.db.ExecuteQuery(q)
-        total_commits = float(total['total'])
-
-        # Database access: developer, %commits
-        q = " select pup.uuid, "+\
-            "        (count(distinct(s.id))) as commits "+\
-            " from scmlog s, "+\
-            "      actions a, "+\
-            "      people_uidentities pup, "+\
-            "      people p "+\
-            " where s.id = a.commit_id and "+\
-            "       s.author_date>="+self.filters.startdate+" and "+\
-            "       s.author_date<"+self.filters.enddate+" and "+\
-            "       s.author_id = pup.people_id and "+\
-            "       s.author_id = p.id and "+\
-            "       p.email <> '%gerrit@%' and "+\
-            "       p.email <> '%jenkins@%' "+\
-            " group by pup.uuid "+\
-            " order by commits desc; "
-
-        people = self.db.ExecuteQuery(q)
-        if not isinstance(people['commits'], list):
-            people['commits'] = [people['commits']]
-        # this is a list. Operate over the list
-        people['commits'] = [((commits / total_commits) * 100) for commits in people['commits']]
-        # people['commits'] = (people['commits'] / total_commits) * 100
-
-
-        # Calculating number of core, regular and occasional developers
-        cont = 0
-        core = 0
-        core_f = True # flag
-        regular = 0
-        regular_f = True  # flag
-        occasional = 0
-        devs = 0
-
-        for value in people['commits']:
-            cont = cont + value
-            devs = devs + 1
-
-            if (core_f and cont >= 80):
-                #core developers number reached
-                core = devs
-                core_f = False
-
-            if (regular_f and cont >= 95):
-                regular = devs
-                regular_f = False
-
-        occasional = devs - regular
-        regular = regular - core
-
-        # inserting values in variable
-        community['core'] = core
-        community['regular'] = regular
-        community['occasional'] = occasional
-
-        print(community)
-        return(community)
-
+    def _get_activity(self, windows, data_source, type_analysis):
+        if data_source is None or data_source.get_name() == "scm":
+            # Merges (commits without actions) are not counted
+            return self.db.GetOnionActivity(windows, type_analysis, merges = False)
+        return self.db.GetOnionActivity(windows, type_analysis)
 
+    def result(self, data_source = None):
+        if data_source is not None and data_source.get_name() not in self.supported: return None
+
+        type_analysis = self.filters.type_analysis
+        if not type_analysis: type_analysis = None
+
+        windows = [[self.filters.startdate, self.filters.enddate]]
+        activity = self._get_activity(windows, data_source, type_analysis)
+        if activity is None: return None
+        onion = OnionModel(activity)
+
+        if type_analysis is not None and type_analysis[1] is None:
+            # Community structure for each item of the filter
+            community = {"name":[], "core":[], "regular":[], "occasional":[]}
+            for item in onion.get_items(0):
+                counts = onion.get_counts(0, item)
+                community["name"].append(item)
+                for layer in counts:
+                    community[layer].append(counts[layer])
+            return community
+
+        return onion.get_counts(0)
@@ -32,15 +32,15 @@
 # http://firstmonday.org/ojs/index.php/fm/rt/printerFriendly/1207/1127
 
 
-import logging
+import datetime
+
+from dateutil import parser
+
 from vizgrimoire.analysis.analyses import Analyses
-from vizgrimoire.metrics.query_builder import DSQuery
-from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.onion import OnionModel
 
 class OnionTransitions(Analyses):
     # TODO:
-    #  - Add date filters (start and end date)
-    #  - Add repository filters (s.repository_id= xxx)
     #  - Add type of file filter (so far 'code' is harcoded in the query)
     #  - Add evolutionary analysis of territoriality
 
@@ -48,391 +48,89 @@ class OnionTransitions(Analyses):
     name = "Migrations in the Onion Model"
     desc = "Migration in the Community structure of developers: core, regular and occasional"
 
+    # Fields exported for each person and name of the contributions
+    people_fields = {"scm": ["uuid", "name", "email"], "qaforums": ["name"]}
+    contributions_field = {"scm": "commits", "its": "changes", "mls": "sent",
+                           "scr": "submissions", "qaforums": "messages"}
+
     def get_agg (self, data_source = None):
         """ Returns aggregated data for a data source. """
-        data = {}
-        if data_source.get_name() == "scm":
-            data = self.result(data_source)
+        data = self.result(data_source)
+        if data is None: data = {}
         return data
 
-    def _get_person_info(self, upeople_id, from_date, to_date, data_source = None):
-        # gets the person info in two queries, first it obtains the name and later
-        # the number of ocurrences if any. If not, it sets ocurrences = 0
-        person_data = {}
-        if (data_source.get_name() == "scm"):
-            logging.info("Warning: current queries are counting merges")
-            # q = " select pup.uuid as uid, p.name, p.email, "+\
-            #     "        (count(distinct(s.id))) as commits "+\
-            #     " from scmlog s, "+\
-            #     "      actions a, "+\
-            #     "      people_uidentities pup, "+\
-            #     "      people p "+\
-            #     " where s.id = a.commit_id and "+\
-            #     "       s.date>="+ from_date+" and "+\
-            #     "       s.date<="+ to_date+" and "+\
-            #     "       s.author_id = pup.people_id and "+\
-            #     "       s.author_id = p.id and "+\
-            #     "       p.email <> '%gerrit@%' and "+\
-            #     "       p.email <> '%jenkins@%' and "+\
-            #     "       pup.uuid = " + str(upeople_id) +\
-            #     " group by pup.uuid "+\
-            #     " order by commits desc; "
-            q0 = "select uuid, name, email from people, people_uidentities pup "+\
-                "where people.id = pup.people_id and pup.uuid = '" + str(upeople_id) + "' "+\
-                " LIMIT 1"
-            
-            q1 = " select pup.uuid as uid, p.name, p.email, "+\
-                "        (count(distinct(s.id))) as commits "+\
-                " from scmlog s, "+\
-                "      people_uidentities pup, "+\
-                "      people p "+\
-                " where s.author_date>="+ from_date+" and "+\
-                "       s.author_date<"+ to_date+" and "+\
-                "       s.author_id = pup.people_id and "+\
-                "       s.author_id = p.id and "+\
-                "       p.email <> '%gerrit@%' and "+\
-                "       p.email <> '%jenkins@%' and "+\
-                "       pup.uuid = '" + str(upeople_id) + "' " +\
-                " group by pup.uuid "+\
-                " order by commits desc; "
-
-            aux = self.db.ExecuteQuery(q0)
-            person_data["name"] = aux["name"]
-            person_data["email"] = aux["email"]
-            person_data["uuid"] = aux["uuid"]
-            aux = self.db.ExecuteQuery(q1)
-            if (type(aux["commits"]) == list):
-                person_data["commits"] = 0
-            else:
-                person_data["commits"] = aux["commits"]
-
-        elif (data_source.get_name() == "qaforums"):
-            logging.info("Warning: qaforums is not using matched identities")
-            q0 = "SELECT username as name from people where identifier = " + str(upeople_id)+ " "+\
-                " LIMIT 1"
-            
-            q1 = "SELECT identifier, username as name, COUNT(*) as messages from ("+\
-                "(select p.identifier as identifier, p.username, q.added_at as date"+\
-                "  from questions q, people p"+\
-                "  where q.author_identifier=p.identifier)"+\
-                "union"+\
-                "(select p.identifier as identifier, p.username, a.submitted_on as date"+\
-                "  from answers a, people p"+\
-                "  where a.user_identifier=p.identifier)"+\
-                "union"+\
-                "(select p.identifier as identifier, p.username, c.submitted_on as date"+\
-                "  from comments c, people p"+\
-                "  where c.user_identifier=p.identifier)) t "+\
-                "WHERE date>="+ from_date +" AND date<" + to_date +" "+\
-                " AND identifier = "+ str(upeople_id) + " "+\
-                "group by identifier"
-            aux = self.db.ExecuteQuery(q0)
-            person_data["name"] = aux["name"]
-            aux = self.db.ExecuteQuery(q1)
-            if (type(aux["messages"]) == list):
-                person_data["messages"] = 0
-            else:
-                person_data["messages"] = aux["messages"]
-        return(person_data)
-
-    def result(self, data_source = None, offset_days = None):
-        if data_source.get_name() != "scm" \
-            and data_source.get_name() != "qaforums": return None
-
-        from dateutil import parser
-        import datetime
-            
-        # calculation of the date ranges
-        cur_to_date = self.filters.enddate
-        if offset_days:
-            dt_end = parser.parse(self.filters.enddate)
-            aux = dt_end - datetime.timedelta(offset_days)
-            cur_from_date = "'" + aux.strftime("%Y-%m-%d") + "'"
-        else:
-            cur_from_date = self.filters.startdate
+    @staticmethod
+    def _get_date(date, days):
+        aux = parser.parse(date.replace("'","")) - datetime.timedelta(days)
+        return "'" + aux.strftime("%Y-%m-%d") + "'"
 
-        past_to_date = self.filters.startdate
+    def _get_windows(self, offset_days):
+        """ Past and current windows to compare """
+        startdate = self.filters.startdate
+        enddate = self.filters.enddate
         if offset_days:
-            dt_end = parser.parse(self.filters.startdate)
-            aux = dt_end - datetime.timedelta(offset_days)
-            past_from_date = "'" + aux.strftime("%Y-%m-%d") + "'"
+            current = [OnionTransitions._get_date(enddate, offset_days), enddate]
+            past = [OnionTransitions._get_date(startdate, offset_days), startdate]
         else:
-            dt_start = parser.parse(self.filters.startdate)
-            dt_end = parser.parse(self.filters.enddate)
-            timedelta = dt_end - dt_start
-            new_startdate = dt_start - timedelta
-            past_from_date = "'" + new_startdate.strftime("%Y-%m-%d") + "'"
-        
-        # getting the data
-        #print("current %s - %s" % (cur_from_date, cur_to_date))
-        current_groups = self._activity_groups(cur_from_date, cur_to_date, data_source)
-        cur_core = current_groups["core"]        
-        cur_regular = current_groups["regular"]
-        cur_occasional = current_groups["occasional"]
-        #print("past %s - %s" % (past_from_date, past_to_date))
-        past_groups = self._activity_groups(past_from_date, past_to_date, data_source)
-        past_core = past_groups["core"]
-        past_regular = past_groups["regular"]
-        past_occasional = past_groups["occasional"]
-
-        # going up
-        up_core = cur_core - past_core
-        # we substract past_core cause we want people going up!
-        up_reg = cur_regular - past_core - past_regular
-        
-        # going down
-        down_reg = past_core.intersection(cur_regular)
-        down_occ = past_regular.intersection(cur_occasional) | past_core.intersection(cur_occasional)
+            current = [startdate, enddate]
+            delta = parser.parse(enddate.replace("'","")) - parser.parse(startdate.replace("'",""))
+            past = [OnionTransitions._get_date(startdate, delta.days), startdate]
+        return past, current
 
-        groups = {"core":cur_core, "up_core":up_core, "up_reg":up_reg,
-                  "down_reg":down_reg, "down_occ":down_occ}
+    def _get_groups_data(self, groups, contributions, people, data_source):
+        """ People data and contributions for the transition groups """
+        name = data_source.get_name()
+        fields = self.people_fields.get(name, ["uuid", "name"])
+        field = self.contributions_field[name]
 
         result = {}
         for g in groups:
-            #here we define what we export in each group
-            if (data_source.get_name() == "scm"):
-                result[g] = {"uuid":[],"name":[],"email":[],"commits":[]}
-            elif (data_source.get_name() == "qaforums"):
-                result[g] = {"name":[],"messages":[]}
-
-            # and .. we get the data
+            result[g] = dict((f, []) for f in fields + [field])
             for person in groups[g]:
-                user_data = self._get_person_info(person, self.filters.startdate, self.filters.enddate, data_source)
-                result[g]["name"].append(user_data["name"])
-                if (data_source.get_name() == "scm"):
-                    result[g]["uuid"].append(user_data["uuid"])
-                    result[g]["email"].append(user_data["email"])
-                    result[g]["commits"].append(user_data["commits"])
-                elif (data_source.get_name() == "qaforums"):
-                    #print(user_data)
-                    result[g]["messages"].append(user_data["messages"])
-                #print user_data
-                #print " --> "+ str(person)
-                #result[g]["uid"].append(user_data["uid"])
-        
-        # print("core VVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVV")
-        # c_set = []
-        # a_set = []
-        # for c in cur_core:
-        #      aux = self._get_person_info(c, cur_from_date, cur_to_date, data_source)
-        #      c_set.append(aux["commits"])
-        # c_set.sort()
-        # print c_set
-        # print("regular ***********************************************")
-        # for a in cur_regular:
-        #      aux2 = self._get_person_info(a, cur_from_date, cur_to_date, data_source)
-        #      a_set.append(aux2["commits"])
-        # a_set.sort()
-        # print a_set
-
-        # print("core 22222222222222 VVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVV")
-        # c_set = []
-        # a_set = []
-        # for c in cur_core:
-        #      aux = self._get_person_info(c, self.filters.startdate, self.filters.enddate, data_source)
-        #      c_set.append(aux["commits"])
-        # c_set.sort()
-        # print c_set
-        # print("regular 2222222222222 ***********************************************")
-        # for a in cur_regular:
-        #      aux2 = self._get_person_info(a, self.filters.startdate, self.filters.enddate, data_source)
-        #      a_set.append(aux2["commits"])
-        # a_set.sort()
-        # print a_set
-        
-
-        return (result)
-
-        # print("PAST core VVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVVV")
-        # c_set = []
-        # a_set = []
-        # for c in past_core:
-        #     aux = self.get_person_info(c, new_startdate, self.filters.startdate, data_source)
-        #     c_set.append(aux["commits"])
-        # c_set.sort()
-        # print c_set
-        # print("PAST regular ***********************************************")
-        # for a in past_regular:
-        #     aux2 = self.get_person_info(a, new_startdate, self.filters.startdate, data_source)
-        #     a_set.append(aux2["commits"])
-        # a_set.sort()
-        # print a_set
+                person_data = people.get(person, {})
+                for f in fields:
+                    result[g][f].append(person_data.get(f))
+                result[g][field].append(contributions.get(person, 0))
+        return result
 
-    def _get_total_messages_query(self, from_date, to_date):
-        q = "SELECT "+\
-        "(select COUNT(*) from questions WHERE "+\
-        " added_at>="+ from_date +" AND added_at<" + to_date + ") + "+\
-        "(select COUNT(*) from comments WHERE "+\
-        " submitted_on>="+ from_date +" AND submitted_on<" + to_date + ") + "+\
-        "(SELECT COUNT(*) FROM answers WHERE "+\
-        " submitted_on>="+ from_date +" AND submitted_on<" + to_date + ")"+\
-        "as total;"
-        return(q)
-        
-    def _get_personal_messages_query(self, from_date, to_date):
-        q = "SELECT identifier, COUNT(*) as messages from ("+\
-        "(select p.identifier as identifier, q.added_at as date"+\
-        "  from questions q, people p"+\
-        "  where q.author_identifier=p.identifier)"+\
-        "union"+\
-        "(select p.identifier as identifier, a.submitted_on as date"+\
-        "  from answers a, people p"+\
-        "  where a.user_identifier=p.identifier)"+\
-        "union"+\
-        "(select p.identifier as identifier, c.submitted_on as date"+\
-        "  from comments c, people p"+\
-        "  where c.user_identifier=p.identifier)) t "+\
-        "WHERE date>="+ from_date +" AND date<" + to_date +" "+\
-        "group by identifier order by messages desc"
-        return(q)
-    
-    def _get_total_commits_query(self, from_date, to_date):
-        logging.info("Warning: current queries are counting merges")
-        # uncomment this query in order to remove the queries
-        # q = "select count(distinct(s.id)) as total "+\
-        #      "from scmlog s, people p, actions a "+\
-        #      "where s.author_id = p.id and "+\
-        #      "      p.email <> '%gerrit@%' and "+\
-        #      "      p.email <> '%jenkins@%' and "+\
-        #      "      s.id = a.commit_id and "+\
-        #      "      s.date>="+ from_date +" and "+\
-        #      "      s.date<="+ to_date+";"
-        q = "select count(distinct(s.id)) as total "+\
-             "from scmlog s, people p "+\
-             "where s.author_id = p.id and "+\
-             "      p.email <> '%gerrit@%' and "+\
-             "      p.email <> '%jenkins@%' and "+\
-             "      s.author_date>="+ from_date +" and "+\
-             "      s.author_date<"+ to_date+";"
-        return(q)
-
-    def _get_personal_commits_query(self, from_date, to_date):
-        logging.info("Warning: current queries are counting merges")
-        # uncomment this query in order to remove the queries
-        # q = " select pup.uuid as uid, p.name, p.email, "+\
-        #     "        (count(distinct(s.id))) as commits "+\
-        #     " from scmlog s, "+\
-        #     "      actions a, "+\
-        #     "      people_uidentities pup, "+\
-        #     "      people p "+\
-        #     " where s.id = a.commit_id and "+\
-        #     "       s.date>="+ from_date+" and "+\
-        #     "       s.date<="+ to_date+" and "+\
-        #     "       s.author_id = pup.people_id and "+\
-        #     "       s.author_id = p.id and "+\
-        #     "       p.email <> '%gerrit@%' and "+\
-        #     "       p.email <> '%jenkins@%' "+\
-        #     " group by pup.uuid "+\
-        #     " order by commits desc; "
-        # Database access: developer, %commits
-        q = " select pup.uuid as uid, p.name, p.email, "+\
-            "        (count(distinct(s.id))) as commits "+\
-            " from scmlog s, "+\
-            "      people_uidentities pup, "+\
-            "      people p "+\
-            " where s.author_date>="+ from_date+" and "+\
-            "       s.author_date<"+ to_date+" and "+\
-            "       s.author_id = pup.people_id and "+\
-            "       s.author_id = p.id and "+\
-            "       p.email <> '%gerrit@%' and "+\
-            "       p.email <> '%jenkins@%' "+\
-            " group by pup.uuid "+\
-            " order by commits desc; "
-        return(q)
-
-    def _activity_groups(self, from_date, to_date, data_source = None):
-        if data_source.get_name() != "scm" and \
-          data_source.get_name() != "qaforums": return None
-
-        groups = {}
-
-        # Init of structure to be returned
-        community = {}
-        community['core'] = None
-        community['regular'] = None
-        community['occasional'] = None
-
-        if data_source.get_name() == "scm":        
-            q = self._get_total_commits_query(from_date, to_date)
-            total = self.db.ExecuteQuery(q)
-            total_commits = float(total['total'])
-            q = self._get_personal_commits_query(from_date, to_date)
-            people = self.db.ExecuteQuery(q)
-            if not isinstance(people['commits'], list):
-                people['commits'] = [people['commits']]
-            # this is a list. Operate over the list
-            people['commits'] = [((commits / total_commits) * 100) for commits in people['commits']]
-        elif data_source.get_name() == "qaforums":
-            q = self._get_total_messages_query(from_date, to_date)
-            total = self.db.ExecuteQuery(q)
-            total_messages = float(total['total'])
-            q = self._get_personal_messages_query(from_date, to_date)
-            people = self.db.ExecuteQuery(q)
-            if not isinstance(people['messages'], list):
-                people['messages'] = [people['messages']]
-            # this is a list. Operate over the list
-            people['messages'] = [((messages / total_messages) * 100) for messages in people['messages']]
+    def result(self, data_source = None, offset_days = None):
+        if data_source.get_name() not in self.contributions_field: return None
 
-        #print(people)
+        type_analysis = self.filters.type_analysis
+        if not type_analysis: type_analysis = None
 
-        # Calculating number of core, regular and occasional developers
-        cont = 0
-        ncore = 0
-        core_f = True # flag
-        nregular = 0
-        regular_f = True  # flag
-        noccasional = 0
-        ndevs = 0
-        core_group = set()
-        reg_group = set()
-        occ_group = set()
-        array_cont = 0        
+        # All the windows are loaded in one query: past, current and the
+        # filters one for the exported contributions, if it is other one.
+        past, current = self._get_windows(offset_days)
+        windows = [past, current]
+        if current != [self.filters.startdate, self.filters.enddate]:
+            windows.append([self.filters.startdate, self.filters.enddate])
+        info_window = len(windows) - 1
 
-        # field used to browse people dict()
         if data_source.get_name() == "scm":
-            field = 'commits'
-            ident = 'uid'
-        elif data_source.get_name() == "qaforums":
-            field = 'messages'
-            ident = 'identifier'
-        
-        #for p in people:
-        for value in people[field]:
-            cont = cont + value
-            ndevs = ndevs + 1
-            dev_email = people[ident][array_cont]
-
-            if (core_f):
-                core_group.add(dev_email)
-                if (cont >= 80):
-                    core_f = False
-                    ncore = ndevs
-            elif (regular_f):
-                reg_group.add(dev_email)
-                if (cont >= 95):
-                    regular_f = False
-                    nregular = ndevs
-            else:
-                occ_group.add(dev_email)
-                
-
-            array_cont += 1
-
-        noccasional = ndevs - nregular
-        nregular = nregular - ncore
-
-        # print("core_group len = %s" % len(core_group))
-        # print("reg_group len = %s" % len(reg_group))
-        # print("occ_group len = %s" % len(occ_group))
-
-        # inserting values in variable
-        community['core'] = ncore
-        community['regular'] = nregular
-        community['occasional'] = noccasional
-
-        #print(community)
-
-        groups["core"]= core_group
-        groups["regular"]=reg_group
-        groups["occasional"]=occ_group
-        return(groups)
+            # TODO: current queries are counting merges
+            activity = self.db.GetOnionActivity(windows, type_analysis, merges = True)
+        else:
+            activity = self.db.GetOnionActivity(windows, type_analysis)
+        if activity is None: return None
+        onion = OnionModel(activity)
+
+        items = [None]
+        if type_analysis is not None and type_analysis[1] is None:
+            items = sorted(set(onion.get_items(0) + onion.get_items(1)))
+
+        transitions = dict((item, onion.get_transitions(0, 1, item)) for item in items)
+        people = set()
+        for groups in transitions.values():
+            for group in groups.values():
+                people.update(group)
+        people = self.db.GetOnionPeople(list(people))
+
+        # The contributions exported are the ones in the filters dates
+        result = {}
+        for item in items:
+            result[item] = self._get_groups_data(transitions[item],
+                                                 onion.get_contributions(info_window, item),
+                                                 people, data_source)
+        if items == [None]: return result[None]
+        return result
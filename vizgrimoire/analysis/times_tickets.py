@@ -42,41 +42,10 @@ class TimesTickets(Analyses):
                   'avg_' + alias : data['avg']}
         return result
 
-    def GetViewFirstCommentPerIssueQueryITS(self):
-        """Returns those issues without changes, only comments made
-           but others than the reporter."""
-
-        q = "CREATE OR REPLACE VIEW first_comment_per_issue AS " +\
-            "SELECT c.issue_id issue_id, MIN(c.submitted_on) date " +\
-            "FROM comments c, issues i " +\
-            "WHERE c.submitted_by <> i.submitted_by " +\
-            "AND c.issue_id = i.id " +\
-            "GROUP BY c.issue_id"
-        return q
-
-    # shared with top issues study
-    def GetViewFirstActionPerIssueQueryITS(self):
-        """Returns the first action of each issue.
-           Actions means changes or comments that were made by others than
-           the reporter."""
-
-        q = "CREATE OR REPLACE VIEW first_action_per_issue AS " +\
-            "SELECT issue_id, MIN(date) date " +\
-            "FROM first_change_and_comment_issues " +\
-            "GROUP BY issue_id"
-        return q
-
-    def CreateViews(self):
-        q = self.GetViewFirstCommentPerIssueQueryITS()
-        self.db.ExecuteViewQuery(q)
-        q = self.GetViewFirstActionPerIssueQueryITS()
-        self.db.ExecuteViewQuery(q)
-
-
     def GetTimeToFirstAction (self, period, startdate, enddate, condition, alias=None) :
-        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, fa.date)/(24*3600) AS %(alias)s
-               FROM first_action_per_issue fa, issues i
-               WHERE i.id = fa.issue_id
+        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, tl.first_action)/(24*3600) AS %(alias)s
+               FROM %(timeline)s tl, issues i
+               WHERE i.id = tl.issue_id AND tl.first_action IS NOT NULL
                AND submitted_on >= %(startdate)s AND submitted_on < %(enddate)s """
 
         if condition:
@@ -85,6 +54,7 @@ class TimesTickets(Analyses):
         q += """ ORDER BY date """
 
         params = {'alias' : alias or 'time_to_action',
+                  'timeline' : self.timeline,
                   'startdate' : startdate,
                   'enddate' : enddate}
         query = q % params
@@ -93,9 +63,9 @@ class TimesTickets(Analyses):
         return (data)
 
     def GetTimeToFirstComment (self, period, startdate, enddate, condition, alias=None) :
-        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, fc.date)/(24*3600) AS %(alias)s
-               FROM first_comment_per_issue fc, issues i
-               WHERE i.id = fc.issue_id
+        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, tl.first_comment)/(24*3600) AS %(alias)s
+               FROM %(timeline)s tl, issues i
+               WHERE i.id = tl.issue_id AND tl.first_comment IS NOT NULL
                AND submitted_on >= %(startdate)s AND submitted_on < %(enddate)s """
 
         if condition:
@@ -104,6 +74,7 @@ class TimesTickets(Analyses):
         q += """ ORDER BY date """
 
         params = {'alias' : alias or 'time_to_comment',
+                  'timeline' : self.timeline,
                   'startdate' : startdate,
                   'enddate' : enddate}
         query = q % params
@@ -112,13 +83,10 @@ class TimesTickets(Analyses):
         return (data)
 
     def GetTimeClosed (self, period, startdate, enddate, closed_condition, ext_condition=None, alias=None):
-        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, ch.changed_on)/(24*3600) AS %(alias)s
-               FROM issues i, changes ch
-               WHERE i.id = ch.issue_id
-               AND submitted_on >= %(startdate)s AND submitted_on < %(enddate)s
-               AND """
-
-        q += closed_condition
+        q = """SELECT submitted_on date, TIMESTAMPDIFF(SECOND, submitted_on, tl.closed)/(24*3600) AS %(alias)s
+               FROM issues i, %(timeline)s tl
+               WHERE i.id = tl.issue_id AND tl.closed IS NOT NULL
+               AND submitted_on >= %(startdate)s AND submitted_on < %(enddate)s """
 
         if ext_condition:
             q += ext_condition
@@ -126,6 +94,7 @@ class TimesTickets(Analyses):
         q += """ ORDER BY date """
 
         params = {'alias' : alias or 'time_opened',
+                  'timeline' : self.db.GetIssuesTimeline(closed_condition),
                   'startdate' : startdate,
                   'enddate' : enddate}
         query = q % params
@@ -134,21 +103,18 @@ class TimesTickets(Analyses):
         return (data)
 
     def GetIssuesOpenedAtQuery (self, startdate, enddate, closed_condition, ext_condition=None):
-        q = """SELECT issue_id
-               FROM issues_log_bugzilla log,
-                 (SELECT MAX(id) id
-                  FROM issues_log_bugzilla
-                  WHERE date >= %(startdate)s AND date < %(enddate)s
-                  GROUP BY issue_id) g
-               WHERE log.id = g.id  AND NOT """
-        q += closed_condition
+        """ Issues in the backlog at enddate: submitted and not closed yet """
+        q = """SELECT i.id issue_id
+               FROM issues i, %(timeline)s tl
+               WHERE i.id = tl.issue_id AND i.submitted_on < %(enddate)s
+               AND (tl.closed IS NULL OR tl.closed >= %(enddate)s) """
 
         if ext_condition:
             q += ext_condition
 
         q += """ ORDER BY issue_id """
 
-        params = {'startdate' : startdate,
+        params = {'timeline' : self.db.GetIssuesTimeline(closed_condition),
                   'enddate' : enddate}
         query = q % params
         return query
@@ -158,12 +124,13 @@ class TimesTickets(Analyses):
                FROM issues i, ("""
         q += self.GetIssuesOpenedAtQuery(startdate, enddate, closed_condition, ext_condition)
         q += """ ) log
-                WHERE i.id = log.issue_id AND i.id NOT IN
-                (SELECT issue_id
-                 FROM first_action_per_issue
-                 WHERE date >= %(startdate)s AND date < %(enddate)s)"""
+                , %(timeline)s tl
+                WHERE i.id = log.issue_id AND tl.issue_id = i.id
+                AND (tl.first_action IS NULL OR tl.first_action < %(startdate)s
+                     OR tl.first_action >= %(enddate)s)"""
 
         params = {'alias' : alias or 'time_opened',
+                  'timeline' : self.timeline,
                   'startdate' : startdate,
                   'enddate' : enddate}
         query = q % params
@@ -176,12 +143,13 @@ class TimesTickets(Analyses):
                FROM issues i, ("""
         q += self.GetIssuesOpenedAtQuery(startdate, enddate, closed_condition, ext_condition)
         q += """ ) log
-                WHERE i.id = log.issue_id AND i.id NOT IN
-                (SELECT issue_id
-                 FROM first_comment_per_issue
-                 WHERE date >= %(startdate)s AND date < %(enddate)s)"""
+                , %(timeline)s tl
+                WHERE i.id = log.issue_id AND tl.issue_id = i.id
+                AND (tl.first_comment IS NULL OR tl.first_comment < %(startdate)s
+                     OR tl.first_comment >= %(enddate)s)"""
 
         params = {'alias' : alias or 'time_opened',
+                  'timeline' : self.timeline,
                   'startdate' : startdate,
                   'enddate' : enddate}
         query = q % params
@@ -217,17 +185,15 @@ class TimesTickets(Analyses):
         return evol
 
     def ticketsTimeOpened(self, period, startdate, enddate, identities_db, backend):
-        log_close_condition_mediawiki = "(status = 'RESOLVED' OR status = 'CLOSED' OR status = 'VERIFIED' OR priority = 'Lowest')"
-
         evol = {}
 
         for result_type in ['action', 'comment', 'open']:
-            time_opened = self.ticketsTimeOpenedByType(period, startdate, enddate, log_close_condition_mediawiki, result_type)
+            time_opened = self.ticketsTimeOpenedByType(period, startdate, enddate, backend.closed_condition, result_type)
 
-            time_opened_priority = self.ticketsTimeOpenedByField(period, startdate, enddate, log_close_condition_mediawiki,
+            time_opened_priority = self.ticketsTimeOpenedByField(period, startdate, enddate, backend.closed_condition,
                                                                  'priority', backend.priority, result_type)
 
-            time_opened_severity = self.ticketsTimeOpenedByField(period, startdate, enddate, log_close_condition_mediawiki,
+            time_opened_severity = self.ticketsTimeOpenedByField(period, startdate, enddate, backend.closed_condition,
                                                                  'type', backend.severity, result_type)
 
             evol = dict(evol.items() + time_opened.items() + time_opened_priority.items() + time_opened_severity.items())
@@ -285,7 +251,7 @@ class TimesTickets(Analyses):
         return time_opened
 
     def ticketsTimeOpenedByField(self, period, startdate, enddate, closed_condition, field, values_set, result_type):
-        condition = "AND " + field + " = '%s'"
+        condition = "AND i." + field + " = '%s'"
         evol = {}
 
         # Build a set of dates
@@ -374,7 +340,7 @@ class TimesTickets(Analyses):
         from vizgrimoire.ITS import ITS
         backend = ITS._get_backend()
 
-        self.CreateViews()
+        self.timeline = self.db.GetIssuesTimeline(backend.closed_condition)
         time_to_response = self.ticketsTimeToResponse(period, startdate, enddate, idb, backend)
         time_from_opened = self.ticketsTimeOpened(period, startdate, enddate, idb, backend)
         return dict(time_to_response.items() + time_from_opened.items())
@@ -35,12 +35,12 @@ from grimoirelib_alch.family.activity_timezones import (
     )
 
 from vizgrimoire.analysis.analyses import Analyses
+from vizgrimoire.GrimoireUtils import write_json_file
 from vizgrimoire.SCM import SCM
 from vizgrimoire.MLS import MLS
 
 from datetime import datetime, timedelta
 from jsonpickle import encode, set_encoder_options
-import codecs
 import logging
 
 def produce_json (filename, data, compact = True):
@@ -57,8 +57,7 @@ def produce_json (filename, data, compact = True):
                             ensure_ascii=False,
                             encoding="utf8")
     data_json = encode(data, unpicklable=False)
-    with codecs.open(filename, "w", "utf-8") as file:
-        file.write(data_json)
+    write_json_file(data_json, filename)
 
 class Timezone(Analyses):
     """Clase for calculating the Timezone analysis.
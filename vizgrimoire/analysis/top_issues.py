@@ -33,65 +33,14 @@ class TopIssues(Analyses):
     name = "Top Issues"
     desc = "Top issues by age"
 
-    def GetViewFirstChangeAndCommentQueryITS(self):
-        """Returns the first change and comment of each issue done by others
-        than the reporter"""
-
-        q = "CREATE OR REPLACE VIEW first_change_and_comment_issues AS " +\
-            "SELECT c.issue_id issue_id, MIN(c.changed_on) date " +\
-            "FROM changes c, issues i " +\
-            "WHERE changed_by <> submitted_by AND i.id = c.issue_id " +\
-            "GROUP BY c.issue_id " +\
-            "UNION " + \
-            "SELECT c.issue_id issue_id, MIN(c.submitted_on) date " +\
-            "FROM comments c, issues i " +\
-            "WHERE c.submitted_by <> i.submitted_by AND c.issue_id = i.id " +\
-            "GROUP BY c.issue_id"
-        return q
-
-
-    def GetViewFirstActionPerIssueQueryITS(self):
-        """Returns the first action of each issue.
-           Actions means changes or comments that were made by others than
-           the reporter."""
-
-        q = "CREATE OR REPLACE VIEW first_action_per_issue AS " +\
-            "SELECT issue_id, MIN(date) date " +\
-            "FROM first_change_and_comment_issues " +\
-            "GROUP BY issue_id"
-        return q
-
-    def GetViewLastCommentPerIssueQueryITS(self):
-        """Returns those issues without changes, only comments made
-           but others than the reporter."""
-
-        q = "CREATE OR REPLACE VIEW last_comment_per_issue AS " +\
-            "SELECT c.issue_id issue_id, MAX(c.submitted_on) date " +\
-            "FROM comments c, issues i " +\
-            "WHERE c.submitted_by <> i.submitted_by " +\
-            "AND c.issue_id = i.id " +\
-            "GROUP BY c.issue_id"
-        return q
-
-    def CreateViews(self):
-        q = self.GetViewFirstChangeAndCommentQueryITS()
-        self.db.ExecuteViewQuery(q)
-        q = self.GetViewLastCommentPerIssueQueryITS()
-        self.db.ExecuteViewQuery(q)
-        q = self.GetViewFirstActionPerIssueQueryITS()
-        self.db.ExecuteViewQuery(q)
-
     def GetTopIssuesWithoutAction(self, startdate, enddate, closed_condition, limit):
         q = "SELECT issue_id, TIMESTAMPDIFF(SECOND, date, NOW())/(24*3600) AS time " +\
             "FROM ( " +\
-            "  SELECT issue AS issue_id, submitted_on AS date " +\
-            "  FROM issues " +\
-            "  WHERE id NOT IN ( " +\
-            "    SELECT issue_id " +\
-            "    FROM first_action_per_issue " +\
-            "  ) " +\
+            "  SELECT i.issue AS issue_id, i.submitted_on AS date " +\
+            "  FROM issues i, " + self.timeline + " tl " +\
+            "  WHERE tl.issue_id = i.id AND tl.first_action IS NULL " +\
             "  AND NOT ( " + closed_condition + ") " +\
-            "  AND submitted_on >= " + startdate + " AND submitted_on < " + enddate +\
+            "  AND i.submitted_on >= " + startdate + " AND i.submitted_on < " + enddate +\
             ") no_actions " +\
             "GROUP BY issue_id " +\
             "ORDER BY time DESC,issue_id " +\
@@ -103,14 +52,11 @@ class TopIssues(Analyses):
     def GetTopIssuesWithoutComment(self, startdate, enddate, closed_condition, limit):
         q = "SELECT issue_id, TIMESTAMPDIFF(SECOND, date, NOW())/(24*3600) AS time " +\
             "FROM ( " +\
-            "  SELECT issue AS issue_id, submitted_on AS date " +\
-            "  FROM issues " +\
-            "  WHERE id NOT IN ( " +\
-            "    SELECT issue_id " +\
-            "    FROM last_comment_per_issue " +\
-            "  ) " +\
+            "  SELECT i.issue AS issue_id, i.submitted_on AS date " +\
+            "  FROM issues i, " + self.timeline + " tl " +\
+            "  WHERE tl.issue_id = i.id AND tl.last_comment IS NULL " +\
             "  AND NOT ( " + closed_condition + ") " +\
-            "  AND submitted_on >= " + startdate + " AND submitted_on < " + enddate +\
+            "  AND i.submitted_on >= " + startdate + " AND i.submitted_on < " + enddate +\
             ") no_comments " +\
             "GROUP BY issue_id " +\
             "ORDER BY time DESC, issue_id " +\
@@ -178,7 +124,8 @@ class TopIssues(Analyses):
         startdate = self.filters.startdate
         enddate = self.filters.enddate
 
-        self.CreateViews()
+        # Issues without actions or comments from the issues timeline
+        self.timeline = self.db.GetIssuesTimeline(data_source._get_backend().closed_condition)
 
         issues_details = self.GetIssuesDetails()
 
@@ -24,16 +24,24 @@
 """ DataSource offers the API to get aggregated, evolutionary and top data with filter 
     support for Grimoire supported data sources """ 
 
-import logging, os
-from vizgrimoire.metrics.query_builder import DSQuery, ITSQuery, MLSQuery
+import copy, logging, os
 from vizgrimoire.GrimoireUtils import createJSON
 from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.batches import ColumnsWriter, get_batches
+from vizgrimoire.metrics.executor import QueryExecutor
+from vizgrimoire.metrics.frame import ReportFrame
+from vizgrimoire.metrics.lifecycle import LifecycleIndex
+from vizgrimoire.metrics.query_builder import DSQuery, synchronized
 from vizgrimoire.filter import Filter
 
 class DataSource(object):
     _bots = []
     _metrics_set = []
     _global_filter = None
+    _cube_data = {} # filters data computed in cube mode, pending to be used
+    _sketch_stores = {} # distinct people sketches for each data source
+    _lifecycle_indexes = {} # people lifecycle index for each data source
+    _metrics_pending = {} # metrics not created yet: ds -> [(id, factory)]
 
     @staticmethod
     def get_name():
@@ -198,14 +206,190 @@ class DataSource(object):
         """Get items with a summary for the data source available for the filter"""
         raise NotImplementedError
 
-    @staticmethod
-    def create_filter_report(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        """Create all files related to all filters in all data sources"""
-        raise NotImplementedError
+    @classmethod
+    def get_group_by_filters(DS):
+        """Filters supported in GROUP BY queries (all the items at once)"""
+        return [name.replace(MetricFilters.DELIMITER, "+")
+                for name in DS.get_query_builder().group_by_filters]
+
+    @classmethod
+    def _get_filter_items_names(DS, filter_, startdate, enddate, identities_db):
+        """Names of the items of a filter, or None if not available"""
+        items_batch = DSQuery.items_batch
+        if items_batch is not None and items_batch[0] == filter_.get_name():
+            # Filter report processed in batches of items
+            return list(items_batch[1])
+        items = DS.get_filter_items(filter_, startdate, enddate, identities_db)
+        if items is None: return None
+        if isinstance(items, dict): items = items.pop('name')
+        if not isinstance(items, list): items = [items]
+        return items
+
+    @classmethod
+    def create_filter_report_all(DS, filter_, period, startdate, enddate, destdir, npeople, identities_db):
+        """Create all files related to all filters in all data sources using GROUP BY queries
+
+        Returns the aggregated and evolutionary data for all the items, or
+        None if the filter is not supported in the data source.
+        """
+        check = False # activate to debug issues
+
+        if filter_.get_name() not in DS.get_group_by_filters():
+            logging.info(DS.get_name() + " does not support " + filter_.get_name() + " filter")
+            return None
+
+        batch_size = DS.get_filter_batch_size(filter_)
+        if batch_size is not None:
+            return DS._create_filter_report_all_batches(filter_, period, startdate, enddate,
+                                                        destdir, identities_db, batch_size)
+
+        # Change filter to GrimoireLib notation
+        filter_name = filter_.get_name().replace("+", MetricFilters.DELIMITER)
+        filter_all = Filter(filter_name, None)
+
+        agg_all = DS.get_agg_data(period, startdate, enddate, identities_db, filter_all)
+        fn = os.path.join(destdir, filter_.get_static_filename_all(DS()))
+        createJSON(agg_all, fn)
+        DS.convert_all_to_single(agg_all, filter_, destdir, False, period)
+
+        evol_all = DS.get_evolutionary_data(period, startdate, enddate, identities_db, filter_all)
+        fn = os.path.join(destdir, filter_.get_evolutionary_filename_all(DS()))
+        createJSON(evol_all, fn)
+        DS.convert_all_to_single(evol_all, filter_, destdir, True, period)
+
+        # check is only done for basic filters. Composed should work if basic does.
+        if check and not MetricFilters.DELIMITER in filter_name:
+            DS._check_report_all_data(evol_all, filter_, startdate, enddate,
+                                      identities_db, True, period)
+            DS._check_report_all_data(agg_all, filter_, startdate, enddate,
+                                      identities_db, False, period)
+
+        return agg_all, evol_all
+
+    @classmethod
+    def create_filter_report(DS, filter_, period, startdate, enddate, destdir, npeople, identities_db):
+        """Create the files of a filter computing the metrics item by item
+
+        Used for the filters without GROUP BY queries in the data source.
+        The items are the ones configured in the report or, if none, the
+        ones of get_filter_items. Returns the items processed, or None if
+        the filter items are not available.
+        """
+        from vizgrimoire.report import Report
+        items = Report.get_items()
+        if items is None:
+            items = DS._get_filter_items_names(filter_, startdate, enddate, identities_db)
+            if items is None: return None
+        if not isinstance(items, list): items = [items]
+
+        items_list = {'name': []}
+        for item in items:
+            logging.info(item)
+            filter_item = Filter(filter_.get_name(), item)
+
+            evol_data = DS.get_evolutionary_data(period, startdate, enddate,
+                                                 identities_db, filter_item)
+            fn = os.path.join(destdir, filter_item.get_evolutionary_filename(DS()))
+            createJSON(evol_data, fn)
+
+            agg = DS.get_agg_data(period, startdate, enddate, identities_db, filter_item)
+            fn = os.path.join(destdir, filter_item.get_static_filename(DS()))
+            createJSON(agg, fn)
+
+            items_list['name'].append(DS._escape_item_name(item))
+            for field in DS.get_items_list_fields():
+                if field == 'name' or field not in agg: continue
+                if field not in items_list: items_list[field] = []
+                items_list[field].append(agg[field])
+
+        fn = os.path.join(destdir, filter_.get_filename(DS()))
+        createJSON(items_list, fn)
+
+        return items
+
+    @classmethod
+    def get_filter_batch_size(DS, filter_):
+        """Number of items per batch if the filter report is processed in batches
+
+        Configured with <filter>_batch = <size> in the [r] section, i.e.
+        people2_batch = 10000. None if the items are processed all at once.
+        """
+        from vizgrimoire.report import Report
+        config = Report.get_config()
+        if config is None: return None
+        option = filter_.get_name() + "_batch"
+        if option not in config['r']: return None
+        return int(config['r'][option])
+
+    @classmethod
+    def _create_filter_report_all_batches(DS, filter_, period, startdate, enddate,
+                                          destdir, identities_db, batch_size):
+        """Create the files of create_filter_report_all processing the items in batches
+
+        Only the data of a batch of items is kept in memory. Returns the
+        data of the items list file as the aggregated data and None as the
+        evolutionary data, or None if the filter items are not available.
+        """
+        from vizgrimoire.GrimoireUtils import check_array_value, completePeriodIds
+        from vizgrimoire.report import Report
+
+        filter_name = filter_.get_name().replace("+", MetricFilters.DELIMITER)
+        filter_all = Filter(filter_name, None)
+        items = DS._get_filter_items_names(filter_all, startdate, enddate, identities_db)
+        if items is None: return None
+
+        # Items without a metric in a batch get 0 (as in fill_and_order_items)
+        ts_start, ts_end = startdate, enddate
+        if DS.get_name()+"_startdate" in Report.get_config()['r']:
+            ts_start = Report.get_config()['r'][DS.get_name()+"_startdate"]
+        if DS.get_name()+"_enddate" in Report.get_config()['r']:
+            ts_end = Report.get_config()['r'][DS.get_name()+"_enddate"]
+        zero_ts = completePeriodIds({'zero':[], period:[]}, period, ts_start, ts_end)['zero']
+
+        agg_writer = ColumnsWriter(os.path.join(destdir, filter_.get_static_filename_all(DS())))
+        evol_writer = ColumnsWriter(os.path.join(destdir,
+                                                 filter_.get_evolutionary_filename_all(DS())),
+                                    zero_ts)
+        items_list = {}
+        batches = get_batches(items, batch_size)
+        try:
+            for (pos, batch) in enumerate(batches):
+                logging.info(DS.get_name() + " " + filter_.get_name() + " batch " +
+                             str(pos + 1) + "/" + str(len(batches)))
+                # Global hook read by BuildQuery in all the query builders
+                DSQuery.items_batch = (filter_name, batch)
+
+                agg = DS.get_agg_data(period, startdate, enddate, identities_db, filter_all)
+                agg_writer.add(agg, len(batch))
+                DS.convert_all_to_single(agg, filter_, destdir, False, period,
+                                         items_list = False)
+                for field in DS.get_items_list_fields():
+                    if field in agg:
+                        items_list.setdefault(field, []).extend(check_array_value(agg[field]))
+                agg = None
+
+                evol = DS.get_evolutionary_data(period, startdate, enddate, identities_db,
+                                                filter_all)
+                evol_writer.add(evol, len(batch),
+                                [period] + ReportFrame.ts_fields)
+                DS.convert_all_to_single(evol, filter_, destdir, True, period)
+                evol = None
+        except:
+            agg_writer.remove()
+            evol_writer.remove()
+            raise
+        finally:
+            DSQuery.items_batch = None
+        agg_writer.close()
+        evol_writer.close()
+        createJSON(items_list, os.path.join(destdir, filter_.get_filename(DS)))
+
+        return items_list, None
 
     @staticmethod
-    def create_filter_report_all(filter_, period, startdate, enddate, destdir, npeople, identities_db):
-        """Create all files related to all filters in all data sources using GROUP BY queries"""
+    def _check_report_all_data(data, filter_, startdate, enddate, idb,
+                               evol = False, period = None):
+        """Compare the GROUP BY data with the data got for each item"""
         raise NotImplementedError
 
     @staticmethod
@@ -291,19 +475,37 @@ class DataSource(object):
     @staticmethod
     def get_metrics_set(ds):
         """Return all metrics objects available"""
+        DataSource._create_pending_metrics(ds)
         return ds._metrics_set
 
     @staticmethod
     def set_metrics_set(ds, metrics_set):
         """Set all metrics objects available"""
+        DataSource._metrics_pending.pop(ds, None)
         ds._metrics_set = metrics_set
 
     @staticmethod
     def add_metrics(metrics, ds):
         ds._metrics_set.append(metrics)
 
+    @staticmethod
+    def add_metrics_lazy(id, factory, ds):
+        """Add a metrics created with factory() the first time it is used"""
+        if ds not in DataSource._metrics_pending:
+            DataSource._metrics_pending[ds] = []
+        DataSource._metrics_pending[ds].append((id, factory))
+
+    @staticmethod
+    def _create_pending_metrics(ds, id = None):
+        """Create the pending metrics (only the id ones if id is not None)"""
+        pending = DataSource._metrics_pending.get(ds, [])
+        for item in [item for item in pending if id is None or item[0] == id]:
+            pending.remove(item)
+            ds.add_metrics(item[1](), ds)
+
     @staticmethod
     def get_metrics(id, ds):
+        DataSource._create_pending_metrics(ds, id)
         metrics = None
         for item in ds._metrics_set:
             if item.id == id:
@@ -348,15 +550,24 @@ class DataSource(object):
 
     @classmethod
     def get_metrics_data(DS, period, startdate, enddate, identities_db,
-                         filter_ = None, evol = False):
-        """ Get basic data from all core metrics """
-        from vizgrimoire.GrimoireUtils import fill_and_order_items
-        from vizgrimoire.ITS import ITS
-        from vizgrimoire.MLS import MLS
+                         filter_ = None, evol = False, cube = None):
+        """ Get basic data from all core metrics
+
+            If cube is a list of filters, the data for all the items of all
+            these filters is computed together (see get_metrics_data_cube)
+            and a dict with the data for each filter name is returned.
+        """
+        if cube is not None:
+            return DS.get_metrics_data_cube(period, startdate, enddate,
+                                            identities_db, cube, evol)
+        if filter_ is not None and filter_.get_item() is None:
+            key = DS._get_cube_key(filter_.get_name(), evol, period, startdate, enddate)
+            if key in DataSource._cube_data:
+                logging.info("Using cube data for " + filter_.get_name())
+                return DataSource._cube_data.pop(key)
+
         data = {}
-        dsquery = DSQuery
-        if DS == ITS: dsquery = ITSQuery
-        if DS == MLS: dsquery = MLSQuery
+        dsquery = DS.get_query_builder()
 
         from vizgrimoire.report import Report
         automator = Report.get_config()
@@ -383,17 +594,16 @@ class DataSource(object):
 
         if type_analysis and type_analysis[1] is None:
             # We need the items for filling later values in group by queries
-            items = DS.get_filter_items(filter_, startdate, enddate, identities_db)
+            items = DS._get_filter_items_names(filter_, startdate, enddate, identities_db)
             if items is None: return data
-            items = items.pop('name')
+            frame = ReportFrame(items)
+        else:
+            frame = ReportFrame()
 
         if DS.get_name()+"_startdate" in Report.get_config()['r']:
             startdate = Report.get_config()['r'][DS.get_name()+"_startdate"]
         if DS.get_name()+"_enddate" in Report.get_config()['r']:
             enddate = Report.get_config()['r'][DS.get_name()+"_enddate"]
-        # TODO: the hardcoded 10 should be removed, and use instead the npeople provided
-        #       in the config file.
-        mfilter = MetricFilters(period, startdate, enddate, type_analysis, 10, people_out, None)
         metrics_reports = DS.get_metrics_core_reports()
         all_metrics = DS.get_metrics_set(DS)
 
@@ -404,15 +614,59 @@ class DataSource(object):
             for r in metrics_reports:
                 if r in reports_on: metrics_on += [r]
 
+        metrics_trends = []
+        if not evol:
+            # Tendencies
+            metrics_trends = DS.get_metrics_core_trends()
+
+            automator_metrics = DS.get_name()+"_metrics_trends"
+            if automator_metrics in automator['r']:
+                metrics_trends = automator['r'][automator_metrics].split(",")
+        trends_days = [7,30,365]
+
+        def get_metric_data(item, values, trends):
+            """ Values and trends of a metric, run by the query executor """
+            # A copy of the metric with its own filters, so the metrics can
+            # be computed at the same time
+            metric = copy.copy(item)
+            # TODO: the hardcoded 10 should be removed, and use instead the npeople provided
+            #       in the config file.
+            metric.filters = MetricFilters(period, startdate, enddate, type_analysis,
+                                           10, people_out, None)
+            metric.filters.global_filter = item.filters.global_filter
+            metric.filters.set_closed_condition(item.filters.closed_condition)
+            mvalue = None
+            if values:
+                if evol: mvalue = metric.get_ts()
+                else:    mvalue = metric.get_agg()
+            trends_data = []
+            for days in trends:
+                trends_data.append(metric.get_trends(enddate, days))
+            return mvalue, trends_data
+
+        tasks_metrics = []
+        tasks = []
         for item in all_metrics:
-            # print item
-            if item.id not in metrics_on: continue
-            mfilter_orig = item.filters
-            mfilter.global_filter = mfilter_orig.global_filter
-            mfilter.set_closed_condition(mfilter_orig.closed_condition)
-            item.filters = mfilter
-            if evol: mvalue = item.get_ts()
-            else:    mvalue = item.get_agg()
+            values = item.id in metrics_on
+            trends = []
+            if item.id in metrics_trends: trends = trends_days
+            if not values and len(trends) == 0: continue
+            tasks_metrics.append((item, values, len(trends) > 0))
+            tasks.append((DS.get_name() + " " + item.id,
+                          lambda item=item, values=values, trends=trends:
+                              get_metric_data(item, values, trends)))
+        if DS.get_query_workers() > 1:
+            for dbcon in set(item.db for item in all_metrics):
+                DS.refresh_run_tables(dbcon, type_analysis, people_out)
+        executor = QueryExecutor(DS.get_query_workers(), dsquery.init_worker,
+                                 dsquery.close_worker)
+        results = executor.run(tasks)
+
+        id_field = None
+        for pos in range(len(tasks)):
+            (item, values, trends) = tasks_metrics[pos]
+            if not values or results[pos][1] is not None: continue
+            mvalue = results[pos][0][0]
 
             if type_analysis and type_analysis[1] is None and mvalue:
                 logging.info(item.id)
@@ -424,11 +678,9 @@ class DataSource(object):
                         break
                 if id_field is None:
                     id_field = dsquery.get_group_field_alias(type_analysis[0])
-                mvalue = fill_and_order_items(items, mvalue, id_field,
-                                              evol, period, startdate, enddate)
-            data = dict(data.items() + mvalue.items())
-
-            item.filters = mfilter_orig
+                frame.add_items(mvalue, id_field, evol, period, startdate, enddate)
+            else:
+                frame.add(mvalue)
 
         if not evol:
             init_date = DS.get_date_init(startdate, enddate, identities_db, type_analysis)
@@ -437,13 +689,155 @@ class DataSource(object):
             if type_analysis and type_analysis[1] is None:
                 if id_field is None:
                     id_field = dsquery.get_group_field_alias(type_analysis[0])
-                init_date = fill_and_order_items(items, init_date, id_field,
-                                                 evol, period, startdate, enddate)
-                end_date = fill_and_order_items(items, end_date, id_field,
-                                                evol, period, startdate, enddate)
-            if init_date is None: init_date = {}
-            if end_date is None: end_date = {}
-            data = dict(data.items() + init_date.items() + end_date.items())
+                frame.add_items(init_date, id_field, evol, period, startdate, enddate)
+                frame.add_items(end_date, id_field, evol, period, startdate, enddate)
+            else:
+                frame.add(init_date)
+                frame.add(end_date)
+
+            for i in range(len(trends_days)):
+                for pos in range(len(tasks)):
+                    (item, values, trends) = tasks_metrics[pos]
+                    if not trends or results[pos][1] is not None: continue
+                    period_data = results[pos][0][1][i]
+
+                    if type_analysis and type_analysis[1] is None:
+                        group_field = dsquery.get_group_field_alias(type_analysis[0])
+                        frame.add_items(period_data, group_field)
+                    else:
+                        frame.add(period_data)
+
+        return frame.to_dict()
+
+    @classmethod
+    def refresh_run_tables(DS, dbcon, type_analysis, people_out):
+        """ Refresh the per run tables before computing the metrics in workers
+
+        The people lifecycle index used by the global metrics is also
+        built here, so the workers only read it.
+        """
+        dbcon.refresh_run_tables(type_analysis, people_out)
+        if type_analysis is None and getattr(dbcon, "lifecycle_source", None) is not None:
+            DS.get_lifecycle_index(dbcon)
+
+    @classmethod
+    def get_query_workers(DS):
+        """ Number of threads running the metrics of the data source at once
+
+        query_workers in the [r] section for all the data sources, and
+        <data source>_query_workers (i.e. scm_query_workers) for the
+        database of one of them. 1 (no threads) by default.
+        """
+        from vizgrimoire.report import Report
+        config = Report.get_config()
+        if config is None: return 1
+        for option in [DS.get_name() + "_query_workers", "query_workers"]:
+            if option in config['r']: return int(config['r'][option])
+        return 1
+
+    @staticmethod
+    def cube_supported():
+        """ Data for the filters is computed with get_metrics_data """
+        return True
+
+    @classmethod
+    def _get_cube_key(DS, filter_name, evol, period, startdate, enddate):
+        filter_name = filter_name.replace("+", MetricFilters.DELIMITER)
+        return (DS.get_name(), filter_name, evol, period, startdate, enddate)
+
+    @classmethod
+    def get_metrics_data_cube(DS, period, startdate, enddate, identities_db,
+                              filters, evol = False):
+        """ Get data from all core metrics for all items of several filters
+
+            Each metric is computed for all the filters with just one query
+            joining the GROUP BY queries of the filters. Metrics that are not
+            built from one SQL query (i.e. dates of activity) fall back to
+            the GROUP BY query of each filter.
+
+            Returns a dict with the data for each filter name, the same that
+            get_metrics_data returns for the filter with all its items.
+        """
+        from vizgrimoire.report import Report
+        automator = Report.get_config()
+
+        if evol:
+            metrics_on = DS.get_metrics_core_ts()
+            automator_metrics = DS.get_name()+"_metrics_ts"
+        else:
+            metrics_on = DS.get_metrics_core_agg()
+            automator_metrics = DS.get_name()+"_metrics_agg"
+
+        if automator_metrics in automator['r']:
+            metrics_on = automator['r'][automator_metrics].split(",")
+
+        people_out = []
+        if "people_out" in automator['r']:
+            people_out = automator['r']["people_out"].split(",")
+
+        # We need the items for filling later values in group by queries
+        items = {}
+        for filter_ in filters:
+            filter_name = filter_.get_name().replace("+", MetricFilters.DELIMITER)
+            filter_items = DS._get_filter_items_names(Filter(filter_name), startdate,
+                                                      enddate, identities_db)
+            if filter_items is None: continue
+            items[filter_name] = filter_items
+        filter_names = items.keys()
+        frames = {}
+        for filter_name in filter_names: frames[filter_name] = ReportFrame(items[filter_name])
+        if len(filter_names) == 0: return {}
+
+        if DS.get_name()+"_startdate" in automator['r']:
+            startdate = automator['r'][DS.get_name()+"_startdate"]
+        if DS.get_name()+"_enddate" in automator['r']:
+            enddate = automator['r'][DS.get_name()+"_enddate"]
+
+        mfilter = MetricFilters(period, startdate, enddate, None, 10, people_out, None)
+        all_metrics = DS.get_metrics_set(DS)
+
+        def add_items_data(filter_name, mvalue, evol):
+            id_field = None
+            # Support for combined filters
+            for idf in mvalue.keys():
+                if "CONCAT(" in idf:
+                    id_field = idf
+                    break
+            if id_field is None:
+                id_field = DS.get_query_builder().get_group_field_alias(filter_name)
+            frames[filter_name].add_items(mvalue, id_field, evol, period,
+                                          startdate, enddate)
+
+        for item in all_metrics:
+            if item.id not in metrics_on: continue
+            mfilter_orig = item.filters
+            mfilter.global_filter = mfilter_orig.global_filter
+            mfilter.set_closed_condition(mfilter_orig.closed_condition)
+            item.filters = mfilter
+            if item.is_cube_supported(evol):
+                logging.info(item.id + " (cube)")
+                cube = item.get_cube(filter_names, evol)
+            else:
+                logging.info(item.id)
+                cube = {}
+                for filter_name in filter_names:
+                    mfilter.type_analysis = [filter_name, None]
+                    if evol: cube[filter_name] = item.get_ts()
+                    else:    cube[filter_name] = item.get_agg()
+                mfilter.type_analysis = None
+            item.filters = mfilter_orig
+
+            for filter_name in filter_names:
+                if cube[filter_name]:
+                    add_items_data(filter_name, cube[filter_name], evol)
+
+        if not evol:
+            for filter_name in filter_names:
+                type_analysis = [filter_name, None]
+                init_date = DS.get_date_init(startdate, enddate, identities_db, type_analysis)
+                end_date = DS.get_date_end(startdate, enddate, identities_db, type_analysis)
+                if init_date is not None: add_items_data(filter_name, init_date, evol)
+                if end_date is not None: add_items_data(filter_name, end_date, evol)
 
             # Tendencies
             metrics_trends = DS.get_metrics_core_trends()
@@ -457,16 +851,89 @@ class DataSource(object):
                     if item.id not in metrics_trends: continue
                     mfilter_orig = item.filters
                     item.filters = mfilter
-                    period_data = item.get_trends(enddate, i)
+                    # People metrics trends from sketches, if available
+                    cube = None
+                    if DS.get_sketch_store() is not None:
+                        cube = {}
+                        for filter_name in filter_names:
+                            mfilter.type_analysis = [filter_name, None]
+                            cube[filter_name] = item.get_trends_sketches(enddate, i)
+                            if cube[filter_name] is None:
+                                cube = None
+                                break
+                        mfilter.type_analysis = None
+                    if cube is None and item.is_cube_supported(False):
+                        cube = item.get_trends_cube(enddate, i, filter_names)
+                    elif cube is None:
+                        cube = {}
+                        for filter_name in filter_names:
+                            mfilter.type_analysis = [filter_name, None]
+                            cube[filter_name] = item.get_trends(enddate, i)
+                        mfilter.type_analysis = None
                     item.filters = mfilter_orig
 
-                    if type_analysis and type_analysis[1] is None:
-                        group_field = dsquery.get_group_field_alias(type_analysis[0])
-                        period_data = fill_and_order_items(items, period_data, group_field)
+                    for filter_name in cube:
+                        group_field = DS.get_query_builder().get_group_field_alias(filter_name)
+                        frames[filter_name].add_items(cube[filter_name], group_field)
 
-                    data = dict(data.items() + period_data.items())
+        return dict((filter_name, frames[filter_name].to_dict())
+                    for filter_name in filter_names)
 
-        return data
+    @classmethod
+    def prepare_filters_cube(DS, filters, period, startdate, enddate, identities_db):
+        """ Compute in cube mode the data for all items of several filters
+
+            The data is kept until get_metrics_data is called for each filter
+            with all its items, so the filter reports are created as usual.
+        """
+        for evol in [False, True]:
+            cube = DS.get_metrics_data(period, startdate, enddate, identities_db,
+                                       evol = evol, cube = filters)
+            for filter_name in cube:
+                key = DS._get_cube_key(filter_name, evol, period, startdate, enddate)
+                DataSource._cube_data[key] = cube[filter_name]
+
+    @classmethod
+    def clean_filters_cube(DS):
+        """ Remove cube data not used for the data source """
+        for key in DataSource._cube_data.keys():
+            if key[0] == DS.get_name():
+                DataSource._cube_data.pop(key)
+
+    @classmethod
+    def get_sketch_store(DS):
+        """ Sketch store used for the people metrics trends, if any """
+        if DS.get_name() in DataSource._sketch_stores:
+            return DataSource._sketch_stores[DS.get_name()]
+        return None
+
+    @classmethod
+    def set_sketch_store(DS, store):
+        """ Use store (SketchStore) for the people metrics. None to disable """
+        if store is None:
+            if DS.get_name() in DataSource._sketch_stores:
+                DataSource._sketch_stores.pop(DS.get_name())
+        else:
+            DataSource._sketch_stores[DS.get_name()] = store
+
+    @classmethod
+    @synchronized
+    def get_lifecycle_index(DS, dbcon):
+        """ People lifecycle index (LifecycleIndex), built once per run
+
+        Returns None if the data source has no lifecycle query. It is
+        built with the refresh lock held, as it is shared by the
+        QueryExecutor workers.
+        """
+        if DS.get_name() not in DataSource._lifecycle_indexes:
+            index = None
+            if hasattr(dbcon, "GetLifecycleActivity"):
+                activity = dbcon.GetLifecycleActivity()
+                if activity is not None:
+                    logging.info("Building people lifecycle index for " + DS.get_name())
+                    index = LifecycleIndex(activity, dbcon.GetLifecycleProfiles())
+            DataSource._lifecycle_indexes[DS.get_name()] = index
+        return DataSource._lifecycle_indexes[DS.get_name()]
 
     @staticmethod
     def get_metrics_core_agg():
@@ -499,44 +966,79 @@ class DataSource(object):
         raise NotImplementedError
 
     @classmethod
-    def convert_all_to_single(cls, data, filter_, destdir, evolutionary, period='month'):
-        """ Convert a GROUP BY result to follow tradition individual JSON files """
+    def get_items_list_fields(cls):
+        """ Fields of the JSON with the list of items of a filter """
+        from vizgrimoire.SCM import SCM
+        from vizgrimoire.ITS import ITS
+        from vizgrimoire.SCR import SCR
+        from vizgrimoire.MLS import MLS
+        from vizgrimoire.Pullpo import Pullpo
+        from vizgrimoire.EventsDS import EventsDS
+
+        if cls == SCM:
+            fields = ["authors_365","name","commits_365"]
+        elif cls == ITS:
+            fields = ["closed_365","closers_365", "name"]
+        elif cls == MLS:
+            fields = ["sent_365","senders_365", "name"]
+        elif cls == SCR:
+            fields = ["submitted","review_time_days_median","review_time_pending_upload_ReviewsWaitingForReviewer_days_median", "name"]
+        elif cls == Pullpo:
+            fields = ["submitted","review_time_days_median", "name"]
+        elif cls == EventsDS:
+            fields = ["events_365","rsvps_365", "name"]
+        else:
+            fields = ["name"]
+        return fields
+
+    @staticmethod
+    def _escape_item_name(item):
+        """ Name of an item in the items list, the one used in its files """
+        if not isinstance(item, basestring): return item
+        item = item.replace('/', '_')
+        if item.startswith('.'): item = "_" + item
+        return item
+
+    @classmethod
+    def convert_all_to_single(cls, data, filter_, destdir, evolutionary, period='month',
+                              items_list = True):
+        """ Convert a GROUP BY result to follow tradition individual JSON files
+
+        items_list: create the JSON with the list of items (with the
+        aggregated data), False when the items are processed in batches.
+        """
         from vizgrimoire.SCM import SCM
         from vizgrimoire.ITS import ITS
         from vizgrimoire.SCR import SCR
         from vizgrimoire.MLS import MLS
         from vizgrimoire.filter import Filter
+        from vizgrimoire.GrimoireUtils import check_array_value
 
         if cls == ITS or cls == SCR:
             if 'url' in data.keys():
                 data['name'] = data.pop('url')
-                data['name'] = [item.replace('/', '_') for item in data['name']]
         elif cls == MLS:
             if 'mailing_list_url' in data.keys():
                 data['name'] = data.pop('mailing_list_url')
-                data['name'] = [item.replace('/', '_') for item in data['name']]
         if cls == ITS or cls == SCM:
             if filter_.get_name() in ["company+country","company+project"]:
                 data['name'] = data.pop('filter')
-                data['name'] = [item.replace('/', '_') for item in data['name']]
-        if cls == SCM:
-            data['name'] = [item.replace('/', '_') for item in data['name']]
-
-        if not evolutionary:
+        if 'name' not in data:
+            id_field = cls.get_query_builder().get_group_field_alias(
+                filter_.get_name().replace("+", MetricFilters.DELIMITER))
+            if id_field not in data:
+                logging.warning(cls.get_name() + " " + filter_.get_name() + " without items")
+                return
+            data['name'] = data.pop(id_field)
+        # The names in the items list must match the names of the items files
+        data['name'] = [cls._escape_item_name(item)
+                        for item in check_array_value(data['name'])]
+
+        if not evolutionary and items_list:
             # First create the JSON with the list of items
             item_list = {}
             fn = os.path.join(destdir, filter_.get_filename(cls))
-            if cls == SCM:
-                fields = ["authors_365","name","commits_365"]
-            elif cls == ITS:
-                fields = ["closed_365","closers_365", "name"]
-            elif cls == MLS:
-                fields = ["sent_365","senders_365", "name"]
-            elif cls == SCR:
-                fields = ["submitted","review_time_days_median","review_time_pending_upload_ReviewsWaitingForReviewer_days_median", "name"]
-            else:
-                fields = ["name"]
-            for field in fields:
+            for field in cls.get_items_list_fields():
                 if field in data:
                     item_list[field] = data[field]
             createJSON(item_list, fn)
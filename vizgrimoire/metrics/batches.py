@@ -0,0 +1,134 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Filter reports processed in batches of items
+##
+## The data for all the items of a filter with many items (people2) does
+## not fit in memory: one value per item, period and metric. With
+## <filter>_batch = <size> in the [r] section of the automator config,
+## the items are processed in batches, restricting the GROUP BY queries
+## to the items of each batch. The files of the items are written for
+## each batch and the columns of the *-all-* files are appended to
+## temporal files, so only one batch is kept in memory. ColumnsWriter
+## joins them in the same JSON that createJSON writes for all the items.
+
+
+import json
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+import vizgrimoire.GrimoireUtils as GrimoireUtils
+
+
+def get_batches(items, size):
+    """ List of the lists of (at most size) items to be processed together """
+    return [items[pos:pos + size] for pos in range(0, len(items), size)]
+
+
+class ColumnsWriter(object):
+    """ JSON file metric -> values of the items, added by batches of items """
+
+    def __init__(self, filepath, zero = 0):
+        """ zero: value of the items of a batch without a metric """
+        self.filepath = filepath
+        self.zero = zero
+        self.tmpdir = tempfile.mkdtemp(prefix = "grimoirelib-")
+        self.columns = {} # column -> [temporal file, number of items]
+        self.shared = {} # column -> JSON of columns shared by all the items
+        self.items = 0
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, sort_keys = True).replace('NaN', '"NA"')
+
+    def _append(self, column, values_json, nitems):
+        """ Append the JSON of nitems values (without []) to the column """
+        if nitems == 0: return
+        if column not in self.columns:
+            path = os.path.join(self.tmpdir, "%i.json" % (len(self.columns)))
+            self.columns[column] = [path, 0]
+        (path, column_items) = self.columns[column]
+        with open(path, "a") as f:
+            if column_items > 0: f.write(", ")
+            f.write(values_json)
+        self.columns[column][1] += nitems
+
+    def _pad(self, column, nitems):
+        """ Append the zero value for nitems items """
+        if nitems <= 0: return
+        self._append(column, ", ".join([ColumnsWriter.dumps(self.zero)] * nitems), nitems)
+
+    def add(self, data, nitems, shared_fields = []):
+        """ Add the columns of a batch with nitems items
+
+        data is the dict of the batch as returned by get_metrics_data and
+        shared_fields the columns with the same value for all the items
+        (time series fields), written once.
+        """
+        data = GrimoireUtils.convertDatetime(GrimoireUtils.roundDecimals(
+            GrimoireUtils.removeDecimals(data)))
+        for column in data:
+            values = data[column]
+            if column in shared_fields or not isinstance(values, list):
+                if column not in self.shared:
+                    self.shared[column] = ColumnsWriter.dumps(values)
+                continue
+            # Columns not in the previous batches
+            if column not in self.columns: self._pad(column, self.items)
+            self._append(column, ColumnsWriter.dumps(values)[1:-1], len(values))
+        self.items += nitems
+        # Columns not in this batch
+        for column in self.columns.keys():
+            self._pad(column, self.items - self.columns[column][1])
+
+    def _write_columns(self, out):
+        columns = sorted(set(self.columns.keys() + self.shared.keys()))
+        out.write("{")
+        for (pos, column) in enumerate(columns):
+            if pos > 0: out.write(", ")
+            out.write(ColumnsWriter.dumps(column) + ": ")
+            if column in self.shared:
+                out.write(self.shared[column])
+                continue
+            out.write("[")
+            with open(self.columns[column][0]) as f:
+                shutil.copyfileobj(f, out)
+            out.write("]")
+        out.write("}")
+
+    def remove(self):
+        """ Remove the temporal files without writing the JSON file """
+        shutil.rmtree(self.tmpdir, ignore_errors = True)
+
+    def close(self):
+        """ Write the JSON file and remove the temporal files """
+        try:
+            if GrimoireUtils.json_bundle is None and GrimoireUtils.output_manager is None:
+                with open(self.filepath, "w") as out:
+                    self._write_columns(out)
+            else:
+                # The bundle and the output manager need the whole document
+                out = StringIO()
+                self._write_columns(out)
+                GrimoireUtils.write_json_file(out.getvalue(), self.filepath)
+        finally:
+            self.remove()
@@ -0,0 +1,152 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Bundled JSON output of a report
+##
+## Instead of one file per JSON document (evolutionary, static and top of
+## each filter item of each data source), the documents are appended to a
+## few JSON lines files: one shard per data source and filter, and a main
+## shard for the rest. Each shard has an index with the offset and length
+## of each document, so a browser can get a document with an HTTP range
+## request, and a manifest lists the shards. BundleReader produces the
+## legacy files from the bundle when they are needed.
+
+
+import json
+import logging
+import os
+import re
+
+from vizgrimoire.filter import Filter
+
+
+class BundleWriter(object):
+    """ Shards of JSON documents of a report named as the legacy files """
+
+    version = 1
+    main_shard = "main"
+
+    def __init__(self, destdir, bundledir = "bundle"):
+        self.destdir = destdir
+        self.bundledir = os.path.join(destdir, bundledir)
+        if not os.path.isdir(self.bundledir): os.makedirs(self.bundledir)
+        self.shards = {} # shard -> [file, index (name -> [offset, length])]
+
+    @staticmethod
+    def get_shard(name):
+        """ Shard of a legacy file name: ds-filter for the filters files """
+        shorts = [re.escape(data[1]) for data in Filter._filters_data]
+        # Longest first so com+cou is not matched as com
+        shorts = "|".join(sorted(set(shorts), key = lambda short: -len(short)))
+        # item-ds-filter-evolutionary.json, ds-filter-all-static.json ...
+        item = re.match(r"^.+-([a-z0-9_]+)-(" + shorts + r")-(evolutionary|static|top-[a-z]+)\.json$", name)
+        if item is None:
+            item = re.match(r"^([a-z0-9_]+)-(" + shorts + r")-all-(evolutionary|static)\.json$", name)
+        if item is None: return BundleWriter.main_shard
+        return re.sub(r"[^\w\-]", "_", item.group(1) + "-" + item.group(2))
+
+    def add(self, filepath, json_data):
+        """ Add the JSON document of filepath
+
+        Returns False if filepath is not inside destdir, so the document
+        must be written as a file. If a document is added several times,
+        the last one is the one in the index.
+        """
+        name = os.path.relpath(filepath, self.destdir)
+        if name.startswith(os.pardir): return False
+        shard = BundleWriter.get_shard(os.path.basename(name))
+        if shard not in self.shards:
+            data_file = open(os.path.join(self.bundledir, shard + ".jsonl"), "wb")
+            self.shards[shard] = [data_file, {}]
+        data_file, index = self.shards[shard]
+        if isinstance(json_data, unicode): json_data = json_data.encode('utf-8')
+        index[name] = [data_file.tell(), len(json_data)]
+        data_file.write(json_data + "\n")
+        return True
+
+    def close(self):
+        """ Write the indexes of the shards and the manifest """
+        manifest = {"version": BundleWriter.version, "shards": {}}
+        for shard, (data_file, index) in self.shards.items():
+            manifest["shards"][shard] = {"data": shard + ".jsonl",
+                                         "index": shard + ".index.json",
+                                         "documents": len(index),
+                                         "size": data_file.tell()}
+            data_file.close()
+            with open(os.path.join(self.bundledir, shard + ".index.json"), "w") as f:
+                json.dump(index, f, sort_keys = True)
+        with open(os.path.join(self.bundledir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent = 1, sort_keys = True)
+        logging.info("Bundle with %i documents in %i shards saved in %s" %
+                     (sum([len(s[1]) for s in self.shards.values()]),
+                      len(self.shards), self.bundledir))
+        self.shards = {}
+
+
+class BundleReader(object):
+    """ Legacy JSON files from a bundle created with BundleWriter """
+
+    def __init__(self, bundledir):
+        self.bundledir = bundledir
+        with open(os.path.join(bundledir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] != BundleWriter.version:
+            raise Exception("Bundle version not supported: " + str(self.manifest["version"]))
+        self.indexes = {} # shard -> index, read when needed
+
+    def get_index(self, shard):
+        if shard not in self.indexes:
+            if shard not in self.manifest["shards"]: return {}
+            index_file = self.manifest["shards"][shard]["index"]
+            with open(os.path.join(self.bundledir, index_file)) as f:
+                self.indexes[shard] = json.load(f)
+        return self.indexes[shard]
+
+    def get_names(self):
+        names = []
+        for shard in self.manifest["shards"]:
+            names += self.get_index(shard).keys()
+        return sorted(names)
+
+    def get(self, name):
+        """ JSON document (as a string) of the legacy file name, or None """
+        shard = BundleWriter.get_shard(os.path.basename(name))
+        index = self.get_index(shard)
+        if name not in index: return None
+        offset, length = index[name]
+        data_file = self.manifest["shards"][shard]["data"]
+        with open(os.path.join(self.bundledir, data_file), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def extract(self, destdir, names = None):
+        """ Write the legacy files (all if names is None) in destdir """
+        if names is None: names = self.get_names()
+        for name in names:
+            json_data = self.get(name)
+            if json_data is None:
+                logging.warning(name + " not found in bundle " + self.bundledir)
+                continue
+            filepath = os.path.join(destdir, name)
+            if not os.path.isdir(os.path.dirname(filepath)):
+                os.makedirs(os.path.dirname(filepath))
+            with open(filepath, "wb") as f:
+                f.write(json_data)
+        return len(names)
@@ -0,0 +1,118 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Coverage of the GROUP BY (all items of a filter) queries
+##
+## The filters of a report are computed only with GROUP BY queries, for
+## the filters in the group_by_filters of the query builder of each data
+## source. The coverage matrix shows, for each data source, filter and
+## metric, if the metric queries are grouped by the items of the filter.
+## It is generated with metrics_tool.py --group-by-coverage.
+
+
+import logging
+
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+
+
+STATUS_GROUP_BY = "group by"
+STATUS_CUSTOM = "custom" # not built from _get_sql, i.e. from other metrics
+STATUS_NO_GROUP_BY = "no group by"
+STATUS_ERROR = "error"
+
+def get_sql_status(sql, group_field):
+    """ Status of a query built for all the items of a filter """
+    if sql is None: return STATUS_NO_GROUP_BY
+    if "GROUP BY" not in sql.upper() or group_field not in sql:
+        return STATUS_NO_GROUP_BY
+    return STATUS_GROUP_BY
+
+def get_metric_status(metric, filter_name, check_db = False):
+    """ Status of the aggregated and evolutionary queries of a metric
+
+    filter_name is in GrimoireLib notation (company,,country). If check_db
+    the queries are also checked against the database, without reading
+    rows, to find the SQL errors.
+    """
+    filters = metric.filters
+    period = filters.period
+    if period is None: period = "month"
+    mfilter = MetricFilters(period, filters.startdate, filters.enddate,
+                            [filter_name, None])
+    mfilter.global_filter = filters.global_filter
+    mfilter.set_closed_condition(filters.closed_condition)
+    metric.filters = mfilter
+    try:
+        group_field = metric.db.get_group_field_alias(filter_name)
+        for evolutionary in [False, True]:
+            try:
+                sql = metric._get_sql(evolutionary)
+            except NotImplementedError:
+                return STATUS_CUSTOM
+            status = get_sql_status(sql, group_field)
+            if status != STATUS_GROUP_BY: return status
+            if check_db:
+                columns = metric.db.get_query_columns(sql)
+                if group_field not in columns: return STATUS_NO_GROUP_BY
+        return STATUS_GROUP_BY
+    except Exception, e:
+        logging.info(metric.id + " " + filter_name + " error: " + str(e))
+        return STATUS_ERROR + ": " + str(e)
+    finally:
+        metric.filters = filters
+
+def get_coverage(data_sources, check_db = False):
+    """ Coverage matrix as data source -> filter -> metric id -> status """
+    coverage = {}
+    for ds in data_sources:
+        coverage[ds.get_name()] = {}
+        metrics_set = ds.get_metrics_set(ds)
+        for filter_name in ds.get_group_by_filters():
+            statuses = {}
+            for metric in metrics_set:
+                statuses[metric.id] = get_metric_status(metric,
+                    filter_name.replace("+", MetricFilters.DELIMITER), check_db)
+            coverage[ds.get_name()][filter_name] = statuses
+    return coverage
+
+def format_coverage(coverage):
+    """ Text table for each data source with the metrics and filters """
+    symbols = {STATUS_GROUP_BY: "x", STATUS_CUSTOM: "c", STATUS_NO_GROUP_BY: "-"}
+    lines = []
+    for ds_name in sorted(coverage):
+        filter_names = sorted(coverage[ds_name])
+        metric_ids = set()
+        for filter_name in filter_names:
+            metric_ids.update(coverage[ds_name][filter_name].keys())
+        lines.append(ds_name)
+        if len(filter_names) == 0:
+            lines.append("  no filters supported")
+            continue
+        width = max([len(metric_id) for metric_id in metric_ids] + [len(ds_name)])
+        lines.append(" " * (width + 2) + " ".join(filter_names))
+        for metric_id in sorted(metric_ids):
+            line = "  " + metric_id.ljust(width)
+            for filter_name in filter_names:
+                status = coverage[ds_name][filter_name].get(metric_id, "")
+                symbol = symbols.get(status, "E")
+                line += " " + symbol.center(len(filter_name))
+            lines.append(line.rstrip())
+    lines.append("x: group by, c: custom, -: no group by, E: error")
+    return "\n".join(lines)
@@ -0,0 +1,186 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Derived date keys and email domain columns
+##
+## The time series group by the day, week or month of a date, and the
+## domain filter by the domain of an email, computed per row. The derived
+## columns store them (indexed) in the fact tables: <date>_day_key,
+## <date>_week_key and <date>_month_key with the same values the queries
+## compute, and <email>_domain. They are created and refreshed for the
+## new rows with report_tool --date-keys, and the query builders use
+## them when they are in the database.
+
+
+class DateKeys(object):
+    """ Derived columns available in a database """
+
+    # table -> date columns with keys
+    date_columns = {"scmlog": ["date", "author_date"],
+                    "changes": ["changed_on"],
+                    "messages": ["first_date"],
+                    "irclog": ["date"],
+                    "issues": ["submitted_on"]}
+    # table -> email column with domain
+    email_columns = {"people": "email",
+                     "messages_people": "email_address"}
+    # period -> (type, expression for the date) of the keys
+    periods = {"day": ("DATE", "DATE(%s)"),
+               "week": ("INT", "YEARWEEK(%s,3)"),
+               "month": ("INT", "YEAR(%s)*12+MONTH(%s)")}
+
+    def __init__(self, columns):
+        """ columns: table -> list of columns in the database """
+        self.columns = columns
+
+    @staticmethod
+    def get_key_column(column, period):
+        return column + "_" + period + "_key"
+
+    @staticmethod
+    def get_key_expression(date, period):
+        expression = DateKeys.periods[period][1]
+        return expression.replace("%s", date)
+
+    @staticmethod
+    def get_domain_column(column):
+        return column + "_domain"
+
+    @staticmethod
+    def get_domain_expression(email):
+        return "SUBSTR(" + email + ",LOCATE('@'," + email + ")+1)"
+
+    def has_keys(self, table, column):
+        table_columns = self.columns.get(table, [])
+        for period in DateKeys.periods:
+            if DateKeys.get_key_column(column, period) not in table_columns:
+                return False
+        return True
+
+    def has_domain(self, table):
+        column = DateKeys.email_columns.get(table)
+        if column is None: return False
+        return DateKeys.get_domain_column(column) in self.columns.get(table, [])
+
+    @staticmethod
+    def get_table(alias, tables):
+        """ Table with alias in a FROM string (tables separated by ,) """
+        for table in tables.split(","):
+            tokens = table.split()
+            if len(tokens) == 0: continue
+            if tokens[-1] == alias: return tokens[0]
+        return None
+
+    @staticmethod
+    def has_table(table, tables):
+        """ Check if a FROM string (tables separated by ,) includes table """
+        for from_table in tables.split(","):
+            tokens = from_table.split()
+            if len(tokens) > 0 and tokens[0] == table: return True
+        return False
+
+    def replace_domains(self, expression, tables):
+        """ Use the domain columns for the email domains in expression """
+        for table in DateKeys.email_columns:
+            if not self.has_domain(table): continue
+            column = DateKeys.email_columns[table]
+            for from_table in tables.split(","):
+                tokens = from_table.split()
+                if len(tokens) == 0 or tokens[0] != table: continue
+                email = tokens[-1] + "." + column
+                expression = expression.replace(DateKeys.get_domain_expression(email),
+                                                DateKeys.get_domain_column(email))
+        return expression
+
+    def get_key(self, date, tables, period):
+        """ Key column (with alias) to group a date field by period, or None
+
+        date is the date field of the query ("i.date", "changed_on") and
+        tables the FROM of the query.
+        """
+        if period not in DateKeys.periods: return None
+        date = date.strip()
+        if date.find(".") > -1:
+            (alias, column) = date.split(".", 1)
+            table = DateKeys.get_table(alias, tables)
+            prefix = alias + "."
+        else:
+            # Without alias the date column must be of one table only
+            (column, prefix) = (date, "")
+            candidates = [table for table in DateKeys.date_columns
+                          if column in DateKeys.date_columns[table] and
+                          DateKeys.has_table(table, tables)]
+            table = None
+            if len(candidates) == 1: table = candidates[0]
+        if table is None or column not in DateKeys.date_columns.get(table, []):
+            return None
+        if not self.has_keys(table, column): return None
+        return prefix + DateKeys.get_key_column(column, period)
+
+    def get_missing(self):
+        """ List of (table, column) of the derived columns to be created
+
+        Only for the tables in the database.
+        """
+        missing = []
+        for table in sorted(DateKeys.date_columns):
+            if table not in self.columns: continue
+            for column in DateKeys.date_columns[table]:
+                if column not in self.columns[table]: continue
+                for period in sorted(DateKeys.periods):
+                    key = DateKeys.get_key_column(column, period)
+                    if key not in self.columns[table]: missing.append((table, key))
+        for table in sorted(DateKeys.email_columns):
+            if table not in self.columns: continue
+            column = DateKeys.email_columns[table]
+            if column not in self.columns[table]: continue
+            domain = DateKeys.get_domain_column(column)
+            if domain not in self.columns[table]: missing.append((table, domain))
+        return missing
+
+    @staticmethod
+    def get_create_query(table, column):
+        """ ALTER TABLE query to add a derived column and its index """
+        if column.endswith("_domain"): col_type = "VARCHAR(255)"
+        else: col_type = DateKeys.periods[column.split("_")[-2]][0]
+        return "ALTER TABLE %s ADD COLUMN %s %s NULL, ADD INDEX gl_%s (%s)" % \
+            (table, column, col_type, column, column)
+
+    def get_refresh_queries(self):
+        """ UPDATE queries to fill the derived columns of the new rows """
+        queries = []
+        for table in sorted(DateKeys.date_columns):
+            for column in DateKeys.date_columns[table]:
+                if not self.has_keys(table, column): continue
+                sets = []
+                for period in sorted(DateKeys.periods):
+                    sets.append(DateKeys.get_key_column(column, period) + " = " +
+                                DateKeys.get_key_expression(column, period))
+                queries.append("UPDATE %s SET %s WHERE %s IS NULL AND %s IS NOT NULL" %
+                               (table, ", ".join(sets),
+                                DateKeys.get_key_column(column, "day"), column))
+        for table in sorted(DateKeys.email_columns):
+            if not self.has_domain(table): continue
+            column = DateKeys.email_columns[table]
+            domain = DateKeys.get_domain_column(column)
+            queries.append("UPDATE %s SET %s = %s WHERE %s IS NULL AND %s IS NOT NULL" %
+                           (table, domain, DateKeys.get_domain_expression(column),
+                            domain, column))
+        return queries
@@ -0,0 +1,89 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Concurrent execution of the independent metrics of a data source
+##
+## The metrics of a data source are computed one after the other, each one
+## waiting for its queries. QueryExecutor runs them in a bounded pool of
+## threads: MySQLdb releases the GIL while waiting for the database, so
+## the queries run in parallel in the server. Each worker has its own
+## connections (DSQuery.init_worker). The results are returned in the
+## order of the tasks, so the report is the same with any number of
+## workers, and the error of a task is logged without stopping the rest.
+
+
+import logging
+import Queue
+import threading
+import traceback
+
+
+class QueryExecutor(object):
+    """ Bounded pool of threads running independent tasks """
+
+    def __init__(self, workers = 1, worker_init = None, worker_close = None):
+        """ worker_init and worker_close are called in each worker thread """
+        self.workers = workers
+        self.worker_init = worker_init
+        self.worker_close = worker_close
+
+    def _worker(self, tasks, pending, results):
+        if self.worker_init is not None: self.worker_init()
+        try:
+            while True:
+                try:
+                    pos = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                (name, function) = tasks[pos]
+                try:
+                    results[pos] = (function(), None)
+                except Exception, e:
+                    logging.error(name + " failed: " + str(e) + "\n" +
+                                  traceback.format_exc())
+                    results[pos] = (None, e)
+        finally:
+            if self.worker_close is not None: self.worker_close()
+
+    def run(self, tasks):
+        """ Run tasks, a list of (name, function without args)
+
+        Returns a list with (result, None) or (None, exception) for each
+        task, in the order of tasks. With just one worker the tasks are run
+        in the calling thread and the exceptions are raised.
+        """
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [(function(), None) for (name, function) in tasks]
+        pending = Queue.Queue()
+        for pos in range(len(tasks)): pending.put(pos)
+        results = [None] * len(tasks)
+        threads = []
+        for i in range(min(self.workers, len(tasks))):
+            thread = threading.Thread(target = self._worker,
+                                      args = (tasks, pending, results))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads: thread.join()
+        for pos in range(len(tasks)):
+            if results[pos] is None:
+                # All the workers failed to start
+                results[pos] = (None, Exception(tasks[pos][0] + " not run"))
+        return results
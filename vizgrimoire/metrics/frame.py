@@ -0,0 +1,101 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Metrics data of a report, as columns
+##
+## The data of a report is a dict metric -> values: a value (or a time
+## series) for the global data, and a list with the value (or time series)
+## of each item, in the items order, for the data of all the items of a
+## filter. ReportFrame collects the results of the metrics in place,
+## aligning the results of each GROUP BY query to the items with an index
+## of the items positions, and gives the legacy dict for the JSON files.
+
+
+import logging
+
+
+class ReportFrame(object):
+    """ Columns (metric -> values) of the global data or of the items of a filter """
+
+    # Time series fields shared by all the items
+    ts_fields = ['unixtime', 'date', 'id']
+
+    def __init__(self, items = None):
+        """ items: list of the items of the filter, None for global data """
+        self.columns = {}
+        if items is not None and not isinstance(items, list): items = [items]
+        self.items = items
+
+    def __contains__(self, metric):
+        return metric in self.columns
+
+    def __getitem__(self, metric):
+        return self.columns[metric]
+
+    def add(self, data):
+        """ Add the columns of data (dict), replacing the existing ones """
+        if data is None: return
+        self.columns.update(data)
+
+    def add_items(self, data, id_field, evol = False, period = None,
+                  startdate = None, enddate = None):
+        """ Add the columns of a GROUP BY result aligned to the items
+
+        The values of the items not in data are 0 (or a time series with 0
+        for all the periods) and the items of data not in the filter items
+        are dropped. All the filled items share the same zero time series.
+        """
+        from vizgrimoire.GrimoireUtils import check_array_values, completePeriodIds
+
+        if data is None: return
+        if self.items is None:
+            self.add(data)
+            return
+        if id_field not in data:
+            logging.info("[ReportFrame] " + str(id_field) + " not found in " + ",".join(data))
+            self.add(check_array_values(dict(data)))
+            return
+        data_items = data[id_field]
+        if not isinstance(data_items, list): data_items = [data_items]
+        data_positions = {}
+        for (pos, item) in enumerate(data_items):
+            data_positions.setdefault(item, pos)
+        # Position in data of each item, None for the items to be filled
+        rows = [data_positions.get(item) for item in self.items]
+
+        shared_fields = []
+        zero = 0
+        if evol:
+            shared_fields = [period] + ReportFrame.ts_fields
+            zero = completePeriodIds({id_field:[], period:[]},
+                                     period, startdate, enddate)[id_field]
+        for field in data:
+            if field == id_field: continue
+            values = data[field]
+            if field in shared_fields:
+                self.columns[field] = values
+                continue
+            if not isinstance(values, list): values = [values]
+            self.columns[field] = [zero if row is None else values[row] for row in rows]
+        self.columns[id_field] = list(self.items)
+
+    def to_dict(self):
+        """ Legacy dict metric -> values used in the JSON files """
+        return dict(self.columns)
@@ -0,0 +1,110 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Index catalog of the data sources databases
+##
+## Each query builder declares the indexes its joins and date predicates
+## need (DSQuery.indexes). The catalog is checked against the indexes in
+## information_schema and the missing ones are created on demand. The
+## EXPLAIN of the queries is used to report the ones still doing full
+## table scans.
+
+
+import logging
+
+
+class IndexCatalog(object):
+    """ Indexes needed by a data source: list of (table, [columns]) """
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    @staticmethod
+    def get_name(table, columns):
+        """ Name of the index created for columns in table """
+        # MySQL identifiers are limited to 64 chars
+        return ("gl_" + table + "_" + "_".join(columns))[0:64]
+
+    @staticmethod
+    def is_covered(columns, existing):
+        """ Check if an existing index (columns list) starts with columns """
+        for index in existing:
+            if index[0:len(columns)] == columns: return True
+        return False
+
+    def get_missing(self, existing):
+        """ Indexes of the catalog not covered by the existing ones
+
+        existing is a dict table -> list of indexes (list of columns in
+        index order) as read from information_schema. Indexes for tables
+        not in existing (not available in the database) are ignored.
+        """
+        missing = []
+        for (table, columns) in self.indexes:
+            if table not in existing: continue
+            if IndexCatalog.is_covered(columns, existing[table]): continue
+            missing.append((table, columns))
+        return missing
+
+
+class ScanReport(object):
+    """ Queries doing full table scans, from the EXPLAIN of each query """
+
+    def __init__(self, min_rows = 1000):
+        # Full scans of small tables (trackers, repositories ...) are fine
+        self.min_rows = min_rows
+        self.scans = {} # (table, sql) -> estimated rows
+
+    @staticmethod
+    def get_full_scans(plan):
+        """ Tables read with a full scan in an EXPLAIN result
+
+        plan is the EXPLAIN result as returned by DSQuery.ExecuteQuery,
+        already converted with check_array_values. Derived tables are
+        not real tables so they are not included.
+        """
+        scans = []
+        if 'type' not in plan: return scans
+        for i in range(0, len(plan['type'])):
+            table = plan['table'][i]
+            if plan['type'][i] != 'ALL' or table is None: continue
+            if table.startswith("<"): continue # <derivedN>, <unionN,M>
+            scans.append((table, plan['rows'][i]))
+        return scans
+
+    def add(self, sql, plan):
+        for (table, rows) in ScanReport.get_full_scans(plan):
+            if rows is None or rows < self.min_rows: continue
+            self.scans[(table, sql)] = rows
+
+    def get_scans(self):
+        """ List of (table, rows, sql) sorted by estimated rows """
+        scans = [(key[0], rows, key[1]) for key, rows in self.scans.iteritems()]
+        return sorted(scans, key = lambda scan: (-scan[1], scan[0], scan[2]))
+
+    def log(self):
+        scans = self.get_scans()
+        if len(scans) == 0:
+            logging.info("No queries doing full table scans")
+            return
+        logging.warning(str(len(scans)) + " queries doing full table scans")
+        for (table, rows, sql) in scans:
+            logging.warning("Full scan of " + table + " (" + str(rows) + " rows): " +
+                            " ".join(sql.split()))
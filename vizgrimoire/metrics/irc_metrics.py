@@ -152,6 +152,54 @@ class Repositories(Metrics):
             "  GROUP BY name ORDER BY total DESC"
         return(self.db.ExecuteQuery(q)['name'])
 
+class Companies(Metrics):
+    """Organizations participating in IRC channels"""
+    id = "organizations"
+    name = "Organizations"
+    desc = "Number of organizations participating in IRC channels"
+    data_source = IRC
+
+    def _get_sql(self, evolutionary):
+        fields = Set([])
+        tables = Set([])
+        filters = Set([])
+
+        fields.add("COUNT(DISTINCT(org.id)) AS organizations")
+        tables.add("irclog i")
+        tables.union_update(self.db.GetSQLCompaniesFrom())
+        tables.union_update(self.db.GetSQLReportFrom(self.filters))
+        filters.add("i.type = 'COMMENT'")
+        filters.union_update(self.db.GetSQLCompaniesWhere(None))
+        filters.union_update(self.db.GetSQLReportWhere(self.filters))
+
+        query = self.db.BuildQuery(self.filters.period, self.filters.startdate,
+                               self.filters.enddate, " i.date ", fields,
+                               tables, filters, evolutionary, self.filters.type_analysis)
+        return query
+
+    def get_list (self):
+        from vizgrimoire.data_source import DataSource
+        from vizgrimoire.filter import Filter
+        tables_set = Set([])
+        tables_set.add("irclog i")
+        tables_set.union_update(self.db.GetSQLCompaniesFrom())
+        filters_set = Set([])
+        filters_set.add("i.type = 'COMMENT'")
+        filters_set.union_update(self.db.GetSQLCompaniesWhere(None))
+        for company in DataSource.get_filter_bots(Filter("company")):
+            filters_set.add("org.name<>'"+company+"'")
+
+        tables = self.db._get_tables_query(tables_set)
+        filters = self.db._get_filters_query(filters_set)
+
+        q = "SELECT org.name AS name, COUNT(i.id) AS sent "+\
+            "  FROM " + tables +\
+            "  WHERE " + filters + " AND "+\
+            "    i.date >= " + self.filters.startdate + " AND "+\
+            "    i.date < " + self.filters.enddate +\
+            "  GROUP BY org.name ORDER BY sent DESC, name"
+        return(self.db.ExecuteQuery(q))
+
 class RegisteredUsers(Metrics):
     """Total number of registered users in the service (Slack supported)"""
     id = "registered_users"
@@ -28,7 +28,7 @@ import MySQLdb
 
 from sets import Set
 
-from vizgrimoire.GrimoireUtils import checkListArray
+from vizgrimoire.GrimoireUtils import checkListArray, check_array_values
 from vizgrimoire.metrics.metrics import Metrics, to_list
 from vizgrimoire.metrics.metrics_filter import MetricFilters
 from vizgrimoire.metrics.query_builder import ITSQuery
@@ -72,6 +72,15 @@ class InitialActivity(Metrics):
     data_source = ITS
 
     def get_agg(self):
+        # Only the people with identity are in the lifecycle index, the
+        # same ones the bots filter (people_out) selects.
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            first = index.get_first_date(self.filters.startdate,
+                                         self.filters.enddate, bots)
+            if first is not None: first = first.strftime('%Y-%m-%d')
+            return {"first_date": first}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -103,6 +112,13 @@ class EndOfActivity(Metrics):
     data_source = ITS
 
     def get_agg(self):
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            last = index.get_last_date(self.filters.startdate,
+                                       self.filters.enddate, bots)
+            if last is not None: last = last.strftime('%Y-%m-%d')
+            return {"last_date": last}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -272,6 +288,9 @@ class TimeToClose(Metrics):
     For a given period, limited by two dates, this class provides the time to close
     for those tickets that were closed in such period.
 
+    The close date of an issue is its first close in the period, from the
+    closes of the issues timeline. An issue closed before the period and
+    closed again in it is counted with the close of the period.
     """
 
     def get_agg(self):
@@ -284,13 +303,15 @@ class TimeToClose(Metrics):
         tables.union_update(self.db.GetSQLReportFrom(self.filters))
 
         closed_condition = ITS._get_closed_condition()
-        if self.filters.closed_condition is not None:
-             closed_condition = self.filters.closed_condition
-
-        # TODO: if RESOLVED and CLOSED appear in the same period of study, this
-        # will affect the total time to close the issue. Both timeframes will
-        # be taken into account.
-        table_extra = "(select issue_id, changed_on from changes where "+closed_condition+" and changed_on < "+self.filters.enddate+" and changed_on >= "+self.filters.startdate+") t1"
+        if self.filters.closed_condition is None or \
+            self.filters.closed_condition == closed_condition:
+            # The first close of each issue in the period, not the first one
+            # ever (the close date of the issues timeline)
+            closes = self.db.GetIssuesCloses(closed_condition)
+            table_extra = "(select issue_id, MIN(closed) as changed_on from "+closes+" where closed < "+self.filters.enddate+" and closed >= "+self.filters.startdate+" group by issue_id) t1"
+        else:
+            closed_condition = self.filters.closed_condition
+            table_extra = "(select issue_id, MIN(changed_on) as changed_on from changes where "+closed_condition+" and changed_on < "+self.filters.enddate+" and changed_on >= "+self.filters.startdate+" group by issue_id) t1"
         tables.add(table_extra)
 
         filters.add("i.id=t1.issue_id")
@@ -407,25 +428,46 @@ class BMIIndex(Metrics):
     desc = "Number of tickets closed out of the opened ones in a given period"
     data_source = ITS
 
+    @staticmethod
+    def _get_bmi(closed, opened):
+        if int(opened) <= 0:
+            # a value is needed when there's a division by 0
+            return closed * 100
+        return (float(closed) / float(opened)) * 100.0
+
+    def _get_items_values(self, closed, opened, field_closed, field_opened):
+        """ Values of closed and opened for the items of a GROUP BY query
+
+        Returns the group field, the items and the closed and opened values
+        of each item (0 for the items not found in one of them).
+        """
+        group_field = self.db.get_group_field_alias(self.filters.type_analysis[0])
+        closed = check_array_values(closed)
+        opened = check_array_values(opened)
+        closed_items = dict(zip(closed.get(group_field, []), closed.get(field_closed, [])))
+        opened_items = dict(zip(opened.get(group_field, []), opened.get(field_opened, [])))
+        items = list(opened.get(group_field, []))
+        items += [item for item in closed.get(group_field, []) if item not in opened_items]
+        values = [(closed_items.get(item, 0), opened_items.get(item, 0)) for item in items]
+        return group_field, items, values
+
     def get_agg(self):
         data = {}
 
         closed_tickets = Closed(self.db, self.filters)
         opened_tickets = Opened(self.db, self.filters)
 
-        if self.filters.type_analysis and self.filters.type_analysis[1] is None:
-            # GROUP BY not supported
-            logging.info("agg BMI metric does NOT support GROUP BY queries")
-            return data
-
         closed = closed_tickets.get_agg()
         opened = opened_tickets.get_agg()
 
-        if int(opened["opened"]) <= 0:
-            # a value is needed when there's a division by 0
-            data["bmitickets"] = closed["closed"] * 100
-        else:
-            data["bmitickets"] = (float(closed["closed"]) / float(opened["opened"])) * 100.0
+        if self.filters.type_analysis and self.filters.type_analysis[1] is None:
+            group_field, items, values = self._get_items_values(closed, opened,
+                                                                "closed", "opened")
+            data[group_field] = items
+            data["bmitickets"] = [BMIIndex._get_bmi(c, o) for (c, o) in values]
+            return data
+
+        data["bmitickets"] = BMIIndex._get_bmi(closed["closed"], opened["opened"])
 
         return data
 
@@ -441,21 +483,26 @@ class BMIIndex(Metrics):
         if len(opened["opened"]) == 0:
             return data
 
-        if type(opened["opened"][0]) is list:
-            # GROUP BY not supported
-            logging.info("evol BMI metric does NOT support GROUP BY queries")
+        if self.filters.type_analysis and self.filters.type_analysis[1] is None:
+            # The time series of all the items are completed for all periods
+            zeros = [0] * len(opened[self.filters.period])
+            group_field, items, values = self._get_items_values(closed, opened,
+                                                                "closed", "opened")
+            data[group_field] = items
+            data["bmitickets"] = []
+            for (closed_ts, opened_ts) in values:
+                if closed_ts == 0: closed_ts = zeros
+                if opened_ts == 0: opened_ts = zeros
+                data["bmitickets"].append([BMIIndex._get_bmi(c, o)
+                                           for (c, o) in zip(closed_ts, opened_ts)])
+            for field in [self.filters.period, "unixtime", "date", "id"]:
+                if field in opened: data[field] = opened[field]
             return data
 
-
         evol_bmi = []
-        for i in closed["closed"]:
-
-            index = closed["closed"].index(i)
-            if opened["opened"][index] == 0:
-                #div by 0
-                evol_bmi.append(i * 100) # some "neutral" value, although this should be infinite
-            else:
-                evol_bmi.append((float(i) / float(opened['opened'][index])) * 100.0)
+        for (index, i) in enumerate(closed["closed"]):
+            # some "neutral" value for div by 0, although this should be infinite
+            evol_bmi.append(BMIIndex._get_bmi(i, opened['opened'][index]))
 
         data["bmitickets"] = evol_bmi
 
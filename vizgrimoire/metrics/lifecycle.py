@@ -0,0 +1,234 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## People lifecycle index: activity of each person (uuid) per day
+##
+## New and gone people, first and last activity dates, people intake and
+## the evolution of the activity of each person are computed from the
+## index instead of MIN/MAX GROUP BY queries for each metric and person.
+
+
+import datetime
+import time
+
+from dateutil import parser
+
+from vizgrimoire.GrimoireUtils import check_array_values
+
+
+class LifecycleIndex(object):
+    """ Activity per person (uuid) and day of a data source
+
+    activity is the data returned by the data source lifecycle query with
+    the columns uuid, day and one column for each activity count (i.e.
+    commits). profiles is a dict uuid -> [name, is_bot] with the people
+    profiles, used to remove bots as the SQL queries do. If it is None,
+    the bots can not be removed from the index.
+
+    All dates ranges are [startdate, enddate), as in the SQL queries.
+    """
+
+    def __init__(self, activity, profiles = None):
+        activity = check_array_values(activity)
+        self.fields = [f for f in activity.keys() if f not in ['uuid', 'day']]
+        self.profiles = profiles
+        self.activity = {} # uuid -> day -> [counts in fields order]
+        self.first = {} # uuid -> first day of activity
+        self.last = {} # uuid -> last day of activity
+
+        for i in range(0, len(activity['uuid'])):
+            uuid = activity['uuid'][i]
+            day = LifecycleIndex._get_day(activity['day'][i])
+            counts = [activity[field][i] for field in self.fields]
+            self.activity.setdefault(uuid, {})[day] = counts
+            if uuid not in self.first or day < self.first[uuid]:
+                self.first[uuid] = day
+            if uuid not in self.last or day > self.last[uuid]:
+                self.last[uuid] = day
+
+    @staticmethod
+    def _get_day(date):
+        """ Convert SQL dates ("'2014-01-01'") and datetimes to date """
+        if isinstance(date, datetime.datetime): return date.date()
+        if isinstance(date, datetime.date): return date
+        return parser.parse(date.replace("'","")).date()
+
+    @staticmethod
+    def get_period_id(day, period):
+        """ Period id for a day, the same GetSQLPeriod returns """
+        if period == 'day':
+            return int(time.mktime(day.timetuple()))
+        elif period == 'week':
+            return day.isocalendar()[0] * 100 + day.isocalendar()[1]
+        elif period == 'month':
+            return day.year * 12 + day.month
+        elif period == 'year':
+            return day.year * 12
+        raise Exception("PERIOD: " + period + " not supported")
+
+    @staticmethod
+    def _get_period_field(period):
+        if period == 'day': return 'unixtime'
+        return period
+
+    def get_people(self):
+        return self.activity.keys()
+
+    def get_first(self, uuid):
+        return self.first.get(uuid)
+
+    def get_last(self, uuid):
+        return self.last.get(uuid)
+
+    def get_total(self, uuid, field, startdate = None, enddate = None):
+        """ Activity of a person in field for [startdate, enddate) """
+        pos = self.fields.index(field)
+        startdate, enddate = LifecycleIndex._get_range(startdate, enddate)
+        total = 0
+        for day, counts in self.activity.get(uuid, {}).iteritems():
+            if LifecycleIndex._in_range(day, startdate, enddate): total += counts[pos]
+        return total
+
+    def get_bots(self, people_out):
+        """ People removed by the bots filter (people_out) of the SQL queries
+
+        As the bots filter (GetBotsTable), it includes the people without
+        profile and, if there are names in people_out, the ones without name.
+        Returns None if there are no profiles.
+        """
+        if people_out is None: return set()
+        if self.profiles is None: return None
+        names = set(name for name in people_out if name != "")
+        bots = set()
+        for uuid in self.activity:
+            profile = self.profiles.get(uuid)
+            if profile is None or profile[1] is None or profile[1] == 1:
+                bots.add(uuid)
+            elif len(names) > 0 and (profile[0] is None or profile[0] in names):
+                bots.add(uuid)
+        return bots
+
+    @staticmethod
+    def _get_range(startdate, enddate):
+        if startdate is not None: startdate = LifecycleIndex._get_day(startdate)
+        if enddate is not None: enddate = LifecycleIndex._get_day(enddate)
+        return startdate, enddate
+
+    @staticmethod
+    def _in_range(day, startdate, enddate):
+        """ Check day in [startdate, enddate), dates already converted """
+        if startdate is not None and day < startdate: return False
+        if enddate is not None and day >= enddate: return False
+        return True
+
+    def get_active(self, startdate, enddate, exclude = None):
+        """ People with activity in [startdate, enddate) """
+        startdate = LifecycleIndex._get_day(startdate)
+        enddate = LifecycleIndex._get_day(enddate)
+        active = set()
+        for uuid, days in self.activity.iteritems():
+            if exclude is not None and uuid in exclude: continue
+            # Fast path: no activity at all in the range
+            if self.first[uuid] >= enddate or self.last[uuid] < startdate: continue
+            for day in days:
+                if startdate <= day < enddate:
+                    active.add(uuid)
+                    break
+        return active
+
+    def get_new(self, startdate, enddate, exclude = None):
+        """ People whose first activity is in [startdate, enddate) """
+        startdate, enddate = LifecycleIndex._get_range(startdate, enddate)
+        return set(uuid for uuid, first in self.first.iteritems()
+                   if LifecycleIndex._in_range(first, startdate, enddate)
+                   and (exclude is None or uuid not in exclude))
+
+    def get_gone(self, enddate, days, exclude = None):
+        """ People active in the previous days period but not in the last one
+
+        Previous period: [enddate - 2*days, enddate - days)
+        Last period: [enddate - days, enddate)
+        """
+        enddate = LifecycleIndex._get_day(enddate)
+        startdate = enddate - datetime.timedelta(days = days)
+        prevdate = enddate - datetime.timedelta(days = days * 2)
+        return (self.get_active(prevdate, startdate, exclude) -
+                self.get_active(startdate, enddate))
+
+    def get_first_date(self, startdate, enddate, exclude = None):
+        """ First day with activity in [startdate, enddate) """
+        startdate, enddate = LifecycleIndex._get_range(startdate, enddate)
+        days = [day for uuid in self.get_active(startdate, enddate, exclude)
+                for day in self.activity[uuid] if LifecycleIndex._in_range(day, startdate, enddate)]
+        if len(days) == 0: return None
+        return min(days)
+
+    def get_last_date(self, startdate, enddate, exclude = None):
+        """ Last day with activity in [startdate, enddate) """
+        startdate, enddate = LifecycleIndex._get_range(startdate, enddate)
+        days = [day for uuid in self.get_active(startdate, enddate, exclude)
+                for day in self.activity[uuid] if LifecycleIndex._in_range(day, startdate, enddate)]
+        if len(days) == 0: return None
+        return max(days)
+
+    def get_ts(self, field, period, startdate, enddate, uuid = None):
+        """ Evolution of the activity in field for one person or all
+
+        Returns the data in the format of the GetSQLPeriod queries: the
+        period ids with activity and the activity for each of them.
+        """
+        pos = self.fields.index(field)
+        startdate, enddate = LifecycleIndex._get_range(startdate, enddate)
+        people = self.activity.keys()
+        if uuid is not None: people = [uuid]
+        ts = {}
+        for person in people:
+            for day, counts in self.activity.get(person, {}).iteritems():
+                if counts[pos] == 0 or not LifecycleIndex._in_range(day, startdate, enddate): continue
+                period_id = LifecycleIndex.get_period_id(day, period)
+                ts[period_id] = ts.get(period_id, 0) + counts[pos]
+        periods = sorted(ts.keys())
+        return {LifecycleIndex._get_period_field(period): periods,
+                field: [ts[p] for p in periods]}
+
+    def get_new_ts(self, metric, period, startdate, enddate, exclude = None):
+        """ Evolution of the number of new people (metric) """
+        ts = {}
+        for uuid in self.get_new(startdate, enddate, exclude):
+            period_id = LifecycleIndex.get_period_id(self.first[uuid], period)
+            ts[period_id] = ts.get(period_id, 0) + 1
+        periods = sorted(ts.keys())
+        return {LifecycleIndex._get_period_field(period): periods,
+                metric: [ts[p] for p in periods]}
+
+    def get_intake(self, field, min, max):
+        """ People with activity in field in (min, max] for each month """
+        pos = self.fields.index(field)
+        intake = {}
+        for days in self.activity.itervalues():
+            months = {}
+            for day, counts in days.iteritems():
+                month = LifecycleIndex.get_period_id(day, 'month')
+                months[month] = months.get(month, 0) + counts[pos]
+            for month, total in months.iteritems():
+                if total > min and total <= max:
+                    intake[month] = intake.get(month, 0) + 1
+        months = sorted(intake.keys())
+        return {"month": months, "people": [intake[m] for m in months]}
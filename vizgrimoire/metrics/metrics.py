@@ -23,6 +23,7 @@
 ##   Alvaro del Castillo <acs@bitergia.com>
 
 
+import datetime
 import logging
 
 from functools import wraps
@@ -30,6 +31,7 @@ from functools import wraps
 from vizgrimoire.GrimoireUtils import completePeriodIds, GetDates, GetPercentageDiff, check_array_values
 from vizgrimoire.metrics.query_builder import DSQuery
 from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.rollup import DAILY_BASE, DailySeries, RollupNotSupported
 
 
 def to_list(func):
@@ -193,16 +195,73 @@ class Metrics(object):
 
         query = self._get_sql(True)
         ts = self.db.ExecuteQuery(query)
+        return self._complete_ts(ts, self.filters.period)
+
+    def _complete_ts(self, ts, period):
+        """ Time series of the result of a period query, 0-filled """
         if self.filters.type_analysis and self.filters.type_analysis[1] is None:
             id_field = self.db.get_group_field_alias(self.filters.type_analysis[0])
             ts = Metrics._convert_group_to_ts(ts, id_field)
-            ts = Metrics._complete_period_ids_items(ts, id_field, self.filters.period,
+            ts = Metrics._complete_period_ids_items(ts, id_field, period,
                                                     self.filters.startdate, self.filters.enddate)
         else:
-            ts = completePeriodIds(ts, self.filters.period, 
+            ts = completePeriodIds(ts, period,
                                    self.filters.startdate, self.filters.enddate)
         return ts
 
+    def _get_period_filters(self, period):
+        """ Copy of the filters of the metric for other period """
+        filters = self.filters.copy()
+        filters.closed_condition = self.filters.closed_condition
+        filters.period = period
+        return filters
+
+    def get_daily_series(self, windows = None):
+        """ DailySeries with the daily base of the metric (rollup.py)
+
+        With windows, a list of (start, end) dates, the values are computed
+        per window by the query and the series is only valid for
+        roll_up_windows.
+        Raises RollupNotSupported if the fields of the metric can not be
+        rolled up from daily values.
+        """
+        filters = self.filters
+        self.filters = self._get_period_filters(DAILY_BASE)
+        self.db.windows = windows
+        try:
+            query = self._get_sql(True)
+        finally:
+            self.filters = filters
+            self.db.windows = None
+        id_field = None
+        if self.filters.type_analysis and self.filters.type_analysis[1] is None:
+            id_field = self.db.get_group_field_alias(self.filters.type_analysis[0])
+        return DailySeries(self.db.ExecuteQuery(query), id_field)
+
+    def get_ts_periods(self, periods):
+        """ Time series of the metric for each period (dict period -> ts)
+
+        The time series are rolled up from one daily base query, or got
+        with a query per period if the metric does not support it.
+        """
+        try:
+            series = self.get_daily_series()
+        except RollupNotSupported, e:
+            logging.info(self.id + " time series with a query per period: " + str(e))
+            series = None
+        result = {}
+        for period in periods:
+            if series is not None:
+                result[period] = self._complete_ts(series.roll_up(period), period)
+                continue
+            filters = self.filters
+            self.filters = self._get_period_filters(period)
+            try:
+                result[period] = self.get_ts()
+            finally:
+                self.filters = filters
+        return result
+
     def get_agg(self):
         """ Returns an aggregated value """
         q = self._get_sql(False)
@@ -212,6 +271,9 @@ class Metrics(object):
     def get_trends(self, date, days):
         """ Returns the trend metrics between now and now-days values """
 
+        data = self.get_trends_sketches(date, days)
+        if data is not None: return data
+
         if self.filters.type_analysis and self.filters.type_analysis[1] is None:
             return self._get_trends_all_items(date, days)
 
@@ -252,13 +314,6 @@ class Metrics(object):
         # Keeping state of origin filters
         filters = self.filters
 
-        # metrics not supported in group_by queries
-        metrics_not_supported = ['bmitickets']
-
-        if self.id in metrics_not_supported:
-            logging.warning(self.id + " not supported in GROUP BY queries.")
-            return {}
-
         chardates = GetDates(date, days)
         self.filters = MetricFilters(filters.period,
                                      chardates[1], chardates[0], filters.type_analysis)
@@ -274,6 +329,13 @@ class Metrics(object):
         prev = check_array_values(self.get_agg())
 
         group_field = self.db.get_group_field_alias(self.filters.type_analysis[0])
+
+        # Returning filters to their original value
+        self.filters = filters
+        return self._get_trends_items(prev, last, group_field, days)
+
+    def _get_trends_items(self, prev, last, group_field, days):
+        """ Build the trend metrics for all items from prev and last values """
         field = prev.keys()[0]
         if field == group_field: field = prev.keys()[1]
 
@@ -306,10 +368,200 @@ class Metrics(object):
         data['percentage_'+self.id+'_'+str(days)] = \
             [GetPercentageDiff(prev[field][i],last_ordered[field][i]) for i in range(0, len(prev[field]))]
 
-        # Returning filters to their original value
-        self.filters = filters
         return (data)
 
+    def is_cube_supported(self, evolutionary):
+        """ Check if the metric can be computed inside a cube query
+
+        Only metrics whose data comes from the query returned by _get_sql,
+        processed with the generic get_ts and get_agg, can be joined with
+        other filters queries.
+        """
+        if self.__class__._get_sql.im_func is Metrics._get_sql.im_func:
+            return False
+        if evolutionary: method = "get_ts"
+        else: method = "get_agg"
+        return getattr(self.__class__, method).im_func is getattr(Metrics, method).im_func
+
+    def get_cube(self, filter_names, evolutionary):
+        """ Returns the metric for all items of several filters in one query
+
+        The GROUP BY query for each filter is built as usual and all of them
+        are joined in one UNION ALL query. The result is split back per filter
+        using the same format get_ts and get_agg return for a filter with
+        all its items (type_analysis = [filter_name, None]).
+        """
+        filters = self.filters
+        branches = []
+        for filter_name in filter_names:
+            self.filters = filters.copy()
+            self.filters.type_analysis = [filter_name, None]
+            self.filters.closed_condition = filters.closed_condition
+            branches.append([filter_name, self._get_sql(evolutionary)])
+        self.filters = filters
+
+        period = None
+        if evolutionary: period = filters.period
+        query = self.db.BuildCubeQuery(branches, period)
+        cube = self.db.SplitCubeData(self.db.ExecuteQuery(query), branches, period)
+
+        if evolutionary:
+            for filter_name in cube:
+                id_field = self.db.get_group_field_alias(filter_name)
+                ts = Metrics._convert_group_to_ts(cube[filter_name], id_field)
+                cube[filter_name] = Metrics._complete_period_ids_items(ts, id_field,
+                                                                       filters.period,
+                                                                       filters.startdate,
+                                                                       filters.enddate)
+        return cube
+
+    def get_trends_cube(self, date, days, filter_names):
+        """ Returns the trend metrics for all items of several filters
+
+        Same data than get_trends for each filter with all its items, but
+        using only one cube query for the last period and one for the
+        previous one.
+        """
+        filters = self.filters
+
+        chardates = GetDates(date, days)
+        self.filters = MetricFilters(filters.period, chardates[1], chardates[0])
+        self.filters.global_filter = filters.global_filter
+        self.filters.closed_condition = filters.closed_condition
+        last = self.get_cube(filter_names, False)
+
+        self.filters = MetricFilters(filters.period, chardates[2], chardates[1])
+        self.filters.global_filter = filters.global_filter
+        self.filters.closed_condition = filters.closed_condition
+        prev = self.get_cube(filter_names, False)
+
+        self.filters = filters
+
+        data = {}
+        for filter_name in filter_names:
+            group_field = self.db.get_group_field_alias(filter_name)
+            data[filter_name] = self._get_trends_items(check_array_values(prev[filter_name]),
+                                                       check_array_values(last[filter_name]),
+                                                       group_field, days)
+        return data
+
+    def is_sketch_supported(self):
+        """ Check if the metric distinct people can be kept in sketches
+
+        The metric query must be built by _get_sql with the generic get_agg
+        and get_ts and count "count(distinct(people)) as metric_id".
+        """
+        return self.is_cube_supported(False) and self.is_cube_supported(True)
+
+    def _get_sketch_store(self):
+        if not hasattr(self.data_source, "get_sketch_store"): return None
+        return self.data_source.get_sketch_store()
+
+    def _get_sketch_metric(self):
+        """ Key for the metric in the sketch store """
+        return (self.id, str(self.filters.global_filter), str(self.filters.closed_condition))
+
+    def load_sketches(self, store, startdate, enddate, extend = False):
+        """ Load in store the distinct people per day for [startdate, enddate)
+
+        The sketches are loaded for the whole data source or for all the
+        items of the filter in type_analysis ([filter_name, None]). With
+        extend the days are added to the ones already loaded, which must end
+        at startdate.
+        Returns False if the metric can not be kept in sketches.
+        """
+        filters = self.filters
+        metric = self._get_sketch_metric()
+        filter_name = None
+        if filters.type_analysis: filter_name = filters.type_analysis[0]
+
+        self.filters = MetricFilters("day", startdate, enddate, filters.type_analysis)
+        self.filters.global_filter = filters.global_filter
+        self.filters.closed_condition = filters.closed_condition
+        query = self.db.BuildSketchQuery(self._get_sql(True), self.id)
+        self.filters = filters
+        if query is None:
+            logging.warning(self.id + " query not supported in sketches.")
+            store.unsupported.add(metric)
+            return False
+
+        data = check_array_values(self.db.ExecuteQuery(query))
+        if extend: store.extend_loaded(metric, filter_name, enddate)
+        else: store.set_loaded(metric, filter_name, startdate, enddate)
+        id_field = None
+        if filter_name is not None:
+            id_field = self.db.get_group_field_alias(filter_name)
+        for i in range(0, len(data['sketch_uuid'])):
+            item = None
+            if id_field is not None: item = (filter_name, data[id_field][i])
+            store.add(data['sketch_day'][i], item, metric, data['sketch_uuid'][i])
+        return True
+
+    def get_trends_sketches(self, date, days):
+        """ Returns the trend metrics using the sketch store of the data source
+
+        Returns None if there is no sketch store or the metric or filter
+        is not supported in sketches, so the trends are got with SQL.
+        """
+        store = self._get_sketch_store()
+        if store is None: return None
+        type_analysis = self.filters.type_analysis
+        if type_analysis and type_analysis[1] is not None: return None
+        if not self.is_sketch_supported(): return None
+        # The store is shared by the QueryExecutor workers of the data source
+        with store.lock:
+            metric = self._get_sketch_metric()
+            if metric in store.unsupported: return None
+
+            filter_name = None
+            if type_analysis: filter_name = type_analysis[0]
+            chardates = GetDates(date, days)
+            if not store.covers(metric, filter_name, chardates[2], chardates[0]):
+                startdate = GetDates(date, max(days, store.days))[2]
+                loaded = store.get_loaded(metric, filter_name)
+                if (loaded is not None and loaded[1] > store._get_day(startdate) and
+                    store.covers(metric, filter_name, startdate, loaded[1])):
+                    # Sketches saved in a previous run: load only the new days,
+                    # and the last saved one again as it could be incomplete
+                    startdate = "'" + str(loaded[1] - datetime.timedelta(days=1)) + "'"
+                    store.truncate(metric, filter_name, startdate)
+                    if not self.load_sketches(store, startdate, chardates[0], True): return None
+                # Load all days needed for the longest trend
+                elif not self.load_sketches(store, startdate, chardates[0]): return None
+
+            if filter_name is None:
+                last = store.count(metric, chardates[1], chardates[0])
+                prev = store.count(metric, chardates[2], chardates[1])
+                data = {}
+                data['diff_net'+self.id+'_'+str(days)] = last - prev
+                data['percentage_'+self.id+'_'+str(days)] = GetPercentageDiff(prev, last)
+                data[self.id+'_'+str(days)] = last
+                return data
+
+            group_field = self.db.get_group_field_alias(filter_name)
+            trends = []
+            for dates in [[chardates[2], chardates[1]], [chardates[1], chardates[0]]]:
+                counts = store.count_items(metric, dates[0], dates[1], filter_name)
+                trends.append({group_field: counts['name'], self.id: counts['count']})
+            return self._get_trends_items(trends[0], trends[1], group_field, days)
+
+    def _get_lifecycle_index(self):
+        """ People lifecycle index of the data source and bots to remove
+
+        Returns the index and the people removed by the bots filter
+        (people_out), or (None, None) if the metric can not use it. The index
+        has the whole activity of the data source, so it is only used for
+        global metrics (no type_analysis nor global filter).
+        """
+        if self.filters.type_analysis or self.filters.global_filter is not None:
+            return None, None
+        if not hasattr(self.data_source, "get_lifecycle_index"): return None, None
+        index = self.data_source.get_lifecycle_index(self.db)
+        if index is None: return None, None
+        bots = index.get_bots(self.filters.people_out)
+        if bots is None: return None, None
+        return index, bots
+
     def _get_top_supported_filters(self):
         return []
 
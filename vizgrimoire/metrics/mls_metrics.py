@@ -48,6 +48,15 @@ class InitialActivity(Metrics):
     data_source = MLS
 
     def get_agg(self):
+        # Only the people with identity are in the lifecycle index, the
+        # same ones the bots filter (people_out) selects.
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            first = index.get_first_date(self.filters.startdate,
+                                         self.filters.enddate, bots)
+            if first is not None: first = first.strftime('%Y-%m-%d')
+            return {"first_date": first}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -74,6 +83,13 @@ class EndOfActivity(Metrics):
     data_source = MLS
 
     def get_agg(self):
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            last = index.get_last_date(self.filters.startdate,
+                                       self.filters.enddate, bots)
+            if last is not None: last = last.strftime('%Y-%m-%d')
+            return {"last_date": last}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -0,0 +1,129 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Onion model: core, regular and occasional contributors
+##
+## The contributions of each person for several time windows (and items
+## of a filter) are loaded with one query (DSQuery.GetOnionActivity) and
+## the layers of each window are cut from the cumulative share of the
+## people sorted by contributions. Transitions between windows are set
+## operations on the layers.
+##
+## Analysis based on the study by Crowston and Howison,
+##          'The social structure of free and open source software'
+## http://firstmonday.org/ojs/index.php/fm/rt/printerFriendly/1207/1127
+
+
+import numpy as np
+
+from vizgrimoire.GrimoireUtils import check_array_values
+
+
+class OnionModel(object):
+    """ Onion layers for the windows of a data source onion activity
+
+    activity is the data returned by DSQuery.GetOnionActivity with the
+    columns onion_window, person, contributions and, for filter all
+    queries, item. Core people are the top contributors until core (%)
+    of the contributions is reached, regular people the next ones until
+    regular (%) and occasional people the rest.
+    """
+
+    def __init__(self, activity, core = 80, regular = 95):
+        activity = check_array_values(activity)
+        self.core = core
+        self.regular = regular
+        self.contributions = {} # (window, item) -> person -> contributions
+
+        if 'person' not in activity: return
+        items = activity.get('item')
+        for i in range(0, len(activity['person'])):
+            item = None
+            if items is not None: item = items[i]
+            key = (int(activity['onion_window'][i]), item)
+            people = self.contributions.setdefault(key, {})
+            person = activity['person'][i]
+            people[person] = people.get(person, 0) + int(activity['contributions'][i])
+
+    @staticmethod
+    def cut(counts, core = 80, regular = 95):
+        """ Size of the core and core + regular layers
+
+        counts are the contributions of the people sorted in descending
+        order. The core layer ends with the person reaching core (%) of the
+        contributions and the regular layer with the one reaching regular (%).
+        """
+        if len(counts) == 0: return 0, 0
+        cumsum = np.cumsum(counts)
+        total = cumsum[-1]
+        # Shares as cumsum * 100 >= share * total to avoid float rounding
+        ncore = int(np.searchsorted(cumsum * 100, core * total, side = 'left')) + 1
+        nregular = int(np.searchsorted(cumsum * 100, regular * total, side = 'left')) + 1
+        ncore = min(ncore, len(counts))
+        nregular = min(max(ncore, nregular), len(counts))
+        return ncore, nregular
+
+    def get_items(self, window):
+        """ Items of the filter with activity in the window """
+        return sorted(key[1] for key in self.contributions
+                      if key[0] == window and key[1] is not None)
+
+    def get_contributions(self, window, item = None):
+        """ Dict person -> contributions in the window """
+        return self.contributions.get((window, item), {})
+
+    def get_sorted(self, window, item = None):
+        """ People and contributions sorted by contributions (descending) """
+        people = self.get_contributions(window, item)
+        # Sorted first by person so ties are always resolved the same way
+        persons = sorted(people.keys())
+        counts = np.array([people[p] for p in persons], dtype = np.int64)
+        order = np.argsort(-counts, kind = 'mergesort')
+        return [persons[pos] for pos in order], counts[order]
+
+    def get_layers(self, window, item = None):
+        """ Sets of core, regular and occasional people in the window """
+        persons, counts = self.get_sorted(window, item)
+        ncore, nregular = OnionModel.cut(counts, self.core, self.regular)
+        return {"core": set(persons[:ncore]),
+                "regular": set(persons[ncore:nregular]),
+                "occasional": set(persons[nregular:])}
+
+    def get_counts(self, window, item = None):
+        """ Number of core, regular and occasional people in the window """
+        persons, counts = self.get_sorted(window, item)
+        ncore, nregular = OnionModel.cut(counts, self.core, self.regular)
+        return {"core": ncore, "regular": nregular - ncore,
+                "occasional": len(persons) - nregular}
+
+    def get_transitions(self, past, current, item = None):
+        """ People moving between layers from the past to the current window
+
+        Returns the current core and the people going up to the core
+        (up_core) and to the regular layer (up_reg) and going down to
+        the regular (down_reg) and occasional (down_occ) layers.
+        """
+        past = self.get_layers(past, item)
+        cur = self.get_layers(current, item)
+        return {"core": cur["core"],
+                "up_core": cur["core"] - past["core"],
+                "up_reg": cur["regular"] - past["core"] - past["regular"],
+                "down_reg": past["core"] & cur["regular"],
+                "down_occ": (past["core"] | past["regular"]) & cur["occasional"]}
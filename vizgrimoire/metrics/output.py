@@ -0,0 +1,108 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Write if changed output of a report
+##
+## The files of a report are written only if their content changed from
+## the previous run, so their mtime (and browser or CDN caches) is kept,
+## and atomically using a temporal file and a rename. The manifest has
+## the hash, size and mtime of each file, and the files changed in the
+## last run, which are the ones to be published.
+
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+
+class OutputManager(object):
+    """ Files of destdir written only when their content changes """
+
+    manifest_file = "manifest.json"
+
+    def __init__(self, destdir, force = False):
+        self.destdir = destdir
+        self.force = force # write all the files even if not changed
+        self.files = {} # path relative to destdir -> {hash, size, mtime}
+        self.changed = []
+        self.skipped = 0
+        manifest = os.path.join(destdir, OutputManager.manifest_file)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                self.files = json.load(f)["files"]
+
+    @staticmethod
+    def get_hash(data):
+        return hashlib.sha1(data).hexdigest()
+
+    @staticmethod
+    def write_atomic(filepath, data):
+        """ Write data in a temporal file of the same dir and rename it """
+        dirname = os.path.dirname(os.path.abspath(filepath))
+        (fd, tmp) = tempfile.mkstemp(dir = dirname, prefix = ".tmp-")
+        try:
+            os.write(fd, data)
+            os.close(fd)
+            # mkstemp creates the files only readable by the owner
+            os.chmod(tmp, 0644)
+            os.rename(tmp, filepath)
+        except:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+
+    def is_changed(self, name, filepath, data_hash, size):
+        if self.force or name not in self.files: return True
+        old = self.files[name]
+        if old["hash"] != data_hash: return True
+        # The file could be removed or modified after the last run
+        return not os.path.exists(filepath) or os.path.getsize(filepath) != size
+
+    def write(self, filepath, data):
+        """ Write data (a str) in filepath if it changed
+
+        Returns True if the file was written.
+        """
+        if isinstance(data, unicode): data = data.encode('utf-8')
+        data_hash = OutputManager.get_hash(data)
+        name = os.path.relpath(filepath, self.destdir)
+        if name.startswith(os.pardir):
+            # Not a report file: written but not in the manifest
+            OutputManager.write_atomic(filepath, data)
+            return True
+        if not self.is_changed(name, filepath, data_hash, len(data)):
+            self.skipped += 1
+            return False
+        OutputManager.write_atomic(filepath, data)
+        self.files[name] = {"hash": data_hash, "size": len(data),
+                            "mtime": int(os.path.getmtime(filepath))}
+        if name not in self.changed: self.changed.append(name)
+        return True
+
+    def close(self):
+        """ Save the manifest with all the files and the changed ones """
+        manifest = {"date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "files": self.files,
+                    "changed": sorted(self.changed)}
+        OutputManager.write_atomic(os.path.join(self.destdir, OutputManager.manifest_file),
+                                   json.dumps(manifest, indent = 1, sort_keys = True))
+        logging.info("%i files written, %i not changed" % (len(self.changed), self.skipped))
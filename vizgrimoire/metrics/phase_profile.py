@@ -0,0 +1,137 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Python side profile of the phases of a report run
+##
+## Each step of the report (a phase as evol or agg, or a data source and
+## filter inside a phase) is run under cProfile and its stats are dumped
+## in a pstats file, which can be converted to a flame graph with tools
+## as gprof2dot or flameprof. The RSS at the end of each step, its change
+## in the step and, if the tracemalloc module is available (pytracemalloc
+## for python 2), the top allocation sites of each step are reported too.
+## The peak RSS is the one of the process so far, not of the step.
+
+
+import cProfile
+import json
+import logging
+import os
+import re
+import resource
+import time
+
+
+class PhaseProfiler(object):
+    """ cProfile and memory profile of each step of a report run """
+
+    def __init__(self, destdir, memory = False, top = 20):
+        self.destdir = destdir
+        self.top = top
+        self.tracemalloc = None
+        if memory:
+            try:
+                import tracemalloc
+                self.tracemalloc = tracemalloc
+                tracemalloc.start()
+            except ImportError:
+                logging.warning("tracemalloc not available: only RSS reported")
+        if not os.path.isdir(destdir): os.makedirs(destdir)
+        self.steps = [] # profile data of the finished steps
+        self.step = None
+        self.profile = None
+        self.start = None
+
+    @staticmethod
+    def get_step_name(phase, step = None):
+        name = phase
+        if step is not None: name += "-" + step
+        return re.sub(r"[^\w\-+.]", "_", name)
+
+    @staticmethod
+    def get_peak_rss():
+        """ Peak RSS of the process since it started in KB (Linux) """
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    @staticmethod
+    def get_rss():
+        """ Current RSS of the process in KB, None if not available (Linux) """
+        try:
+            with open("/proc/self/statm") as f:
+                pages = int(f.read().split()[1])
+        except (IOError, IndexError, ValueError):
+            return None
+        return pages * resource.getpagesize() / 1024
+
+    def start_step(self, phase, step = None):
+        """ Finish the current step and start profiling a new one """
+        self.stop_step()
+        self.step = PhaseProfiler.get_step_name(phase, step)
+        if self.tracemalloc is not None: self.tracemalloc.clear_traces()
+        self.start = (time.time(), time.clock(), PhaseProfiler.get_rss())
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop_step(self):
+        if self.profile is None: return
+        self.profile.disable()
+        rss = PhaseProfiler.get_rss()
+        data = {"step": self.step,
+                "time": time.time() - self.start[0],
+                "cpu": time.clock() - self.start[1],
+                "rss": rss, "rss_delta": None,
+                "process_peak_rss": PhaseProfiler.get_peak_rss()}
+        if rss is not None and self.start[2] is not None:
+            data["rss_delta"] = rss - self.start[2]
+        # The same step can be run several times (i.e. people of each ds)
+        runs = len([s for s in self.steps if s["step"] == self.step])
+        pstats = self.step
+        if runs > 0: pstats += "-" + str(runs + 1)
+        pstats += ".pstats"
+        self.profile.dump_stats(os.path.join(self.destdir, pstats))
+        data["pstats"] = pstats
+        if self.tracemalloc is not None:
+            data.update(self._get_memory())
+        self.steps.append(data)
+        logging.info("Profile %s: %.1fs (%.1fs cpu), RSS %s KB (%s KB in the step), "
+                     "process peak RSS so far %i KB" %
+                     (self.step, data["time"], data["cpu"], data["rss"],
+                      data["rss_delta"], data["process_peak_rss"]))
+        self.profile = None
+        self.step = None
+
+    def _get_memory(self):
+        """ Traced memory and top allocation sites of the current step """
+        current, peak = self.tracemalloc.get_traced_memory()
+        snapshot = self.tracemalloc.take_snapshot()
+        sites = []
+        for stat in snapshot.statistics('lineno')[0:self.top]:
+            frame = stat.traceback[0]
+            sites.append({"site": frame.filename + ":" + str(frame.lineno),
+                          "size": stat.size, "count": stat.count})
+        return {"traced_memory": current, "traced_peak": peak, "allocations": sites}
+
+    def save(self):
+        """ Finish the current step and save the summary of all the steps """
+        self.stop_step()
+        path = os.path.join(self.destdir, "profile.json")
+        logging.info("Saving phases profile in " + path)
+        with open(path, "w") as f:
+            json.dump({"steps": self.steps}, f, indent = 1, sort_keys = True)
+        if self.tracemalloc is not None: self.tracemalloc.stop()
@@ -0,0 +1,109 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Hierarchy of the projects of the projects database
+##
+## A project includes the repositories of all its subprojects, at any
+## level of project_children. The transitive closure is computed once
+## per run and per projects database, and the query builders resolve it
+## to the ids of the repositories of each data source (projects_repos).
+
+
+import logging
+
+from vizgrimoire.GrimoireUtils import check_array_values
+
+
+class ProjectsHierarchy(object):
+    """ Projects with all their subprojects and repositories """
+
+    _hierarchies = {} # projects database -> ProjectsHierarchy
+
+    def __init__(self, projects, children, repositories):
+        """ projects: project name (projects.id) -> project_id
+            children: list of (project_id, subproject_id)
+            repositories: list of (project_id, data_source, repository_name)
+        """
+        self.projects = projects
+        self.closure = ProjectsHierarchy.get_closure(projects.values(), children)
+        self.repositories = {} # project_id -> data source -> repositories
+        for (project_id, data_source, repository) in repositories:
+            project_repos = self.repositories.setdefault(project_id, {})
+            project_repos.setdefault(data_source, set()).add(repository)
+
+    @staticmethod
+    def get_closure(project_ids, children):
+        """ Dict project_id -> set with the project and all its subprojects """
+        direct = {}
+        for (project_id, subproject_id) in children:
+            direct.setdefault(project_id, set()).add(subproject_id)
+        closure = {}
+        for project_id in project_ids:
+            # Iterative walk, safe with cycles in project_children
+            subprojects = set([project_id])
+            pending = [project_id]
+            while pending:
+                for child in direct.get(pending.pop(), []):
+                    if child not in subprojects:
+                        subprojects.add(child)
+                        pending.append(child)
+            closure[project_id] = subprojects
+        return closure
+
+    def get_subprojects(self, name):
+        """ Sorted project_ids of the project and all its subprojects """
+        if name not in self.projects: return []
+        return sorted(self.closure[self.projects[name]])
+
+    def get_repositories(self, name, data_source):
+        """ Sorted repositories of the project and all its subprojects """
+        repositories = set()
+        for project_id in self.get_subprojects(name):
+            repositories.update(self.repositories.get(project_id, {}).get(data_source, []))
+        return sorted(repositories)
+
+    def get_projects_repositories(self, data_source):
+        """ List of (project name, repository) for all the projects """
+        pairs = []
+        for name in sorted(self.projects):
+            for repository in self.get_repositories(name, data_source):
+                pairs.append((name, repository))
+        return pairs
+
+    @classmethod
+    def get_hierarchy(cls, dsquery):
+        """ Hierarchy of the projects database of dsquery, read once per run """
+        projects_db = dsquery.projects_db
+        if projects_db not in cls._hierarchies:
+            logging.info("Reading the projects hierarchy from " + projects_db)
+            res = check_array_values(dsquery.ExecuteQuery(
+                "SELECT id, project_id FROM %s.projects" % (projects_db)))
+            projects = dict(zip(res.get('id', []), res.get('project_id', [])))
+            res = check_array_values(dsquery.ExecuteQuery(
+                "SELECT project_id, subproject_id FROM %s.project_children" % (projects_db)))
+            children = zip(res.get('project_id', []), res.get('subproject_id', []))
+            res = check_array_values(dsquery.ExecuteQuery("""
+                SELECT project_id, data_source, repository_name
+                FROM %s.project_repositories""" % (projects_db)))
+            repositories = zip(res.get('project_id', []), res.get('data_source', []),
+                               res.get('repository_name', []))
+            cls._hierarchies[projects_db] = ProjectsHierarchy(projects, children,
+                                                              repositories)
+        return cls._hierarchies[projects_db]
@@ -210,6 +210,12 @@ class Participants(Metrics):
                            people p 
                       where c.user_identifier=p.identifier)) t
                  """)
+        type_analysis = self.filters.type_analysis
+        if type_analysis is not None and type_analysis[0] == "people2":
+            tables.add("people p")
+            filters.add("t.identifier = p.identifier")
+            if type_analysis[1] is not None:
+                filters.add("p.username = " + type_analysis[1])
         query = self.db.BuildQuery(self.filters.period, self.filters.startdate,
                                    self.filters.enddate, " t.date ", fields,
                                    tables, filters, evolutionary, self.filters.type_analysis)
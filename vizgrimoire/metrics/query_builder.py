@@ -25,18 +25,77 @@ import logging
 import MySQLdb
 import re
 import sys
+import threading
 from sets import Set
 import datetime
+import hashlib
 import time
+from dateutil import parser
 
+from vizgrimoire.metrics.date_keys import DateKeys
+from vizgrimoire.metrics.indexes import IndexCatalog
 from vizgrimoire.metrics.metrics_filter import MetricFilters
-from vizgrimoire.GrimoireUtils import genDates
+from vizgrimoire.metrics.projects import ProjectsHierarchy
+from vizgrimoire.metrics.rollup import DAILY_BASE, get_base_fields, get_ids_column, get_windows_key
+from vizgrimoire.metrics.sql import Select, bind, join_parts, quote
+from vizgrimoire.GrimoireUtils import genDates, check_array_values
 from vizgrimoire.datahandlers.data_handler import DHESA
 
+def synchronized(method):
+    """ Run method with DSQuery.refresh_lock held
+
+    For the per run tables and caches shared by the QueryExecutor workers.
+    """
+    def synchronized_method(*args, **kwargs):
+        with DSQuery.refresh_lock:
+            return method(*args, **kwargs)
+    synchronized_method.__name__ = method.__name__
+    synchronized_method.__doc__ = method.__doc__
+    return synchronized_method
+
+
 class DSQuery(object):
     """ Generic methods to control access to db """
 
     db_conn_pool = {} # one connection per database
+    # QueryExecutor workers: connections of each worker thread
+    worker_local = threading.local()
+    refresh_lock = threading.RLock()
+    # Indexes used by the joins and date predicates: list of (table, [columns])
+    indexes = []
+    # ScanReport: if set, the EXPLAIN of all SELECT queries is added to it
+    scan_report = None
+    # QueryProfile: if set, all the queries executed are added to it
+    query_profile = None
+    # (filter, items): if set, the GROUP BY queries for all the items of
+    # filter are restricted to items (filter reports processed in batches)
+    items_batch = None
+    # [(start, end)]: if set in a query builder, its daily base queries
+    # get the values per window instead of per day (GetSQLWindows)
+    windows = None
+    # Filters supported in GROUP BY (filter all items) queries
+    group_by_filters = ['people2','company','country','domain','project','repository',
+                        'company'+MetricFilters.DELIMITER+'country',
+                        'company'+MetricFilters.DELIMITER+'project']
+    # Fields to group by for filters not using the default ones
+    group_fields = {}
+    # Project filter: data source in project_repositories, query for the
+    # id and name of its repositories, and tables and filters to join the
+    # items with the repositories ids of projects_repos
+    projects_data_source = None
+    projects_repositories = None
+    projects_repository_type = "INT"
+    projects_tables = []
+    projects_filters = []
+    projects_repos_refreshed = {} # databases with projects_repos refreshed
+    affiliations_refreshed = {} # databases with the affiliations tables refreshed
+    date_keys = {} # database -> DateKeys with the derived columns available
+    bots_refreshed = {} # database -> bots of the people_bots table
+    # Lifecycle index: source table and date field of the activity and
+    # activity count columns (see _get_lifecycle_query)
+    lifecycle_source = None
+    lifecycle_fields = []
+    lifecycle_refreshed = {} # databases with people_lifecycle refreshed
 
     def __init__(self, user, password, database,
                  identities_db = None, projects_db = None,
@@ -49,151 +108,300 @@ class DSQuery(object):
         self.host = host
         self.port = port
         self.group = group
-        if database in DSQuery.db_conn_pool:
-            db = DSQuery.db_conn_pool[database]
-        else:
-            db = self.__SetDBChannel__(user, password, database, host, port, group)
-            DSQuery.db_conn_pool[database] = db
-        self.cursor = db.cursor()
-        self.cursor.execute("SET NAMES 'utf8'")
+        self._cursor = None # the database is connected when first used
 
-        db = self.__SetDBChannel__(user, password, database, host, port, group)
+    @classmethod
+    def init_worker(cls):
+        """ Use own connections in the current (QueryExecutor worker) thread """
+        DSQuery.worker_local.cursors = {}
+        DSQuery.worker_local.connections = []
 
-        self.create_indexes()
+    @classmethod
+    def close_worker(cls):
+        """ Close the connections of the current worker thread """
+        for db in getattr(DSQuery.worker_local, "connections", []):
+            db.close()
+        DSQuery.worker_local.cursors = None
+        DSQuery.worker_local.connections = []
+
+    def refresh_run_tables(self, type_analysis = None, people_out = None):
+        """ Refresh the per run tables used by the queries of a report
+
+        Called in the main thread before the metrics are computed by the
+        QueryExecutor workers, so the tables are written and committed once
+        with the main connection and the workers only read them.
+        """
+        if type_analysis and "project" in type_analysis[0].split(MetricFilters.DELIMITER):
+            self.GetProjectsRepos()
+        if people_out:
+            self.GetBotsTable(people_out)
+
+    @property
+    def cursor(self):
+        """ Cursor of the database, connected (and indexed) the first time """
+        cursors = getattr(DSQuery.worker_local, "cursors", None)
+        if cursors is not None:
+            # MySQLdb connections can not be shared between threads
+            if self.database not in cursors:
+                db = self.__SetDBChannel__(self.user, self.password, self.database,
+                                           self.host, self.port, self.group)
+                DSQuery.worker_local.connections.append(db)
+                cursors[self.database] = db.cursor()
+                cursors[self.database].execute("SET NAMES 'utf8'")
+            return cursors[self.database]
+        if self._cursor is None:
+            if self.database in DSQuery.db_conn_pool:
+                db = DSQuery.db_conn_pool[self.database]
+            else:
+                db = self.__SetDBChannel__(self.user, self.password, self.database,
+                                           self.host, self.port, self.group)
+                DSQuery.db_conn_pool[self.database] = db
+            self._cursor = db.cursor()
+            self._cursor.execute("SET NAMES 'utf8'")
+            self.create_indexes()
+        return self._cursor
 
     def create_indexes(self):
         """ Basic indexes used in each data source """
         pass
 
+    def get_existing_indexes(self):
+        """ Dict table -> list of indexes (columns lists) in the database """
+        existing = {}
+        q = "SELECT table_name FROM information_schema.tables "
+        q += "WHERE table_schema = '%s'" % (self.database)
+        tables = check_array_values(self.ExecuteQuery(q))
+        for table in tables.get('table_name', []):
+            existing[table] = []
+        q = """
+            SELECT table_name, index_name, column_name
+            FROM information_schema.statistics
+            WHERE table_schema = '%s'
+            ORDER BY table_name, index_name, seq_in_index
+            """ % (self.database)
+        columns = check_array_values(self.ExecuteQuery(q))
+        indexes = {}
+        for i in range(0, len(columns.get('table_name', []))):
+            key = (columns['table_name'][i], columns['index_name'][i])
+            indexes.setdefault(key, []).append(columns['column_name'][i])
+        for (table, index), index_columns in indexes.iteritems():
+            existing.setdefault(table, []).append(index_columns)
+        return existing
+
+    def get_missing_indexes(self):
+        """ Indexes of the data source catalog not in the database """
+        catalog = IndexCatalog(self.indexes)
+        return catalog.get_missing(self.get_existing_indexes())
+
+    def ensure_indexes(self):
+        """ Create the indexes of the data source catalog not in the database
+
+        Returns the list of indexes (table, [columns]) created.
+        """
+        created = []
+        for (table, columns) in self.get_missing_indexes():
+            name = IndexCatalog.get_name(table, columns)
+            q = "CREATE INDEX %s ON `%s` (%s)" % (name, table,
+                ", ".join("`" + column + "`" for column in columns))
+            logging.info("Creating index " + name + " in " + self.database)
+            try:
+                self.ExecuteViewQuery(q)
+                created.append((table, columns))
+            except MySQLdb.Error, e:
+                logging.error("Can not create index " + name + " in " +
+                              self.database + ": " + str(e))
+        return created
+
+    @staticmethod
+    def get_explain(cursor, sql):
+        """ EXPLAIN of a SELECT query as a dict column -> list of values """
+        if not sql.lstrip().upper().startswith("SELECT"): return None
+        try:
+            cursor.execute("EXPLAIN " + sql)
+        except MySQLdb.Error:
+            # The query itself will report the error
+            return None
+        columns = [column[0] for column in cursor.description]
+        plan = dict((column, []) for column in columns)
+        for row in cursor.fetchall():
+            for (index, value) in enumerate(row):
+                plan[columns[index]].append(value)
+        return plan
+
+    def explain_query(self, sql):
+        """ Add the EXPLAIN of a SELECT query to the scan report """
+        plan = DSQuery.get_explain(self.cursor, sql)
+        if plan is not None:
+            with DSQuery.refresh_lock: DSQuery.scan_report.add(sql, plan)
+
+    @staticmethod
+    def _add_filters(select, filters):
+        """ Add a filters string (a and b ...) to the WHERE of select """
+        reg_and = re.compile("^\\s*and\\s", re.IGNORECASE)
+        select.add_filter(reg_and.sub("", filters))
+
     @classmethod
-    def GetSQLGlobal(cls, date, fields, tables, filters, start, end, all_items = None, strict = False):
-        group_field = None
+    def GetSQLGlobal(cls, date, fields, tables, filters, start, end, all_items = None,
+                     strict = False, group_field = None):
+        select = Select(tables = tables)
         count_field = None
         if all_items:
-            group_field = cls.get_group_field(all_items)
+            if group_field is None: group_field = cls.get_group_field(all_items)
             # Format: "count(distinct(pup.uuid)) AS authors"
             count_field = fields.split(" ")[2]
             if len(fields.split(" ")) == 5:
                 # Format: "count(distinct ch.issue_id, ch.old_value) as sent_patchsets"
                 count_field = fields.split(" ")[4]
-            fields = group_field + ", " + fields
-
-        sql = 'SELECT '+ fields
-        sql += ' FROM '+ tables
-        if (strict):
-            sql += ' WHERE '+date+'>='+start+' AND '+date+'<='+end
-        else:
-            sql += ' WHERE '+date+'>='+start+' AND '+date+'<'+end
-
-        reg_and = re.compile("^[ ]*and", re.IGNORECASE)
-        if (filters != ""):
-            if (reg_and.match (filters.lower())) is not None: sql += " " + filters
-            else: sql += ' AND '+filters
+            select.add_field(group_field)
+        select.add_field(fields)
+        select.add_date_range(date, start, end, strict)
+        cls._add_filters(select, filters)
 
         if all_items:
             if len(group_field.split(" ")) == 3:
                 group_field = group_field.split(" ")[2]
-            sql += " GROUP BY " + group_field
-            sql += " ORDER BY " + count_field + " DESC," + group_field
+            select.group_by.append(group_field)
+            select.order_by += [count_field + " DESC", group_field]
 
-        return(sql)
+        return select.get_sql()
 
     @classmethod
     def GetSQLPeriod(cls, period, date, qfields, tables, filters, start, end,
-                     all_items = None, strict = False):
-        group_field = None
+                     all_items = None, strict = False, date_key = None, group_field = None):
+        # date_key: derived column with the period of date (DateKeys)
 
+        if period == DAILY_BASE:
+            return cls.GetSQLDailyBase(date, qfields, tables, filters, start, end,
+                                       all_items, strict, date_key, group_field)
         iso_8601_mode = 3
-        if (period == 'day'):
+        if date_key is not None:
+            if (period == 'day'):
+                fields = 'UNIX_TIMESTAMP('+date_key+') AS unixtime'
+            else:
+                fields = date_key+' AS '+period
+        elif (period == 'day'):
             # Remove time so unix timestamp is start of day
             fields = 'UNIX_TIMESTAMP(DATE('+date+')) AS unixtime'
         elif (period == 'week'):
             fields = 'YEARWEEK('+date+','+str(iso_8601_mode)+') AS week'
         elif (period == 'month'):
             fields = 'YEAR('+date+')*12+MONTH('+date+') AS month'
+        elif (period == 'quarter'):
+            fields = 'YEAR('+date+')*4+QUARTER('+date+')-1 AS quarter'
         elif (period == 'year'):
             fields = 'YEAR('+date+')*12 AS year'
         else:
             logging.error("PERIOD: "+period+" not supported")
             raise Exception
+        select = Select(tables = tables)
         # sql = paste(sql, 'DATE_FORMAT (',date,', \'%d %b %Y\') AS date, ')
         if all_items:
-            group_field = cls.get_group_field(all_items)
+            if group_field is None: group_field = cls.get_group_field(all_items)
             if group_field.find("DISTINCT") > -1:
                 # DISTINCT field should be the first
-                fields = group_field + ", "+ fields
+                select.add_field(group_field)
+                select.add_field(fields)
             else:
-                fields += ", " + group_field
-        fields += ", " + qfields
-        sql = "SELECT " + fields
-        sql += ' FROM ' + tables
-        if (strict):
-            sql = sql + ' WHERE '+date+'>='+start+' AND '+date+'<='+end
+                select.add_field(fields)
+                select.add_field(group_field)
         else:
-            sql = sql + ' WHERE '+date+'>='+start+' AND '+date+'<'+end
-
-        reg_and = re.compile("^[ ]*and", re.IGNORECASE)
-
-        if (filters != ""):
-            if (reg_and.match (filters.lower())) is not None: sql += " " + filters
-            else: sql += ' AND ' + filters
-
-        group_by = " GROUP BY "
+            select.add_field(fields)
+        select.add_field(qfields)
+        select.add_date_range(date, start, end, strict)
+        cls._add_filters(select, filters)
 
         if all_items:
             if len(group_field.split(" ")) == 3:
                 group_field = group_field.split(" ")[2]
-            group_by += group_field + ", "
+            select.group_by.append(group_field)
 
-        if (period == 'year'):
-            sql += group_by + ' YEAR('+date+')'
-            sql += ' ORDER BY YEAR('+date+')'
+        if date_key is not None:
+            period_fields = date_key
+        elif (period == 'year'):
+            period_fields = 'YEAR('+date+')'
         elif (period == 'month'):
-            sql += group_by + ' YEAR('+date+'),MONTH('+date+')'
-            sql += ' ORDER BY YEAR('+date+'),MONTH('+date+')'
+            period_fields = 'YEAR('+date+'),MONTH('+date+')'
+        elif (period == 'quarter'):
+            period_fields = 'YEAR('+date+'),QUARTER('+date+')'
         elif (period == 'week'):
-            sql += group_by + ' YEARWEEK('+date+','+str(iso_8601_mode)+')'
-            sql += ' ORDER BY YEARWEEK('+date+','+str(iso_8601_mode)+')'
+            period_fields = 'YEARWEEK('+date+','+str(iso_8601_mode)+')'
         elif (period == 'day'):
-            sql += group_by + ' YEAR('+date+'),DAYOFYEAR('+date+')'
-            sql += ' ORDER BY YEAR('+date+'),DAYOFYEAR('+date+')'
-        else:
-            logging.error("PERIOD: "+period+" not supported")
-            sys.exit(1)
+            period_fields = 'YEAR('+date+'),DAYOFYEAR('+date+')'
+        select.group_by.append(period_fields)
+        select.order_by.append(period_fields)
 
-        return(sql)
+        return select.get_sql()
 
-    def _get_fields_query(self, fields):
-        # Returns a string with fields separated by ","
-        fields_str = ""
+    @classmethod
+    def GetSQLDailyBase(cls, date, qfields, tables, filters, start, end,
+                        all_items = None, strict = False, date_key = None, group_field = None):
+        """ Daily values of qfields to be rolled up to any period (DailySeries)
 
-        if len(fields) > 0:
-            fields_str = str(fields.pop())
-            for i in range(len(fields)):
-                fields_str += " , " + str(fields.pop())
+        The count and sum fields are computed per day. A count distinct
+        field gives its ids per day instead (one row per day and id).
+        date_key: derived column with the day of date (DateKeys)
+        """
+        day = date_key
+        if day is None: day = 'DATE('+date+')'
+        select = Select(tables = tables)
+        if all_items:
+            if group_field is None: group_field = cls.get_group_field(all_items)
+            # DISTINCT field should be the first
+            select.add_field(group_field)
+            if len(group_field.split(" ")) == 3:
+                group_field = group_field.split(" ")[2]
+            select.group_by.append(group_field)
+        select.add_field(day+' AS day')
+        select.group_by.append(day)
+        for (kind, expression, alias) in get_base_fields(qfields):
+            if kind == "distinct":
+                select.add_field(expression+' AS '+get_ids_column(alias))
+                select.group_by.append(expression)
+            else:
+                select.add_field(expression)
+        select.add_date_range(date, start, end, strict)
+        cls._add_filters(select, filters)
+        select.order_by.append(day)
 
-        return fields_str
+        return select.get_sql()
 
-    def _get_tables_query(self, tables):
-        # Returns a string with tables separated by ","
-        tables_str = ""
+    @classmethod
+    def GetSQLWindows(cls, windows, date, qfields, tables, filters, start, end,
+                      all_items = None, strict = False, group_field = None):
+        """ Values of qfields in each window [start, end) of windows
+
+        The dates are bucketed in the windows by the query, so any field
+        is exact. The day of a window is its start (DailySeries).
+        """
+        day = get_windows_key(date, windows)
+        select = Select(tables = tables)
+        if all_items:
+            if group_field is None: group_field = cls.get_group_field(all_items)
+            # DISTINCT field should be the first
+            select.add_field(group_field)
+            if len(group_field.split(" ")) == 3:
+                group_field = group_field.split(" ")[2]
+            select.group_by.append(group_field)
+        select.add_field(day+' AS day')
+        select.group_by.append(day)
+        select.add_field(qfields)
+        select.add_date_range(date, start, end, strict)
+        cls._add_filters(select, filters)
 
-        if len(tables) > 0:
-            tables_str = str(tables.pop())
-            for i in range(len(tables)):
-                tables_str += " , " + str(tables.pop())
+        return select.get_sql()
 
-        return tables_str
+    def _get_fields_query(self, fields):
+        # Returns a string with fields separated by ","
+        # The parts are sorted so a query has always the same text
+        return join_parts(fields, " , ")
+
+    def _get_tables_query(self, tables):
+        # Returns a string with tables separated by ","
+        return join_parts(tables, " , ")
 
     def _get_filters_query(self, filters):
         # Returns a string with filters separated by "and"
-        filters_str = ""
-
-        if len(filters) > 0:
-            filters_str = str(filters.pop())
-            for i in range(len(filters)):
-                filters_str += " and " + str(filters.pop())
-        return filters_str
+        return join_parts(filters, " and ")
 
     def BuildQuery (self, period, startdate, enddate, date_field, fields,
                     tables, filters, evolutionary, type_analysis = None, strict = False):
@@ -211,15 +419,110 @@ class DSQuery(object):
 
         # if all_items build a query for getting all items in one query
         all_items = self.get_all_items(type_analysis)
-
-        if (evolutionary):
+        group_field = None
+        if all_items:
+            group_field = self.get_date_keys().replace_domains(
+                self.get_group_field(all_items), tables)
+            if DSQuery.items_batch is not None and DSQuery.items_batch[0] == all_items:
+                items_filter = self.get_items_filter(group_field, DSQuery.items_batch[1])
+                if filters.strip() == "": filters = items_filter
+                else: filters += " and " + items_filter
+
+        if (evolutionary and period == DAILY_BASE and self.windows is not None):
+            q = self.GetSQLWindows(self.windows, date_field, fields, tables, filters,
+                                   startdate, enddate, all_items, strict = strict,
+                                   group_field = group_field)
+        elif (evolutionary):
+            date_key_period = period
+            if period == DAILY_BASE: date_key_period = "day"
+            date_key = self.get_date_keys().get_key(date_field, tables, date_key_period)
             q = self.GetSQLPeriod(period, date_field, fields, tables, filters,
-                                  startdate, enddate, all_items, strict = strict)
+                                  startdate, enddate, all_items, strict = strict,
+                                  date_key = date_key, group_field = group_field)
         else:
             q = self.GetSQLGlobal(date_field, fields, tables, filters,
-                                  startdate, enddate, all_items, strict = strict)
+                                  startdate, enddate, all_items, strict = strict,
+                                  group_field = group_field)
         return(q)
 
+    @staticmethod
+    def get_items_filter(group_field, items):
+        """ Condition to restrict a GROUP BY query to some of the items """
+        field = re.split(" as ", group_field, flags = re.IGNORECASE)[0].strip()
+        if field.upper().startswith("DISTINCT"): field = field[len("DISTINCT"):]
+        values = [item for item in items if item is not None]
+        condition = field + " IN (" + ", ".join(quote(item) for item in values) + ")"
+        if len(values) == 0: condition = "FALSE"
+        if len(values) < len(items):
+            condition = "(" + condition + " OR " + field + " IS NULL)"
+        return condition
+
+    @synchronized
+    def get_date_keys(self):
+        """ DateKeys with the derived columns of the database, read once per run
+
+        The derived columns of the rows added since they were filled are
+        filled the first time, so the queries using them miss no rows. If
+        they can not be filled they are not used in this run.
+        """
+        if self.database not in DSQuery.date_keys:
+            date_keys = DateKeys(self._get_derived_tables_columns())
+            try:
+                self._refresh_date_keys(date_keys)
+            except MySQLdb.Error, e:
+                logging.error("Can not refresh the derived columns in " + self.database +
+                              ", not used: " + str(e))
+                date_keys = DateKeys({})
+            DSQuery.date_keys[self.database] = date_keys
+        return DSQuery.date_keys[self.database]
+
+    def _refresh_date_keys(self, date_keys):
+        """ Fill the derived columns of the new rows """
+        queries = date_keys.get_refresh_queries()
+        if len(queries) == 0: return
+        for q in queries:
+            self.ExecuteViewQuery(q)
+        self.cursor.connection.commit()
+
+    def _get_derived_tables_columns(self):
+        """ Dict table -> columns of the tables with derived columns """
+        tables = DateKeys.date_columns.keys() + DateKeys.email_columns.keys()
+        q = """
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = '%s' AND table_name IN (%s)
+            """ % (self.database, ",".join("'" + table + "'" for table in tables))
+        res = check_array_values(self.ExecuteQuery(q))
+        columns = {}
+        for i in range(0, len(res.get('table_name', []))):
+            columns.setdefault(res['table_name'][i], []).append(res['column_name'][i])
+        return columns
+
+    def ensure_date_keys(self):
+        """ Create the missing derived columns and fill them for the new rows
+
+        Returns the list of (table, column) created.
+        """
+        created = []
+        for (table, column) in DateKeys(self._get_derived_tables_columns()).get_missing():
+            logging.info("Creating derived column " + table + "." + column + " in " + self.database)
+            try:
+                self.ExecuteViewQuery(DateKeys.get_create_query(table, column))
+                created.append((table, column))
+            except MySQLdb.Error, e:
+                logging.error("Can not create derived column " + table + "." + column +
+                              " in " + self.database + ": " + str(e))
+        date_keys = DateKeys(self._get_derived_tables_columns())
+        self._refresh_date_keys(date_keys)
+        DSQuery.date_keys[self.database] = date_keys
+        return created
+
+    def _get_domain_filter(self, email, table, name):
+        """ Filter of the items with email (in table) of the domain name """
+        name = name.replace("'","")
+        if self.get_date_keys().has_domain(table):
+            return DateKeys.get_domain_column(email) + " = '" + name + "'"
+        return email + " like '%" + name + "%'"
+
     def __SetDBChannel__ (self, user=None, password=None, database=None,
                       host="127.0.0.1", port=3306, group=None):
         if (group == None):
@@ -230,9 +533,20 @@ class DSQuery(object):
 
         return db
 
-    def ExecuteQuery (self, sql):
+    def ExecuteQuery (self, sql, params = None):
+        # params: values for the %(name)s placeholders of sql
         if sql is None: return {}
-        # print sql
+        if params is not None: sql = bind(sql, params)
+        if DSQuery.scan_report is not None: self.explain_query(sql)
+        if DSQuery.query_profile is None: return self._execute_query(sql)
+        start = time.time()
+        result = self._execute_query(sql)
+        with DSQuery.refresh_lock:
+            DSQuery.query_profile.add(sql, time.time() - start, result,
+                                      lambda sql: DSQuery.get_explain(self.cursor, sql))
+        return result
+
+    def _execute_query (self, sql):
         result = {}
         self.cursor.execute(sql)
         rows = self.cursor.rowcount
@@ -255,6 +569,290 @@ class DSQuery(object):
     def ExecuteViewQuery(self, sql):
         self.cursor.execute(sql)
 
+    def get_query_columns(self, sql):
+        """ Return the name of the columns of a query without getting rows
+
+        MySQL resolves a LIMIT 0 query without reading any table row.
+        """
+        self.cursor.execute(sql + " LIMIT 0")
+        return [column[0] for column in self.cursor.description]
+
+    @staticmethod
+    def get_period_field(period):
+        """ Name of the column with the period in GetSQLPeriod queries """
+        if period == 'day': return 'unixtime'
+        return period
+
+    def BuildCubeQuery(self, branches, period = None):
+        """ Join the GROUP BY queries of several filters in one query
+
+        branches is a list of [filter_name, sql] with the GROUP BY query for
+        all items of each filter. All of them are projected to the same
+        columns: cube_filter (filter name), cube_item (item of the filter),
+        the period field for evolutionary queries and the metric columns.
+        The columns of each branch are added to the branch for splitting.
+        """
+        period_field = None
+        if period is not None: period_field = self.get_period_field(period)
+        union = []
+        values = None
+
+        for branch in branches:
+            filter_name, sql = branch[0], branch[1]
+            id_field = self.get_group_field_alias(filter_name)
+            columns = self.get_query_columns(sql)
+            branch_values = [c for c in columns if c not in (id_field, period_field)]
+            if values is None:
+                values = branch_values
+            elif sorted(values) != sorted(branch_values):
+                raise Exception("Different metric columns in cube for " + filter_name)
+            branch[2:] = [id_field]
+
+            fields = "'%s' AS cube_filter, t.`%s` AS cube_item" % (filter_name, id_field)
+            if period_field is not None:
+                fields += ", t.`%s` AS `%s`" % (period_field, period_field)
+            for value in values:
+                fields += ", t.`%s` AS `%s`" % (value, value)
+            union.append("(SELECT %s FROM (%s) t)" % (fields, sql))
+
+        return " UNION ALL ".join(union)
+
+    @staticmethod
+    def SplitCubeData(data, branches, period = None):
+        """ Split a cube query result in the data for each filter
+
+        Each filter data has the same format than the GROUP BY query
+        for all items of the filter: the items in the group field
+        alias and the period and metrics columns.
+        """
+        cube = {}
+        data = check_array_values(data)
+        fields = [f for f in data.keys() if f not in ('cube_filter', 'cube_item')]
+        for branch in branches:
+            filter_name, id_field = branch[0], branch[2]
+            cube[filter_name] = {id_field: []}
+            for field in fields:
+                cube[filter_name][field] = []
+        if 'cube_filter' not in data: return cube
+
+        for i in range(0, len(data['cube_filter'])):
+            filter_data = cube[data['cube_filter'][i]]
+            for field in filter_data:
+                if field in fields: filter_data[field].append(data[field][i])
+                else: filter_data[field].append(data['cube_item'][i])
+        return cube
+
+    @staticmethod
+    def BuildSketchQuery(sql, metric_id):
+        """ Convert a per day distinct people query in a sketch query
+
+        sql is the evolutionary query with day period for a people metric
+        with the format "count(distinct(pup.uuid)) as authors". The query returns
+        instead the distinct people for each day (and item for GROUP BY
+        queries) in the columns sketch_day and sketch_uuid.
+
+        Returns None if the metric query has not this format.
+        """
+        count = re.compile("count\s*\(\s*distinct\s*\(\s*([\w\.]*uuid)\s*\)\s*\)\s+as\s+" +
+                           metric_id + "\\b", re.IGNORECASE)
+        # The day of the date or its day key column (DateKeys)
+        day = re.compile("UNIX_TIMESTAMP\((DATE\(.+?\)|[\w\.]+_day_key)\) AS unixtime")
+
+        uuid_field = count.search(sql)
+        if uuid_field is None or day.search(sql) is None: return None
+        uuid_field = uuid_field.group(1)
+        group_pos = sql.rfind(" GROUP BY ")
+        if group_pos == -1: return None
+
+        if sql.rfind(" ORDER BY ") > group_pos: sql = sql[:sql.rfind(" ORDER BY ")]
+        sql = sql[:group_pos] + " GROUP BY " + uuid_field + ", " + sql[group_pos+len(" GROUP BY "):]
+        sql = count.sub(uuid_field + " AS sketch_uuid", sql)
+        sql = day.sub(lambda m: m.group(1) + " AS sketch_day", sql)
+        return sql
+
+    def _get_lifecycle_query(self, condition = None):
+        """ Activity (lifecycle_fields) per person (uuid) and day
+
+        condition restricts the rows of the lifecycle source table used.
+        """
+        raise NotImplementedError
+
+    @synchronized
+    def GetLifecycleTable(self, full = False):
+        """ Refresh the people_lifecycle table and return its name
+
+        people_lifecycle has the activity (lifecycle_fields) per person
+        (uuid) and day. Only the rows of the source table with a date after
+        the last refresh are added. It is created again if rows were added
+        with older dates, the identities changed, the database was reloaded
+        or full is True. It is refreshed once per run.
+        """
+        table = "people_lifecycle"
+        if DSQuery.lifecycle_refreshed.get(self.database) and not full: return table
+
+        source, date_field = self.lifecycle_source
+        fields_id = hashlib.md5(",".join(self.lifecycle_fields)).hexdigest()
+        self.ExecuteQuery("""
+            CREATE TABLE IF NOT EXISTS people_lifecycle_state (
+                fields CHAR(32) NOT NULL,
+                last_date DATETIME NULL,
+                source_rows INT NOT NULL,
+                identities BIGINT NULL)
+            """)
+        state = check_array_values(self.ExecuteQuery("SELECT * FROM people_lifecycle_state"))
+        identities = self.ExecuteQuery("CHECKSUM TABLE people_uidentities")['Checksum']
+        last = self.ExecuteQuery("SELECT COUNT(*) AS source_rows, MAX(%s) AS last_date FROM %s" %
+                                 (date_field, source))
+
+        condition = None
+        new_rows = last['source_rows']
+        if len(state.get('fields', [])) == 1 and state['last_date'][0] is not None:
+            condition = "%s > '%s'" % (date_field, state['last_date'][0])
+            new_rows = self.ExecuteQuery("SELECT COUNT(*) AS new_rows FROM %s WHERE %s" %
+                                         (source, condition))['new_rows']
+
+        if (full or len(state.get('fields', [])) != 1 or
+            state['fields'][0] != fields_id or state['identities'][0] != identities or
+            # rows added with older dates or removed
+            last['source_rows'] - state['source_rows'][0] != new_rows):
+            logging.info("Creating the people lifecycle table")
+            self.ExecuteQuery("DROP TABLE IF EXISTS people_lifecycle")
+            self.ExecuteQuery("""
+                CREATE TABLE people_lifecycle (
+                    uuid VARCHAR(128) NOT NULL,
+                    day DATE NOT NULL,
+                    %s,
+                    PRIMARY KEY (uuid, day))
+                """ % (", ".join(field + " INT NOT NULL" for field in self.lifecycle_fields)))
+            condition = None
+        elif new_rows > 0:
+            logging.info("Refreshing the people lifecycle table")
+        else:
+            condition = ""
+
+        if condition != "":
+            # Activity in a day already in the table is added to it
+            q = "INSERT INTO people_lifecycle (uuid, day, %s) " % (", ".join(self.lifecycle_fields))
+            q += self._get_lifecycle_query(condition)
+            q += " ON DUPLICATE KEY UPDATE "
+            q += ", ".join("%s = %s + VALUES(%s)" % (field, field, field)
+                           for field in self.lifecycle_fields)
+            self.ExecuteQuery(q)
+            last_date = "NULL"
+            if last['last_date'] is not None: last_date = "'%s'" % (last['last_date'])
+            self.ExecuteQuery("DELETE FROM people_lifecycle_state")
+            self.ExecuteQuery("INSERT INTO people_lifecycle_state VALUES ('%s', %s, %i, %s)" %
+                              (fields_id, last_date, last['source_rows'],
+                               "NULL" if identities is None else str(identities)))
+            self.cursor.connection.commit()
+
+        DSQuery.lifecycle_refreshed[self.database] = True
+        return table
+
+    def GetLifecycleActivity(self):
+        """ Activity per person (uuid) and day for the lifecycle index
+
+        Returns the columns uuid, day and the activity counts, or None
+        if the data source has no lifecycle index.
+        """
+        if self.lifecycle_source is None: return None
+        q = "SELECT uuid, day, %s FROM %s" % (", ".join(self.lifecycle_fields),
+                                             self.GetLifecycleTable())
+        return self.ExecuteQuery(q)
+
+    def GetLifecycleProfiles(self):
+        """ Profiles (name and bot flag) per person for the lifecycle index """
+        if self.identities_db is None: return None
+        q = "SELECT uuid, name, is_bot FROM %s.profiles" % (self.identities_db)
+        data = check_array_values(self.ExecuteQuery(q))
+        profiles = {}
+        for i in range(0, len(data['uuid'])):
+            profiles[data['uuid'][i]] = [data['name'][i], data['is_bot'][i]]
+        return profiles
+
+    @staticmethod
+    def _overlap_windows(window1, window2):
+        start1, end1 = [parser.parse(d.replace("'","")) for d in window1]
+        start2, end2 = [parser.parse(d.replace("'","")) for d in window2]
+        return start1 < end2 and start2 < end1
+
+    def BuildOnionQuery(self, windows, date_field, person_field, count_field,
+                        tables, filters, item_field = None):
+        """ Contributions per person (and item) for several time windows
+
+        windows is a list of [startdate, enddate] and the onion_window column
+        is the position of the window in the list. Windows that do not
+        overlap are resolved in the same scan with a CASE on date_field,
+        overlapping ones go in other branches of an UNION ALL.
+        """
+        branches = []
+        for pos in range(0, len(windows)):
+            for branch in branches:
+                if not [w for w in branch if DSQuery._overlap_windows(windows[w], windows[pos])]:
+                    branch.append(pos)
+                    break
+            else:
+                branches.append([pos])
+
+        queries = []
+        for branch in branches:
+            case = "CASE "
+            in_windows = []
+            for pos in branch:
+                in_window = "%s >= %s AND %s < %s" % (date_field, windows[pos][0],
+                                                      date_field, windows[pos][1])
+                case += "WHEN " + in_window + " THEN " + str(pos) + " "
+                in_windows.append("(" + in_window + ")")
+            case += "END"
+
+            fields = [case + " AS onion_window", person_field + " AS person"]
+            group_by = " GROUP BY onion_window, person"
+            if item_field is not None:
+                fields.append(item_field + " AS item")
+                group_by += ", item"
+            fields.append(count_field + " AS contributions")
+            branch_filters = Set(filters)
+            branch_filters.add("(" + " OR ".join(in_windows) + ")")
+
+            q = "SELECT " + ", ".join(fields)
+            q += " FROM " + self._get_tables_query(Set(tables))
+            q += " WHERE " + self._get_filters_query(branch_filters)
+            q += group_by
+            queries.append(q)
+
+        if len(queries) == 1: return queries[0]
+        return " UNION ALL ".join("(" + q + ")" for q in queries)
+
+    def _get_onion_item_field(self, type_analysis):
+        """ Field of the filter items for filter all onion queries """
+        if type_analysis is None or type_analysis[1] is not None: return None
+        field = re.split("\s+as\s+", self.get_group_field(type_analysis[0]),
+                         flags = re.IGNORECASE)[0]
+        if field.upper().startswith("DISTINCT"): field = field[len("DISTINCT"):]
+        return field
+
+    def GetOnionActivity(self, windows, type_analysis = None):
+        """ Contributions per person for each window for the onion model
+
+        type_analysis filters the activity by an item ([filter, "'item'"])
+        or groups it by the items of a filter ([filter, None]). Returns
+        the columns onion_window, person, item (filter all) and
+        contributions. None if the data source has no onion model.
+        """
+        return None
+
+    def GetOnionPeople(self, people):
+        """ Name and email of the people (uuids) in the onion layers """
+        info = {}
+        if self.identities_db is None or len(people) == 0: return info
+        q = "SELECT uuid, name, email FROM %s.profiles WHERE uuid IN (%s)" % \
+            (self.identities_db, ",".join("'" + str(p) + "'" for p in people))
+        data = check_array_values(self.ExecuteQuery(q))
+        for i in range(0, len(data['uuid'])):
+            info[data['uuid'][i]] = {"uuid": data['uuid'][i], "name": data['name'][i],
+                                     "email": data['email'][i]}
+        return info
+
     def get_subprojects(self, project):
         """ Return all subprojects ids for a project in a string join by comma """
 
@@ -264,24 +862,10 @@ class DSQuery(object):
             #       or in the final query builder
             project = project.replace("'", "")
 
-        q = "SELECT project_id from %s.projects WHERE id='%s'" % (self.projects_db, project)
-        project_id = self.ExecuteQuery(q)['project_id']
-
-        q = """
-            SELECT subproject_id from %s.project_children pc where pc.project_id = '%s'
-        """ % (self.projects_db, project_id)
-
-        subprojects = self.ExecuteQuery(q)
-
-        if not isinstance(subprojects['subproject_id'], list):
-            subprojects['subproject_id'] = [subprojects['subproject_id']]
-
-        project_with_children = subprojects['subproject_id'] + [project_id]
-        project_with_children_str = ','.join(str(x) for x in project_with_children)
-
-        if (project_with_children_str == "[]"): project_with_children_str = "NULL"
+        subprojects = ProjectsHierarchy.get_hierarchy(self).get_subprojects(project)
+        if len(subprojects) == 0: return "NULL"
 
-        return  project_with_children_str
+        return ','.join(str(x) for x in subprojects)
 
 
     @classmethod
@@ -298,27 +882,19 @@ class DSQuery(object):
     def get_group_field (ds_query, filter_type):
         """ Return the name of the field to group by in filter all queries """
         field = None
-        supported = ['people2','company','country','domain','project','repository',
-                     'company'+MetricFilters.DELIMITER+'country',
-                     'company'+MetricFilters.DELIMITER+'project',]
 
         analysis = filter_type
 
-        if analysis not in supported:
+        if analysis not in ds_query.group_by_filters:
             raise Exception("Can't get_group_field for " +  filter_type)
-        if analysis == 'people2': field = "up.identifier"
+        if analysis in ds_query.group_fields: field = ds_query.group_fields[analysis]
+        elif analysis == 'people2': field = "up.identifier"
         elif analysis == "company": field = "org.name"
         elif analysis == "country": field = "cou.name"
         # elif analysis == "domain": field = "d.name"
         elif analysis == "domain":
             field = "DISTINCT(SUBSTR(people.email,LOCATE('@',people.email)+1)) as name"
-            if ds_query == MLSQuery:
-                field = "DISTINCT(SUBSTR(mp.email_address,LOCATE('@',mp.email_address)+1)) as name"
-        elif analysis == "repository":
-            field = "r.uri AS name"
-            if ds_query == ITSQuery: field = "t.url"
-            elif ds_query == SCRQuery: field = "t.url"
-            elif ds_query == MLSQuery: field = "ml.mailing_list_url"
+        elif analysis == "repository": field = "r.uri AS name"
         elif analysis == "project": field = "prj.name"
         elif analysis == "company"+MetricFilters.DELIMITER+"country":
             field = "CONCAT(org.name,'_',cou.name)"
@@ -350,86 +926,132 @@ class DSQuery(object):
         if filter_bots != '': filter_bots = filter_bots[:-4]
         return filter_bots
 
-    def get_projects_children_on (self):
-        global project_children_on
-        if 'project_children_on' not in globals():
-            # Detect if project_children has contents. If not, don't use it
-            q = "SELECT COUNT(*) as total FROM %s.project_children" % (self.projects_db)
-            res = self.ExecuteQuery(q)
-            if res['total'] == 0:
-                project_children_on = False
-            else:
-                project_children_on = True
-        return project_children_on
+    @synchronized
+    def GetProjectsRepos(self):
+        """ Refresh the projects_repos table and return its name
 
-    def GetSQLProjectsFrom (self, project = None):
-        project_children_on = self.get_projects_children_on()
-
-        tables = Set([])
-        # TODO: ds_name should be obtained from DataSource
-        if type(self) == SCMQuery:
-            tables.add("scmlog s")
-            tables.add("repositories r")
-            ds_name = "scm"
-        elif type(self) == ITSQuery:
-            tables.add("trackers t")
-            ds_name = "its"
-        elif type(self) == SCRQuery:
-            tables.add("trackers t")
-            ds_name = "scr"
-        elif type(self) == PullpoQuery:
-            tables.add("repositories re")
-            ds_name = "pullpo"
-        elif type(self) == MLSQuery:
-            tables.add("mailing_lists ml")
-            ds_name = "mls"
-        else:
-            raise("Project filter not supported by data source: ", self)
-
-        pc_table = pc_filters = ''
-        if project_children_on:
-            pc_table = ", " + self.projects_db+".project_children pc"
-            pc_filters = "(p.project_id = pc.project_id and pc.subproject_id = pr.project_id) or"
-
-        q_proj_repo = """
-            SELECT distinct p.id as name, pr.repository_name
-            FROM  %s.projects p, %s.project_repositories pr %s
-            WHERE (%s p.project_id = pr.project_id) and
-                 pr.data_source='%s'
-            """ % (self.projects_db, self.projects_db, pc_table, pc_filters, ds_name)
-        if project is not None:
-            if (project[0] == "'" and project[-1] == "'"):
-                project = project[1:-1]
-            q_proj_repo += " AND p.id = '"+project+"'"
-        table_q_proj_repo = "(" + q_proj_repo +") prj"
+        projects_repos has per project the ids of the repositories of the
+        project and all its subprojects, so the project filter is an
+        indexed join with the items. It is refreshed once per run.
+        """
+        table = "projects_repos"
+        if DSQuery.projects_repos_refreshed.get(self.database): return table
+        if self.projects_data_source is None:
+            raise Exception("Project filter not supported by data source: " + str(self))
+
+        hierarchy = ProjectsHierarchy.get_hierarchy(self)
+        res = check_array_values(self.ExecuteQuery(self.projects_repositories))
+        ids = dict(zip(res.get('name', []), res.get('id', [])))
+        rows = set()
+        for (name, repository) in hierarchy.get_projects_repositories(self.projects_data_source):
+            if repository in ids: rows.add((name, ids[repository]))
+
+        logging.info("Creating projects_repos with %i repositories in %s" %
+                     (len(rows), self.database))
+        self.ExecuteQuery("""
+            CREATE TABLE IF NOT EXISTS projects_repos (
+                name VARCHAR(255) NOT NULL,
+                repository_id %s NOT NULL,
+                PRIMARY KEY (name, repository_id),
+                INDEX projects_repos_repository_id (repository_id))
+            """ % (self.projects_repository_type))
+        self.ExecuteQuery("DELETE FROM projects_repos")
+        if len(rows) > 0:
+            self.cursor.executemany("INSERT INTO projects_repos VALUES (%s, %s)",
+                                    sorted(rows))
+        self.cursor.connection.commit()
+
+        DSQuery.projects_repos_refreshed[self.database] = True
+        return table
+
+    @synchronized
+    def GetAffiliations(self):
+        """ Refresh the affiliations tables and return their names
+
+        people_organizations has the enrollments of the people of the data
+        source (people_id, start, end and the organization id and name) and
+        people_countries their country (people_id, code and name), both read
+        from the identities database. The company and country filters join
+        the items only with them. They are refreshed once per run.
+        """
+        tables = ("people_organizations", "people_countries")
+        if DSQuery.affiliations_refreshed.get(self.database): return tables
+
+        logging.info("Creating the affiliations tables in " + self.database)
+        self.ExecuteQuery("DROP TABLE IF EXISTS people_organizations")
+        self.ExecuteQuery("""
+            CREATE TABLE people_organizations (
+                INDEX people_organizations_people_id (people_id, start),
+                INDEX people_organizations_name (name))
+            SELECT pup.people_id, enr.start, enr.end, org.id, org.name
+            FROM people_uidentities pup, %s.enrollments enr, %s.organizations org
+            WHERE pup.uuid = enr.uuid AND enr.organization_id = org.id
+            """ % (self.identities_db, self.identities_db))
+        self.ExecuteQuery("DROP TABLE IF EXISTS people_countries")
+        self.ExecuteQuery("""
+            CREATE TABLE people_countries (
+                INDEX people_countries_people_id (people_id),
+                INDEX people_countries_name (name))
+            SELECT pup.people_id, cou.code, cou.name
+            FROM people_uidentities pup, %s.profiles pro, %s.countries cou
+            WHERE pup.uuid = pro.uuid AND pro.country_code = cou.code
+            """ % (self.identities_db, self.identities_db))
+
+        DSQuery.affiliations_refreshed[self.database] = True
+        return tables
 
-        tables.add(table_q_proj_repo)
+    @synchronized
+    def GetBotsTable(self, bots_str):
+        """ Refresh the people_bots table and return its name
+
+        people_bots has the people_id of the bots: people with no profile,
+        with is_bot or with a name in bots_str (list or comma separated),
+        read from the identities database. As in the name comparisons of the
+        old bots filter, people without name are bots only if there are
+        names in bots_str. The bots filter is an anti-join with it. It is
+        refreshed once per run (and when the bots change).
+        """
+        table = "people_bots"
+        bots = bots_str
+        if not isinstance(bots_str, list):
+            bots = bots_str.split(",")
+        bots = sorted(set(bot for bot in bots if bot != ""))
+        if DSQuery.bots_refreshed.get(self.database) == bots: return table
+
+        names = ""
+        if len(bots) > 0:
+            names = " OR pro.name IS NULL OR pro.name IN (%s)" % \
+                (",".join("'" + bot.replace("'", "\\'") + "'" for bot in bots))
+        logging.info("Creating the bots table in " + self.database)
+        self.ExecuteQuery("DROP TABLE IF EXISTS people_bots")
+        self.ExecuteQuery("""
+            CREATE TABLE people_bots (INDEX people_bots_people_id (people_id))
+            SELECT DISTINCT pup.people_id
+            FROM people_uidentities pup
+              LEFT JOIN %s.profiles pro ON pro.uuid = pup.uuid
+            WHERE pup.people_id IS NOT NULL AND
+                  (pro.uuid IS NULL OR pro.is_bot IS NULL OR pro.is_bot = 1 %s)
+            """ % (self.identities_db, names))
+
+        DSQuery.bots_refreshed[self.database] = bots
+        return table
+
+    def GetSQLProjectsFrom (self, project = None):
+        # the project is filtered in GetSQLProjectsWhere
+        tables = Set(self.projects_tables)
+        tables.add(self.GetProjectsRepos() + " prj")
 
         return tables
 
 
-    def GetSQLProjectsWhere (self):
+    def GetSQLProjectsWhere (self, project = None):
         # include all repositories for a project and its subprojects
 
-        filters = Set([])
-
-        if type(self) == SCMQuery:
-            filters.add("s.repository_id = r.id")
-            filters.add("r.uri = prj.repository_name")
-        elif type(self) == ITSQuery:
-            filters.add("t.id = i.tracker_id")
-            filters.add("t.url = prj.repository_name")
-        elif type(self) == SCRQuery:
-            filters.add("t.id = i.tracker_id")
-            filters.add("t.url = prj.repository_name")
-        elif type(self) == PullpoQuery:
-            filters.add("re.id = pr.repo_id")
-            filters.add("re.url = prj.repository_name")
-        elif type(self) == MLSQuery:
-            filters.add("ml.mailing_list_url = m.mailing_list_url")
-            filters.add("ml.mailing_list_url = prj.repository_name")
-        else:
-            raise("Project filter not supported by data source: ", self)
+        filters = Set(self.projects_filters)
+        if project is not None:
+            if (project[0] == "'" and project[-1] == "'"):
+                project = project[1:-1]
+            filters.add("prj.name = '" + project + "'")
 
         return filters
 
@@ -437,6 +1059,21 @@ class DSQuery(object):
 class SCMQuery(DSQuery):
     """ Specific query builders for source code management system data source """
 
+    indexes = [("scmlog", ["author_date"]), ("scmlog", ["date"]),
+               ("scmlog", ["author_id"]), ("scmlog", ["committer_id"]),
+               ("scmlog", ["repository_id"]), ("actions", ["commit_id"]),
+               ("actions", ["branch_id"]), ("actions", ["file_id"]),
+               ("file_types", ["file_id"]), ("commits_lines", ["commit_id"]),
+               ("file_links", ["commit_id"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    projects_data_source = "scm"
+    projects_repositories = "SELECT id, uri AS name FROM repositories"
+    projects_tables = ["scmlog s"]
+    projects_filters = ["s.repository_id = prj.repository_id"]
+    lifecycle_source = ("scmlog s", "s.author_date")
+    lifecycle_fields = ["all_commits", "commits"]
+
     def GetSQLRepositoriesFrom (self):
         """ Tables needed for repository studies
 
@@ -511,26 +1148,21 @@ class SCMQuery(DSQuery):
     def GetSQLCompaniesFrom (self):
         """ Tables needed for organization studies
 
-        This always returns the same table for organizations
+        This always returns the same table for organizations, the
+        enrollments of the people of the data source (GetAffiliations)
 
         >>> scm = SCMQuery("root", "", "cp_cvsanaly_GrimoireLibTests", "fake")
         >>> organizations = scm.GetSQLCompaniesFrom()
-        >>> "fake.organizations org" in organizations
-        True
-        >>> "fake.enrollments enr" in organizations
-        True
-        >>> "people_uidentities pup" in organizations
+        >>> "people_organizations org" in organizations
         True
 
-        and this is a Set of only 3 elements
+        and this is a Set of only 1 element
         >>> len(scm.GetSQLCompaniesFrom())
-        3
+        1
         """
 
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".enrollments enr")
-        tables.add(self.identities_db + ".organizations org")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
@@ -543,51 +1175,41 @@ class SCMQuery(DSQuery):
         --------------------------------
         >>> scm = SCMQuery("root", "", "cp_cvsanaly_GrimoireLibTests", "fake")
         >>> organizations = scm.GetSQLCompaniesWhere ("'organization_1'", 'author')
-        >>> "s.author_id = pup.people_id" in organizations
-        True
-        >>> "pup.uuid = enr.uuid" in organizations
-        True
-        >>> "s.author_date >= enr.start" in organizations
+        >>> "s.author_id = org.people_id" in organizations
         True
-        >>> "s.author_date < enr.end" in organizations
+        >>> "s.author_date >= org.start" in organizations
         True
-        >>> "enr.organization_id = org.id" in organizations
+        >>> "s.author_date < org.end" in organizations
         True
         >>> "org.name = 'organization_1'" in organizations
         True
 
-        and this is a Set of 6 elements
+        and this is a Set of 4 elements
         >>> len(organizations)
-        6
+        4
 
         Case 2: an organization is None (used when grouping by organization)
         ---------------------------------------------------------------
         >>> organizations = scm.GetSQLCompaniesWhere (None, 'author')
-        >>> "s.author_id = pup.people_id" in organizations
+        >>> "s.author_id = org.people_id" in organizations
         True
-        >>> "pup.uuid = enr.uuid" in organizations
+        >>> "s.author_date >= org.start" in organizations
         True
-        >>> "s.author_date >= enr.start" in organizations
-        True
-        >>> "s.author_date < enr.end" in organizations
-        True
-        >>> "enr.organization_id = org.id" in organizations
+        >>> "s.author_date < org.end" in organizations
         True
 
-        and this is a Set of 5 elements
+        and this is a Set of 3 elements
         >>> len(organizations)
-        5
+        3
 
         Case 3: several organizations are provided
         -----------------------------------------
         """
 
         fields = Set([])
-        fields.add("s."+role+"_id = pup.people_id")
-        fields.add("pup.uuid = enr.uuid")
-        fields.add("s.author_date >= enr.start")
-        fields.add("s.author_date < enr.end")
-        fields.add("enr.organization_id = org.id")
+        fields.add("s."+role+"_id = org.people_id")
+        fields.add("s.author_date >= org.start")
+        fields.add("s.author_date < org.end")
         if company is not None: fields.add("org.name = " + company)
 
         return fields
@@ -595,18 +1217,14 @@ class SCMQuery(DSQuery):
     def GetSQLCountriesFrom (self):
         #tables necessaries for organizations
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".profiles pro")
-        tables.add(self.identities_db + ".countries cou")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
     def GetSQLCountriesWhere (self, country, role):
          #fields necessaries to match info among tables
         fields = Set([])
-        fields.add("s."+role+"_id = pup.people_id")
-        fields.add("pup.uuid = pro.uuid")
-        fields.add("pro.country_code = cou.code")
+        fields.add("s."+role+"_id = cou.people_id")
         if country is not None: fields.add("cou.name ="+ country)
 
         return fields
@@ -623,7 +1241,7 @@ class SCMQuery(DSQuery):
         filters = Set([])
         filters.add("s."+role+"_id = people.id")
         if name is not None and name<>'':
-            filters.add("people.email like '%"+name.replace("'","")+"%'")
+            filters.add(self._get_domain_filter("people.email", "people", name))
 
         return filters
 
@@ -737,34 +1355,16 @@ class SCMQuery(DSQuery):
         return fields
 
     def GetSQLBotFrom(self):
-        # Bots are removed from the upeople table, using the upeople.identifier table.
-        # Another option is to remove those bots directly in the people table.
-        tables = Set([])
-        #tables.add("scmlog s")
-        tables.add("people p")
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".uidentities u")
-        tables.add(self.identities_db + ".profiles pro")
-
-        return tables
+        # Bots are removed with an anti-join with the people_bots table,
+        # resolved once per run (GetBotsTable), so no tables are needed.
+        return Set([])
 
     def GetSQLBotWhere(self, bots_str):
-        # Based on the tables provided in GetSQLBotFrom method,
-        # this method provides the clauses to join the several tables
+        # Authors not in the bots resolved for bots_str
 
-        bots = bots_str
-        if not isinstance(bots_str, list):
-            bots = bots_str.split(",")
         where = Set([])
-        where.add("s.author_id = p.id")
-        where.add("p.id = pup.people_id")
-        where.add("pup.uuid = u.uuid")
-        where.add("pup.uuid = pro.uuid")
-        where.add("pro.is_bot<>1")
-        for bot in bots:
-            # This code only ignores bots provided in raw_bots.
-            # This should add the other way around, u.identifier = 'xxx'
-            where.add("pro.name <> '" + bot + "'")
+        where.add("s.author_id NOT IN (SELECT people_id FROM %s)" %
+                  (self.GetBotsTable(bots_str)))
 
         return where
 
@@ -865,7 +1465,7 @@ class SCMQuery(DSQuery):
                 elif analysis == 'company': where.union_update(self.GetSQLCompaniesWhere(value, role))
                 elif analysis == 'country': where.union_update(self.GetSQLCountriesWhere(value, role))
                 elif analysis == 'domain': where.union_update(self.GetSQLDomainsWhere(value, role))
-                elif analysis == 'project': where.union_update(self.GetSQLProjectsWhere())
+                elif analysis == 'project': where.union_update(self.GetSQLProjectsWhere(value))
                 elif analysis == 'branch': where.union_update(self.GetSQLBranchWhere(value))
                 elif analysis == 'module': where.union_update(self.GetSQLModuleWhere(value))
                 elif analysis == 'filetype': where.union_update(self.GetSQLFileTypeWhere(value))
@@ -927,6 +1527,60 @@ class SCMQuery(DSQuery):
         data = self.ExecuteQuery(q)
         return (data)
 
+    def _get_lifecycle_query(self, condition = None):
+        """ Commits per person and day for the lifecycle index
+
+        commits are the commits with actions (no merges), as in the people
+        evolution, and all_commits all the commits of the person.
+        """
+        where = ""
+        if condition is not None: where = "WHERE " + condition
+        q = """
+            SELECT pup.uuid AS uuid, DATE(s.author_date) AS day,
+                   COUNT(DISTINCT(s.id)) AS all_commits,
+                   COUNT(DISTINCT(nomergers.id)) AS commits
+            FROM scmlog s
+            JOIN people_uidentities pup ON s.author_id = pup.people_id
+            LEFT JOIN (SELECT DISTINCT(a.commit_id) AS id FROM actions a) nomergers
+                ON s.id = nomergers.id
+            %s
+            GROUP BY pup.uuid, DATE(s.author_date)
+            """ % (where)
+        return q
+
+    def GetOnionActivity(self, windows, type_analysis = None, merges = True):
+        """ Commits per person for each window for the onion model
+
+        Merge commits (commits without actions) are only counted if merges.
+        """
+        filters = MetricFilters(None, None, None, type_analysis)
+        tables = self.GetSQLReportFrom(filters)
+        tables.add("scmlog s")
+        tables.add("people_uidentities pup")
+        where = self.GetSQLReportWhere(filters)
+        where.add("s.author_id = pup.people_id")
+        if not merges:
+            tables.add("actions a")
+            where.add("s.id = a.commit_id")
+        q = self.BuildOnionQuery(windows, "s.author_date", "pup.uuid", "COUNT(DISTINCT(s.id))",
+                                 tables, where, self._get_onion_item_field(type_analysis))
+        return self.ExecuteQuery(q)
+
+    def GetOnionPeople(self, people):
+        """ Name and email of the people (uuids) from their identities """
+        info = {}
+        if len(people) == 0: return info
+        q = "SELECT pup.uuid AS uuid, MAX(p.name) AS name, MAX(p.email) AS email " +\
+            "FROM people p, people_uidentities pup " +\
+            "WHERE p.id = pup.people_id AND pup.uuid IN (%s) " % \
+            (",".join("'" + str(p) + "'" for p in people)) +\
+            "GROUP BY pup.uuid"
+        data = check_array_values(self.ExecuteQuery(q))
+        for i in range(0, len(data['uuid'])):
+            info[data['uuid'][i]] = {"uuid": data['uuid'][i], "name": data['name'][i],
+                                     "email": data['email'][i]}
+        return info
+
     def GetPeopleIntake(self, min, max):
         filters = self.GetCommitsFiltered()
         if (filters != ""): filters  = " WHERE " + filters
@@ -952,6 +1606,20 @@ class SCMQuery(DSQuery):
 
 class ITSQuery(DSQuery):
     """ Specific query builders for issue tracking system data source """
+
+    indexes = [("issues", ["submitted_on"]), ("issues", ["submitted_by"]),
+               ("issues", ["tracker_id"]), ("changes", ["issue_id"]),
+               ("changes", ["changed_on"]), ("changes", ["changed_by"]),
+               ("comments", ["issue_id"]), ("comments", ["submitted_on"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_fields = {'repository': "t.url"}
+    projects_data_source = "its"
+    projects_repositories = "SELECT id, url AS name FROM trackers"
+    projects_filters = ["i.tracker_id = prj.repository_id"]
+    lifecycle_source = ("issues i", "i.submitted_on")
+    lifecycle_fields = ["submissions"]
+
     def GetSQLRepositoriesFrom (self):
         # tables necessary for repositories
         tables = Set([])
@@ -970,21 +1638,17 @@ class ITSQuery(DSQuery):
     def GetSQLCompaniesFrom (self):
         # fields necessary for the organizations analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
         tables.add("issues i")
-        tables.add(self.identities_db + ".organizations org")
-        tables.add(self.identities_db + ".enrollments enr")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
     def GetSQLCompaniesWhere (self, name):
         # filters for the organizations analysis
         filters = Set([])
-        filters.add("i.submitted_by = pup.people_id")
-        filters.add("pup.uuid = enr.uuid")
-        filters.add("enr.organization_id = org.id")
-        filters.add("i.submitted_on >= enr.start")
-        filters.add("i.submitted_on < enr.end")
+        filters.add("i.submitted_by = org.people_id")
+        filters.add("i.submitted_on >= org.start")
+        filters.add("i.submitted_on < org.end")
         if name is not None:
             if type(name) is str:
                 filters.add("org.name = "+name)
@@ -1000,18 +1664,14 @@ class ITSQuery(DSQuery):
     def GetSQLCountriesFrom (self):
         # fields necessary for the countries analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".countries cou")
-        tables.add(self.identities_db + ".profiles pro")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
     def GetSQLCountriesWhere (self, name):
         # filters for the countries analysis
         filters = Set([])
-        filters.add("i.submitted_by = pup.people_id")
-        filters.add("pup.uuid = pro.uuid")
-        filters.add("pro.country_code = cou.code")
+        filters.add("i.submitted_by = cou.people_id")
         if name is not None: filters.add("cou.name = "+name)
 
         return filters
@@ -1028,7 +1688,7 @@ class ITSQuery(DSQuery):
         filters = Set([])
         filters.add("i.submitted_by = people.id")
         if name is not None and name<>'':
-            filters.add("people.email like '%"+name.replace("'","")+"%'")
+            filters.add(self._get_domain_filter("people.email", "people", name))
 
         return filters
 
@@ -1072,30 +1732,18 @@ class ITSQuery(DSQuery):
         return filters
 
     def GetSQLBotsFrom (self):
-        tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".profiles pro")
-
-        return tables
+        # Bots are removed with an anti-join with people_bots (GetBotsTable)
+        return Set([])
 
     def GetSQLBotsWhere (self, bots_str, table = "changes"):
         filters = Set([])
 
-        bots = bots_str
-        if not isinstance(bots_str, list):
-            bots = bots_str.split(",")
-
         field = "ch.changed_by"
 
         if table == "issues": field = "i.submitted_by"
 
-        filters.add(field + " = pup.people_id")
-        filters.add("pro.uuid = pup.uuid")
-        filters.add("pro.is_bot<>1")
-        for bot in bots:
-            # This code only ignores bots provided in raw_bots.
-            # This should add the other way around, u.identifier = 'xxx'
-            filters.add("pro.name <> '" + bot + "'")
+        filters.add(field + " NOT IN (SELECT people_id FROM %s)" %
+                    (self.GetBotsTable(bots_str)))
 
         return filters
 
@@ -1149,7 +1797,7 @@ class ITSQuery(DSQuery):
         return global_where
 
 
-    def _get_where_type_analysis_set(self, type_analysis):
+    def _get_where_type_analysis_set(self, type_analysis, table = "changes"):
         #"type" is a list of two values: type of analysis and value of
         #such analysis
         where = Set([])
@@ -1183,7 +1831,7 @@ class ITSQuery(DSQuery):
                 elif analysis == 'company': where.union_update(self.GetSQLCompaniesWhere(value))
                 elif analysis == 'country': where.union_update(self.GetSQLCountriesWhere(value))
                 elif analysis == 'domain': where.union_update(self.GetSQLDomainsWhere(value))
-                elif analysis == 'project': where.union_update(self.GetSQLProjectsWhere())
+                elif analysis == 'project': where.union_update(self.GetSQLProjectsWhere(value))
                 elif analysis == 'people2': where.union_update(self.GetSQLPeopleWhere(value, table))
                 elif analysis == 'ticket_type': where.union_update(self.GetSQLTicketTypeWhere(value))
                 else: raise Exception( analysis + " not supported")
@@ -1193,7 +1841,7 @@ class ITSQuery(DSQuery):
     def GetSQLReportWhere (self, filters, table = "changes"):
         #generic function to generate 'where' clauses
 
-        where = self._get_where_type_analysis_set(filters.type_analysis)
+        where = self._get_where_type_analysis_set(filters.type_analysis, table)
 
         if filters.people_out is not None:
             where.union_update(self.GetSQLBotsWhere(filters.people_out, table))
@@ -1300,8 +1948,208 @@ class ITSQuery(DSQuery):
 
         return(filters)
 
+    def _get_lifecycle_query(self, condition = None):
+        """ Issues submitted per person and day for the lifecycle index """
+        where = ""
+        if condition is not None: where = "WHERE " + condition
+        q = """
+            SELECT pup.uuid AS uuid, DATE(i.submitted_on) AS day,
+                   COUNT(i.id) AS submissions
+            FROM issues i
+            JOIN people_uidentities pup ON i.submitted_by = pup.people_id
+            %s
+            GROUP BY pup.uuid, DATE(i.submitted_on)
+            """ % (where)
+        return q
+
+    def GetOnionActivity(self, windows, type_analysis = None):
+        """ Issue changes per person for each window for the onion model
+
+        The filters of the data source match the issues (i.e. the company of
+        the submitter), so the people doing the changes use their own
+        people_uidentities alias.
+        """
+        filters = MetricFilters(None, None, None, type_analysis)
+        tables = self.GetSQLReportFrom(filters)
+        tables.add("issues i")
+        tables.add("changes ch")
+        tables.add("people_uidentities chpup")
+        where = self.GetSQLReportWhere(filters)
+        where.add("i.id = ch.issue_id")
+        where.add("ch.changed_by = chpup.people_id")
+        q = self.BuildOnionQuery(windows, "ch.changed_on", "chpup.uuid", "COUNT(DISTINCT(ch.id))",
+                                 tables, where, self._get_onion_item_field(type_analysis))
+        return self.ExecuteQuery(q)
+
+    issues_timeline_refreshed = {} # database -> closed condition refreshed in this run
+
+    def _get_issues_timeline_query(self, closed_condition, changed = None):
+        """ Timeline of all the issues or of the issues ids returned by changed
+
+        Changes and comments done by the reporter of the issue are not
+        actions on the issue. The issue is closed with the first change
+        that matches closed_condition.
+        """
+        def restrict(field):
+            if changed is None: return ""
+            return " JOIN (%s) changed ON changed.issue_id = %s " % (changed, field)
+
+        first_change = "SELECT c.issue_id, MIN(c.changed_on) AS date " +\
+            "FROM changes c JOIN issues i ON i.id = c.issue_id " + restrict("c.issue_id") +\
+            "WHERE c.changed_by <> i.submitted_by GROUP BY c.issue_id"
+        comments = "SELECT c.issue_id, MIN(c.submitted_on) AS first, MAX(c.submitted_on) AS last " +\
+            "FROM comments c JOIN issues i ON i.id = c.issue_id " + restrict("c.issue_id") +\
+            "WHERE c.submitted_by <> i.submitted_by GROUP BY c.issue_id"
+        closed = "SELECT ch.issue_id, MIN(ch.changed_on) AS date " +\
+            "FROM changes ch " + restrict("ch.issue_id") +\
+            "WHERE " + closed_condition + " GROUP BY ch.issue_id"
+
+        q = """
+            SELECT i.id, fch.date, cm.first,
+                   CASE WHEN fch.date IS NULL THEN cm.first
+                        WHEN cm.first IS NULL THEN fch.date
+                        ELSE LEAST(fch.date, cm.first) END,
+                   cm.last, cl.date
+            FROM issues i %s
+              LEFT JOIN (%s) fch ON fch.issue_id = i.id
+              LEFT JOIN (%s) cm ON cm.issue_id = i.id
+              LEFT JOIN (%s) cl ON cl.issue_id = i.id
+            """ % (restrict("i.id"), first_change, comments, closed)
+        return q
+
+    def _get_issues_closes_query(self, closed_condition, last_change_id = None):
+        """ Closing changes, all of them or the ones after last_change_id """
+        q = "SELECT DISTINCT issue_id, changed_on FROM changes WHERE " + closed_condition
+        if last_change_id is not None:
+            q += " AND id > %i" % (last_change_id)
+        return q
+
+    def GetIssuesCloses(self, closed_condition):
+        """ Refresh the issues timeline tables and return the closes table name
+
+        issues_timeline_closes has a row per issue and date it was closed,
+        so the first close of an issue in a period can be got from it.
+        """
+        self.GetIssuesTimeline(closed_condition)
+        return "issues_timeline_closes"
+
+    @synchronized
+    def GetIssuesTimeline(self, closed_condition, full = False):
+        """ Refresh the issues_timeline table and return its name
+
+        issues_timeline has per issue the first change, first comment,
+        first action (change or comment), last comment and close dates.
+        Only the issues with new changes or comments since the last refresh
+        are computed again; all of them if the closed condition changed,
+        the database was reloaded or full is True. It is refreshed once
+        per run. issues_timeline_closes, with all the closes of the issues,
+        is refreshed with it.
+        """
+        table = "issues_timeline"
+        condition_id = hashlib.md5(closed_condition).hexdigest()
+        if ITSQuery.issues_timeline_refreshed.get(self.database) == condition_id and not full:
+            return table
+
+        self.ExecuteQuery("""
+            CREATE TABLE IF NOT EXISTS issues_timeline (
+                issue_id INT NOT NULL PRIMARY KEY,
+                first_change DATETIME NULL,
+                first_comment DATETIME NULL,
+                first_action DATETIME NULL,
+                last_comment DATETIME NULL,
+                closed DATETIME NULL,
+                INDEX issues_timeline_first_action (first_action),
+                INDEX issues_timeline_first_comment (first_comment),
+                INDEX issues_timeline_last_comment (last_comment),
+                INDEX issues_timeline_closed (closed))
+            """)
+        self.ExecuteQuery("""
+            CREATE TABLE IF NOT EXISTS issues_timeline_closes (
+                issue_id INT NOT NULL,
+                closed DATETIME NOT NULL,
+                PRIMARY KEY (issue_id, closed),
+                INDEX issues_timeline_closes_closed (closed))
+            """)
+        self.ExecuteQuery("""
+            CREATE TABLE IF NOT EXISTS issues_timeline_state (
+                closed_condition CHAR(32) NOT NULL,
+                last_issue_id INT NOT NULL,
+                last_change_id INT NOT NULL,
+                last_comment_id INT NOT NULL)
+            """)
+
+        state = check_array_values(self.ExecuteQuery("SELECT * FROM issues_timeline_state"))
+        last = check_array_values(self.ExecuteQuery("""
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM issues) AS last_issue_id,
+                   (SELECT COALESCE(MAX(id), 0) FROM changes) AS last_change_id,
+                   (SELECT COALESCE(MAX(id), 0) FROM comments) AS last_comment_id
+            """))
+        ids = ['last_issue_id', 'last_change_id', 'last_comment_id']
+        timeline = self.ExecuteQuery("""
+            SELECT (SELECT COUNT(*) FROM issues_timeline) AS issues,
+                   (SELECT COUNT(closed) FROM issues_timeline) AS closed,
+                   (SELECT COUNT(*) FROM issues_timeline_closes) AS closes
+            """)
+
+        if (full or len(state.get('closed_condition', [])) != 1 or
+            (timeline['issues'] == 0 and last['last_issue_id'][0] > 0) or
+            (timeline['closes'] == 0 and timeline['closed'] > 0) or
+            state['closed_condition'][0] != condition_id or
+            [1 for field in ids if state[field][0] > last[field][0]]):
+            logging.info("Creating the issues timeline")
+            self.ExecuteQuery("DELETE FROM issues_timeline")
+            self.ExecuteQuery("DELETE FROM issues_timeline_closes")
+            changed = None
+        elif [1 for field in ids if state[field][0] < last[field][0]]:
+            logging.info("Refreshing the issues timeline")
+            changed = """
+                SELECT issue_id FROM changes WHERE id > %i
+                UNION SELECT issue_id FROM comments WHERE id > %i
+                UNION SELECT id FROM issues WHERE id > %i
+                """ % (state['last_change_id'][0], state['last_comment_id'][0],
+                       state['last_issue_id'][0])
+        else:
+            changed = ""
+
+        if changed != "":
+            q = "REPLACE INTO issues_timeline (issue_id, first_change, first_comment, " +\
+                "first_action, last_comment, closed) "
+            q += self._get_issues_timeline_query(closed_condition, changed)
+            self.ExecuteQuery(q)
+            # Closes are only added by new changes
+            last_change_id = None
+            if changed is not None: last_change_id = state['last_change_id'][0]
+            self.ExecuteQuery("INSERT IGNORE INTO issues_timeline_closes (issue_id, closed) " +
+                              self._get_issues_closes_query(closed_condition,
+                                                            last_change_id))
+            self.ExecuteQuery("DELETE FROM issues_timeline_state")
+            self.ExecuteQuery("INSERT INTO issues_timeline_state VALUES ('%s', %i, %i, %i)" %
+                              (condition_id, last['last_issue_id'][0],
+                               last['last_change_id'][0], last['last_comment_id'][0]))
+            self.cursor.connection.commit()
+
+        ITSQuery.issues_timeline_refreshed[self.database] = condition_id
+        return table
+
 class MLSQuery(DSQuery):
     """ Specific query builders for mailing lists data source """
+
+    indexes = [("messages", ["first_date"]), ("messages", ["mailing_list_url"]),
+               ("messages", ["is_response_of"]), ("messages_people", ["message_id"]),
+               ("messages_people", ["email_address"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_by_filters = ['people2','company','country','domain','project','repository']
+    group_fields = {'domain': "DISTINCT(SUBSTR(mp.email_address,LOCATE('@',mp.email_address)+1)) as name",
+                    'repository': "ml.mailing_list_url"}
+    projects_data_source = "mls"
+    # mailing lists have no integer id
+    projects_repositories = "SELECT mailing_list_url AS id, mailing_list_url AS name FROM mailing_lists"
+    projects_repository_type = "VARCHAR(255)"
+    projects_filters = ["m.mailing_list_url = prj.repository_id"]
+    lifecycle_source = ("messages m", "m.first_date")
+    lifecycle_fields = ["sent"]
+
     def GetSQLRepositoriesFrom (self):
         # tables necessary for repositories
         #return (" messages m ")
@@ -1322,9 +2170,7 @@ class MLSQuery(DSQuery):
         # fields necessary for the organizations analysis
         tables = Set([])
         tables.add("messages_people mp")
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".enrollments enr")
-        tables.add(self.identities_db + ".organizations org")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
@@ -1332,12 +2178,10 @@ class MLSQuery(DSQuery):
         # filters for the organizations analysis
         filters = Set([])
         filters.add("m.message_ID = mp.message_id")
-        filters.add("mp.email_address = pup.people_id")
+        filters.add("mp.email_address = org.people_id")
         filters.add("mp.type_of_recipient = \'From\'")
-        filters.add("pup.uuid = enr.uuid")
-        filters.add("enr.organization_id = org.id")
-        filters.add("m.first_date >= enr.start")
-        filters.add("m.first_date < enr.end")
+        filters.add("m.first_date >= org.start")
+        filters.add("m.first_date < org.end")
         if name <> "" and name is not None:
             filters.add("org.name = "+name)
 
@@ -1347,9 +2191,7 @@ class MLSQuery(DSQuery):
         # fields necessary for the countries analysis
         tables = Set([])
         tables.add("messages_people mp")
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".countries cou")
-        tables.add(self.identities_db + ".profiles pro")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
@@ -1357,10 +2199,8 @@ class MLSQuery(DSQuery):
         # filters necessary for the countries analysis
         filters = Set([])
         filters.add("m.message_ID = mp.message_id")
-        filters.add("mp.email_address = pup.people_id")
+        filters.add("mp.email_address = cou.people_id")
         filters.add("mp.type_of_recipient = \'From\'")
-        filters.add("pup.uuid = pro.uuid")
-        filters.add("pro.country_code = cou.code")
         if name not in  (None,""):
             filters.add("cou.name = " + name)
 
@@ -1377,7 +2217,7 @@ class MLSQuery(DSQuery):
         filters.add("m.message_ID = mp.message_id")
         filters.add("mp.type_of_recipient = \'From\'")
         if name is not None and name<>'':
-            filters.add("mp.email_address like '%"+name.replace("'","")+"%'")
+            filters.add(self._get_domain_filter("mp.email_address", "messages_people", name))
 
         return filters
 
@@ -1427,13 +2267,12 @@ class MLSQuery(DSQuery):
     ##########
 
     def GetSQLBotFrom(self):
-        # Tables needed to filter bots in mailing lists
+        # Tables needed to filter bots in mailing lists: the senders are
+        # removed with an anti-join with people_bots (GetBotsTable)
         tables = Set([])
 
         tables.add("messages m")
         tables.add("messages_people mp")
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".profiles pro")
 
         return tables
 
@@ -1470,11 +2309,9 @@ class MLSQuery(DSQuery):
 
         where = Set([])
         where.add("m.message_ID = mp.message_id")
-        where.add("mp.email_address = pup.people_id")
         where.add("mp.type_of_recipient = \'From\'")
-        where.add("pup.uuid = pro.uuid")
-        for bot in bots:
-            where.add("pro.name <> '" + bot + "'")
+        where.add("mp.email_address NOT IN (SELECT people_id FROM %s)" %
+                  (self.GetBotsTable(bots)))
 
         return where
 
@@ -1514,7 +2351,7 @@ class MLSQuery(DSQuery):
                         logging.error("project filter not supported without identities_db")
                         sys.exit(0)
                     else:
-                        where.union_update(self.GetSQLProjectsWhere())
+                        where.union_update(self.GetSQLProjectsWhere(value))
                 elif analysis == 'people2': where.union_update(self.GetSQLPeopleWhere(value))
 
         if filters.people_out is not None:
@@ -1597,9 +2434,49 @@ class MLSQuery(DSQuery):
 
         return filters
 
+    def _get_lifecycle_query(self, condition = None):
+        """ Messages sent per person and day for the lifecycle index """
+        where = ""
+        if condition is not None: where = "AND " + condition
+        q = """
+            SELECT pup.uuid AS uuid, DATE(m.first_date) AS day,
+                   COUNT(DISTINCT(m.message_ID)) AS sent
+            FROM messages m
+            JOIN messages_people mp ON m.message_ID = mp.message_id
+            JOIN people_uidentities pup ON mp.email_address = pup.people_id
+            WHERE mp.type_of_recipient = 'From' %s
+            GROUP BY pup.uuid, DATE(m.first_date)
+            """ % (where)
+        return q
+
+    def GetOnionActivity(self, windows, type_analysis = None):
+        """ Messages sent per person for each window for the onion model """
+        filters = MetricFilters(None, None, None, type_analysis)
+        tables = self.GetSQLReportFrom(filters)
+        tables.union_update(self.GetTablesOwnUniqueIds())
+        where = self.GetSQLReportWhere(filters)
+        where.union_update(self.GetFiltersOwnUniqueIds())
+        q = self.BuildOnionQuery(windows, "m.first_date", "pup.uuid", "COUNT(DISTINCT(m.message_ID))",
+                                 tables, where, self._get_onion_item_field(type_analysis))
+        return self.ExecuteQuery(q)
+
 class SCRQuery(DSQuery):
     """ Specific query builders for source code review source"""
 
+    indexes = [("issues", ["submitted_on"]), ("issues", ["submitted_by"]),
+               ("issues", ["tracker_id"]), ("issues_ext_gerrit", ["issue_id"]),
+               ("changes", ["issue_id"]), ("changes", ["changed_on"]),
+               ("changes", ["changed_by"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_by_filters = ['people2','company','country','domain','project','repository']
+    group_fields = {'repository': "t.url"}
+    projects_data_source = "scr"
+    projects_repositories = "SELECT id, url AS name FROM trackers"
+    projects_filters = ["i.tracker_id = prj.repository_id"]
+    lifecycle_source = ("issues i", "i.submitted_on")
+    lifecycle_fields = ["submissions"]
+
     def GetSQLRepositoriesFrom (self):
         #tables necessaries for repositories
         tables = Set([])
@@ -1641,9 +2518,7 @@ class SCRQuery(DSQuery):
     def GetSQLCompaniesFrom (self):
         #tables necessaries for organizations
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db+".enrollments enr")
-        tables.add(self.identities_db+".organizations org")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
@@ -1651,11 +2526,9 @@ class SCRQuery(DSQuery):
         #fields necessaries to match info among tables
         filters = Set([])
 
-        filters.add("i.submitted_by = pup.people_id")
-        filters.add("pup.uuid = enr.uuid")
-        filters.add("i.submitted_on >= enr.start")
-        filters.add("i.submitted_on < enr.end")
-        filters.add("enr.organization_id = org.id")
+        filters.add("i.submitted_by = org.people_id")
+        filters.add("i.submitted_on >= org.start")
+        filters.add("i.submitted_on < org.end")
         if company is not None:
             filters.add("org.name = '"+ company+"'")
 
@@ -1665,10 +2538,7 @@ class SCRQuery(DSQuery):
         #tables necessaries for organizations
         tables = Set([])
 
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".profiles pro")
-        #TODO: warning -> countries is using the same acronym as organizations
-        tables.add(self.identities_db + ".countries cou")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
@@ -1676,9 +2546,7 @@ class SCRQuery(DSQuery):
         #fields necessaries to match info among tables
         filters = Set([])
 
-        filters.add("i.submitted_by = pup.people_id")
-        filters.add("pup.uuid = pro.uuid")
-        filters.add("pro.country_code = cou.code")
+        filters.add("i.submitted_by = cou.people_id")
         if country is not None:
             filters.add("cou.name = '"+country+"'")
 
@@ -1697,7 +2565,7 @@ class SCRQuery(DSQuery):
         filters = Set([])
         filters.add("i.submitted_by = people.id")
         if name is not None and name<>'':
-            filters.add("people.email like '%"+name.replace("'","")+"%'")
+            filters.add(self._get_domain_filter("people.email", "people", name))
 
         return filters
 
@@ -1712,10 +2580,8 @@ class SCRQuery(DSQuery):
 
         filters = Set([])
 
-        if table == "issues":
-            filters.add("i.submitted_by")
-        else:
-            filters.add("ch.changed_by")
+        field = "ch.changed_by"
+        if table == "issues": field = "i.submitted_by"
 
         filters.add(field + " = pup.people_id")
         filters.add("up.uuid = pup.uuid")
@@ -1772,30 +2638,18 @@ class SCRQuery(DSQuery):
         return filters
 
     def GetSQLBotsFrom (self):
-        tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".profiles pro")
-
-        return tables
+        # Bots are removed with an anti-join with people_bots (GetBotsTable)
+        return Set([])
 
     def GetSQLBotsWhere (self, bots_str, table = "changes"):
         filters = Set([])
 
-        bots = bots_str
-        if not isinstance(bots_str, list):
-            bots = bots_str.split(",")
-
         field = "ch.changed_by"
 
         if table == "issues": field = "i.submitted_by"
 
-        filters.add(field + " = pup.people_id")
-        filters.add("pro.uuid = pup.uuid")
-        filters.add("pro.is_bot<>1")
-        for bot in bots:
-            # This code only ignores bots provided in raw_bots.
-            # This should add the other way around, u.identifier = 'xxx'
-            filters.add("pro.name <> '" + bot + "'")
+        filters.add(field + " NOT IN (SELECT people_id FROM %s)" %
+                    (self.GetBotsTable(bots_str)))
 
         return filters
 
@@ -1896,7 +2750,7 @@ class SCRQuery(DSQuery):
                         logging.error("project filter not supported without identities_db")
                         sys.exit(0)
                     else:
-                        where.union_update(self.GetSQLProjectsWhere())
+                        where.union_update(self.GetSQLProjectsWhere(value))
         return where
 
     def GetSQLReportWhere (self, filters, table = "changes"):
@@ -2287,6 +3141,32 @@ class SCRQuery(DSQuery):
         q = self.GetPeopleQuerySubmissions(developer_id, None, startdate, enddate, False)
         return(self.ExecuteQuery(q))
 
+    def _get_lifecycle_query(self, condition = None):
+        """ Submissions per person and day for the lifecycle index """
+        where = ""
+        if condition is not None: where = "WHERE " + condition
+        q = """
+            SELECT pup.uuid AS uuid, DATE(i.submitted_on) AS day,
+                   COUNT(i.id) AS submissions
+            FROM issues i
+            JOIN people_uidentities pup ON i.submitted_by = pup.people_id
+            %s
+            GROUP BY pup.uuid, DATE(i.submitted_on)
+            """ % (where)
+        return q
+
+    def GetOnionActivity(self, windows, type_analysis = None):
+        """ Review submissions per person for each window for the onion model """
+        filters = MetricFilters(None, None, None, type_analysis)
+        tables = self.GetSQLReportFrom(filters)
+        tables.add("issues i")
+        tables.add("people_uidentities pup")
+        where = self.GetSQLReportWhere(filters, "issues")
+        where.add("i.submitted_by = pup.people_id")
+        q = self.BuildOnionQuery(windows, "i.submitted_on", "pup.uuid", "COUNT(DISTINCT(i.id))",
+                                 tables, where, self._get_onion_item_field(type_analysis))
+        return self.ExecuteQuery(q)
+
     def GetPeopleIntake(self, min, max):
         filters = self.GetIssuesFiltered()
         if (filters != ""): filters  = " WHERE " + filters
@@ -2394,10 +3274,7 @@ class SCRQuery(DSQuery):
                  host="127.0.0.1", port=3306, group=None):
         super(SCRQuery, self).__init__(user, password, database, identities_db, projects_db,
                                        host, port, group)
-        # _filter_submitter_id as a static global var to avoid SQL re-execute
-        people_userid = 'l10n-bot'
-        q = "SELECT id FROM people WHERE user_id = '%s'" % (people_userid)
-        self._filter_submitter_id = self.ExecuteQuery(q)['id']
+        # Submitter to be filtered (l10n-bot id in people) if not None
         self._filter_submitter_id = None # don't filter in general
 
     # To be used for issues table
@@ -2415,6 +3292,12 @@ class SCRQuery(DSQuery):
         return filters
 
 class IRCQuery(DSQuery):
+    indexes = [("irclog", ["date"]), ("irclog", ["nick"]),
+               ("irclog", ["channel_id"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_by_filters = ['people2','company','repository']
+    group_fields = {'repository': "chan.name"}
 
     def GetSQLRepositoriesFrom (self):
         # tables necessary for repositories
@@ -2429,46 +3312,40 @@ class IRCQuery(DSQuery):
         # filters necessaries for repositories
         filters = Set([])
         filters.add("i.channel_id = chan.id")
-        filters.add("chan.name = " + repository)
+        if repository is not None:
+            filters.add("chan.name = " + repository)
 
         return filters
 
     def GetSQLCompaniesFrom(self):
         # tables necessary to organizations analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".organizations org")
-        tables.add(self.identities_db + ".enrollments enr")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
     def GetSQLCompaniesWhere(self, name):
         # filters necessary to organizations analysis
         filters = Set([])
-        filters.add("i.nick = pup.people_id")
-        filters.add("pup.uuid = enr.uuid")
-        filters.add("enr.organization_id = org.id")
-        filters.add("i.date >= enr.start")
-        filters.add("i.date < enr.end")
-        filters.add("org.name = " + name)
+        filters.add("i.nick = org.people_id")
+        filters.add("i.date >= org.start")
+        filters.add("i.date < org.end")
+        if name is not None:
+            filters.add("org.name = " + name)
 
         return filters
 
     def GetSQLCountriesFrom(self):
         # tables necessary to countries analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".countries cou")
-        tables.add(self.identities_db + ".profiles pro")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
     def GetSQLCountriesWhere(self, name):
         # filters necessary to countries analysis
         filters = Set([])
-        filters.add("i.nick = pup.people_id")
-        filters.add("pup.uuid = pro.uuid")
-        filters.add("pro.country_code = cou.code")
+        filters.add("i.nick = cou.people_id")
         if name is not None:
             filters.add("cou.name = " + name)
 
@@ -2496,14 +3373,6 @@ class IRCQuery(DSQuery):
 
         return tables
 
-    def GetSQLPeople2From(self):
-        # tables necessary to countries analysis
-        tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".uidentities up")
-
-        return tables
-
     def GetSQLPeople2Where(self, name):
         # filters necessary to countries analysis
         filters = Set([])
@@ -2617,6 +3486,11 @@ class IRCQuery(DSQuery):
         return where
 
 class MediawikiQuery(DSQuery):
+    indexes = [("wiki_pages_revs", ["date"]), ("wiki_pages_revs", ["user"]),
+               ("wiki_pages_revs", ["page_id"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_by_filters = ['people2','company']
 
     def GetSQLPeople2Where(self, name = None):
         # filters necessary to organizations analysis
@@ -2636,6 +3510,24 @@ class MediawikiQuery(DSQuery):
 
         return tables
 
+    def GetSQLCompaniesFrom(self):
+        # tables necessary to organizations analysis
+        tables = Set([])
+        tables.add(self.GetAffiliations()[0] + " org")
+
+        return tables
+
+    def GetSQLCompaniesWhere(self, name = None):
+        # filters necessary to organizations analysis
+        filters = Set([])
+        filters.add("wiki_pages_revs.user = org.people_id")
+        filters.add("wiki_pages_revs.date >= org.start")
+        filters.add("wiki_pages_revs.date < org.end")
+        if name is not None:
+            filters.add("org.name = " + name)
+
+        return filters
+
     def GetSQLReportFrom (self, filters):
         tables = Set([])
         tables.add("wiki_pages_revs")
@@ -2651,6 +3543,7 @@ class MediawikiQuery(DSQuery):
         value = type_analysis[1]
 
         if analysis == 'people2': tables.union_update(self.GetSQLPeople2From())
+        elif analysis == 'company': tables.union_update(self.GetSQLCompaniesFrom())
 
         return tables
 
@@ -2671,36 +3564,21 @@ class MediawikiQuery(DSQuery):
         value = type_analysis[1]
 
         if analysis == 'people2': where.union_update(self.GetSQLPeople2Where(value))
+        elif analysis == 'company': where.union_update(self.GetSQLCompaniesWhere(value))
 
         return where
 
 class QAForumsQuery(DSQuery):
     """ Specific query builders for question and answer platforms """
 
+    indexes = [("answers", ["question_identifier"]),
+               ("questionstags", ["question_identifier"]),
+               ("questionstags", ["tag_id"]), ("tags", ["tag"])]
+    group_by_filters = ['repository', 'people2']
+    group_fields = {'repository': "t.tag", 'people2': "p.username"}
+
     def create_indexes(self):
-        try:
-            q = "create index q_id_a_idx on answers (question_identifier)"
-            self.ExecuteQuery(q)
-        except Exception:
-            pass
-            # logging.info("Indexes for QAForums already created")
-            # import traceback
-            # traceback.print_exc(file=sys.stdout)
-        try:
-            q = "create index q_id_qt_idx on questionstags (question_identifier)"
-            self.ExecuteQuery(q)
-        except:
-            pass
-        try:
-            q = "create index tag_id_qt_idx on questionstags (question_identifier)"
-            self.ExecuteQuery(q)
-        except:
-            pass
-        try:
-            q = "create index tag_idx_t on tags (tag)"
-            self.ExecuteQuery(q)
-        except:
-            pass
+        self.ensure_indexes()
 
     def GetSQLReportFrom(self, type_analysis):
         # generic function to generate "from" clauses
@@ -2724,6 +3602,8 @@ class QAForumsQuery(DSQuery):
         if report == "repository":
             tables.add("tags t")
             tables.add("questionstags qt")
+        elif report == "people2":
+            tables.add("people p")
 
         #rest of reports to be implemented
 
@@ -2753,7 +3633,13 @@ class QAForumsQuery(DSQuery):
         if report == "repository":
             filters.add(shorttable + ".question_identifier = qt.question_identifier")
             filters.add("qt.tag_id = t.id")
-            filters.add("t.tag = " + value)
+            if value is not None:
+                filters.add("t.tag = " + value)
+        elif report == "people2":
+            author_field = self.__get_author_field(table)
+            filters.add(shorttable + "." + author_field + " = p.identifier")
+            if value is not None:
+                filters.add("p.username = " + value)
 
         return filters
 
@@ -2971,17 +3857,63 @@ class QAForumsQuery(DSQuery):
         q = select + fromtable + filters + date_limit + tail
         return(self.ExecuteQuery(q))
 
+    def GetOnionActivity(self, windows, type_analysis = None):
+        """ Questions, answers and comments per person for each window
+
+        People are the identifiers of the forum (no unique identities) and
+        the onion model is only available for the whole data source: None
+        is returned for filters.
+        """
+        if type_analysis is not None:
+            logging.info("Onion model not supported for qaforums filters")
+            return None
+        messages = "((select p.identifier as identifier, q.added_at as date"+\
+            "  from questions q, people p"+\
+            "  where q.author_identifier=p.identifier)"+\
+            "union"+\
+            "(select p.identifier as identifier, a.submitted_on as date"+\
+            "  from answers a, people p"+\
+            "  where a.user_identifier=p.identifier)"+\
+            "union"+\
+            "(select p.identifier as identifier, c.submitted_on as date"+\
+            "  from comments c, people p"+\
+            "  where c.user_identifier=p.identifier)) t"
+        q = self.BuildOnionQuery(windows, "date", "identifier", "COUNT(*)",
+                                 Set([messages]), Set([]))
+        return self.ExecuteQuery(q)
+
+    def GetOnionPeople(self, people):
+        """ Username of the people (identifiers) in the onion layers """
+        info = {}
+        if len(people) == 0: return info
+        q = "SELECT identifier, MAX(username) AS name FROM people " +\
+            "WHERE identifier IN (%s) GROUP BY identifier" % \
+            (",".join(str(p) for p in people))
+        data = check_array_values(self.ExecuteQuery(q))
+        for i in range(0, len(data['identifier'])):
+            info[data['identifier'][i]] = {"name": data['name'][i]}
+        return info
+
 class DownloadsDSQuery(DSQuery):
     """ Specific query builders for downloads """
 
-    pass
+    group_by_filters = []
 
 class ReleasesDSQuery(DSQuery):
     """ Specific query builders for downloads """
-    pass
+    group_by_filters = []
 
 
 class PullpoQuery(DSQuery):
+    indexes = [("pull_requests", ["created_at"]), ("pull_requests", ["user_id"]),
+               ("pull_requests", ["repo_id"]),
+               ("people_uidentities", ["people_id"]),
+               ("people_uidentities", ["uuid"])]
+    group_by_filters = ['people2','company','country','project','repository']
+    group_fields = {'repository': "re.url"}
+    projects_data_source = "pullpo"
+    projects_repositories = "SELECT id, url AS name FROM repositories"
+    projects_filters = ["pr.repo_id = prj.repository_id"]
 
     def GetSQLRepositoriesFrom (self):
         # tables necessary for repositories
@@ -2994,47 +3926,60 @@ class PullpoQuery(DSQuery):
         # filters necessaries for repositories
         filters = Set([])
         filters.add("pr.repo_id = re.id")
-        filters.add("re.url = " + repository)
+        if repository is not None:
+            filters.add("re.url = " + repository)
+
+        return filters
+
+    def GetSQLPeople2From(self):
+        # tables necessary to people analysis
+        tables = Set([])
+        tables.add("people_uidentities pup")
+        tables.add(self.identities_db + ".uidentities up")
+
+        return tables
+
+    def GetSQLPeople2Where(self, name):
+        # filters necessary to people analysis
+        filters = Set([])
+        filters.add("pr.user_id = pup.people_id")
+        filters.add("pup.uuid = up.uuid")
+        if name is not None:
+            filters.add("up.identifier = " + name)
 
         return filters
 
     def GetSQLCompaniesFrom(self):
         # tables necessary to organizations analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".organizations org")
-        tables.add(self.identities_db + ".enrollments enr")
+        tables.add(self.GetAffiliations()[0] + " org")
 
         return tables
 
     def GetSQLCompaniesWhere(self, name):
         # filters necessary to organizations analysis
         filters = Set([])
-        filters.add("pr.user_id = pup.people_id")
-        filters.add("pup.uuid = enr.uuid")
-        filters.add("enr.organization_id = org.id")
-        filters.add("pr.created_at >= enr.start")
-        filters.add("pr.created_at < enr.end")
-        filters.add("org.name = " + name)
+        filters.add("pr.user_id = org.people_id")
+        filters.add("pr.created_at >= org.start")
+        filters.add("pr.created_at < org.end")
+        if name is not None:
+            filters.add("org.name = " + name)
 
         return filters
 
     def GetSQLCountriesFrom(self):
         # tables necessary to countries analysis
         tables = Set([])
-        tables.add("people_uidentities pup")
-        tables.add(self.identities_db + ".countries cou")
-        tables.add(self.identities_db + ".profiles pro")
+        tables.add(self.GetAffiliations()[1] + " cou")
 
         return tables
 
     def GetSQLCountriesWhere(self, name):
         # filters necessary to countries analysis
         filters = Set([])
-        filters.add("pr.user_id = pup.people_id")
-        filters.add("pup.uuid = pro.uuid")
-        filters.add("pro.country_code = cou.code")
-        filters.add("cou.name = " + name)
+        filters.add("pr.user_id = cou.people_id")
+        if name is not None:
+            filters.add("cou.name = " + name)
 
         return filters
 
@@ -3051,7 +3996,7 @@ class PullpoQuery(DSQuery):
         filters.add("pr.user_id = people.id")
 
         if name is not None and name<>'':
-            filters.add("people.email like '%"+name.replace("'","")+"%'")
+            filters.add(self._get_domain_filter("people.email", "people", name))
 
         return filters
 
@@ -3071,6 +4016,7 @@ class PullpoQuery(DSQuery):
 
         if (analysis):
             if analysis == 'repository': From.union_update(self.GetSQLRepositoriesFrom())
+            elif analysis == 'people2': From.union_update(self.GetSQLPeople2From())
             elif analysis == 'company': From.union_update(self.GetSQLCompaniesFrom())
             elif analysis == 'country': From.union_update(self.GetSQLCountriesFrom())
             elif analysis == 'domain': From.union_update(self.GetSQLDomainsFrom())
@@ -3095,6 +4041,7 @@ class PullpoQuery(DSQuery):
 
         if (analysis):
             if analysis == 'repository': where.union_update(self.GetSQLRepositoriesWhere(value))
+            elif analysis == 'people2': where.union_update(self.GetSQLPeople2Where(value))
             elif analysis == 'company': where.union_update(self.GetSQLCompaniesWhere(value))
             elif analysis == 'country': where.union_update(self.GetSQLCountriesWhere(value))
             elif analysis == 'domain': where.union_update(self.GetSQLDomainsWhere(value))
@@ -3103,7 +4050,7 @@ class PullpoQuery(DSQuery):
                     logging.error("project filter not supported without identities_db")
                     sys.exit(0)
                 else:
-                    where.union_update(self.GetSQLProjectsWhere())
+                    where.union_update(self.GetSQLProjectsWhere(value))
         return where
 
     def GetReviewsSQL (self, period, startdate, enddate, type_, type_analysis, evolutionary):
@@ -3241,6 +4188,11 @@ class PullpoQuery(DSQuery):
 
 
 class EventizerQuery(DSQuery):
+    indexes = [("events", ["local_time"]), ("events", ["group_id"]),
+               ("events", ["city_id"]), ("rsvps", ["event_id"]),
+               ("groups", ["category_id"])]
+    group_by_filters = ['repository']
+    group_fields = {'repository': "gro.name"}
 
     # Groups conditions
     def GetSQLGroupsFrom(self):
@@ -3252,6 +4204,7 @@ class EventizerQuery(DSQuery):
     def GetSQLGroupsWhere(self, value):
         filters = Set([])
         filters.add("eve.group_id = gro.id")
+        if value is None: return filters
         #TODO: at some point we should use the escape function from mysqldb
         value = value.replace("'", "\\'")
         value = value[1:]
@@ -3271,7 +4224,8 @@ class EventizerQuery(DSQuery):
         filters = Set([])
         filters.add("eve.group_id = gro.id")
         filters.add("gro.category_id = cat.id")
-        filters.add("cat.name = " + value)
+        if value is not None:
+            filters.add("cat.name = " + value)
         return filters
 
     # Cities conditions
@@ -3284,7 +4238,8 @@ class EventizerQuery(DSQuery):
     def GetSQLCitiesWhere(self, value):
         filters = Set([])
         filters.add("eve.city_id = cit.id")
-        filters.add("cit.city = " + value)
+        if value is not None:
+            filters.add("cit.city = " + value)
         return filters
 
     # Generic query builders
@@ -3311,10 +4266,14 @@ class EventizerQuery(DSQuery):
         if type_analysis is not None:
             # To be improved... not a very smart way of doing this
             list_analysis = type_analysis[0].split(MetricFilters.DELIMITER)
-            list_values = type_analysis[1].split(MetricFilters.DELIMITER)
+            list_values = None
+            if type_analysis[1] is not None:
+                list_values = type_analysis[1].split(MetricFilters.DELIMITER)
             # Retrieving tables based on the required type of analysis.
             for analysis in list_analysis:
-                value = list_values[list_analysis.index(analysis)]
+                value = None
+                if list_values is not None:
+                    value = list_values[list_analysis.index(analysis)]
                 if analysis == 'repository': where.union_update(self.GetSQLGroupsWhere(value))
                 elif analysis == 'category': where.union_update(self.GetSQLCategoriesWhere(value))
                 elif analysis == 'city': where.union_update(self.GetSQLCitiesWhere(value))
@@ -3323,7 +4282,7 @@ class EventizerQuery(DSQuery):
 
 class DockerHubDSQuery(DSQuery):
     """ Specific query builders for dockerhub """
-    pass
+    group_by_filters = []
 
 if __name__=="__main__":
     import doctest
@@ -0,0 +1,210 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Profile of the SQL queries executed in a report run
+##
+## When DSQuery.query_profile is set, DSQuery.ExecuteQuery and
+## GrimoireSQL.ExecuteQuery add each query to it: wall time, rows, bytes
+## fetched and the metric, study or function which executed it. Queries
+## are grouped by fingerprint (the SQL without literals) and the phase of
+## the report (evol, agg, top ...) in which they were executed.
+
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+
+
+class QueryProfile(object):
+    """ Time, rows and bytes of the queries grouped by fingerprint
+
+    If explain_time is set, the EXPLAIN of the first query of each
+    fingerprint slower than explain_time seconds is captured.
+    """
+
+    # Modules of the SQL layer, not reported as callers
+    sql_modules = ["query_builder", "GrimoireSQL", "query_profile"]
+
+    def __init__(self, explain_time = None, top = 50):
+        self.explain_time = explain_time
+        self.top = top
+        self.phase = None
+        self.fingerprints = {} # fingerprint -> stats
+        self.phases = {} # phase -> stats
+        self.executions = {} # md5 of the SQL -> [executions, fingerprint]
+
+    def set_phase(self, phase):
+        self.phase = phase
+
+    @staticmethod
+    def get_fingerprint(sql):
+        """ Normalized SQL: literals replaced with ? and spaces collapsed """
+        sql = re.sub(r"'(?:[^'\\]|\\.)*'", "?", sql)
+        sql = re.sub(r'"(?:[^"\\]|\\.)*"', "?", sql)
+        sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+        sql = " ".join(sql.split()).lower()
+        # Lists of values in IN clauses with any number of items
+        sql = re.sub(r"\(\s*\?(\s*,\s*\?)*\s*\)", "(?+)", sql)
+        return sql
+
+    @staticmethod
+    def get_result_size(result):
+        """ Rows and approximate bytes of a result from ExecuteQuery """
+        rows = 0
+        size = 0
+        for values in result.values():
+            if not isinstance(values, list): values = [values]
+            rows = max(rows, len(values))
+            for value in values:
+                if isinstance(value, basestring): size += len(value)
+                elif value is not None: size += 8
+        return rows, size
+
+    @staticmethod
+    def get_caller():
+        """ Metric, study or function executing the current query """
+        from vizgrimoire.analysis.analyses import Analyses
+        from vizgrimoire.metrics.metrics import Metrics
+
+        function = None
+        frame = sys._getframe(1)
+        while frame is not None:
+            obj = frame.f_locals.get('self')
+            if isinstance(obj, Metrics) or isinstance(obj, Analyses):
+                caller = obj.__class__.__name__
+                filters = obj.filters
+                if filters is not None and filters.type_analysis is not None \
+                   and len(filters.type_analysis) == 2:
+                    caller += " " + str(filters.type_analysis[0]) + ":" + \
+                              unicode(filters.type_analysis[1])
+                return caller
+            module = os.path.basename(frame.f_code.co_filename).split(".")[0]
+            if function is None and module not in QueryProfile.sql_modules:
+                function = module + "." + frame.f_code.co_name
+            frame = frame.f_back
+        return function
+
+    @staticmethod
+    def _new_stats():
+        return {"queries": 0, "time": 0.0, "rows": 0, "bytes": 0}
+
+    @staticmethod
+    def _add_stats(stats, elapsed, rows, size):
+        stats["queries"] += 1
+        stats["time"] += elapsed
+        stats["rows"] += rows
+        stats["bytes"] += size
+
+    def add(self, sql, elapsed, result, explain = None):
+        """ Add an executed query
+
+        explain is a function returning the EXPLAIN of the query, used
+        if the query is slower than explain_time.
+        """
+        rows, size = QueryProfile.get_result_size(result)
+        fingerprint = QueryProfile.get_fingerprint(sql)
+
+        stats = self.fingerprints.get(fingerprint)
+        if stats is None:
+            stats = QueryProfile._new_stats()
+            stats.update({"max_time": 0.0, "sql": sql, "callers": {},
+                          "phases": {}, "explain": None})
+            self.fingerprints[fingerprint] = stats
+        QueryProfile._add_stats(stats, elapsed, rows, size)
+        if elapsed >= stats["max_time"]:
+            stats["max_time"] = elapsed
+            stats["sql"] = sql
+        caller = QueryProfile.get_caller()
+        stats["callers"][caller] = stats["callers"].get(caller, 0) + 1
+        stats["phases"][self.phase] = stats["phases"].get(self.phase, 0) + 1
+
+        if self.phase not in self.phases:
+            self.phases[self.phase] = QueryProfile._new_stats()
+        QueryProfile._add_stats(self.phases[self.phase], elapsed, rows, size)
+
+        key = hashlib.md5(sql.encode('utf-8') if isinstance(sql, unicode) else sql).hexdigest()
+        if key not in self.executions: self.executions[key] = [0, fingerprint]
+        self.executions[key][0] += 1
+
+        if self.explain_time is not None and elapsed >= self.explain_time \
+           and stats["explain"] is None and explain is not None:
+            stats["explain"] = explain(sql)
+
+    def get_duplicates(self):
+        """ Fingerprints with queries executed more than once with the same SQL
+
+        Returns a dict fingerprint -> number of repeated executions.
+        """
+        duplicates = {}
+        for (executions, fingerprint) in self.executions.values():
+            if executions < 2: continue
+            duplicates[fingerprint] = duplicates.get(fingerprint, 0) + executions - 1
+        return duplicates
+
+    def get_slow(self):
+        """ Top fingerprints by total time """
+        slow = sorted(self.fingerprints.items(), key = lambda item: -item[1]["time"])
+        return slow[0:self.top]
+
+    def get_profile(self):
+        duplicates = self.get_duplicates()
+        slow = []
+        for fingerprint, stats in self.get_slow():
+            data = dict(stats)
+            data["fingerprint"] = fingerprint
+            data["duplicates"] = duplicates.get(fingerprint, 0)
+            slow.append(data)
+        phases = dict((str(phase), stats) for phase, stats in self.phases.items())
+        total = QueryProfile._new_stats()
+        for stats in self.phases.values():
+            for field in total: total[field] += stats[field]
+        total["fingerprints"] = len(self.fingerprints)
+        total["duplicates"] = sum(duplicates.values())
+        return {"total": total, "phases": phases, "slow": slow}
+
+    def save(self, path):
+        """ Save the profile in path.json and the slow queries in path.csv """
+        profile = self.get_profile()
+        logging.info("Saving queries profile in " + path + ".json")
+        with open(path + ".json", "w") as f:
+            json.dump(profile, f, indent = 1, sort_keys = True, default = str)
+
+        with open(path + ".csv", "wb") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fingerprint", "queries", "duplicates", "time",
+                             "max_time", "rows", "bytes", "callers"])
+            for query in profile["slow"]:
+                callers = u";".join(unicode(caller) for caller in query["callers"])
+                writer.writerow([query["fingerprint"].encode('utf-8'), query["queries"],
+                                 query["duplicates"], "%.3f" % query["time"],
+                                 "%.3f" % query["max_time"], query["rows"],
+                                 query["bytes"], callers.encode('utf-8')])
+
+    def log(self):
+        total = self.get_profile()["total"]
+        logging.info("%i queries (%i fingerprints, %i duplicated) in %.1fs" %
+                     (total["queries"], total["fingerprints"],
+                      total["duplicates"], total["time"]))
+        for phase, stats in sorted(self.phases.items()):
+            logging.info("  %s: %i queries in %.1fs" % (phase, stats["queries"], stats["time"]))
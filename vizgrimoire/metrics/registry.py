@@ -0,0 +1,158 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Registry of the available metrics and studies
+##
+## The metrics (Metrics classes in metrics/*_metrics.py) and the studies
+## (Analyses classes in analysis/*.py) are found parsing the sources, so
+## no module is imported, and saved in registry_data.py. Report uses it
+## to import the modules only when a metric or study is used. The
+## registry is generated when building the package (setup.py) and must
+## be generated again when a metric or study is added:
+##
+##    python -m vizgrimoire.metrics.registry
+
+
+import ast
+import os
+
+
+registry_file = "registry_data.py"
+
+def _get_module_classes(path):
+    """ Classes defined in a module and the names imported in it
+
+    Returns classes as name -> (bases, attributes) where bases is a list
+    of (module, class name) with module None for names not imported from
+    other module, and attributes has the id and data_source of the class.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    imports = {} # name or alias -> module
+    classes = {}
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name] = alias.name.split(".")[-1]
+        elif isinstance(node, ast.ImportFrom) and node.module is not None:
+            for alias in node.names:
+                imports[alias.asname or alias.name] = node.module.split(".")[-1]
+        elif isinstance(node, ast.ClassDef):
+            bases = []
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    bases.append((imports.get(base.id), base.id))
+                elif isinstance(base, ast.Attribute) and isinstance(base.value, ast.Name):
+                    bases.append((imports.get(base.value.id), base.attr))
+            attributes = {}
+            for item in node.body:
+                if not isinstance(item, ast.Assign) or len(item.targets) != 1: continue
+                target = item.targets[0]
+                if not isinstance(target, ast.Name): continue
+                if target.id not in ["id", "data_source"]: continue
+                if isinstance(item.value, ast.Str):
+                    attributes[target.id] = item.value.s
+                elif isinstance(item.value, ast.Name) and item.value.id != "None":
+                    attributes[target.id] = item.value.id
+                else:
+                    attributes[target.id] = None
+            classes[node.name] = (bases, attributes)
+    return classes
+
+def _resolve(modules, module, name, root):
+    """ Attributes of class name of module if it is a root subclass, else None """
+    if name == root: return {}
+    if module not in modules or name not in modules[module]: return None
+    bases, attributes = modules[module][name]
+    for (base_module, base_name) in bases:
+        inherited = _resolve(modules, base_module or module, base_name, root)
+        if inherited is None: continue
+        resolved = dict(inherited)
+        resolved.update(attributes)
+        return resolved
+    return None
+
+def _get_subclasses(path, files, root):
+    """ List of (module, class, attributes) of the root subclasses in files """
+    modules = {}
+    for f in files:
+        modules[f.split(".py")[0]] = _get_module_classes(os.path.join(path, f))
+    subclasses = []
+    for module in sorted(modules):
+        for name in sorted(modules[module]):
+            if name == root: continue
+            attributes = _resolve(modules, module, name, root)
+            if attributes is None: continue
+            subclasses.append((module, name, attributes))
+    return subclasses
+
+def build_registry(vizgrimoire_dir = None):
+    """ Metrics and studies available in the sources
+
+    Returns a dict with the metrics as (module, class, data source class
+    name, id) and the studies as (module, class, id).
+    """
+    if vizgrimoire_dir is None:
+        vizgrimoire_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    metrics_dir = os.path.join(vizgrimoire_dir, "metrics")
+    analysis_dir = os.path.join(vizgrimoire_dir, "analysis")
+
+    metrics = []
+    files = [f for f in os.listdir(metrics_dir) if f.endswith("_metrics.py")]
+    for (module, name, attributes) in _get_subclasses(metrics_dir, files, "Metrics"):
+        if attributes.get("data_source") is None: continue
+        metrics.append((module, name, attributes["data_source"], attributes.get("id")))
+
+    studies = []
+    files = [f for f in os.listdir(analysis_dir)
+             if f.endswith(".py") and f != "__init__.py"]
+    for (module, name, attributes) in _get_subclasses(analysis_dir, files, "Analyses"):
+        studies.append((module, name, attributes.get("id")))
+
+    return {"metrics": metrics, "studies": studies}
+
+def write_registry(path = None):
+    """ Save the registry of the sources in registry_data.py """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), registry_file)
+    registry = build_registry()
+    with open(path, "w") as f:
+        f.write("## Generated by vizgrimoire/metrics/registry.py, do not edit\n\n")
+        f.write("# (module, class, data source, id) of the metrics\n")
+        f.write("metrics = [\n")
+        for metric in registry["metrics"]:
+            f.write("    %r,\n" % (metric,))
+        f.write("]\n\n")
+        f.write("# (module, class, id) of the studies\n")
+        f.write("studies = [\n")
+        for study in registry["studies"]:
+            f.write("    %r,\n" % (study,))
+        f.write("]\n")
+    return registry
+
+def get_registry():
+    """ Registry saved in registry_data.py """
+    from vizgrimoire.metrics import registry_data
+    return {"metrics": registry_data.metrics, "studies": registry_data.studies}
+
+if __name__ == '__main__':
+    registry = write_registry()
+    print "%i metrics and %i studies registered" % (len(registry["metrics"]),
+                                                   len(registry["studies"]))
@@ -0,0 +1,206 @@
+## Generated by vizgrimoire/metrics/registry.py, do not edit
+
+# (module, class, data source, id) of the metrics
+metrics = [
+    ('dockerhub_metrics', 'Downloads', 'DockerHubDS', 'downloads'),
+    ('dockerhub_metrics', 'Forks', 'DockerHubDS', 'forks'),
+    ('dockerhub_metrics', 'Pulls', 'DockerHubDS', 'pulls'),
+    ('dockerhub_metrics', 'Starred', 'DockerHubDS', 'starred'),
+    ('dockerhub_metrics', 'Watchers', 'DockerHubDS', 'watchers'),
+    ('downloads_metrics', 'Bounces', 'DownloadsDS', 'bounces'),
+    ('downloads_metrics', 'Countries', 'DownloadsDS', 'countries'),
+    ('downloads_metrics', 'Downloads', 'DownloadsDS', 'downloads'),
+    ('downloads_metrics', 'Packages', 'DownloadsDS', 'packages'),
+    ('downloads_metrics', 'Pages', 'DownloadsDS', 'pages'),
+    ('downloads_metrics', 'UniqueDownloads', 'DownloadsDS', 'udownloads'),
+    ('downloads_metrics', 'UniqueVisitors', 'DownloadsDS', 'uvisitors'),
+    ('downloads_metrics', 'Visits', 'DownloadsDS', 'visits'),
+    ('eventizer_metrics', 'Attendees', 'EventsDS', 'rsvps'),
+    ('eventizer_metrics', 'Cities', 'EventsDS', 'cities'),
+    ('eventizer_metrics', 'Events', 'EventsDS', 'events'),
+    ('eventizer_metrics', 'Groups', 'EventsDS', 'groups'),
+    ('eventizer_metrics', 'Members', 'EventsDS', 'members'),
+    ('eventizer_metrics', 'RsvpsEvent', 'EventsDS', 'rsvps_event'),
+    ('irc_metrics', 'Companies', 'IRC', 'organizations'),
+    ('irc_metrics', 'RegisteredUsers', 'IRC', 'registered_users'),
+    ('irc_metrics', 'Repositories', 'IRC', 'repositories'),
+    ('irc_metrics', 'Senders', 'IRC', 'senders'),
+    ('irc_metrics', 'Sent', 'IRC', 'sent'),
+    ('its_metrics', 'AllParticipants', 'ITS', 'allhistory_participants'),
+    ('its_metrics', 'BMIIndex', 'ITS', 'bmitickets'),
+    ('its_metrics', 'Changed', 'ITS', 'changed'),
+    ('its_metrics', 'Changers', 'ITS', 'changers'),
+    ('its_metrics', 'Closed', 'ITS', 'closed'),
+    ('its_metrics', 'Closers', 'ITS', 'closers'),
+    ('its_metrics', 'Companies', 'ITS', 'organizations'),
+    ('its_metrics', 'CompaniesCountries', 'ITS', 'organizations+countries'),
+    ('its_metrics', 'CompaniesProjects', 'ITS', 'organizations+projects'),
+    ('its_metrics', 'Countries', 'ITS', 'countries'),
+    ('its_metrics', 'Domains', 'ITS', 'domains'),
+    ('its_metrics', 'EndOfActivity', 'ITS', 'last_date'),
+    ('its_metrics', 'InitialActivity', 'ITS', 'first_date'),
+    ('its_metrics', 'Opened', 'ITS', 'opened'),
+    ('its_metrics', 'Openers', 'ITS', 'openers'),
+    ('its_metrics', 'People', 'ITS', 'people2'),
+    ('its_metrics', 'Projects', 'ITS', 'projects'),
+    ('its_metrics', 'Trackers', 'ITS', 'trackers'),
+    ('its_stories_metrics', 'People', 'ITS', 'stories_people'),
+    ('its_stories_metrics', 'StoriesClosed', 'ITS', 'stories_closed'),
+    ('its_stories_metrics', 'StoriesOpened', 'ITS', 'stories_opened'),
+    ('its_stories_metrics', 'StoriesOpeners', 'ITS', 'stories_openers'),
+    ('its_stories_metrics', 'StoriesPending', 'ITS', 'stories_pending'),
+    ('mediawiki_scr_metrics', 'TimeToReviewPendingSCR', 'SCR', 'review_time_pending_total'),
+    ('mls_metrics', 'ActiveThreads', 'MLS', 'active_threads'),
+    ('mls_metrics', 'Companies', 'MLS', 'organizations'),
+    ('mls_metrics', 'Countries', 'MLS', 'countries'),
+    ('mls_metrics', 'Domains', 'MLS', 'domains'),
+    ('mls_metrics', 'EmailsSenders', 'MLS', 'senders'),
+    ('mls_metrics', 'EmailsSent', 'MLS', 'sent'),
+    ('mls_metrics', 'EmailsSentInit', 'MLS', 'sent_init'),
+    ('mls_metrics', 'EmailsSentResponse', 'MLS', 'sent_response'),
+    ('mls_metrics', 'EndOfActivity', 'MLS', 'last_date'),
+    ('mls_metrics', 'InitialActivity', 'MLS', 'first_date'),
+    ('mls_metrics', 'People', 'MLS', 'people2'),
+    ('mls_metrics', 'Projects', 'MLS', 'projects'),
+    ('mls_metrics', 'Repositories', 'MLS', 'repositories'),
+    ('mls_metrics', 'SendersInit', 'MLS', 'senders_init'),
+    ('mls_metrics', 'SendersResponse', 'MLS', 'senders_response'),
+    ('mls_metrics', 'Threads', 'MLS', 'threads'),
+    ('mls_metrics', 'TimeToFirstReply', 'MLS', 'timeto_attention'),
+    ('mls_metrics', 'UnansweredPosts', 'MLS', 'unanswered_posts'),
+    ('pullpo_metrics', 'Abandoned', 'Pullpo', 'abandoned'),
+    ('pullpo_metrics', 'BMIPullpo', 'Pullpo', 'bmiscr'),
+    ('pullpo_metrics', 'Closed', 'Pullpo', 'closed'),
+    ('pullpo_metrics', 'Closers', 'Pullpo', 'closers'),
+    ('pullpo_metrics', 'Companies', 'Pullpo', 'organizations'),
+    ('pullpo_metrics', 'Countries', 'Pullpo', 'countries'),
+    ('pullpo_metrics', 'Domains', 'Pullpo', 'domains'),
+    ('pullpo_metrics', 'Merged', 'Pullpo', 'merged'),
+    ('pullpo_metrics', 'Mergers', 'Pullpo', 'mergers'),
+    ('pullpo_metrics', 'New', 'Pullpo', 'new'),
+    ('pullpo_metrics', 'Participants', 'Pullpo', 'participants'),
+    ('pullpo_metrics', 'Pending', 'Pullpo', 'pending'),
+    ('pullpo_metrics', 'People', 'Pullpo', 'people2'),
+    ('pullpo_metrics', 'Projects', 'Pullpo', 'projects'),
+    ('pullpo_metrics', 'Repositories', 'Pullpo', 'repositories'),
+    ('pullpo_metrics', 'Reviewers', 'Pullpo', 'reviewers'),
+    ('pullpo_metrics', 'Submitted', 'Pullpo', 'submitted'),
+    ('pullpo_metrics', 'Submitters', 'Pullpo', 'submitters'),
+    ('pullpo_metrics', 'TimeToClose', 'Pullpo', 'timeto_close'),
+    ('pullpo_metrics', 'TimeToMerge', 'Pullpo', 'timeto_merge'),
+    ('qaforums_metrics', 'AnswerSenders', 'QAForums', 'asenders'),
+    ('qaforums_metrics', 'Answers', 'QAForums', 'asent'),
+    ('qaforums_metrics', 'CommentSenders', 'QAForums', 'csenders'),
+    ('qaforums_metrics', 'Comments', 'QAForums', 'csent'),
+    ('qaforums_metrics', 'Participants', 'QAForums', 'participants'),
+    ('qaforums_metrics', 'QuestionSenders', 'QAForums', 'qsenders'),
+    ('qaforums_metrics', 'Questions', 'QAForums', 'qsent'),
+    ('qaforums_metrics', 'Tags', 'QAForums', 'tags'),
+    ('qaforums_metrics', 'UnansweredQuestions', 'QAForums', 'unanswered'),
+    ('releases_metrics', 'Authors', 'ReleasesDS', 'authors'),
+    ('releases_metrics', 'Modules', 'ReleasesDS', 'modules'),
+    ('releases_metrics', 'Releases', 'ReleasesDS', 'releases'),
+    ('scm_metrics', 'Actions', 'SCM', 'actions'),
+    ('scm_metrics', 'AddedLines', 'SCM', 'added_lines'),
+    ('scm_metrics', 'Authors', 'SCM', 'authors'),
+    ('scm_metrics', 'AuthorsPeriod', 'SCM', 'avg_authors_period'),
+    ('scm_metrics', 'Branches', 'SCM', 'branches'),
+    ('scm_metrics', 'Commits', 'SCM', 'commits'),
+    ('scm_metrics', 'CommitsAuthor', 'SCM', 'avg_commits_author'),
+    ('scm_metrics', 'CommitsPeriod', 'SCM', 'avg_commits'),
+    ('scm_metrics', 'Committers', 'SCM', 'committers'),
+    ('scm_metrics', 'CommittersPeriod', 'SCM', 'avg_committers_period'),
+    ('scm_metrics', 'Companies', 'SCM', 'organizations'),
+    ('scm_metrics', 'CompaniesCountries', 'SCM', 'organizations+countries'),
+    ('scm_metrics', 'CompaniesProjects', 'SCM', 'organizations+projects'),
+    ('scm_metrics', 'Countries', 'SCM', 'countries'),
+    ('scm_metrics', 'Domains', 'SCM', 'domains'),
+    ('scm_metrics', 'EndOfActivity', 'SCM', 'last_date'),
+    ('scm_metrics', 'Files', 'SCM', 'files'),
+    ('scm_metrics', 'FilesAuthor', 'SCM', 'avg_files_author'),
+    ('scm_metrics', 'FilesPeriod', 'SCM', 'avg_files'),
+    ('scm_metrics', 'GoneAuthors', 'SCM', 'goneauthors'),
+    ('scm_metrics', 'InitialActivity', 'SCM', 'first_date'),
+    ('scm_metrics', 'Lines', 'SCM', 'lines'),
+    ('scm_metrics', 'NewAuthors', 'SCM', 'newauthors'),
+    ('scm_metrics', 'People', 'SCM', 'people2'),
+    ('scm_metrics', 'Projects', 'SCM', 'projects'),
+    ('scm_metrics', 'RemovedLines', 'SCM', 'removed_lines'),
+    ('scm_metrics', 'Repositories', 'SCM', 'repositories'),
+    ('scr_jira_metrics', 'Abandoned', 'ITS', 'abandoned'),
+    ('scr_jira_metrics', 'Companies', 'ITS', 'organizations'),
+    ('scr_jira_metrics', 'Merged', 'ITS', 'merged'),
+    ('scr_jira_metrics', 'PullRequests', 'ITS', 'submitted'),
+    ('scr_jira_metrics', 'Submitters', 'ITS', 'submitters'),
+    ('scr_jira_metrics', 'Trackers', 'ITS', 'trackers'),
+    ('scr_metrics', 'Abandoned', 'SCR', 'abandoned'),
+    ('scr_metrics', 'ActiveCoreReviewers', 'SCR', 'active_core_reviewers'),
+    ('scr_metrics', 'BMISCR', 'SCR', 'bmiscr'),
+    ('scr_metrics', 'Closed', 'SCR', 'closed'),
+    ('scr_metrics', 'Closers', 'SCR', 'closers'),
+    ('scr_metrics', 'Companies', 'SCR', 'organizations'),
+    ('scr_metrics', 'Countries', 'SCR', 'countries'),
+    ('scr_metrics', 'Domains', 'SCR', 'domains'),
+    ('scr_metrics', 'EndOfActivity', 'SCR', 'last_date'),
+    ('scr_metrics', 'InProgress', 'SCR', 'inprogress'),
+    ('scr_metrics', 'InitialActivity', 'SCR', 'first_date'),
+    ('scr_metrics', 'Merged', 'SCR', 'merged'),
+    ('scr_metrics', 'Mergers', 'SCR', 'mergers'),
+    ('scr_metrics', 'New', 'SCR', 'new'),
+    ('scr_metrics', 'Opened', 'SCR', 'opened'),
+    ('scr_metrics', 'Participants', 'SCR', 'participants'),
+    ('scr_metrics', 'PatchesApproved', 'SCR', 'approved'),
+    ('scr_metrics', 'PatchesCodeReview', 'SCR', 'codereview'),
+    ('scr_metrics', 'PatchesPerReview', 'SCR', 'iterations_per_review'),
+    ('scr_metrics', 'PatchesSent', 'SCR', 'sent'),
+    ('scr_metrics', 'PatchesVerified', 'SCR', 'verified'),
+    ('scr_metrics', 'PatchesWaitingForReviewer', 'SCR', 'WaitingForReviewer'),
+    ('scr_metrics', 'PatchesWaitingForSubmitter', 'SCR', 'WaitingForSubmitter'),
+    ('scr_metrics', 'PatchsetSubmitters', 'SCR', 'patchset_submitters'),
+    ('scr_metrics', 'PatchsetsSubmitted', 'SCR', 'sent_patchsets'),
+    ('scr_metrics', 'PatchsetsVotes', 'SCR', 'voted_patchsets'),
+    ('scr_metrics', 'Pending', 'SCR', 'pending'),
+    ('scr_metrics', 'People', 'SCR', 'people2'),
+    ('scr_metrics', 'Projects', 'SCR', 'projects'),
+    ('scr_metrics', 'Repositories', 'SCR', 'repositories'),
+    ('scr_metrics', 'Reviewers', 'SCR', 'reviewers'),
+    ('scr_metrics', 'ReviewsWaitingForReviewer', 'SCR', 'ReviewsWaitingForReviewer'),
+    ('scr_metrics', 'ReviewsWaitingForReviewerTS', 'SCR', 'ReviewsWaitingForReviewer_ts'),
+    ('scr_metrics', 'ReviewsWaitingForSubmitter', 'SCR', 'ReviewsWaitingForSubmitter'),
+    ('scr_metrics', 'Submitted', 'SCR', 'submitted'),
+    ('scr_metrics', 'Submitters', 'SCR', 'submitters'),
+    ('scr_metrics', 'TimeToReview', 'SCR', 'review_time'),
+    ('scr_metrics', 'TimeToReviewPatch', 'SCR', 'timewaiting_reviewer_n_submitter'),
+    ('wiki_metrics', 'Authors', 'Mediawiki', 'authors'),
+    ('wiki_metrics', 'Companies', 'Mediawiki', 'organizations'),
+    ('wiki_metrics', 'Pages', 'Mediawiki', 'pages'),
+    ('wiki_metrics', 'Reviews', 'Mediawiki', 'reviews'),
+]
+
+# (module, class, id) of the studies
+studies = [
+    ('ages', 'Ages', 'ages'),
+    ('companies_activity', 'CompaniesActivity', 'organizations_activity'),
+    ('contributors_new_gone', 'ContributorsNewGone', 'contributors_new_gone'),
+    ('contributors_new_gone', 'ContributorsNewGoneSCM', 'contributors_new_gone_scm'),
+    ('contributors_new_gone', 'ContributorsNewGoneSCR', 'contributors_new_gone_scr'),
+    ('events', 'AllEvents', 'events_list'),
+    ('events_punchcard', 'PunchcardEvents', 'events_punchcard'),
+    ('gerrit_studies', 'MostActiveChangesetsWaiting4Reviewer', 'list_most_active_changesets_waiting4reviewer'),
+    ('gerrit_studies', 'OldestChangesets', 'oldest_changesets'),
+    ('gerrit_studies', 'OldestChangesetsByAffiliation', 'oldest_changesets_by_affiliation'),
+    ('its_changers', 'StatusChangers', 'status_changers'),
+    ('its_changers', 'StatusChanges', 'status_changes'),
+    ('its_states', 'TicketsStates', 'tickets_states'),
+    ('leaders', 'Leaders', 'leaders'),
+    ('leaders', 'SCMLeaders', 'main_actors_developing'),
+    ('onion_model', 'CommunityStructure', 'onion'),
+    ('onion_transitions', 'OnionTransitions', 'onion_migrations'),
+    ('quarters_data', 'QuartersData', 'quarters_data'),
+    ('territoriality', 'Territoriality', 'territoriality'),
+    ('times_tickets', 'TimesTickets', 'times_tickets'),
+    ('timezone', 'Timezone', 'timezone'),
+    ('top_authors_projects', 'TopAuthorsProjects', 'topauthors'),
+    ('top_companies_projects', 'TopCompaniesProjects', 'toporganizations'),
+    ('top_issues', 'TopIssues', 'top_issues'),
+]
@@ -0,0 +1,110 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Metrics of the releases of a project (or all the projects) in one query
+##
+## The release reports (openstack_report, opnfv_report) need the value of
+## the metrics for each release and project. Computing them per release
+## and project is a query per metric and cell. ReleaseMatrix gets each
+## metric for all the releases (and all the items of a filter) in one
+## GROUP BY query, with the dates bucketed in the release windows by the
+## query (get_windows_key), and the exact distinct counts of DailySeries.
+## The metrics that can not be rolled up are computed per cell.
+
+
+import logging
+
+from vizgrimoire.metrics.metrics_filter import MetricFilters
+from vizgrimoire.metrics.rollup import RollupNotSupported
+
+
+class ReleaseMatrix(object):
+    """ Values of metrics per release (and per item of a filter) """
+
+    def __init__(self, releases, filters, filter_name = None, items = None):
+        """ releases: list of (start, end) yyyy-mm-dd dates
+            filters: MetricFilters with the common filters (people out ...)
+            filter_name: filter of the items ("project"), None for global
+            items: items of the filter in the matrix
+        """
+        self.releases = releases
+        self.filters = filters
+        self.filter_name = filter_name
+        self.items = items
+        if filter_name is not None and items is None:
+            raise Exception("The items of " + filter_name + " are needed")
+
+    def get_filters(self, startdate, enddate, type_analysis):
+        filters = MetricFilters(self.filters.period, "'" + startdate + "'",
+                                "'" + enddate + "'", type_analysis,
+                                self.filters.npeople, self.filters.people_out,
+                                self.filters.companies_out, self.filters.global_filter)
+        filters.closed_condition = self.filters.closed_condition
+        return filters
+
+    def get_metric(self, metric_class, dbcon):
+        """ dict field -> values of the metric in each release
+
+        For a filter, the values are a list per item (in the items order)
+        with the values of each release.
+        """
+        type_analysis = None
+        if self.filter_name is not None: type_analysis = [self.filter_name, None]
+        filters = self.get_filters(self.releases[0][0], self.releases[-1][1], type_analysis)
+        metric = metric_class(dbcon, filters)
+        try:
+            series = metric.get_daily_series(self.releases)
+        except RollupNotSupported, e:
+            logging.info(metric.id + " computed per release: " + str(e))
+            return self._get_metric_cells(metric_class, dbcon)
+        data = series.roll_up_windows(self.releases)
+        if self.filter_name is None: return data
+        return self._align_items(data, series.id_field)
+
+    def _align_items(self, data, id_field):
+        """ Values of data in the items order, 0 for the items not in data """
+        positions = dict((item, pos) for (pos, item) in enumerate(data[id_field]))
+        matrix = {}
+        for field in data:
+            if field == id_field: continue
+            zero = [0] * len(self.releases)
+            matrix[field] = [data[field][positions[item]] if item in positions else zero
+                             for item in self.items]
+        return matrix
+
+    def _get_cell(self, metric_class, dbcon, release, item):
+        type_analysis = None
+        if self.filter_name is not None: type_analysis = [self.filter_name, item]
+        filters = self.get_filters(release[0], release[1], type_analysis)
+        return metric_class(dbcon, filters).get_agg()
+
+    def _get_metric_cells(self, metric_class, dbcon):
+        """ The matrix of a metric computed with a query per cell """
+        items = [None]
+        if self.filter_name is not None: items = self.items
+        matrix = {}
+        for (pos, item) in enumerate(items):
+            for release in self.releases:
+                for (field, value) in self._get_cell(metric_class, dbcon, release, item).items():
+                    values = matrix.setdefault(field, [[] for i in items])
+                    values[pos].append(value)
+        if self.filter_name is None:
+            for field in matrix: matrix[field] = matrix[field][0]
+        return matrix
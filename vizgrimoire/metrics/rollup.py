@@ -0,0 +1,246 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Time series of several periods from one daily base series
+##
+## A metric query with the "daily_base" period (GetSQLDailyBase) gets, in
+## one scan, the value of each day (for count and sum fields) or the ids
+## counted each day (for count distinct fields, i.e. people), for all the
+## items of a filter if needed. DailySeries rolls it up in memory to the
+## day, week (ISO), month, quarter and year periods, with the same period
+## ids that GetSQLPeriod uses, and to arbitrary windows (releases). The
+## distinct counts are exact: the union of the ids of the days. When only
+## the windows are needed the query (GetSQLWindows) buckets the dates in
+## them (get_windows_key) and gets one row per window instead of per day.
+
+
+import calendar
+import datetime
+import re
+
+from vizgrimoire.metrics.sql import quote
+
+
+DAILY_BASE = "daily_base"
+# Suffix of the columns with the ids of a count distinct field
+IDS_SUFFIX = "__ids"
+
+class RollupNotSupported(Exception):
+    """ The fields of a query can not be rolled up from daily values """
+    pass
+
+def split_fields(fields):
+    """ List of the fields of a SELECT fields string (commas out of parenthesis) """
+    result = []
+    level = 0
+    field = ""
+    for char in fields:
+        if char == "(": level += 1
+        elif char == ")": level -= 1
+        if char == "," and level == 0:
+            result.append(field.strip())
+            field = ""
+        else:
+            field += char
+    if field.strip() != "": result.append(field.strip())
+    return result
+
+def is_enclosed(expression):
+    """ True if the parenthesis of expression are balanced """
+    level = 0
+    for char in expression:
+        if char == "(": level += 1
+        elif char == ")": level -= 1
+        if level < 0: return False
+    return level == 0
+
+def get_base_fields(fields):
+    """ List of (kind, expression, alias) of the fields to be rolled up
+
+    kind is "sum" for COUNT and SUM fields (additive, the daily values
+    are added) and "distinct" for a COUNT(DISTINCT) field (the daily ids
+    are joined). Only one distinct field is supported per query.
+    """
+    base = []
+    reg_field = re.compile(r"^(count|sum)\s*\((.*)\)\s+as\s+(\w+)$", re.IGNORECASE | re.DOTALL)
+    reg_distinct = re.compile(r"^distinct\s*(.*)$", re.IGNORECASE | re.DOTALL)
+    for field in split_fields(fields):
+        match = reg_field.match(field)
+        if match is None or not is_enclosed(match.group(2)):
+            # Not a single count or sum, i.e. count(a)/count(b) as x
+            raise RollupNotSupported(field + " can not be rolled up")
+        (function, expression, alias) = match.groups()
+        distinct = reg_distinct.match(expression.strip())
+        if distinct is None:
+            base.append(("sum", field, alias))
+            continue
+        if function.lower() != "count" or distinct.group(1).find(",") > -1:
+            raise RollupNotSupported(field + " can not be rolled up")
+        base.append(("distinct", distinct.group(1).strip(), alias))
+    if len([kind for (kind, expression, alias) in base if kind == "distinct"]) > 1:
+        raise RollupNotSupported(fields + ": only one distinct field is supported")
+    return base
+
+def get_ids_column(alias):
+    """ Column of the daily base with the ids of the distinct field alias """
+    return alias + IDS_SUFFIX
+
+def get_date(date):
+    """ datetime.date of a date, a datetime or a (quoted) yyyy-mm-dd string """
+    if isinstance(date, basestring):
+        return datetime.datetime.strptime(date.replace("'", "")[0:10], "%Y-%m-%d").date()
+    if isinstance(date, datetime.datetime): return date.date()
+    return date
+
+def get_windows_key(date, windows):
+    """ Expression with the start day of the window [start, end) of date
+
+    The dates out of the windows get NULL.
+    """
+    key = "CASE"
+    for (start, end) in windows:
+        (start, end) = (quote(str(get_date(start))), quote(str(get_date(end))))
+        key += " WHEN " + date + ">=" + start + " AND " + date + "<" + end
+        key += " THEN DATE(" + start + ")"
+    return key + " END"
+
+def get_period_id(day, period):
+    """ Id of the period of a day, as in GetSQLPeriod """
+    if period == "day":
+        return calendar.timegm(day.timetuple())
+    elif period == "week":
+        # YEARWEEK(date, 3): ISO year and week
+        (year, week, weekday) = day.isocalendar()
+        return year * 100 + week
+    elif period == "month":
+        return day.year * 12 + day.month
+    elif period == "quarter":
+        return day.year * 4 + (day.month - 1) / 3
+    elif period == "year":
+        return day.year * 12
+    raise RollupNotSupported("Period " + str(period) + " not supported")
+
+def get_period_field(period):
+    """ Name of the period column, as in GetSQLPeriod """
+    if period == "day": return "unixtime"
+    return period
+
+
+class DailySeries(object):
+    """ Daily values of the metrics of a query, rolled up to other periods """
+
+    def __init__(self, base, id_field = None):
+        """ base: result of the GetSQLDailyBase query, with the day, the
+            daily values of the additive fields and the ids of the distinct
+            field (get_ids_column)
+            id_field: column with the items, None for global metrics
+        """
+        self.id_field = id_field
+        # (kind, column in base, alias) of the metrics
+        self.fields = []
+        # item -> day -> alias -> value (sum) or set of ids (distinct)
+        self.days = {}
+        if len(base) == 0: return
+        if "day" not in base:
+            raise RollupNotSupported("The query has not a day column")
+        for column in sorted(base):
+            if column in ["day", id_field]: continue
+            if column.endswith(IDS_SUFFIX):
+                self.fields.append(("distinct", column, column[:-len(IDS_SUFFIX)]))
+            else:
+                self.fields.append(("sum", column, column))
+        rows = base["day"]
+        if not isinstance(rows, list): base = dict((k, [v]) for (k, v) in base.items())
+        for pos in range(len(base["day"])):
+            day = base["day"][pos]
+            if day is None: continue
+            day = get_date(day)
+            item = None
+            if id_field is not None: item = base[id_field][pos]
+            values = self.days.setdefault(item, {}).setdefault(day, {})
+            for (kind, column, alias) in self.fields:
+                value = base[column][pos]
+                if kind == "distinct":
+                    if value is not None: values.setdefault(alias, set()).add(value)
+                elif value is not None:
+                    values[alias] = values.get(alias, 0) + value
+
+    def get_items(self):
+        return sorted(self.days)
+
+    def _roll_up(self, item, get_key):
+        """ key -> alias -> value of the days of item grouped by get_key(day) """
+        groups = {}
+        for (day, values) in self.days.get(item, {}).iteritems():
+            key = get_key(day)
+            if key is None: continue
+            group = groups.setdefault(key, {})
+            for (kind, column, alias) in self.fields:
+                if alias not in values: continue
+                if kind == "distinct":
+                    group.setdefault(alias, set()).update(values[alias])
+                else:
+                    group[alias] = group.get(alias, 0) + values[alias]
+        for group in groups.values():
+            for (kind, column, alias) in self.fields:
+                if kind == "distinct": group[alias] = len(group.get(alias, []))
+                else: group[alias] = group.get(alias, 0)
+        return groups
+
+    def roll_up(self, period):
+        """ Rows (dict of columns) of the GetSQLPeriod query for period """
+        period_field = get_period_field(period)
+        data = {period_field: []}
+        if self.id_field is not None: data[self.id_field] = []
+        for (kind, column, alias) in self.fields: data[alias] = []
+        for item in self.get_items():
+            groups = self._roll_up(item, lambda day: get_period_id(day, period))
+            for key in sorted(groups):
+                if self.id_field is not None: data[self.id_field].append(item)
+                data[period_field].append(key)
+                for (kind, column, alias) in self.fields:
+                    data[alias].append(groups[key][alias])
+        return data
+
+    def roll_up_windows(self, windows):
+        """ Values of the metrics in each window [start, end) of windows
+
+        windows is a list of (start, end) dates (datetime.date or
+        yyyy-mm-dd strings). Returns a dict alias -> list with the value of
+        each window (a list per item, with id_field, for all items).
+        """
+        windows = [(get_date(start), get_date(end)) for (start, end) in windows]
+        def get_window(day):
+            for (pos, (start, end)) in enumerate(windows):
+                if start <= day < end: return pos
+            return None
+        data = {}
+        for (kind, column, alias) in self.fields: data[alias] = []
+        items = self.get_items()
+        if self.id_field is not None: data[self.id_field] = items
+        for item in items:
+            groups = self._roll_up(item, get_window)
+            for (kind, column, alias) in self.fields:
+                values = [groups.get(pos, {}).get(alias, 0) for pos in range(len(windows))]
+                if self.id_field is None: data[alias] = values
+                else: data[alias].append(values)
+        if self.id_field is None and len(items) == 0:
+            for (kind, column, alias) in self.fields: data[alias] = [0] * len(windows)
+        return data
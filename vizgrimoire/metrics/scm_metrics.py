@@ -52,6 +52,15 @@ class InitialActivity(Metrics):
     data_source = SCM
 
     def get_agg(self):
+        # Only commits of people with identity are in the lifecycle index,
+        # the same ones the bots filter (people_out) selects.
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            first = index.get_first_date(self.filters.startdate,
+                                         self.filters.enddate, bots)
+            if first is not None: first = first.strftime('%Y-%m-%d')
+            return {"first_date": first}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -78,6 +87,13 @@ class EndOfActivity(Metrics):
     data_source = SCM
 
     def get_agg(self):
+        index, bots = self._get_lifecycle_index()
+        if index is not None and self.filters.people_out is not None:
+            last = index.get_last_date(self.filters.startdate,
+                                       self.filters.enddate, bots)
+            if last is not None: last = last.strftime('%Y-%m-%d')
+            return {"last_date": last}
+
         fields = Set([])
         tables = Set([])
         filters = Set([])
@@ -176,6 +192,20 @@ class NewAuthors(Metrics):
     def _get_sql(self, evolutionary):
         return self._get_sql_generic(evolutionary)
 
+    def get_agg(self):
+        index, bots = self._get_lifecycle_index()
+        if index is None: return Metrics.get_agg(self)
+        new = index.get_new(self.filters.startdate, self.filters.enddate, bots)
+        return {"newauthors": len(new)}
+
+    def get_ts(self):
+        index, bots = self._get_lifecycle_index()
+        if index is None: return Metrics.get_ts(self)
+        ts = index.get_new_ts("newauthors", self.filters.period,
+                              self.filters.startdate, self.filters.enddate, bots)
+        return completePeriodIds(ts, self.filters.period,
+                                 self.filters.startdate, self.filters.enddate)
+
     def get_list(self):
         q = self._get_sql_generic(None, True)
         data = self.db.ExecuteQuery(q)
@@ -226,7 +256,7 @@ class GoneAuthors(Metrics):
             fields.add("p.email")
             fields.add("max(author_date) as last_activity")
         else:
-            fields.add("count(distinct(pup.uuid))")
+            fields.add("count(distinct(pup.uuid)) as goneauthors")
 
         tables.add("scmlog s")
         tables.add("people_uidentities pup")
@@ -273,6 +303,10 @@ class GoneAuthors(Metrics):
         return query
 
     def get_agg(self):
+        index, bots = self._get_lifecycle_index()
+        if index is not None:
+            gone = index.get_gone(self.filters.enddate, 180, bots)
+            return {"goneauthors": len(gone)}
         query = self._get_sql_generic(False)
         return self.db.ExecuteQuery(query)
 
@@ -0,0 +1,319 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## Distinct count sketches for people metrics (authors, senders, closers ...)
+##
+## Distinct people can not be added between days or items, so each time
+## window and filter item needs its own COUNT(DISTINCT) query. A sketch
+## per (day, item, metric) can be merged with others to get the distinct
+## count for any date range or group of items without going to the database.
+
+
+import datetime
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import threading
+
+from dateutil import parser
+
+
+class HyperLogLog(object):
+    """ Approximate distinct counter (HyperLogLog)
+
+    Registers are kept in a dict (sparse) because most sketches are for
+    one day and one item, with few people. The standard error of the count
+    is 1.04/sqrt(2^precision): 0.81% with the default precision (14).
+    """
+
+    def __init__(self, precision = 14):
+        if precision < 4 or precision > 16:
+            raise Exception("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = {}
+
+    @staticmethod
+    def _hash(value):
+        if isinstance(value, unicode): value = value.encode('utf-8')
+        else: value = str(value)
+        return struct.unpack('>Q', hashlib.sha1(value).digest()[:8])[0]
+
+    def add(self, value):
+        x = HyperLogLog._hash(value)
+        bits = 64 - self.precision
+        index = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers.get(index, 0):
+            self.registers[index] = rank
+
+    def merge(self, sketch):
+        """ Union with other sketch """
+        if not isinstance(sketch, HyperLogLog) or sketch.precision != self.precision:
+            raise Exception("Can not merge sketches of different type or precision")
+        registers = self.registers
+        for index, rank in sketch.registers.iteritems():
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+
+    def count(self):
+        m = 1 << self.precision
+        if len(self.registers) == 0: return 0
+        zeros = m - len(self.registers)
+        total = zeros + sum(2.0 ** -rank for rank in self.registers.itervalues())
+        alpha = 0.7213 / (1 + 1.079 / m)
+        if m == 16: alpha = 0.673
+        elif m == 32: alpha = 0.697
+        elif m == 64: alpha = 0.709
+        estimate = alpha * m * m / total
+        # Linear counting for small cardinalities
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(float(m) / zeros)
+        return int(round(estimate))
+
+    def copy(self):
+        sketch = HyperLogLog(self.precision)
+        sketch.registers = dict(self.registers)
+        return sketch
+
+    def to_dict(self):
+        return {"p": self.precision, "r": self.registers.items()}
+
+    @staticmethod
+    def from_dict(data):
+        sketch = HyperLogLog(data["p"])
+        sketch.registers = dict((index, rank) for index, rank in data["r"])
+        return sketch
+
+
+class ExactSet(object):
+    """ Exact distinct counter with the same interface than HyperLogLog """
+
+    def __init__(self):
+        self.values = set()
+
+    def add(self, value):
+        self.values.add(value)
+
+    def merge(self, sketch):
+        if not isinstance(sketch, ExactSet):
+            raise Exception("Can not merge sketches of different type")
+        self.values.update(sketch.values)
+
+    def count(self):
+        return len(self.values)
+
+    def copy(self):
+        sketch = ExactSet()
+        sketch.values = set(self.values)
+        return sketch
+
+    def to_dict(self):
+        return {"v": list(self.values)}
+
+    @staticmethod
+    def from_dict(data):
+        sketch = ExactSet()
+        sketch.values = set(data["v"])
+        return sketch
+
+
+class SketchStore(object):
+    """ Sketches for people metrics per (day, item, metric)
+
+    item is None for the whole data source or a tuple (filter_name, name)
+    for an item of a filter. Metrics listed in exact are counted with
+    ExactSet, the rest with HyperLogLog. The dates covered for each metric
+    and filter are registered so a count is only answered from the
+    sketches if all the days were loaded. days is the number of days of
+    the longest trend window, used when the metrics load their sketches.
+    """
+
+    def __init__(self, precision = 14, exact = None, days = 365):
+        self.precision = precision
+        self.exact = []
+        if exact is not None: self.exact = exact
+        self.days = days
+        self.sketches = {} # metric -> item -> day -> sketch
+        self.loaded = {} # (metric, filter_name) -> [startdate, enddate]
+        self.unsupported = set() # metrics whose query can not be sketched
+        self.lock = threading.RLock() # held by the metrics loading and counting sketches
+
+    @staticmethod
+    def _get_day(date):
+        """ Convert SQL dates ("'2014-01-01'") and datetimes to date """
+        if isinstance(date, datetime.datetime): return date.date()
+        if isinstance(date, datetime.date): return date
+        return parser.parse(date.replace("'","")).date()
+
+    @staticmethod
+    def _get_metric_id(metric):
+        # metric can be an id or a tuple (id, context of the metric)
+        if isinstance(metric, tuple): return metric[0]
+        return metric
+
+    def is_exact(self, metric):
+        return SketchStore._get_metric_id(metric) in self.exact
+
+    def new_sketch(self, metric):
+        if self.is_exact(metric): return ExactSet()
+        return HyperLogLog(self.precision)
+
+    def add(self, day, item, metric, value):
+        day = SketchStore._get_day(day)
+        items = self.sketches.setdefault(metric, {})
+        days = items.setdefault(item, {})
+        if day not in days: days[day] = self.new_sketch(metric)
+        days[day].add(value)
+
+    def set_loaded(self, metric, filter_name, startdate, enddate):
+        """ Register the days [startdate, enddate) loaded for metric and filter
+
+        Previous sketches for the metric and filter are removed.
+        """
+        self.remove(metric, filter_name)
+        self.loaded[(metric, filter_name)] = [SketchStore._get_day(startdate),
+                                              SketchStore._get_day(enddate)]
+
+    def remove(self, metric, filter_name):
+        if metric in self.sketches:
+            for item in self.sketches[metric].keys():
+                if item is None and filter_name is None:
+                    self.sketches[metric].pop(item)
+                elif item is not None and item[0] == filter_name:
+                    self.sketches[metric].pop(item)
+        if (metric, filter_name) in self.loaded:
+            self.loaded.pop((metric, filter_name))
+
+    def truncate(self, metric, filter_name, startdate):
+        """ Remove the days from startdate on of a loaded metric and filter
+
+        The days loaded are [loaded start, startdate) after it, so they can
+        be extended with extend_loaded.
+        """
+        startdate = SketchStore._get_day(startdate)
+        loaded = self.loaded[(metric, filter_name)]
+        for item, days in self.sketches.get(metric, {}).iteritems():
+            if filter_name is None and item is not None: continue
+            if filter_name is not None and (item is None or item[0] != filter_name): continue
+            for day in [day for day in days if day >= startdate]:
+                days.pop(day)
+        loaded[1] = min(loaded[1], startdate)
+
+    def extend_loaded(self, metric, filter_name, enddate):
+        """ Register the days loaded for metric and filter up to enddate """
+        loaded = self.loaded[(metric, filter_name)]
+        loaded[1] = max(loaded[1], SketchStore._get_day(enddate))
+
+    def get_loaded(self, metric, filter_name):
+        """ [startdate, enddate) loaded for metric and filter, or None """
+        return self.loaded.get((metric, filter_name))
+
+    def covers(self, metric, filter_name, startdate, enddate):
+        """ Check if the days [startdate, enddate) are loaded """
+        if (metric, filter_name) not in self.loaded: return False
+        loaded = self.loaded[(metric, filter_name)]
+        return (loaded[0] <= SketchStore._get_day(startdate) and
+                SketchStore._get_day(enddate) <= loaded[1])
+
+    def get_items(self, metric, filter_name):
+        """ Names of the items of a filter with sketches for metric """
+        items = self.sketches.get(metric, {}).keys()
+        return [item[1] for item in items if item is not None and item[0] == filter_name]
+
+    def get_sketch(self, metric, startdate, enddate, items = [None]):
+        """ Union of the sketches of several items for days in [startdate, enddate) """
+        startdate = SketchStore._get_day(startdate)
+        enddate = SketchStore._get_day(enddate)
+        sketch = self.new_sketch(metric)
+        metric_sketches = self.sketches.get(metric, {})
+        for item in items:
+            for day, day_sketch in metric_sketches.get(item, {}).iteritems():
+                if startdate <= day < enddate:
+                    sketch.merge(day_sketch)
+        return sketch
+
+    def count(self, metric, startdate, enddate, items = [None]):
+        """ Distinct count for several items (union) in [startdate, enddate) """
+        return self.get_sketch(metric, startdate, enddate, items).count()
+
+    def count_items(self, metric, startdate, enddate, filter_name):
+        """ Distinct count for each item of a filter in [startdate, enddate)
+
+        Returns a dict {"name":[items], "count":[values]}
+        """
+        data = {"name":[], "count":[]}
+        for name in self.get_items(metric, filter_name):
+            data["name"].append(name)
+            data["count"].append(self.count(metric, startdate, enddate,
+                                            [(filter_name, name)]))
+        return data
+
+    def save(self, path):
+        """ Save all the sketches in a JSON file """
+        records = []
+        for metric, items in self.sketches.iteritems():
+            for item, days in items.iteritems():
+                for day, sketch in days.iteritems():
+                    records.append([metric, item, day.isoformat(), sketch.to_dict()])
+        loaded = [[key[0], key[1], dates[0].isoformat(), dates[1].isoformat()]
+                  for key, dates in self.loaded.iteritems()]
+        store = {"precision": self.precision, "exact": self.exact,
+                 "loaded": loaded, "sketches": records}
+        with open(path, "w") as f:
+            json.dump(store, f)
+
+    @staticmethod
+    def load(path):
+        """ Create a store with the sketches saved in a JSON file """
+        def to_key(value):
+            # JSON converts tuples to lists
+            if isinstance(value, list): return tuple(to_key(v) for v in value)
+            return value
+
+        with open(path) as f:
+            data = json.load(f)
+        store = SketchStore(data["precision"], data["exact"])
+        for metric, filter_name, startdate, enddate in data["loaded"]:
+            store.loaded[(to_key(metric), filter_name)] = [SketchStore._get_day(startdate),
+                                                           SketchStore._get_day(enddate)]
+        for metric, item, day, sketch in data["sketches"]:
+            if "v" in sketch: sketch = ExactSet.from_dict(sketch)
+            else: sketch = HyperLogLog.from_dict(sketch)
+            items = store.sketches.setdefault(to_key(metric), {})
+            items.setdefault(to_key(item), {})[SketchStore._get_day(day)] = sketch
+        return store
+
+def open_store(path, precision = 14, exact = None):
+    """ The store saved in path, or a new one
+
+    A new store is created if path does not exist or the saved one used
+    other precision or exact metrics.
+    """
+    if exact is None: exact = []
+    if os.path.isfile(path):
+        logging.info("Loading sketches from " + path)
+        store = SketchStore.load(path)
+        if store.precision == precision and sorted(store.exact) == sorted(exact):
+            return store
+        logging.info(path + " saved with other sketches config, not used")
+    return SketchStore(precision, exact)
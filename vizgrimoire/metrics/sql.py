@@ -0,0 +1,121 @@
+## Copyright (C) 2015 Bitergia
+##
+## This program is free software; you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation; either version 3 of the License, or
+## (at your option) any later version.
+##
+## This program is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with this program; if not, write to the Free Software
+## Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+##
+## This file is a part of GrimoireLib
+##  (an Python library for the MetricsGrimoire and vizGrimoire systems)
+##
+##
+## SELECT queries built from their parts with bound parameters
+##
+## The parts of the queries (fields, tables and filters) are kept in Sets
+## by the query builders, so the same query got a different text in each
+## run. Select joins them in a canonical order, so the text of a query is
+## always the same (for the MySQL query cache, the profiles and any other
+## cache keyed by the query), and binds the values (dates, names) as
+## escaped literals in %(name)s placeholders.
+
+
+def quote(value):
+    """ SQL literal for a value """
+    if value is None: return "NULL"
+    if isinstance(value, bool): return str(int(value))
+    if isinstance(value, (int, long, float)): return str(value)
+    if isinstance(value, unicode): value = value.encode('utf-8')
+    value = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return "'" + value + "'"
+
+def unquote(value):
+    """ Value of a quoted string literal, or None if value is not one """
+    value = value.strip()
+    if len(value) > 1 and value[0] == "'" and value[-1] == "'" and \
+        value[1:-1].find("'") == -1:
+        return value[1:-1]
+    return None
+
+def bind(template, params):
+    """ Query with the %(name)s placeholders of template replaced by params """
+    if not params: return template.replace("%%", "%")
+    return template % dict((name, quote(value)) for name, value in params.items())
+
+def escape(text):
+    """ Text of a query part to be used in a template """
+    return text.replace("%", "%%")
+
+def join_parts(parts, separator):
+    """ Query parts (strings) joined in a canonical order without repeats """
+    parts = [str(part).strip() for part in parts]
+    return separator.join(sorted(set(part for part in parts if part != "")))
+
+
+class Select(object):
+    """ SELECT query: fields, tables, filters, group by and order by """
+
+    def __init__(self, fields = None, tables = None):
+        self.fields = [] # in the given order
+        self.tables = []
+        self.filters = [] # templates
+        self.group_by = []
+        self.order_by = []
+        self.params = {}
+        if fields is not None: self.add_field(fields)
+        if tables is not None: self.add_table(tables)
+
+    def add_field(self, field):
+        if field.strip() != "": self.fields.append(field.strip())
+
+    def add_table(self, table):
+        if table.strip() != "": self.tables.append(table.strip())
+
+    def add_filter(self, condition, **params):
+        """ Condition of the WHERE, with %(name)s placeholders for params """
+        condition = condition.strip()
+        if condition == "": return
+        if len(params) == 0: condition = escape(condition)
+        self.filters.append(condition)
+        self.params.update(params)
+
+    def add_date_range(self, date, start, end, strict = False):
+        """ Condition for date in [start, end) ([start, end] if strict) """
+        (name_start, name_end) = ("startdate", "enddate")
+        start_value, end_value = unquote(start), unquote(end)
+        end_op = "<="
+        if not strict: end_op = "<"
+        if start_value is None:
+            self.filters.append(escape(date + ">=" + start))
+        else:
+            self.filters.append(date + ">=%(" + name_start + ")s")
+            self.params[name_start] = start_value
+        if end_value is None:
+            self.filters.append(escape(date + end_op + end))
+        else:
+            self.filters.append(date + end_op + "%(" + name_end + ")s")
+            self.params[name_end] = end_value
+
+    def get_template(self):
+        """ Query text with %(name)s placeholders for the params """
+        sql = "SELECT " + escape(", ".join(self.fields))
+        sql += " FROM " + escape(", ".join(self.tables))
+        if len(self.filters) > 0:
+            sql += " WHERE " + " AND ".join(self.filters)
+        if len(self.group_by) > 0:
+            sql += " GROUP BY " + escape(", ".join(self.group_by))
+        if len(self.order_by) > 0:
+            sql += " ORDER BY " + escape(", ".join(self.order_by))
+        return sql
+
+    def get_sql(self):
+        """ Query text with the params bound """
+        return bind(self.get_template(), self.params)
@@ -144,3 +144,50 @@ class Authors(Metrics):
                                self.filters.enddate, "date", fields,
                                tables, filters, evolutionary, self.filters.type_analysis)
         return(q)
+
+
+class Companies(Metrics):
+    """ Organizations editing the Wiki """
+
+    id = "organizations"
+    name = "Organizations"
+    desc = "Organizations editing the Wiki"
+    data_source = Mediawiki
+
+    def _get_sql (self, evolutionary):
+        fields = Set([])
+        tables = Set([])
+        filters = Set([])
+
+        fields.add("count(distinct(org.id)) as organizations")
+        tables.union_update(self.db.GetSQLReportFrom(self.filters))
+        tables.union_update(self.db.GetSQLCompaniesFrom())
+        filters.union_update(self.db.GetSQLReportWhere(self.filters))
+        filters.union_update(self.db.GetSQLCompaniesWhere())
+
+        q = self.db.BuildQuery(self.filters.period, self.filters.startdate,
+                               self.filters.enddate, "date", fields,
+                               tables, filters, evolutionary, self.filters.type_analysis)
+        return(q)
+
+    def get_list (self):
+        from vizgrimoire.data_source import DataSource
+        from vizgrimoire.filter import Filter
+        tables_set = Set([])
+        tables_set.add("wiki_pages_revs")
+        tables_set.union_update(self.db.GetSQLCompaniesFrom())
+        filters_set = self.db.GetSQLCompaniesWhere()
+        for company in DataSource.get_filter_bots(Filter("company")):
+            filters_set.add("org.name<>'"+company+"'")
+
+        tables = self.db._get_fields_query(tables_set)
+        filters = self.db._get_filters_query(filters_set)
+
+        q = "SELECT org.name as name, count(wiki_pages_revs.id) as reviews "+\
+            "FROM " + tables + " "+\
+            "WHERE " + filters + " AND "+\
+            "    date >= "+ self.filters.startdate+ " AND "+\
+            "    date < "+ self.filters.enddate+ " "+\
+            "GROUP BY org.name "+\
+            "ORDER BY reviews desc, name"
+        return(self.db.ExecuteQuery(q))
@@ -22,6 +22,8 @@
 from vizgrimoire.GrimoireSQL import SetDBChannel
 from vizgrimoire.GrimoireUtils import read_main_conf
 import logging, time, sys
+from functools import partial
+from importlib import import_module
 import vizgrimoire.SCM as SCM
 import vizgrimoire.ITS as ITS
 import vizgrimoire.ITS_1 as ITS_1
@@ -38,7 +40,6 @@ import vizgrimoire.DockerHubDS as DockerHubDS
 from vizgrimoire.filter import Filter
 from vizgrimoire.metrics.metrics import Metrics
 from vizgrimoire.metrics.metrics_filter import MetricFilters
-from vizgrimoire.analysis.analyses import Analyses
 from vizgrimoire.metrics.query_builder import DSQuery
 
 class Report(object):
@@ -50,6 +51,7 @@ class Report(object):
     _all_data_sources = []
     _all_studies = []
     _on_studies = []
+    _studies_pending = [] # (module, class, id) of studies on not imported yet
     _automator = None
     _automator_file = None
 
@@ -61,8 +63,7 @@ class Report(object):
         Report._init_data_sources()
         if metrics_path is not None:
             Report._init_metrics(metrics_path)
-            studies_path = metrics_path.replace("metrics","analysis")
-            Report._init_studies(studies_path)
+            Report._init_studies()
 
     @staticmethod
     def _init_filters():
@@ -124,14 +125,31 @@ class Report(object):
 
     @staticmethod
     def _init_metrics(metrics_path):
-        """Register all available metrics"""
+        """Register all available metrics
+
+        The metrics are registered from the registry of metrics (see
+        metrics/registry.py) and their modules are imported, and the
+        metrics created, only when they are used.
+        """
+        from vizgrimoire.metrics.registry import get_registry
+
+        data_sources = dict((ds.__name__, ds) for ds in Report._all_data_sources)
+        for (module, name, ds_name, metrics_id) in get_registry()["metrics"]:
+            ds = data_sources.get(ds_name)
+            if ds is None: continue
+            if ds.get_db_name() not in Report._automator['generic']: continue
+            ds.add_metrics_lazy(metrics_id, partial(Report._create_metrics, module, name, ds), ds)
+            if ds == ITS.ITS:
+                db_its1_name = ITS_1.ITS_1.get_db_name()
+                if db_its1_name in Report._automator['generic']:
+                    ITS_1.ITS_1.add_metrics_lazy(metrics_id,
+                                                 partial(Report._create_metrics, module, name, ITS_1.ITS_1),
+                                                 ITS_1.ITS_1)
 
-        # logging.info("Loading metrics modules from %s" % (metrics_path))
-        # sys.path.insert(1,metrics_path) # Prepend the metrics path
-
-        from os import listdir
-        from os.path import isfile, isdir, join, dirname
-        import imp, inspect
+    @staticmethod
+    def _create_metrics(module, name, ds):
+        """Create the metrics name of module for the data source"""
+        metrics_class = getattr(import_module("vizgrimoire.metrics." + module), name)
 
         db_identities = Report._automator['generic']['db_identities']
         db_projects = None
@@ -140,115 +158,48 @@ class Report(object):
         dbuser = Report._automator['generic']['db_user']
         dbpass = Report._automator['generic']['db_password']
 
-        # Read all available metrics installed in GrimoireLib egg
-        metrics_pkg = "vizgrimoire.metrics"
-        import vizgrimoire.metrics
-        mfile = inspect.getfile(vizgrimoire.metrics)
-        if ".egg" in mfile:
-            mdir = mfile.split(".egg")[0] + ".egg"
-        else:
-            mdir = dirname(mfile)
-
-        if isfile(mdir):
-            # Load list of metrics from files zipped inside lib installed egg
-            import zipfile
-            zip = zipfile.ZipFile(mdir)
-            metrics_mod = [f.replace("vizgrimoire/metrics/","") for f in zip.namelist()
-                           if "vizgrimoire/metrics/" in f and f.endswith(".py")]
-            zip.close()
-        else:
-            # Load list of metrics from metrics directory
-            if ".egg" in mdir: mdir += "/vizgrimoire/metrics/"
-            metrics_mod = [f for f in listdir(mdir)
-                           if isfile(join(mdir,f)) and f.endswith("_metrics.py")]
-
-        for metric_mod in metrics_mod:
-            mod_name = metric_mod.split(".py")[0]
-            mod = __import__(metrics_pkg+"."+mod_name)
-            # Support for having more than one metric per module
-            metrics_classes = [c for name, c in inspect.getmembers(sys.modules[metrics_pkg+"."+mod_name])
-                               if inspect.isclass(c) and issubclass(c, Metrics)]
-
-            for metrics_class in metrics_classes:
-                ds = metrics_class.data_source
-                if ds is None: continue
-                if ds.get_db_name() not in Report._automator['generic']: continue
-                builder = ds.get_query_builder()
-                db = Report._automator['generic'][ds.get_db_name()]
-                metric_filters = Report.get_default_filter()
-                if (ds.get_global_filter(ds) is not None):
-                    metric_filters.global_filter = ds.get_global_filter(ds)
-                metrics = metrics_class(builder(dbuser, dbpass, db, db_identities, db_projects), metric_filters)
-                ds.add_metrics(metrics, ds)
-                if ds == ITS.ITS:
-                    db_its1_name = ITS_1.ITS_1.get_db_name()
-                    if db_its1_name in Report._automator['generic']:
-                        db_its1 = Report._automator['generic'][db_its1_name]
-                        metric_filters = Report.get_default_filter()
-                        metric_filters.set_closed_condition(ITS_1.ITS_1._get_closed_condition())
-                        metrics = metrics_class(builder(dbuser, dbpass, db_its1, db_identities, db_projects), metric_filters)
-                        ITS_1.ITS_1.add_metrics(metrics, ITS_1.ITS_1)
-
-                # Specific filters
-                if ds.get_name() == "scr":
-                    if 'scr_start_date' in Report._automator['r']:
-                        metrics.filters.start_date = Report._automator['r']['scr_start_date']
+        builder = ds.get_query_builder()
+        db = Report._automator['generic'][ds.get_db_name()]
+        metric_filters = Report.get_default_filter()
+        if ds == ITS_1.ITS_1:
+            metric_filters.set_closed_condition(ITS_1.ITS_1._get_closed_condition())
+        elif (ds.get_global_filter(ds) is not None):
+            metric_filters.global_filter = ds.get_global_filter(ds)
+        metrics = metrics_class(builder(dbuser, dbpass, db, db_identities, db_projects), metric_filters)
+
+        # Specific filters
+        if ds.get_name() == "scr":
+            if 'scr_start_date' in Report._automator['r']:
+                metrics.filters.start_date = Report._automator['r']['scr_start_date']
+        return metrics
 
     @staticmethod
-    def _init_studies(studies_path):
-        """Register all available studies"""
-        # logging.info("Loading studies modules from %s" % (studies_path))
-        # sys.path.insert(1,studies_path) # Prepend the studies path
+    def _init_studies():
+        """Register all available studies
 
-        from os import listdir
-        from os.path import isfile, join, dirname
-        import imp, inspect
+        As the metrics, the studies modules are imported when used.
+        """
+        from vizgrimoire.metrics.registry import get_registry
 
-        db_identities = Report._automator['generic']['db_identities']
-        dbuser = Report._automator['generic']['db_user']
-        dbpass = Report._automator['generic']['db_password']
         if 'studies' not in Report._automator['r']:
             logging.info("No studies configured.")
             return
         studies_on = Report._automator['r']['studies'].split(",")
+        for (module, name, study_id) in get_registry()["studies"]:
+            if study_id is None or study_id not in studies_on: continue
+            Report._studies_pending.append((module, name, study_id))
 
-        # Read all available studies installed in GrimoireLib egg
-        studies_pkg = "vizgrimoire.analysis"
-        import vizgrimoire.analysis
-        mfile = inspect.getfile(vizgrimoire.analysis)
-
-        if ".egg" in mfile:
-            mdir = mfile.split(".egg")[0] + ".egg"
-        else:
-            mdir = dirname(mfile)
-        if isfile(mdir):
-            # Load list of analysis from files zipped inside lib installed egg
-            mfile = mfile.split(".egg")[0] + ".egg"
-            import zipfile
-            zip = zipfile.ZipFile(mdir)
-            studies_mod = [f.replace("vizgrimoire/analysis/","") for f in zip.namelist()
-                           if "vizgrimoire/analysis/" in f and f.endswith(".py")]
-            zip.close()
-        else:
-            # Load list of analysis from analysis directory
-            if ".egg" in mdir: mdir += "/vizgrimoire/analysis/"
-            studies_mod = [f for f in listdir(mdir)
-                           if isfile(join(studies_path,f)) and f.endswith(".py")]
-
-        for study_mod in studies_mod:
-            mod_name = study_mod.split(".py")[0]
-            mod = __import__(studies_pkg+"."+mod_name)
-            # Support for having more than one study per module
-            studies_classes = [c for name, c in inspect.getmembers(sys.modules[studies_pkg+"."+mod_name])
-                               if inspect.isclass(c) and issubclass(c, Analyses)]
-            for study_class in studies_classes:
-                if study_class == Analyses: continue
-                Report._all_studies.append(study_class)
-                if study_class.id is None or study_class.id not in studies_on: continue
-                # logging.info("Adding new study: " + study_class.id)
-                Report._on_studies.append(study_class)
-        #  logging.info("Total studies: " + str(len(Report._on_studies)))
+    @staticmethod
+    def _get_study_class(module, name):
+        return getattr(import_module("vizgrimoire.analysis." + module), name)
 
+    @staticmethod
+    def _create_pending_studies(study_id = None):
+        """Import the pending studies (only the study_id ones if not None)"""
+        for item in [item for item in Report._studies_pending
+                     if study_id is None or item[2] == study_id]:
+            Report._studies_pending.remove(item)
+            Report._on_studies.append(Report._get_study_class(item[0], item[1]))
 
     @staticmethod
     def get_config():
@@ -328,20 +279,28 @@ class Report(object):
 
     @staticmethod
     def get_studies():
+        Report._create_pending_studies()
         return Report._on_studies
 
     @staticmethod
     def get_all_studies():
+        """All the studies available, also the ones not configured"""
+        from vizgrimoire.metrics.registry import get_registry
+        if len(Report._all_studies) == 0:
+            Report._all_studies = [Report._get_study_class(module, name)
+                                   for (module, name, study_id) in get_registry()["studies"]]
         return Report._all_studies
 
     @staticmethod
     def set_studies(studies):
+        Report._studies_pending = []
         Report._on_studies = studies
 
     @staticmethod
     def get_study_by_id(sid):
+        Report._create_pending_studies(sid)
         found = None
-        for study in Report.get_studies():
+        for study in Report._on_studies:
             if study.id == sid:
                 found = study
                 break